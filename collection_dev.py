@@ -10,8 +10,9 @@ parser.add_argument('-p', '--platform', choices=['vscode', 'circleci'], default=
 
 arguments = parser.parse_args()
 
-collections_path = "from ansible_collections.rubrikinc.cdm.plugins.module_utils.rubrik_cdm import credentials, load_provider_variables, rubrik_argument_spec"
-standard_path = "from ansible.module_utils.rubrik_cdm import credentials, load_provider_variables, rubrik_argument_spec"
+# Only the import prefix is rewritten so modules are free to import any helper from the Rubrik module_utils
+collections_path = "from ansible_collections.rubrikinc.cdm.plugins.module_utils.rubrik_"
+standard_path = "from ansible.module_utils.rubrik_"
 
 
 
@@ -19,9 +20,10 @@ standard_path = "from ansible.module_utils.rubrik_cdm import credentials, load_p
 if arguments.action == 'build':
     # Create a list of all modules for processing
     modules = []
-    for dir_path, _, file_name in os.walk('./rubrikinc/cdm/plugins/modules'):
+    for dir_path, _, file_name in os.walk('./rubrikinc/cdm/plugins'):
         for file in file_name:
-            modules.append(os.path.join(dir_path, file))
+            if '__pycache__' not in dir_path:
+                modules.append(os.path.join(dir_path, file))
 
     # Update import path to support Ansible Collections
     for m in modules:
@@ -51,7 +53,7 @@ else:
     if arguments.platform == 'circleci':
         search_directory = os.walk("/home/circleci/.ansible/collections/ansible_collections/rubrikinc/cdm")
     else:
-        search_directory = os.walk("/root/.ansible/collections/ansible_collections/rubrikinc/cdm/plugins/modules")
+        search_directory = os.walk("/root/.ansible/collections/ansible_collections/rubrikinc/cdm/plugins")
         print("VS Code")
     for dir_path, _, file_name in search_directory:
         for file in file_name:
@@ -3,7 +3,7 @@
 # GNU General Public License v3.0+ (see COPYING or
 # https://www.gnu.org/licenses/gpl-3.0.txt)
 
-from ansible.module_utils.rubrik_cdm import credentials, load_provider_variables, rubrik_argument_spec
+from ansible.module_utils.rubrik_cdm import connect, credentials, load_provider_variables, rubrik_argument_spec
 from ansible.module_utils.basic import AnsibleModule
 from __future__ import absolute_import, division, print_function
 __metaclass__ = type
@@ -76,7 +76,7 @@ def main():
     node_ip, username, password, api_token = credentials(module)
 
     try:
-        rubrik = rubrik_cdm.Connect(node_ip, username, password, api_token)
+        rubrik = connect(module, node_ip, username, password, api_token)
     except Exception as error:
         module.fail_json(msg=str(error))
 
@@ -0,0 +1,435 @@
+# (c) 2018 Rubrik, Inc
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""Action plugin of every rubrikinc.cdm module, see meta/runtime.yml.
+
+The Rubrik modules only talk HTTPS to the Rubrik cluster, so when a task runs on the controller the module main() is executed
+inside the worker process instead of building an AnsiballZ payload and starting a new Python interpreter that imports Ansible
+and the Rubrik SDK again. The API calls of the module go through a keep-alive session of the rubrikinc.cdm.rubrik httpapi
+plugin that is kept for the life of the worker process, so every item of a loop reuses the same TLS connection and session
+token.
+
+The module is executed the usual way when the task is delegated to another host, runs over a persistent connection, is
+asynchronous, when the Rubrik SDK is not installed on the controller or when the rubrik_cdm_in_process variable is false.
+
+The rubrik_assign_sla and rubrik_on_demand_snapshot tasks that every host of the play runs on the controller for its own
+object are coalesced: the identical tasks that start within rubrik_cdm_batch_window seconds of each other are run as a
+single execution of the bulk mode of the module and the result of each object is returned to its own host.
+"""
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import errno
+import fcntl
+import hashlib
+import importlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import traceback
+
+from ansible import constants as C
+from ansible import context
+from ansible.module_utils import basic
+from ansible.module_utils.parsing.convert_bool import boolean
+from ansible.module_utils.rubrik_cdm import HAS_RUBRIK_SDK, set_connection_factory
+from ansible.module_utils.six import iteritems, string_types
+from ansible.module_utils._text import to_bytes, to_native, to_text
+from ansible.plugins.action import ActionBase
+from ansible.plugins.loader import httpapi_loader
+from ansible.utils.display import Display
+from ansible.vars.clean import remove_internal_keys
+from ansible.utils.vars import merge_hash
+
+display = Display()
+
+COLLECTION = "rubrikinc.cdm"
+
+MODULE_PACKAGE = "ansible_collections.rubrikinc.cdm.plugins.modules"
+
+# The cluster connections of the worker process, keyed by cluster address and credentials
+_connections = {}
+
+# The default number of seconds the first task of a batch waits for the identical tasks of the other hosts
+DEFAULT_BATCH_WINDOW = 2.0
+
+BATCH_POLL_INTERVAL = 0.05
+
+
+class ClusterConnection(object):
+    """Stands in for the persistent connection of the rubrikinc.cdm.rubrik httpapi plugin inside the worker process."""
+
+    def __init__(self, node_ip, username, password, api_token):
+        self._options = {"host": node_ip, "remote_user": username, "password": password, "validate_certs": False}
+        self.httpapi = httpapi_loader.get("{0}.rubrik".format(COLLECTION), self)
+        self.httpapi.set_options(direct={"api_token": api_token})
+
+    def get_option(self, option):
+        return self._options.get(option)
+
+    def queue_message(self, level, message):
+        getattr(display, level)(message)
+
+    def send_request(self, data, **kwargs):
+        return self.httpapi.send_request(data, **kwargs)
+
+    def get_connection_stats(self):
+        return self.httpapi.get_connection_stats()
+
+
+def cluster_connection(node_ip, username, password, api_token):
+    """Return the connection of the worker process to the cluster, creating it the first time."""
+
+    key = (node_ip, username, password, api_token)
+    if key not in _connections:
+        _connections[key] = ClusterConnection(node_ip, username, password, api_token)
+    return _connections[key]
+
+
+class AssignSlaBatch(object):
+    """Coalesces the rubrik_assign_sla tasks of single vSphere VMs into the "objects" bulk mode of the module."""
+
+    @staticmethod
+    def request(module_args):
+        """Split the module arguments into the object of the task, its request and the arguments shared by the batch.
+        Returns None when the task can not be coalesced."""
+
+        object_name = module_args.get("object_name")
+        sla_name = module_args.get("sla_name")
+        if module_args.get("objects") is not None or module_args.get("object_type", "vmware") != "vmware" or \
+                not isinstance(object_name, string_types) or not isinstance(sla_name, string_types):
+            return None
+
+        shared_args = dict((key, value) for key, value in iteritems(module_args) if key not in ["object_name", "sla_name"])
+        return object_name, sla_name, shared_args
+
+    @staticmethod
+    def bulk_args(shared_args, requests):
+        module_args = dict(shared_args)
+        module_args["objects"] = dict(requests)
+        return module_args
+
+    @staticmethod
+    def retry(result, requests):
+        """Return the requests to run again because nothing is assigned when any object of the batch is not found."""
+
+        objects = result.get("objects") or {}
+        if not result.get("failed") or not any("error" in vm for vm in objects.values()):
+            return []
+
+        return [(object_name, sla_name) for object_name, sla_name in requests if "error" not in objects.get(object_name, {"error": None})]
+
+    @staticmethod
+    def result(result, object_name, sla_name):
+        vm = (result.get("objects") or {}).get(object_name)
+        if vm is None or "error" in vm:
+            return {"failed": True, "changed": False, "msg": vm["error"] if vm else result.get("msg")}
+
+        if not vm["changed"]:
+            return {"changed": False, "response": "No change required. The vSphere VM '{0}' is already assigned to the '{1}' SLA Domain.".format(
+                object_name, sla_name)}
+
+        return {"changed": True, "response": result.get("response")}
+
+
+class OnDemandSnapshotBatch(object):
+    """Coalesces the rubrik_on_demand_snapshot tasks of single objects into the "objects" bulk mode of the module."""
+
+    SNAPSHOT_OPTIONS = ["object_name", "object_type", "sla_name", "fileset", "host_os", "sql_host", "sql_instance"]
+
+    @classmethod
+    def request(cls, module_args):
+        object_name = module_args.get("object_name")
+        if module_args.get("objects") is not None or not isinstance(object_name, string_types):
+            return None
+
+        snapshot = dict((key, value) for key, value in iteritems(module_args) if key in cls.SNAPSHOT_OPTIONS)
+        shared_args = dict((key, value) for key, value in iteritems(module_args) if key not in cls.SNAPSHOT_OPTIONS)
+        return object_name, snapshot, shared_args
+
+    @staticmethod
+    def bulk_args(shared_args, requests):
+        module_args = dict(shared_args)
+        module_args["objects"] = [snapshot for object_name, snapshot in requests]
+        return module_args
+
+    @staticmethod
+    def retry(result, requests):
+        # The snapshot of every other object is started even when some objects fail
+        return []
+
+    @staticmethod
+    def result(result, object_name, snapshot):
+        # A batch has a single request per object name, so the name finds the snapshot of the request
+        snapshot = next((snapshot for snapshot in result.get("snapshots") or [] if snapshot["object_name"] == object_name), None)
+        if snapshot is None or "error" in snapshot:
+            return {"failed": True, "changed": False, "msg": snapshot["error"] if snapshot else result.get("msg")}
+
+        return {"changed": True, "response": snapshot["response"], "job_status_url": snapshot["job_status_url"]}
+
+
+BATCHES = {
+    "rubrik_assign_sla": AssignSlaBatch,
+    "rubrik_on_demand_snapshot": OnDemandSnapshotBatch,
+}
+
+
+class TaskBatch(object):
+    """The requests of the identical tasks of several hosts that are run as a single bulk module execution.
+
+    The worker process of every host adds its request to the spool directory of the task. The first worker of a batch is its
+    leader: it waits up to "window" seconds for the requests of the other hosts, or until "expected" requests were added, closes
+    the batch, runs it and writes the result of each request to the spool directory for the other workers to pick up. Every
+    worker of the batch is a member with its own result file, so the workers that added the same request each read and remove
+    their own copy of its result. The requests added once the batch is closed start the next batch.
+    """
+
+    def __init__(self, path, window, expected):
+        self.path = path
+        self.window = window
+        self.expected = expected
+        self.batch_id = None
+        self.index = None
+        self.member = None
+        self.members = []
+        self.leader = False
+        self.leader_pid = None
+
+    def join(self, key, request):
+        """Add the request to the open batch, or start a new one. Returns False when a different request for the same object
+        is already part of the open batch."""
+
+        def update(state):
+            if state.get("closed", True):
+                state.update({"batch_id": state.get("batch_id", -1) + 1, "leader": os.getpid(), "requests": [], "members": [],
+                              "closed": False, "started": time.time()})
+                self.leader = True
+
+            for index, (existing_key, existing_request) in enumerate(state["requests"]):
+                if existing_key == key:
+                    if existing_request != request:
+                        return False
+                    self.index = index
+                    break
+            else:
+                state["requests"].append([key, request])
+                self.index = len(state["requests"]) - 1
+
+            # The leader of this batch is pinned, a later batch replaces the leader in the state
+            self.member = len(state["members"])
+            state["members"].append(self.index)
+            self.batch_id = state["batch_id"]
+            self.leader_pid = state["leader"]
+            return True
+
+        return self._update(update)
+
+    def close(self):
+        """Wait for the requests of the other hosts, close the batch and return its requests."""
+
+        while True:
+            state = self._read("state.json")
+            if len(state["requests"]) >= self.expected or time.time() >= state["started"] + self.window:
+                break
+            time.sleep(BATCH_POLL_INTERVAL)
+
+        def update(state):
+            state["closed"] = True
+            self.members = list(state["members"])
+            return [(key, request) for key, request in state["requests"]]
+
+        return self._update(update)
+
+    def set_results(self, results):
+        """Write the result of its request for every other member of the batch."""
+
+        for member, index in enumerate(self.members):
+            if member != self.member:
+                self._write("result-{0}-{1}.json".format(self.batch_id, member), results[index])
+
+    def wait_result(self):
+        """Wait for the leader to write the result of the request. Returns None when the leader exited without a result."""
+
+        name = "result-{0}-{1}.json".format(self.batch_id, self.member)
+        leader = self.leader_pid
+        while True:
+            result = self._read(name)
+            if result is not None:
+                os.remove(os.path.join(self.path, name))
+                return result
+
+            try:
+                os.kill(leader, 0)
+            except OSError as error:
+                if error.errno == errno.ESRCH and self._read(name) is None:
+                    return None
+            time.sleep(BATCH_POLL_INTERVAL)
+
+    def _read(self, name):
+        try:
+            with open(os.path.join(self.path, name)) as spool_file:
+                return json.load(spool_file)
+        except (IOError, OSError, ValueError):
+            return None
+
+    def _write(self, name, data):
+        # Write through a temporary file so readers never see a partial file
+        fd, temp_path = tempfile.mkstemp(dir=self.path)
+        with os.fdopen(fd, "w") as temp_file:
+            json.dump(data, temp_file)
+        os.rename(temp_path, os.path.join(self.path, name))
+
+    def _update(self, update):
+        if not os.path.isdir(self.path):
+            try:
+                os.makedirs(self.path, 0o700)
+            except OSError:
+                if not os.path.isdir(self.path):
+                    raise
+
+        # Serialize the read-modify-write of the batch state across the worker processes
+        with open(os.path.join(self.path, "state.lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+            state = self._read("state.json") or {}
+            value = update(state)
+            self._write("state.json", state)
+
+        return value
+
+
+class ActionModule(ActionBase):
+
+    _supports_check_mode = True
+    _supports_async = True
+
+    def run(self, tmp=None, task_vars=None):
+        result = super(ActionModule, self).run(tmp, task_vars)
+        del tmp  # tmp no longer has any effect
+
+        if task_vars is None:
+            task_vars = dict()
+
+        module_name = self._module_name()
+
+        if not self._runs_in_process(module_name, task_vars):
+            wrap_async = self._task.async_val and not self._connection.has_native_async
+            result = merge_hash(result, self._execute_module(task_vars=task_vars, wrap_async=wrap_async))
+            if not wrap_async:
+                self._remove_tmp_path(self._connection._shell.tmpdir)
+            return result
+
+        batch = BATCHES.get(module_name)
+        if batch is not None and not self._play_context.check_mode:
+            batch_result = self._execute_module_in_batch(module_name, batch, task_vars)
+            if batch_result is not None:
+                return merge_hash(result, batch_result)
+
+        return merge_hash(result, self._execute_module_in_process(module_name, task_vars))
+
+    def _module_name(self):
+        # The resolved action of the task is this action plugin, resolve the module itself
+        module = self._shared_loader_obj.module_loader.find_plugin_with_context(self._task.action, collection_list=self._task.collections)
+        if not module.resolved:
+            return None
+
+        collection, _, module_name = module.resolved_fqcn.rpartition(".")
+        if collection != COLLECTION:
+            return None
+        return module_name
+
+    def _runs_in_process(self, module_name, task_vars):
+        if module_name is None or not HAS_RUBRIK_SDK or self._task.async_val:
+            return False
+
+        # Delegated to another host or sent through a persistent connection
+        if self._connection.transport != "local" or getattr(self._connection, "socket_path", None):
+            return False
+
+        return boolean(task_vars.get("rubrik_cdm_in_process", True), strict=False)
+
+    def _execute_module_in_batch(self, module_name, batch, task_vars):
+        """Run the task as part of the batch of the identical tasks of the other hosts. Returns None when the task must run
+        on its own."""
+
+        window = float(task_vars.get("rubrik_cdm_batch_window", DEFAULT_BATCH_WINDOW))
+        hosts = len(task_vars.get("ansible_play_batch", []))
+        expected = min(hosts, context.CLIARGS.get("forks") or C.DEFAULT_FORKS)
+        if window <= 0 or expected < 2:
+            return None
+
+        request = batch.request(self._task.args)
+        if request is None:
+            return None
+        key, request, shared_args = request
+
+        # The tasks of a batch share the same task, module arguments and so the same Rubrik cluster and credentials
+        batch_key = hashlib.sha1(to_bytes(json.dumps([self._task._uuid, module_name, shared_args], sort_keys=True))).hexdigest()
+        task_batch = TaskBatch(os.path.join(C.DEFAULT_LOCAL_TMP, "rubrik-batch-{0}".format(batch_key)), window, expected)
+
+        if not task_batch.join(key, request):
+            return None
+
+        if not task_batch.leader:
+            result = task_batch.wait_result()
+            if result is not None:
+                display.vvv("Executed {0}.{1} for {2} in a batch".format(COLLECTION, module_name, key))
+            return result
+
+        requests = task_batch.close()
+        results = {}
+        pending = requests
+        while pending:
+            bulk_result = self._execute_module_in_process(module_name, task_vars, batch.bulk_args(shared_args, pending))
+            retry = batch.retry(bulk_result, pending)
+            for pending_key, pending_request in pending:
+                if (pending_key, pending_request) not in retry:
+                    results[pending_key] = batch.result(bulk_result, pending_key, pending_request)
+                    results[pending_key]["coalesced"] = len(requests)
+            pending = retry if len(retry) < len(pending) else []
+
+        task_batch.set_results([results[request_key] for request_key, batch_request in requests])
+        display.vvv("Executed {0}.{1} once for a batch of {2} hosts".format(COLLECTION, module_name, len(requests)))
+
+        return results[key]
+
+    def _execute_module_in_process(self, module_name, task_vars, module_args=None):
+        """Run the module main() in this process and return its result the same way _execute_module() does."""
+
+        module = importlib.import_module("{0}.{1}".format(MODULE_PACKAGE, module_name))
+
+        module_args = (self._task.args if module_args is None else module_args).copy()
+        self._update_module_args(module_name, module_args, task_vars)
+
+        environment = {}
+        self._compute_environment_string(environment)
+        saved_environment = os.environ.copy()
+        os.environ.update((to_native(key), to_native(value)) for key, value in iteritems(environment))
+
+        stdout = io.StringIO()
+        saved_stdout = sys.stdout
+        basic._ANSIBLE_ARGS = to_bytes(json.dumps({"ANSIBLE_MODULE_ARGS": module_args}))
+        set_connection_factory(cluster_connection)
+
+        exception = None
+        try:
+            sys.stdout = stdout
+            module.main()
+        except SystemExit:
+            pass
+        except Exception:
+            exception = traceback.format_exc()
+        finally:
+            sys.stdout = saved_stdout
+            basic._ANSIBLE_ARGS = None
+            set_connection_factory(None)
+            os.environ.clear()
+            os.environ.update(saved_environment)
+
+        display.vvv("Executed {0}.{1} inside the controller worker process".format(COLLECTION, module_name))
+
+        data = self._parse_returned_data({"stdout": to_text(stdout.getvalue()), "stderr": to_text(exception or u""), "rc": 0})
+        remove_internal_keys(data)
+        return data
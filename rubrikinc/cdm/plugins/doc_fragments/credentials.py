@@ -77,6 +77,10 @@ options:
       - The DNS hostname or IP address of the Rubrik cluster. By defeault, the module will attempt to
         read this value from the rubrik_cdm_node_ip environment variable. If this environment variable is
         not present it will need to be manually specified here or in the I(provider) parameter.
+      - A comma separated list of the nodes of the Rubrik cluster spreads the API calls across the healthy nodes, favoring the nodes
+        that respond the fastest. Job status calls are sent to the node that accepted the job and read-only calls are sent to another
+        node when a node can not be reached. The number of API calls, errors and the average latency of each node are returned in
+        I(node_stats).
     required: false
     type: str
   api_token:
@@ -100,4 +104,106 @@ options:
         not present it will need to be manually specified here or in the I(provider) parameter.
     required: false
     type: str
+  lookup_cache_ttl:
+    description:
+      - The number of seconds Rubrik object name to ID lookups (SLA Domains, vSphere VMs, hosts, fileset templates, etc.) are
+        cached on the Ansible controller. Repeated tasks in the same or later plays skip the listing API calls while the entry is
+        valid. Modules that create or delete objects remove the relevant entries from the cache. By default, the module will attempt
+        to read this value from the rubrik_cdm_lookup_cache_ttl environment variable. Set to 0 to disable the cache.
+    required: false
+    default: 0
+    type: int
+  lookup_cache_dir:
+    description:
+      - The directory that holds the lookup cache files, one per Rubrik cluster ID. By default, the module will attempt to read this
+        value from the rubrik_cdm_lookup_cache_dir environment variable and otherwise uses ~/.ansible/rubrik_cdm.
+    required: false
+    type: path
+  discover_nodes:
+    description:
+      - Spread the API calls across every healthy node of the Rubrik cluster, listed from the I(node_ip) at the start of the task.
+        By default, the module will attempt to read this value from the rubrik_cdm_discover_nodes environment variable.
+    required: false
+    default: false
+    type: bool
+  token_cache_ttl:
+    description:
+      - The number of seconds the session token that the I(username) and I(password) are exchanged for is cached on the host that
+        runs the module. Later tasks and plays reuse the session token instead of authenticating again, and login again when the
+        Rubrik cluster rejects it. The session token is stored in a file only readable by the current user, encrypted with a key
+        derived from the password. Requires the cryptography Python library. By default, the module will attempt to read this
+        value from the rubrik_cdm_token_cache_ttl environment variable. Set to 0 to disable the cache.
+    required: false
+    default: 0
+    type: int
+  token_cache_dir:
+    description:
+      - The directory that holds the session token cache files, one per I(node_ip) and I(username). By default, the module will
+        attempt to read this value from the rubrik_cdm_token_cache_dir environment variable and otherwise uses ~/.ansible/rubrik_cdm.
+    required: false
+    type: path
+  rate_limit:
+    description:
+      - The number of API calls per second sent to the Rubrik cluster by every task and fork running on the same host. The calls
+        wait for their turn instead of failing when the cluster would throttle them. API calls rejected by the cluster with
+        429 Too Many Requests or 503 Service Unavailable hold back the calls of every fork and are sent again up to 3 times.
+        By default, the module will attempt to read this value from the rubrik_cdm_rate_limit environment variable. Set to 0 to
+        disable the cluster wide limit. The number of throttled calls and the seconds spent waiting are returned in I(rate_limit_stats).
+    required: false
+    default: 0
+    type: float
+  rate_limit_endpoints:
+    description:
+      - Additional budgets, in API calls per second, for the API calls matching a shell-style pattern of the HTTP method and
+        path (ex. C(POST /v1/vmware/vm/*/snapshot)). Each matching call has to fit in every matching budget as well as in
+        I(rate_limit). By default, the module will attempt to read this value from the rubrik_cdm_rate_limit_endpoints
+        environment variable.
+    required: false
+    type: dict
+  rate_limit_dir:
+    description:
+      - The directory that holds the rate limit files, one per I(node_ip). By default, the module will attempt to read this value
+        from the rubrik_cdm_rate_limit_dir environment variable and otherwise uses ~/.ansible/rubrik_cdm.
+    required: false
+    type: path
+  api_retries:
+    description:
+      - The number of times an API call that failed because the Rubrik cluster could not be reached, timed out or answered with
+        a 5xx status is sent again. Only GET, PUT and job status calls are retried unless I(api_retry_posts) is set. Each retry
+        waits for a randomized exponential back-off. By default, the module will attempt to read this value from the
+        rubrik_cdm_api_retries environment variable. The API calls are not retried when set to 0.
+    required: false
+    default: 0
+    type: int
+  api_retry_posts:
+    description:
+      - Also retry POST, PATCH and DELETE API calls. The Rubrik cluster may have carried out such a call before it failed, so
+        a retry can start a second job or fail because the first call succeeded. By default, the module will attempt to read
+        this value from the rubrik_cdm_api_retry_posts environment variable.
+    required: false
+    default: false
+    type: bool
+  circuit_breaker_threshold:
+    description:
+      - The number of consecutive API calls, made by any task or fork running on the same host, that must fail because the
+        Rubrik cluster could not be reached before the API calls fail at once without being sent. After
+        I(circuit_breaker_cool_down) seconds a single API call probes the cluster again. By default, the module will attempt
+        to read this value from the rubrik_cdm_circuit_breaker_threshold environment variable. Set to 0 to disable the circuit
+        breaker.
+    required: false
+    default: 0
+    type: int
+  circuit_breaker_cool_down:
+    description:
+      - The number of seconds the API calls fail without being sent once the circuit breaker opens. By default, the module will
+        attempt to read this value from the rubrik_cdm_circuit_breaker_cool_down environment variable.
+    required: false
+    default: 30
+    type: int
+  circuit_breaker_dir:
+    description:
+      - The directory that holds the circuit breaker files, one per I(node_ip). By default, the module will attempt to read this
+        value from the rubrik_cdm_circuit_breaker_dir environment variable and otherwise uses ~/.ansible/rubrik_cdm.
+    required: false
+    type: path
 """
@@ -0,0 +1,217 @@
+# (c) 2018 Rubrik, Inc
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = '''
+author: Rubrik Build Team (@drew-russell) <build@rubrik.com>
+httpapi: rubrik
+short_description: Persistent HttpApi plugin for the Rubrik CDM API.
+description:
+    - Keeps a pooled, keep-alive HTTPS session to the Rubrik cluster open inside the persistent connection process for the life of
+      the play. The rubrikinc.cdm modules send every API call through this session instead of opening a new connection, performing
+      a new TLS handshake and re-authenticating on every task.
+    - Username and password credentials are exchanged for a session token once, the first time the connection is used.
+version_added: '2.9'
+options:
+  api_token:
+    description:
+      - The API Token used for authentication in place of the I(ansible_user) and I(ansible_httpapi_password) variables.
+    type: str
+    env:
+      - name: rubrik_cdm_token
+    vars:
+      - name: ansible_httpapi_rubrik_api_token
+'''
+
+EXAMPLES = '''
+# inventory
+# [rubrik]
+# rubrik-cluster ansible_host=192.168.1.100
+#
+# [rubrik:vars]
+# ansible_connection=ansible.netcommon.httpapi
+# ansible_network_os=rubrikinc.cdm.rubrik
+# ansible_user=admin
+# ansible_httpapi_password=SecretPassword
+# ansible_httpapi_validate_certs=false
+# ansible_connect_timeout=600
+
+- rubrik_assign_sla:
+    object_name: "{{ inventory_hostname }}"
+    sla_name: "Gold"
+  delegate_to: rubrik-cluster
+'''
+
+import json
+
+from ansible.module_utils.connection import ConnectionError
+from ansible.module_utils._text import to_text
+from ansible.plugins.httpapi import HttpApiBase
+
+try:
+    import requests
+    HAS_REQUESTS = True
+except ImportError:
+    HAS_REQUESTS = False
+
+
+class HttpApi(HttpApiBase):
+
+    def __init__(self, connection):
+        super(HttpApi, self).__init__(connection)
+
+        self._sessions = {}
+        self._token = None
+        self._requests_sent = 0
+        self._logins = 0
+
+    def login(self, username, password):
+        """Exchange the username and password for a session token, or use the provided API token as is."""
+
+        api_token = self.get_option("api_token")
+        if api_token:
+            self._token = api_token
+            return
+
+        if username is None or password is None:
+            raise ConnectionError("You must provide an api_token or username and password for authentication.")
+
+        response = self._send("POST", self._url("v1", "/session"), data=json.dumps({}), auth=(username, password), timeout=15)
+        self._token = response["token"]
+        self._logins += 1
+
+    def logout(self):
+        if self._token is not None and not self.get_option("api_token"):
+            try:
+                self._send("DELETE", self._url("v1", "/session/me"), timeout=15)
+            except ConnectionError:
+                pass
+        self._token = None
+
+        for session in self._sessions.values():
+            session.close()
+        self._sessions = {}
+
+    def send_request(self, data, call_type="GET", api_version="v1", api_endpoint=None, job_status_url=None, timeout=15,
+                     authentication=True, params=None):
+        """Send a rubrik_cdm.Connect._common_api() call through the pooled session.
+
+        Arguments:
+            data {dict} -- The specified data to send with 'DELETE', 'POST', 'PUT' and 'PATCH' API calls.
+
+        Keyword Arguments:
+            call_type {str} -- The HTTP Method for the type of RESTful API call being made.
+                               (choices: {'GET', 'POST', 'PUT', 'PATCH', 'DELETE', and 'JOB_STATUS'.})
+            api_version {str} -- The version of the Rubrik CDM API to call. (choices: {v1, v2, internal})
+            api_endpoint {str} -- The endpoint of the Rubrik CDM API to call (ex. /cluster/me).
+            job_status_url {str} -- The job status URL provided by a previous API call.
+            timeout {int} -- The number of seconds to wait to establish a connection the Rubrik cluster before returning a timeout error.
+            authentication {bool} -- Flag that specifies whether or not to utilize authentication when making the API call.
+            params {dict} -- An optional dict containing variables in a key:value format to send with `GET` & `DELETE` API calls.
+
+        Returns:
+            dict -- The response body of the API call.
+        """
+
+        if call_type == "JOB_STATUS":
+            method, url = "GET", job_status_url
+        elif call_type in ["GET", "POST", "PUT", "PATCH", "DELETE"]:
+            method, url = call_type, self._url(api_version, api_endpoint)
+        else:
+            raise ConnectionError("The '{0}' call_type is not supported by the rubrikinc.cdm.rubrik httpapi plugin.".format(call_type))
+
+        if data is not None:
+            data = json.dumps(data)
+
+        if authentication and self._token is None:
+            self.login(self.connection.get_option("remote_user"), self.connection.get_option("password"))
+
+        try:
+            return self._send(method, url, data=data, params=params, timeout=timeout, authentication=authentication)
+        except ConnectionError as error:
+            # The session token has expired on the cluster, login again and resend the request once
+            if getattr(error, "code", None) != 401 or not authentication or self.get_option("api_token"):
+                raise
+            self.login(self.connection.get_option("remote_user"), self.connection.get_option("password"))
+            return self._send(method, url, data=data, params=params, timeout=timeout, authentication=authentication)
+
+    def get_connection_stats(self):
+        """Return the number of API calls served by the persistent connection and the number of TLS handshakes and logins
+        that were avoided by reusing the pooled session.
+
+        Returns:
+            dict -- The connection counters.
+        """
+
+        handshakes = 0
+        for session in self._sessions.values():
+            pools = session.get_adapter("https://").poolmanager.pools
+            for key in pools.keys():
+                handshakes += pools[key].num_connections
+
+        return {
+            "requests": self._requests_sent,
+            "handshakes": handshakes,
+            "handshakes_avoided": max(self._requests_sent - handshakes, 0),
+            "logins": self._logins,
+        }
+
+    def _url(self, api_version, api_endpoint):
+        return "https://{0}/api/{1}{2}".format(self.connection.get_option("host"), api_version, api_endpoint)
+
+    def _session(self):
+        node_ip = self.connection.get_option("host")
+
+        session = self._sessions.get(node_ip)
+        if session is None:
+            if not HAS_REQUESTS:
+                raise ConnectionError("The requests library is required for the rubrikinc.cdm.rubrik httpapi plugin (pip install requests).")
+
+            session = requests.Session()
+            session.verify = self.connection.get_option("validate_certs")
+            session.headers.update({
+                "Content-Type": "application/json",
+                "Accept": "application/json",
+                "User-Agent": "RubrikAnsibleHttpApi",
+            })
+            self._sessions[node_ip] = session
+
+        return session
+
+    def _send(self, method, url, data=None, params=None, timeout=15, authentication=True, auth=None):
+        headers = {}
+        if authentication and auth is None and self._token is not None:
+            headers["Authorization"] = "Bearer {0}".format(self._token)
+
+        session = self._session()
+        try:
+            # verify is passed on every request since requests prefers REQUESTS_CA_BUNDLE over the session setting
+            response = session.request(method, url, data=data, params=params, headers=headers, auth=auth, timeout=timeout,
+                                       verify=session.verify)
+        except requests.exceptions.ConnectionError:
+            raise ConnectionError("Unable to establish a connection to the Rubrik cluster.")
+        except requests.exceptions.Timeout:
+            raise ConnectionError(
+                "The Rubrik cluster did not respond to the API request in the allotted amount of time. To fix this issue, increase the timeout value.")
+
+        self._requests_sent += 1
+        self.connection.queue_message("vvvv", "{0} {1} returned {2} ({3})".format(method, url, response.status_code, self.get_connection_stats()))
+
+        if response.status_code == 204:
+            return {"status_code": response.status_code}
+
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+
+        if response.status_code >= 400:
+            if isinstance(body, dict) and "message" in body:
+                raise ConnectionError(to_text(body["message"]), code=response.status_code)
+            raise ConnectionError(to_text(response.text), code=response.status_code)
+
+        if body is None:
+            return {"status_code": response.status_code}
+
+        return body
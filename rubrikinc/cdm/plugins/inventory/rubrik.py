@@ -0,0 +1,297 @@
+# (c) 2018 Rubrik, Inc
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = '''
+author: Rubrik Build Team (@drew-russell) <build@rubrik.com>
+name: rubrik
+plugin_type: inventory
+short_description: Rubrik CDM protected object inventory source.
+description:
+    - Builds an inventory of the vSphere VMs, physical hosts, MSSQL databases and managed volumes known to a Rubrik cluster.
+    - Every page of each object type is fetched, with the object types fetched concurrently.
+    - Objects are grouped by object type (rubrik_vmware, rubrik_physical_host, rubrik_mssql_db, rubrik_managed_volume), by
+      effective SLA Domain (rubrik_sla_<name>), by Rubrik cluster (rubrik_cluster_<name>) and by protection state
+      (rubrik_protected, rubrik_unprotected).
+    - MSSQL databases are named <host>/<instance>/<database>. Objects that share the same name, for example VMs of different
+      vCenters or a vSphere VM and the physical host running in it, are added once per object, the later ones named
+      <name>_<Rubrik ID>, so that they keep their own variables and groups.
+    - Uses a YAML configuration file that ends with rubrik.yml or rubrik.yaml.
+    - Set I(cache) to reuse the fetched objects on the next runs instead of paginating every object again.
+version_added: '2.9'
+requirements: [rubrik_cdm]
+extends_documentation_fragment:
+    - constructed
+    - inventory_cache
+options:
+  plugin:
+    description:
+      - The name of this plugin, it should always be set to 'rubrikinc.cdm.rubrik' for this plugin to recognize it as it's own.
+    required: True
+    choices: ['rubrikinc.cdm.rubrik']
+  node_ip:
+    description:
+      - The DNS hostname or IP address of the Rubrik cluster.
+    type: str
+    env:
+      - name: rubrik_cdm_node_ip
+  username:
+    description:
+      - The username used to authenticate the connection to the Rubrik cluster.
+    type: str
+    env:
+      - name: rubrik_cdm_username
+  password:
+    description:
+      - The password used to authenticate the connection to the Rubrik cluster.
+    type: str
+    env:
+      - name: rubrik_cdm_password
+  api_token:
+    description:
+      - The api token used to authenticate the connection to the Rubrik cluster.
+    type: str
+    env:
+      - name: rubrik_cdm_token
+  object_types:
+    description:
+      - The Rubrik object types to add to the inventory.
+    type: list
+    elements: str
+    choices: [vmware, physical_host, mssql_db, managed_volume]
+    default: [vmware, physical_host, mssql_db, managed_volume]
+  page_size:
+    description:
+      - The number of objects to request per API call.
+    type: int
+    default: 500
+  max_concurrency:
+    description:
+      - The maximum number of object types fetched at the same time.
+    type: int
+    default: 4
+  timeout:
+    description:
+      - The number of seconds to wait to establish a connection the Rubrik cluster before returning a timeout error.
+    type: int
+    default: 30
+'''
+
+EXAMPLES = '''
+# rubrik.yml
+plugin: rubrikinc.cdm.rubrik
+node_ip: 192.168.1.100
+object_types:
+  - vmware
+  - mssql_db
+cache: true
+cache_plugin: jsonfile
+cache_connection: ~/.ansible/inventory_cache
+cache_timeout: 3600
+keyed_groups:
+  - key: rubrik_object_type
+    prefix: type
+'''
+
+from ansible.errors import AnsibleError
+from ansible.inventory.group import to_safe_group_name
+from ansible.module_utils._text import to_native
+from ansible.module_utils.rubrik_cdm import HAS_RUBRIK_SDK, paginate, rubrik_cdm, run_concurrently
+from ansible.plugins.inventory import BaseInventoryPlugin, Cacheable, Constructable
+from ansible.utils.display import Display
+
+display = Display()
+
+
+OBJECT_TYPES = {
+    "vmware": {
+        "api_version": "v1",
+        "api_endpoint": "/vmware/vm",
+        "params": {"is_relic": "false"},
+    },
+    "physical_host": {
+        "api_version": "v1",
+        "api_endpoint": "/host",
+        "params": {},
+    },
+    "mssql_db": {
+        "api_version": "v1",
+        "api_endpoint": "/mssql/db",
+        "params": {"is_relic": "false"},
+    },
+    "managed_volume": {
+        "api_version": "internal",
+        "api_endpoint": "/managed_volume",
+        "params": {"is_relic": "false"},
+    },
+}
+
+UNPROTECTED_SLA_DOMAIN_IDS = ["UNPROTECTED", "INHERIT"]
+
+
+def summarize(object_type, rubrik_object):
+    """Reduce an API listing entry to the host variables stored in the inventory and in the inventory cache.
+
+    Arguments:
+        object_type {str} -- The Rubrik object type of the entry.
+        rubrik_object {dict} -- The API listing entry.
+
+    Returns:
+        dict -- The inventory host name and host variables of the object.
+    """
+
+    summary = {
+        # Hosts registered before CDM 5.0 only have a hostname
+        "name": rubrik_object.get("name") or rubrik_object.get("hostname"),
+        "rubrik_object_type": object_type,
+        "rubrik_id": rubrik_object["id"],
+        "rubrik_cluster_id": rubrik_object.get("primaryClusterId"),
+        "rubrik_sla_domain": rubrik_object.get("effectiveSlaDomainName"),
+        "rubrik_sla_domain_id": rubrik_object.get("effectiveSlaDomainId"),
+    }
+
+    if object_type == "vmware":
+        summary["ansible_host"] = rubrik_object.get("ipAddress") or None
+    elif object_type == "physical_host":
+        summary["ansible_host"] = rubrik_object.get("hostname") or None
+        summary["rubrik_operating_system_type"] = rubrik_object.get("operatingSystemType")
+        summary["rubrik_status"] = rubrik_object.get("status")
+    elif object_type == "mssql_db":
+        summary["rubrik_sql_host"] = (rubrik_object.get("rootProperties") or {}).get("rootName")
+        summary["rubrik_sql_instance"] = rubrik_object.get("instanceName")
+        summary["name"] = "{0}/{1}/{2}".format(summary["rubrik_sql_host"], summary["rubrik_sql_instance"], rubrik_object["name"])
+
+    return summary
+
+
+class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
+
+    NAME = 'rubrikinc.cdm.rubrik'
+
+    def verify_file(self, path):
+        """Only accept configuration files that end with rubrik.yml or rubrik.yaml."""
+
+        if super(InventoryModule, self).verify_file(path):
+            return path.endswith(("rubrik.yml", "rubrik.yaml"))
+        return False
+
+    def parse(self, inventory, loader, path, cache=True):
+        super(InventoryModule, self).parse(inventory, loader, path, cache)
+
+        self._read_config_data(path)
+
+        cache_key = self.get_cache_key(path)
+        user_cache_setting = self.get_option("cache")
+        attempt_to_read_cache = user_cache_setting and cache
+        cache_needs_update = user_cache_setting and not cache
+
+        objects = None
+        if attempt_to_read_cache:
+            try:
+                objects = self._cache[cache_key]
+            except KeyError:
+                cache_needs_update = True
+
+        if objects is None:
+            objects = self._fetch_objects()
+
+        if cache_needs_update:
+            self._cache[cache_key] = objects
+
+        self._populate(objects)
+
+    def _connect(self):
+        if not HAS_RUBRIK_SDK:
+            raise AnsibleError("The Rubrik Python SDK is required for the rubrikinc.cdm.rubrik inventory plugin (pip install rubrik_cdm).")
+
+        try:
+            return rubrik_cdm.Connect(self.get_option("node_ip"), self.get_option("username"), self.get_option("password"),
+                                      self.get_option("api_token"))
+        except Exception as error:
+            raise AnsibleError("Unable to connect to the Rubrik cluster: {0}".format(to_native(error)))
+
+    def _fetch_objects(self):
+        """Fetch the local cluster details and every object of the configured object types.
+
+        Returns:
+            dict -- The local cluster details and the summarized objects of each object type.
+        """
+
+        rubrik = self._connect()
+        timeout = self.get_option("timeout")
+        page_size = self.get_option("page_size")
+        object_types = self.get_option("object_types")
+
+        def fetch(object_type):
+            if object_type == "cluster":
+                cluster = rubrik.get("v1", "/cluster/me", timeout=timeout)
+                return {"id": cluster["id"], "name": cluster["name"]}
+
+            api_call = OBJECT_TYPES[object_type]
+            listing = paginate(rubrik, api_call["api_version"], api_call["api_endpoint"], params=api_call["params"],
+                               limit=page_size, timeout=timeout)
+            return [summarize(object_type, rubrik_object) for rubrik_object in listing]
+
+        requests = ["cluster"] + object_types
+        responses = run_concurrently(fetch, requests, self.get_option("max_concurrency"))
+
+        objects = {}
+        for request, (response, error) in zip(requests, responses):
+            if error is not None:
+                raise AnsibleError("Unable to fetch the Rubrik {0} objects: {1}".format(request, to_native(error)))
+            objects[request] = response
+
+        return objects
+
+    def _populate(self, objects):
+        cluster = objects["cluster"]
+        strict = self.get_option("strict")
+
+        for group in ["rubrik_protected", "rubrik_unprotected"]:
+            self.inventory.add_group(group)
+
+        host_names = set()
+
+        for object_type in OBJECT_TYPES:
+            if object_type not in objects:
+                continue
+
+            type_group = self.inventory.add_group("rubrik_{0}".format(object_type))
+
+            for summary in objects[object_type]:
+                host_vars = dict(summary)
+                host_name = host_vars.pop("name")
+
+                # Objects with the same name, VMs of different vCenters or a VM and its physical host for example, must not share the
+                # host variables and groups
+                if host_name in host_names:
+                    host_name = "{0}_{1}".format(host_name, summary["rubrik_id"])
+                    display.warning("More than one Rubrik object is named '{0}', the {1} object {2} was added as '{3}'.".format(
+                        summary["name"], object_type, summary["rubrik_id"], host_name))
+                host_names.add(host_name)
+
+                self.inventory.add_host(host_name, group=type_group)
+                for key, value in host_vars.items():
+                    if value is not None:
+                        self.inventory.set_variable(host_name, key, value)
+
+                cluster_name = cluster["name"] if summary["rubrik_cluster_id"] == cluster["id"] else summary["rubrik_cluster_id"]
+                if cluster_name:
+                    self._add_to_group(host_name, "rubrik_cluster_{0}".format(cluster_name))
+
+                if summary["rubrik_sla_domain_id"] is not None:
+                    if summary["rubrik_sla_domain_id"] in UNPROTECTED_SLA_DOMAIN_IDS:
+                        self.inventory.add_child("rubrik_unprotected", host_name)
+                    else:
+                        self.inventory.add_child("rubrik_protected", host_name)
+                        self._add_to_group(host_name, "rubrik_sla_{0}".format(summary["rubrik_sla_domain"]))
+
+                host = self.inventory.get_host(host_name)
+                self._set_composite_vars(self.get_option("compose"), host.get_vars(), host_name, strict=strict)
+                self._add_host_to_composed_groups(self.get_option("groups"), host.get_vars(), host_name, strict=strict)
+                self._add_host_to_keyed_groups(self.get_option("keyed_groups"), host.get_vars(), host_name, strict=strict)
+
+    def _add_to_group(self, host_name, group_name):
+        group = self.inventory.add_group(to_safe_group_name(group_name.lower(), force=True, silent=True))
+        self.inventory.add_child(group, host_name)
@@ -31,15 +31,93 @@
 from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
-from ansible.module_utils.six import iteritems
+import base64
+import bisect
+import copy
+import fcntl
+import fnmatch
+import hashlib
+import importlib
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+
+from ansible.module_utils.six import iteritems, string_types
+from ansible.module_utils.six.moves.urllib.parse import unquote, urlsplit
 from ansible.module_utils.basic import env_fallback
+from ansible.module_utils._text import to_bytes, to_native
+
+
+class LazyImport(object):
+    """Stand-in for a module that is only imported the first time one of its attributes is used, so that argument
+    validation and the failure paths of a module never pay for the import. The module is imported once per process.
+    """
+
+    def __init__(self, name, on_import=None):
+        self._name = name
+        self._on_import = on_import
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            module = importlib.import_module(self._name)
+            if self._on_import is not None:
+                self._on_import(module)
+            self._module = module
+        return self._module
+
+    def __getattr__(self, attribute):
+        return getattr(self._load(), attribute)
+
+
+def is_importable(name):
+    """Check whether a top-level module can be imported without importing it."""
+
+    try:
+        from importlib.util import find_spec
+    except ImportError:  # Python 2
+        import imp
+        try:
+            imp.find_module(name)
+        except ImportError:
+            return False
+        return True
+
+    return find_spec(name) is not None
+
+
+def _disable_urllib3_warnings(sdk):
+    # The SDK does not verify the self-signed certificates of the Rubrik cluster
+    try:
+        import urllib3
+        urllib3.disable_warnings()
+    except ImportError:
+        pass
+
 
+rubrik_cdm = LazyImport("rubrik_cdm", on_import=_disable_urllib3_warnings)
+HAS_RUBRIK_SDK = is_importable("rubrik_cdm")
+HAS_CRYPTOGRAPHY = is_importable("cryptography")
 
-try:
-    import urllib3
-    urllib3.disable_warnings()
-except ImportError:
-    pass
+# Set by the rubrikinc.cdm.rubrik action plugin while it runs a module inside the controller worker process
+connection_factory = None
+
+
+def set_connection_factory(factory):
+    """Send the API calls of every connection made by connect() through the connection returned by the factory.
+
+    Arguments:
+        factory {function} -- Called with the node_ip, username, password and api_token of the task, returns an object with
+            the send_request(), get_option() and get_connection_stats() methods of a persistent connection. None restores
+            the direct connection to the cluster.
+    """
+
+    global connection_factory
+    connection_factory = factory
 
 
 def credentials(module):
@@ -57,6 +135,10 @@ def credentials(module):
 
     ansible = module.params
 
+    if module._socket_path is not None:
+        # The persistent rubrikinc.cdm.rubrik httpapi connection owns the cluster address and credentials
+        return ansible["node_ip"], ansible["username"], ansible["password"], ansible["api_token"]
+
     if ansible["provider"]:
 
         node_ip = ansible["provider"]["node_ip"]
@@ -83,6 +165,1751 @@ def credentials(module):
     return node_ip, username, password, api_token
 
 
+def connect(module, node_ip, username, password, api_token):
+    """Helper function to hand out the Rubrik SDK connection used by a module. When the task is executed over a persistent
+    rubrikinc.cdm.rubrik httpapi connection, every API call is forwarded to the long-lived connection process which keeps a
+    pooled, keep-alive HTTPS session to the cluster for the life of the play. When the module runs inside the controller
+    worker process through the rubrikinc.cdm.rubrik action plugin, every API call goes through the pooled session of that
+    process. The request and TLS handshake counters of the connection are returned as "connection_stats". When the
+    "lookup_cache_ttl" module argument is set, object name to ID lookups are served from the on-disk lookup cache. When the
+    "token_cache_ttl" module argument is set, username and password credentials are exchanged for a
+    session token that is shared with the other tasks through the on-disk token cache. When the node_ip is a comma separated
+    list of nodes, or the "discover_nodes" module argument is set, the API calls are spread across the nodes of the cluster.
+    When the "rate_limit" or "rate_limit_endpoints" module arguments are set, the API calls of every fork are held to the
+    shared rate limit of the cluster. Failed API calls are retried according to the "api_retries" module argument, and
+    fail fast while the circuit breaker enabled by the "circuit_breaker_threshold" module argument is open.
+    Arguments:
+        module {class} -- Ansible module helper class.
+        node_ip {str} -- The node ip or hostname of the Rubrik cluster.
+        username {str} -- The username used to login into the Rubrik cluster.
+        password {str} -- The password used to login into the Rubrik cluster.
+        api_token {str} -- The API token used to login into the Rubrik cluster.
+    Returns:
+        [class] -- A rubrik_cdm.Connect compatible object.
+    """
+
+    nodes = [node.strip() for node in node_ip.split(",") if node.strip()] if node_ip else [node_ip]
+
+    connection = None
+    if module._socket_path is not None:
+        from ansible.module_utils.connection import Connection
+
+        connection = Connection(module._socket_path)
+    elif connection_factory is not None:
+        connection = connection_factory(nodes[0], username, password, api_token)
+
+    rubrik = rubrik_connect_class()(nodes[0], username, password, api_token, connection=connection,
+                                    connection_factory=None if module._socket_path is not None else connection_factory)
+
+    if connection is not None:
+        _report_stats(module, "connection_stats", rubrik.connection_stats)
+
+    if module.params.get("lookup_cache_ttl"):
+        cache_dir = module.params.get("lookup_cache_dir") or os.path.join(os.path.expanduser("~"), ".ansible", "rubrik_cdm")
+        rubrik.lookup_cache = LookupCache(cache_dir, module.params["lookup_cache_ttl"])
+
+    if module.params.get("token_cache_ttl") and api_token is None and module._socket_path is None:
+        if not HAS_CRYPTOGRAPHY:
+            module.warn("The session token cache requires the cryptography Python library (pip install cryptography).")
+        else:
+            cache_dir = module.params.get("token_cache_dir") or os.path.join(os.path.expanduser("~"), ".ansible", "rubrik_cdm")
+            rubrik.use_token_cache(TokenCache(cache_dir, module.params["token_cache_ttl"]), username, password)
+
+    if module.params.get("rate_limit") or module.params.get("rate_limit_endpoints"):
+        cache_dir = module.params.get("rate_limit_dir") or os.path.join(os.path.expanduser("~"), ".ansible", "rubrik_cdm")
+        rubrik.rate_limiter = RateLimiter(cache_dir, node_ip, module.params.get("rate_limit") or 0,
+                                          module.params.get("rate_limit_endpoints"))
+        _report_stats(module, "rate_limit_stats", rubrik.rate_limiter.stats)
+
+    if module.params.get("api_retries"):
+        rubrik.retry_policy = RetryPolicy(module.params["api_retries"], module.params.get("api_retry_posts"))
+
+    if module.params.get("circuit_breaker_threshold"):
+        cache_dir = module.params.get("circuit_breaker_dir") or os.path.join(os.path.expanduser("~"), ".ansible", "rubrik_cdm")
+        rubrik.circuit_breaker = CircuitBreaker(cache_dir, node_ip, module.params["circuit_breaker_threshold"],
+                                                module.params.get("circuit_breaker_cool_down") or 30)
+
+    rubrik.check_mode = module.check_mode
+
+    if module._socket_path is None:
+        if module.params.get("discover_nodes"):
+            nodes = discover_nodes(rubrik) or nodes
+
+        if len(nodes) > 1:
+            rubrik.node_router = NodeRouter(nodes)
+            _report_stats(module, "node_stats", rubrik.node_router.stats)
+
+    return rubrik
+
+
+def invalidate_lookup_cache(rubrik, *object_types):
+    """Helper function used by the modules that create or delete Rubrik objects to remove the cached object IDs of the
+    provided object types (ex. physical_host, sla).
+    Arguments:
+        rubrik {class} -- The rubrik_cdm.Connect object returned by connect().
+        object_types {str} -- The object_id() object types to remove from the cache.
+    """
+
+    lookup_cache = getattr(rubrik, "lookup_cache", None)
+    if lookup_cache is not None:
+        lookup_cache.invalidate(rubrik, object_types)
+
+
+def paginate(rubrik, api_version, api_endpoint, params=None, limit=500, timeout=15):
+    """Helper function to walk every page of a Rubrik listing endpoint that returns "hasMore" paged results.
+    Arguments:
+        rubrik {class} -- The rubrik_cdm.Connect object.
+        api_version {str} -- The version of the Rubrik CDM API to call. (choices: {v1, v2, internal})
+        api_endpoint {str} -- The listing endpoint of the Rubrik CDM API to call (ex. /vmware/vm).
+    Keyword Arguments:
+        params {dict} -- Additional query parameters to send with every page request. (default: {None})
+        limit {int} -- The number of objects to request per page. (default: {500})
+        timeout {int} -- The number of seconds to wait to establish a connection the Rubrik cluster before returning a timeout error. (default: {15})
+    Returns:
+        list -- The "data" entries of every page.
+    """
+
+    return list(iterate_pages(rubrik, api_version, api_endpoint, params=params, limit=limit, timeout=timeout))
+
+
+def iterate_pages(rubrik, api_version, api_endpoint, params=None, limit=500, timeout=15, prefetch=True):
+    """Generator that walks the pages of a Rubrik listing endpoint that returns "hasMore" paged results and yields every object
+    as soon as its page arrives. While the caller processes a page, the next page is already requested on a background thread.
+    Breaking out of the loop stops the walk, so a lookup that finds its object on the first page does not download the others;
+    at most the one page requested in advance is discarded.
+    Arguments:
+        rubrik {class} -- The rubrik_cdm.Connect object.
+        api_version {str} -- The version of the Rubrik CDM API to call. (choices: {v1, v2, internal})
+        api_endpoint {str} -- The listing endpoint of the Rubrik CDM API to call (ex. /vmware/vm).
+    Keyword Arguments:
+        params {dict} -- Additional query parameters to send with every page request. (default: {None})
+        limit {int} -- The number of objects to request per page. (default: {500})
+        timeout {int} -- The number of seconds to wait to establish a connection the Rubrik cluster before returning a timeout error. (default: {15})
+        prefetch {bool} -- Request the next page while the caller processes the current one. (default: {True})
+    Yields:
+        dict -- The "data" entries of every page, in order.
+    """
+
+    params = dict(params or {})
+
+    def fetch(offset):
+        page_params = dict(params, limit=limit, offset=offset)
+        return rubrik.get(api_version, api_endpoint, timeout=timeout, params=page_params)
+
+    offset = 0
+    api_request = fetch(offset)
+
+    while True:
+        page = api_request.get("data", [])
+        offset += len(page)
+        # Stop once "total" objects arrived, even when the last page still reports "hasMore"
+        has_more = api_request.get("hasMore") and len(page) > 0 and offset < api_request.get("total", offset + 1)
+
+        next_page = None
+        if has_more and prefetch:
+            next_page = BackgroundCall(fetch, offset)
+
+        for api_object in page:
+            yield api_object
+
+        if not has_more:
+            return
+
+        api_request = next_page.result() if next_page is not None else fetch(offset)
+
+
+def vsphere_live_mounts(rubrik, host_names=False, timeout=15):
+    """Helper function to list every vSphere Live Mount of the Rubrik cluster in one paginated pass. The "vmName" of the source
+    VM and the "mountedVmName" of the Live Mounted VM are added to each mount from a single pass over the VM inventory. The
+    mountedVmName of a Live Mount that is still in progress is None.
+    Arguments:
+        rubrik {class} -- The rubrik_cdm.Connect object.
+    Keyword Arguments:
+        host_names {bool} -- Also add the "hostName" of the ESXi host of each mount from a single pass over the host inventory. (default: {False})
+        timeout {int} -- The number of seconds to wait to establish a connection the Rubrik cluster before returning a timeout error. (default: {15})
+    Returns:
+        list -- The "data" entries of GET /v1/vmware/vm/snapshot/mount.
+    """
+
+    mounts = list(iterate_pages(rubrik, "v1", "/vmware/vm/snapshot/mount", timeout=timeout))
+    if not mounts:
+        return []
+
+    vm_names = dict((vm["id"], vm["name"]) for vm in iterate_pages(rubrik, "v1", "/vmware/vm", timeout=timeout))
+    mounts = [dict(mount, vmName=vm_names.get(mount.get("vmId")), mountedVmName=vm_names.get(mount.get("mountedVmId"))) for mount in mounts]
+
+    if host_names:
+        hosts = dict((host["id"], host["name"]) for host in iterate_pages(rubrik, "v1", "/vmware/host", timeout=timeout))
+        for mount in mounts:
+            mount["hostName"] = hosts.get(mount.get("hostId"))
+
+    return mounts
+
+
+class BackgroundCall(object):
+    """Runs a function on a daemon thread. result() waits for the function to return and re-raises its exception."""
+
+    def __init__(self, function, *args):
+        self._result = None
+        self._error = None
+        self._thread = threading.Thread(target=self._run, args=(function,) + args)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _run(self, function, *args):
+        try:
+            self._result = function(*args)
+        except Exception as error:
+            self._error = error
+
+    def result(self):
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+
+JOB_IN_PROGRESS_STATUS = [
+    "QUEUED",
+    "RUNNING",
+    "FINISHING",
+    "TO_FINISH",
+    "TO_RETRY",
+    "ACQUIRING",
+    "TO_YIELDING",
+    "YIELDING",
+    "TO_YIELDED",
+    "YIELDED",
+    "CANCELING",
+    "TO_CANCEL",
+    "TO_UNDO",
+    "UNDOING",
+]
+
+
+def run_concurrently(function, items, max_concurrency=10):
+    """Helper function to call "function" once for every item on a pool of worker threads. A failed call does not stop the
+    remaining calls, the exception is returned in place of its result instead.
+    Arguments:
+        function {function} -- The function to call with each item.
+        items {list} -- The items to pass to the function.
+    Keyword Arguments:
+        max_concurrency {int} -- The maximum number of calls in flight at the same time. (default: {10})
+    Returns:
+        list -- A (result, error) tuple for each item, in the order of the provided items.
+    """
+
+    def call(item):
+        try:
+            return function(item), None
+        except Exception as error:
+            return None, error
+
+    items = list(items)
+    if max_concurrency <= 1 or len(items) <= 1:
+        return [call(item) for item in items]
+
+    from multiprocessing.pool import ThreadPool
+
+    pool = ThreadPool(min(max_concurrency, len(items)))
+    try:
+        return pool.map(call, items)
+    finally:
+        pool.close()
+        pool.join()
+
+
+class JobPoller(object):
+    """Adaptive polling engine used to monitor one or more Rubrik jobs through their job status URLs.
+
+    Every pending job is polled concurrently once per round. The delay before the next round starts at "poll_interval" seconds.
+    While a job reports progress, the time left until it completes is estimated from its progress rate and the job is polled
+    again half way to the estimated completion time, so short jobs are checked often and long jobs back off. Jobs that do not
+    report progress fall back to doubling the delay after each round. Every delay is capped at "max_poll_interval" seconds and
+    randomized by +/- "jitter" so that parallel forks polling the same cluster do not poll in lockstep.
+
+    A job whose status could not be read is reported as UNKNOWN and stays pending, so a transient error does not end the
+    polling. The job is given up on after "max_poll_errors" consecutive errors or when the deadline passes.
+    """
+
+    def __init__(self, deadline=0, poll_interval=5, max_poll_interval=60, jitter=0.2, max_concurrency=10, max_poll_errors=3):
+        """
+        Keyword Arguments:
+            deadline {int} -- The maximum number of seconds to wait for the jobs to finish. 0 waits until every job has finished. (default: {0})
+            poll_interval {int} -- The minimum number of seconds to wait between two polling rounds. (default: {5})
+            max_poll_interval {int} -- The maximum number of seconds to wait between two polling rounds. (default: {60})
+            jitter {float} -- The fraction of each delay that is randomized. (default: {0.2})
+            max_concurrency {int} -- The maximum number of job status API calls in flight at the same time. (default: {10})
+            max_poll_errors {int} -- The number of consecutive errors after which a job whose status can not be read is given up on. (default: {3})
+        """
+
+        self.deadline = deadline
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max(max_poll_interval, poll_interval)
+        self.jitter = jitter
+        self.max_concurrency = max_concurrency
+        self.max_poll_errors = max(max_poll_errors, 1)
+
+        self.polls = 0
+        self.wait_time = 0.0
+
+        self._backoff = {}
+        self._progress = {}
+        self._errors = {}
+
+    def wait(self, rubrik, urls, timeout=15):
+        """Poll the jobs until every job has finished or the deadline has passed. A negative deadline returns after the first
+        polling round.
+        Arguments:
+            rubrik {class} -- The rubrik_cdm.Connect object.
+            urls {list} -- The job status URLs provided by previous API calls.
+        Keyword Arguments:
+            timeout {int} -- The number of seconds to wait to establish a connection the Rubrik cluster before returning a timeout error. (default: {15})
+        Returns:
+            [dict] -- The last job status API response of each URL.
+            [list] -- The URLs of the jobs that were still in progress when the deadline passed.
+        """
+
+        jobs = {}
+        pending = []
+        for url in urls:
+            if url not in pending:
+                pending.append(url)
+
+        start = time.time()
+
+        while pending:
+            jobs.update(self.poll(rubrik, pending, timeout))
+            pending = [url for url in pending if self.in_progress(url, jobs[url])]
+            if not pending:
+                break
+
+            delay = min(self.next_interval(url, jobs[url]) for url in pending)
+            if self.deadline:
+                remaining = self.deadline - (time.time() - start)
+                if remaining <= 0:
+                    break
+                delay = min(delay, remaining)
+
+            time.sleep(delay)
+            self.wait_time += delay
+
+        return jobs, pending
+
+    def run(self, rubrik, start, items, max_in_flight=10, timeout=15):
+        """Start a job for every item, keeping at most max_in_flight jobs in progress at the same time, and poll the jobs until
+        every job has finished or the deadline has passed. The next job is started as soon as a running job finishes.
+        Arguments:
+            rubrik {class} -- The rubrik_cdm.Connect object.
+            start {function} -- Called with an item to start its job. Returns the job status URL of the job.
+            items {list} -- The items to start a job for.
+        Keyword Arguments:
+            max_in_flight {int} -- The maximum number of jobs in progress at the same time. (default: {10})
+            timeout {int} -- The number of seconds to wait to establish a connection the Rubrik cluster before returning a timeout error. (default: {15})
+        Returns:
+            list -- For each item, in the order of the provided items, a dict with the "job_status_url", the last job status API
+                    "response" and, once the job has finished, the number of "seconds" it took. The dict only has an "error" when
+                    the job could not be started, and the item is None when the deadline passed before its job was started.
+        """
+
+        def launch(index):
+            started = time.time()
+            return started, start(items[index])
+
+        max_in_flight = max(max_in_flight, 1)
+        results = [None] * len(items)
+        queue = list(range(len(items)))
+        running = {}
+        begin = time.time()
+
+        while queue or running:
+            expired = 0 < self.deadline <= time.time() - begin
+
+            if queue and not expired and len(running) < max_in_flight:
+                batch, queue = queue[:max_in_flight - len(running)], queue[max_in_flight - len(running):]
+                for index, (launched, error) in zip(batch, run_concurrently(launch, batch, self.max_concurrency)):
+                    if error is not None:
+                        results[index] = {"error": str(error)}
+                        continue
+
+                    started, url = launched
+                    results[index] = {"job_status_url": url, "started": started}
+                    running[url] = index
+
+            if not running:
+                if expired:
+                    break
+                continue
+
+            for url, response in iteritems(self.poll(rubrik, list(running), timeout)):
+                result = results[running[url]]
+                result["response"] = response
+                if not self.in_progress(url, response):
+                    result["seconds"] = _job_seconds(response, result["started"])
+                    del running[url]
+
+            if not running or queue and not expired and len(running) < max_in_flight:
+                continue
+
+            delay = min(self.next_interval(url, results[index]["response"]) for url, index in iteritems(running))
+            if self.deadline > 0:
+                remaining = self.deadline - (time.time() - begin)
+                if remaining <= 0:
+                    break
+                delay = min(delay, remaining)
+
+            time.sleep(delay)
+            self.wait_time += delay
+
+        for result in results:
+            if result is not None:
+                result.pop("started", None)
+
+        return results
+
+    @staticmethod
+    def job_result(job):
+        """Summarize an item returned by run().
+        Arguments:
+            job {dict} -- An item returned by run().
+        Returns:
+            dict -- The "status" of the job, its "job_status_url" and, once the job has finished, the number of "seconds" it
+                    took. The "error" message is included when the job could not be started, failed, or its status could not
+                    be read. The status is NOT_STARTED when the deadline passed before the job was started.
+        """
+
+        if job is None:
+            return {"status": "NOT_STARTED"}
+
+        if "error" in job:
+            return {"status": "FAILED", "error": job["error"]}
+
+        result = {"job_status_url": job["job_status_url"], "status": job["response"]["status"]}
+        if "seconds" in job:
+            result["seconds"] = job["seconds"]
+        if result["status"] in ["FAILED", "UNKNOWN"]:
+            result["error"] = job["response"].get("error", {}).get("message")
+
+        return result
+
+    def poll(self, rubrik, urls, timeout=15):
+        """Poll every job once, concurrently, and return the job status API response of each URL. A job whose status could
+        not be read is reported as UNKNOWN with the error.
+        """
+
+        responses = run_concurrently(lambda url: rubrik.job_status(url, wait_for_completion=False, timeout=timeout), urls,
+                                     self.max_concurrency)
+        self.polls += len(urls)
+
+        jobs = {}
+        for url, (response, error) in zip(urls, responses):
+            if error is None:
+                self._errors.pop(url, None)
+                jobs[url] = response
+            else:
+                self._errors[url] = self._errors.get(url, 0) + 1
+                jobs[url] = {"status": "UNKNOWN", "error": {"message": str(error)}}
+
+        return jobs
+
+    def in_progress(self, url, response):
+        """Return whether the job has to be polled again: it is still in progress, or its status could not be read fewer than
+        "max_poll_errors" times in a row.
+        Arguments:
+            url {str} -- The job status URL.
+            response {dict} -- The last job status API response of the job.
+        Returns:
+            bool -- True when the job is still pending.
+        """
+
+        if response.get("status") == "UNKNOWN" and url in self._errors:
+            return self._errors[url] < self.max_poll_errors
+
+        return response.get("status") in JOB_IN_PROGRESS_STATUS
+
+    def next_interval(self, url, response):
+        """Return the number of seconds to wait before polling the job again.
+        Arguments:
+            url {str} -- The job status URL.
+            response {dict} -- The last job status API response of the job.
+        Returns:
+            float -- The jittered delay in seconds.
+        """
+
+        now = time.time()
+        progress = response.get("progress")
+
+        interval = None
+        if isinstance(progress, (int, float)) and 0 < progress < 100:
+            first_seen = self._progress.setdefault(url, (now, progress))
+            elapsed = now - first_seen[0]
+            if progress > first_seen[1] and elapsed > 0:
+                rate = (progress - first_seen[1]) / float(elapsed)
+                interval = (100 - progress) / rate / 2
+
+        if interval is None:
+            interval = self._backoff.get(url, self.poll_interval)
+            self._backoff[url] = min(interval * 2, self.max_poll_interval)
+
+        interval = min(max(interval, self.poll_interval), self.max_poll_interval)
+
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def stats(self):
+        """Return the number of job status API calls made and the total number of seconds spent waiting between polling rounds."""
+
+        return {"polls": self.polls, "wait_time": round(self.wait_time, 3)}
+
+
+def _job_seconds(response, started):
+    """Return the number of seconds the job took according to the cluster, or since it was started when its job status does
+    not provide both the start and end time."""
+
+    from datetime import datetime
+
+    try:
+        start_time, end_time = [datetime.strptime(response[key], "%Y-%m-%dT%H:%M:%S.%fZ") for key in ("startTime", "endTime")]
+    except (KeyError, TypeError, ValueError):
+        return round(time.time() - started, 3)
+
+    return round((end_time - start_time).total_seconds(), 3)
+
+
+class LookupCache(object):
+    """Object name to ID cache shared by every task, fork and play that runs on the same controller. Entries are stored in one
+    JSON file per Rubrik cluster ID and expire after "ttl" seconds. The cluster ID of each node_ip is cached in the same way so
+    that multiple nodes of the same cluster share a single cache file.
+    """
+
+    def __init__(self, cache_dir, ttl):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self._cluster_id = None
+
+    def get(self, rubrik, object_type, key):
+        entry = self._read(self._cluster_file(rubrik)).get(object_type, {}).get(key)
+        if entry is not None and entry["expires"] > time.time():
+            return entry["id"]
+
+        return None
+
+    def set(self, rubrik, object_type, key, object_id):
+        def update(cache):
+            cache.setdefault(object_type, {})[key] = {"id": object_id, "expires": time.time() + self.ttl}
+
+        self._update(self._cluster_file(rubrik), update)
+
+    def invalidate(self, rubrik, object_types):
+        def update(cache):
+            for object_type in object_types:
+                cache.pop(object_type, None)
+
+        self._update(self._cluster_file(rubrik), update)
+
+    def _cluster_file(self, rubrik):
+        if self._cluster_id is None:
+            nodes_file = os.path.join(self.cache_dir, "nodes.json")
+
+            entry = self._read(nodes_file).get("cluster", {}).get(rubrik.node_ip)
+            if entry is not None and entry["expires"] > time.time():
+                self._cluster_id = entry["id"]
+            else:
+                self._cluster_id = rubrik.get("v1", "/cluster/me")["id"]
+
+                def update(nodes):
+                    nodes.setdefault("cluster", {})[rubrik.node_ip] = {"id": self._cluster_id, "expires": time.time() + self.ttl}
+
+                self._update(nodes_file, update)
+
+        return os.path.join(self.cache_dir, "{0}.json".format(re.sub(r'[^\w-]', '_', self._cluster_id)))
+
+    def _read(self, path):
+        try:
+            with open(path) as cache_file:
+                return json.load(cache_file)
+        except (IOError, OSError, ValueError):
+            return {}
+
+    def _update(self, path, update):
+        if not os.path.isdir(self.cache_dir):
+            os.makedirs(self.cache_dir, 0o700)
+
+        # Serialize the read-modify-write across forks and write through a temporary file so readers never see a partial file
+        with open(path + ".lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+            cache = self._read(path)
+            update(cache)
+
+            now = time.time()
+            for entries in cache.values():
+                for key in [key for key, entry in entries.items() if entry["expires"] <= now]:
+                    del entries[key]
+
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir)
+            with os.fdopen(fd, "w") as temp_file:
+                json.dump(cache, temp_file)
+            os.rename(temp_path, path)
+
+
+class TokenCache(object):
+    """Session token cache shared by every task, fork and play that runs on the same host. Each token is stored in its own
+    file, only readable by the current user, keyed by the node_ip and username. The token is encrypted with a key derived
+    from the password so the file is useless without the password and a password change discards the cached token. Tokens
+    expire after "ttl" seconds.
+    """
+
+    KEY_ITERATIONS = 100000
+
+    def __init__(self, cache_dir, ttl):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+
+    def token(self, node_ip, username, password, login, expired=None):
+        """Return the cached session token of the credentials, or call login() and cache the session token it returns.
+
+        Arguments:
+            login {function} -- Exchanges the username and password for a new session token.
+
+        Keyword Arguments:
+            expired {str} -- A session token rejected by the Rubrik cluster that must not be returned. (default: {None})
+        """
+
+        path = os.path.join(self.cache_dir, "token-{0}.json".format(hashlib.sha256(to_bytes(json.dumps([node_ip, username]))).hexdigest()))
+
+        token = self._get(path, password)
+        if token is not None and token != expired:
+            return token
+
+        if not os.path.isdir(self.cache_dir):
+            os.makedirs(self.cache_dir, 0o700)
+
+        # Only one fork logs in, the others wait for the lock and then read its session token
+        with open(path + ".lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+            token = self._get(path, password)
+            if token is None or token == expired:
+                token = login()
+                self._set(path, password, token)
+
+        return token
+
+    def _get(self, path, password):
+        try:
+            status = os.stat(path)
+            if status.st_uid != os.getuid() or status.st_mode & 0o077:
+                return None
+
+            with open(path) as cache_file:
+                entry = json.load(cache_file)
+
+            if entry["expires"] <= time.time():
+                return None
+
+            return to_native(self._fernet(password, entry["salt"]).decrypt(to_bytes(entry["token"])))
+        except Exception:
+            # Missing, unreadable or expired entry, or a token encrypted with another password
+            return None
+
+    def _set(self, path, password, token):
+        salt = to_native(base64.urlsafe_b64encode(os.urandom(16)))
+        entry = {"salt": salt, "token": to_native(self._fernet(password, salt).encrypt(to_bytes(token))), "expires": time.time() + self.ttl}
+
+        # mkstemp creates the file readable by the current user only
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir)
+        with os.fdopen(fd, "w") as temp_file:
+            json.dump(entry, temp_file)
+        os.rename(temp_path, path)
+
+    def _fernet(self, password, salt):
+        from cryptography.fernet import Fernet
+
+        key = hashlib.pbkdf2_hmac("sha256", to_bytes(password), to_bytes(salt), self.KEY_ITERATIONS)
+        return Fernet(base64.urlsafe_b64encode(key))
+
+
+class RateLimiter(object):
+    """Token bucket rate limiter shared by every task and fork that runs on the same host. The bucket of the cluster, and the
+    bucket of every endpoint budget matching the API call, are stored in one JSON file per cluster that is updated under a
+    file lock. Each call reserves a token from its buckets and sleeps until the token is available, so the calls of every fork
+    are spread evenly at the configured rate. Each bucket holds up to one second of calls.
+    """
+
+    THROTTLED = (429, 503)
+
+    def __init__(self, cache_dir, cluster, rate, endpoint_rates=None, retries=3):
+        self.cache_dir = cache_dir
+        self.path = os.path.join(cache_dir, "rate_limit_{0}.json".format(re.sub(r'[^\w-]', '_', cluster)))
+        self.rate = rate
+        self.endpoint_rates = endpoint_rates or {}
+        self.retries = retries
+        self.waited = 0.0
+        self.throttled = 0
+
+    def acquire(self, endpoint):
+        """Wait until the API call fits in the budget of the cluster and of every matching endpoint budget.
+
+        Arguments:
+            endpoint {str} -- The HTTP method and path of the API call (ex. POST /v1/vmware/vm/{id}/snapshot).
+        """
+
+        buckets = [("cluster", self.rate)] if self.rate else []
+        buckets += [(pattern, float(rate)) for pattern, rate in sorted(iteritems(self.endpoint_rates))
+                    if float(rate) > 0 and fnmatch.fnmatchcase(endpoint, pattern)]
+
+        def update(state, now):
+            # Every call waits for the end of the pause requested by a throttling cluster
+            wait = state.get("paused_until", 0) - now
+            for name, rate in buckets:
+                bucket = state.setdefault(name, {"tokens": max(rate, 1.0), "time": now})
+                bucket["tokens"] = min(bucket["tokens"] + (now - bucket["time"]) * rate, max(rate, 1.0)) - 1
+                bucket["time"] = now
+                # A negative balance is the queue of calls that reserved a token before this one
+                wait = max(wait, -bucket["tokens"] / rate)
+            return wait
+
+        self._sleep(self._update(update))
+
+    def pause(self, seconds):
+        """Hold back the next API calls of every fork for the number of seconds requested by a throttling cluster."""
+
+        self.throttled += 1
+
+        def update(state, now):
+            state["paused_until"] = max(state.get("paused_until", 0), now + seconds)
+
+        self._update(update)
+
+    def stats(self):
+        """Return the number of throttled API calls and the number of seconds spent waiting for the rate limit."""
+
+        return {"throttled": self.throttled, "waited": round(self.waited, 3)}
+
+    def _sleep(self, seconds):
+        if seconds > 0:
+            self.waited += seconds
+            time.sleep(seconds)
+
+    def _update(self, update):
+        if not os.path.isdir(self.cache_dir):
+            os.makedirs(self.cache_dir, 0o700)
+
+        # The buckets are read and written in place, every fork holds the lock for the whole read-modify-write
+        with open(self.path, "a+") as state_file:
+            fcntl.flock(state_file, fcntl.LOCK_EX)
+
+            state_file.seek(0)
+            try:
+                state = json.loads(state_file.read() or "{}")
+            except ValueError:
+                state = {}
+
+            result = update(state, time.time())
+
+            state_file.seek(0)
+            state_file.truncate()
+            json.dump(state, state_file)
+
+        return result
+
+
+class RetryPolicy(object):
+    """Decides whether a failed API call is sent again. Calls that failed because the Rubrik cluster could not be reached, timed
+    out or answered with a 5xx status are retried up to "retries" times when sending them twice is safe: GET, job status and PUT
+    calls, which only set the configuration to the requested value. POST, PATCH and DELETE calls may have been carried out by
+    the cluster before the error, so they are only retried when "retry_posts" is set. Each retry waits for an exponential
+    back-off with full jitter so the forks that failed together do not retry together.
+    """
+
+    IDEMPOTENT_CALLS = ("GET", "JOB_STATUS", "PUT")
+    TRANSIENT_STATUS = (500, 502, 503, 504)
+
+    def __init__(self, retries, retry_posts=False, backoff=1.0, max_backoff=30.0):
+        self.retries = retries
+        self.retry_posts = retry_posts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.random = random.Random()
+
+    def retry(self, call_type, error, attempt):
+        """Wait for the back-off of the attempt and return True when the failed API call should be sent again.
+
+        Arguments:
+            call_type {str} -- The HTTP method of the API call, or JOB_STATUS.
+            error {Exception} -- The APICallException raised by the API call.
+            attempt {int} -- The number of times the API call has already been retried.
+        """
+
+        if attempt >= self.retries or getattr(error, "circuit_open", False):
+            return False
+
+        if call_type not in self.IDEMPOTENT_CALLS and not self.retry_posts:
+            return False
+
+        status_code = _status_code(error)
+        if status_code is not None and status_code not in self.TRANSIENT_STATUS:
+            return False
+
+        time.sleep(self.random.uniform(0, min(self.backoff * 2 ** attempt, self.max_backoff)))
+        return True
+
+
+class CircuitBreaker(object):
+    """Circuit breaker shared by every task and fork that runs on the same host. After "threshold" consecutive API calls failed
+    because the Rubrik cluster could not be reached, the breaker opens and every API call fails at once for "cool_down" seconds
+    instead of waiting out its timeout. The first call after the cool down probes the cluster: the breaker closes when it
+    succeeds and opens again when it fails. The state is stored in one JSON file per cluster, which only exists while the
+    calls are failing so that a healthy cluster costs a single stat() per call.
+    """
+
+    def __init__(self, cache_dir, cluster, threshold, cool_down):
+        self.cache_dir = cache_dir
+        self.cluster = cluster
+        self.path = os.path.join(cache_dir, "circuit_{0}.json".format(re.sub(r'[^\w-]', '_', cluster)))
+        self.threshold = threshold
+        self.cool_down = cool_down
+
+    def check(self):
+        """Raise an APICallException when the breaker is open, let the API call through otherwise."""
+
+        if not os.path.exists(self.path):
+            return
+
+        def update(state, now):
+            open_until = state.get("open_until", 0)
+            if open_until > now:
+                return state["failures"]
+            if open_until:
+                # The cool down is over, this call probes the cluster while the other calls keep failing fast
+                state["open_until"] = now + self.cool_down
+            return None
+
+        failures = self._update(update)
+        if failures is not None:
+            error = rubrik_cdm.exceptions.APICallException(
+                "The Rubrik cluster {0} is unavailable after {1} consecutive failed API calls. API calls fail without being sent "
+                "for {2} seconds before the cluster is tried again.".format(self.cluster, failures, self.cool_down))
+            error.circuit_open = True
+            raise error
+
+    def record(self, failed):
+        """Record the outcome of an API call let through by check()."""
+
+        if not failed:
+            if os.path.exists(self.path):
+                self._update(lambda state, now: state.clear())
+            return
+
+        def update(state, now):
+            state["failures"] = state.get("failures", 0) + 1
+            if state["failures"] >= self.threshold:
+                state["open_until"] = now + self.cool_down
+
+        self._update(update)
+
+    def _update(self, update):
+        if not os.path.isdir(self.cache_dir):
+            os.makedirs(self.cache_dir, 0o700)
+
+        with open(self.path + ".lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+            try:
+                with open(self.path) as state_file:
+                    state = json.load(state_file)
+            except (IOError, OSError, ValueError):
+                state = {}
+
+            result = update(state, time.time())
+
+            if not state:
+                if os.path.exists(self.path):
+                    os.remove(self.path)
+                return result
+
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir)
+            with os.fdopen(fd, "w") as temp_file:
+                json.dump(state, temp_file)
+            os.rename(temp_path, self.path)
+
+        return result
+
+
+class LookupPlanner(object):
+    """Query planner for object name to ID lookups. For each object type it knows the listing endpoint, the filters that narrow
+    the listing to the objects the module can use (primary_cluster_id, is_relic) and whether the endpoint filters by name on
+    the server. The cheapest request is sent first: the server side name filter, paged with an explicit limit so that a
+    lookup never misses an object past the default page size. When the cluster rejects the name filter, the lookup falls back
+    to a full scan of the filtered listing. The names are matched exactly, ignoring case, the same way as
+    rubrik_cdm.Connect.object_id().
+    """
+
+    PLANS = {
+        "vmware": {"api_version": "v1", "api_endpoint": "/vmware/vm", "filters": {"primary_cluster_id": "local", "is_relic": "false"},
+                   "name_filter": "name"},
+        "sla": {"api_version": "v1", "api_endpoint": "/sla_domain", "filters": {"primary_cluster_id": "local"}, "name_filter": "name"},
+        "vmware_host": {"api_version": "v1", "api_endpoint": "/vmware/host", "filters": {"primary_cluster_id": "local"}},
+        "vcenter": {"api_version": "v1", "api_endpoint": "/vmware/vcenter", "filters": {"primary_cluster_id": "local"}},
+        # CDM 5.0 renamed the hostname filter and field of hosts to name, older clusters ignore the name filter
+        "physical_host": {"api_version": "v1", "api_endpoint": "/host", "filters": {"primary_cluster_id": "local"}, "name_filter": "name",
+                          "name_fields": ["name", "hostname"]},
+        "fileset_template": {"api_version": "v1", "api_endpoint": "/fileset_template", "filters": {"primary_cluster_id": "local"},
+                             "name_filter": "name"},
+        "managed_volume": {"api_version": "internal", "api_endpoint": "/managed_volume",
+                           "filters": {"primary_cluster_id": "local", "is_relic": "false"}, "name_filter": "name"},
+        "ahv": {"api_version": "internal", "api_endpoint": "/nutanix/vm", "filters": {"primary_cluster_id": "local", "is_relic": "false"},
+                "name_filter": "name"},
+        "mssql_instance": {"api_version": "v1", "api_endpoint": "/mssql/instance", "filters": {"primary_cluster_id": "local"}},
+        "mssql_db": {"api_version": "v1", "api_endpoint": "/mssql/db", "filters": {"primary_cluster_id": "local", "is_relic": "false"},
+                     "name_filter": "name"},
+        "archival_location": {"api_version": "internal", "api_endpoint": "/archive/location", "filters": {}, "name_filter": "name"},
+    }
+
+    # The number of objects requested per page, name filters match the names that contain the searched name
+    LIMIT = 100
+
+    @classmethod
+    def supports(cls, object_type, host_os=None, mssql_host=None, mssql_instance=None):
+        """Return True when the lookup of the object type is planned. The lookups with missing or invalid arguments are left to
+        the SDK, which raises the appropriate error."""
+
+        if object_type not in cls.PLANS:
+            return False
+        if object_type == "fileset_template":
+            return host_os in ["Linux", "Windows"]
+        if object_type == "mssql_instance":
+            return mssql_host is not None
+        if object_type == "mssql_db":
+            return mssql_host is not None and mssql_instance is not None
+        return True
+
+    def requests(self, object_name, object_type, filters=None):
+        """Return the requests that can resolve the object, cheapest first.
+
+        Returns:
+            list -- An (api_version, api_endpoint, params) tuple for each request.
+        """
+
+        plan = self.PLANS[object_type]
+        params = dict(plan["filters"], **(filters or {}))
+
+        requests = []
+        if plan.get("name_filter"):
+            requests.append((plan["api_version"], plan["api_endpoint"], dict(params, **{plan["name_filter"]: object_name})))
+        requests.append((plan["api_version"], plan["api_endpoint"], params))
+
+        return requests
+
+    def object_id(self, rubrik, object_name, object_type, filters=None, timeout=15):
+        """Return the ID of the object, sending the cheapest request the cluster accepts.
+
+        Arguments:
+            rubrik {class} -- The rubrik_cdm.Connect object.
+            object_name {str} -- The name of the object.
+            object_type {str} -- The rubrik_cdm.Connect.object_id() object type.
+        Keyword Arguments:
+            filters {dict} -- The query parameters that depend on the lookup (ex. the instance_id of a mssql_db). (default: {None})
+            timeout {int} -- The number of seconds to wait to establish a connection the Rubrik cluster before returning a timeout error. (default: {15})
+        Returns:
+            str -- The ID of the object.
+        """
+
+        name_fields = self.PLANS[object_type].get("name_fields", ["name"])
+        requests = self.requests(object_name, object_type, filters)
+
+        for index, (api_version, api_endpoint, params) in enumerate(requests):
+            try:
+                object_ids = [api_object["id"] for api_object in iterate_pages(rubrik, api_version, api_endpoint, params=params,
+                                                                                limit=self.LIMIT, timeout=timeout)
+                              if any(str(api_object.get(field, "")).lower() == object_name.lower() for field in name_fields)]
+            except rubrik_cdm.exceptions.APICallException as error:
+                # The cluster does not support a filter of this request, fall back to the next, broader, request
+                if _status_code(error) not in (400, 422) or index == len(requests) - 1:
+                    raise
+                continue
+
+            if len(object_ids) > 1:
+                raise rubrik_cdm.exceptions.InvalidParameterException(
+                    "Multiple {0} objects named '{1}' were found on the Rubrik cluster. Unable to return a specific object id.".format(
+                        object_type, object_name))
+            if not object_ids:
+                raise rubrik_cdm.exceptions.InvalidParameterException(
+                    "The {0} object '{1}' was not found on the Rubrik cluster.".format(object_type, object_name))
+
+            return object_ids[0]
+
+
+class SnapshotIndex(object):
+    """Point in time index of the snapshots of vSphere VMs. The snapshot dates of each VM are kept sorted in UTC so a requested
+    point in time is resolved with a binary search instead of a scan of the snapshot list. The index of a VM is only refreshed
+    from the cluster when the requested point in time is newer than its newest indexed snapshot, or the latest snapshot is
+    requested. When a lookup cache is set, the indexes and the cluster timezone are shared with the other tasks through it.
+    """
+
+    MATCHES = ["exact", "nearest_before", "nearest_after"]
+
+    def __init__(self):
+        self.refreshes = 0
+        self._indexes = {}
+        self._timezone = None
+        self._timezone_lock = threading.Lock()
+
+    def point_in_time(self, rubrik, date, time_of_day, timeout=15):
+        """Convert a date and time in the timezone of the Rubrik cluster into the UTC minute used by the index.
+
+        Arguments:
+            rubrik {class} -- The rubrik_cdm.Connect object.
+            date {str} -- A date value formated as `Month-Day-Year` (ex: 1-15-2014).
+            time_of_day {str} -- A time value formated as `Hour:Minute AM/PM` (ex: 1:30 AM).
+        Keyword Arguments:
+            timeout {int} -- The number of seconds to wait to establish a connection the Rubrik cluster before returning a timeout error. (default: {15})
+        Returns:
+            str -- The UTC date/time formated as `Year-Month-DayTHour:Minute` (ex: 2014-01-15T07:30).
+        """
+
+        from datetime import datetime
+        import pytz
+
+        try:
+            datetime.strptime(date, '%m-%d-%Y')
+        except ValueError:
+            raise rubrik_cdm.exceptions.InvalidParameterException(
+                "The date argument '{0}' must be formatd as 'Month-Date-Year' (ex: 8-9-2018).".format(date))
+        try:
+            datetime.strptime(time_of_day, '%I:%M %p')
+        except ValueError:
+            raise rubrik_cdm.exceptions.InvalidParameterException(
+                "The time argument '{0}' must be formatd as 'Hour:Minute AM/PM' (ex: 2:57 AM).".format(time_of_day))
+
+        local_time = pytz.timezone(self.timezone(rubrik, timeout)).localize(
+            datetime.strptime("{0} {1}".format(date, time_of_day), '%m-%d-%Y %I:%M %p'))
+
+        return local_time.astimezone(pytz.UTC).strftime("%Y-%m-%dT%H:%M")
+
+    def timezone(self, rubrik, timeout=15):
+        """Return the timezone configured on the Rubrik cluster."""
+
+        # Concurrent Live Mounts wait for the first one to read the timezone
+        with self._timezone_lock:
+            if self._timezone is None:
+                lookup_cache = getattr(rubrik, "lookup_cache", None)
+                if lookup_cache is not None:
+                    self._timezone = lookup_cache.get(rubrik, "cluster_timezone", "timezone")
+
+                if self._timezone is None:
+                    self._timezone = rubrik.get("v1", "/cluster/me", timeout=timeout)["timezone"]["timezone"]
+                    if lookup_cache is not None:
+                        lookup_cache.set(rubrik, "cluster_timezone", "timezone", self._timezone)
+
+        return self._timezone
+
+    def snapshot(self, rubrik, vm_id, point_in_time=None, match="exact", timeout=15):
+        """Return the snapshot of the VM taken at the point in time.
+
+        Arguments:
+            rubrik {class} -- The rubrik_cdm.Connect object.
+            vm_id {str} -- The ID of the vSphere VM.
+        Keyword Arguments:
+            point_in_time {str} -- The UTC minute returned by point_in_time(). The latest snapshot is returned when None. (default: {None})
+            match {str} -- Return the snapshot taken during the minute of the point in time (exact), or the closest snapshot taken
+                           at or before (nearest_before) or at or after (nearest_after) it. (default: {"exact"})
+            timeout {int} -- The number of seconds to wait to establish a connection the Rubrik cluster before returning a timeout error. (default: {15})
+        Returns:
+            dict -- The "id" and "date" of the snapshot and the "hostId" of the VM, or None when no snapshot matches.
+        """
+
+        index = self._index(rubrik, vm_id)
+        if index is None or point_in_time is None or not index["dates"] or point_in_time > index["dates"][-1]:
+            index = self.refresh(rubrik, vm_id, timeout)
+
+        dates = index["dates"]
+        if point_in_time is None:
+            position = len(dates) - 1
+        else:
+            # Every snapshot date of the minute sorts after the minute itself and before the minute followed by ";"
+            first = bisect.bisect_left(dates, point_in_time)
+            after = bisect.bisect_left(dates, point_in_time + ";")
+
+            if match == "nearest_after":
+                position = first if first < len(dates) else -1
+            elif match == "nearest_before" or after > first:
+                position = after - 1
+            else:
+                position = -1
+
+        if position < 0:
+            return None
+
+        return {"id": index["ids"][position], "date": dates[position], "hostId": index["hostId"]}
+
+    def refresh(self, rubrik, vm_id, timeout=15):
+        """Rebuild the index of the VM from its snapshot list."""
+
+        vm_summary = rubrik.get("v1", "/vmware/vm/{0}".format(vm_id), timeout=timeout)
+        snapshots = sorted(vm_summary["snapshots"], key=lambda snapshot: snapshot["date"])
+
+        index = {
+            "ids": [snapshot["id"] for snapshot in snapshots],
+            "dates": [snapshot["date"] for snapshot in snapshots],
+            "hostId": vm_summary.get("hostId"),
+        }
+        self.refreshes += 1
+
+        self._indexes[vm_id] = index
+        lookup_cache = getattr(rubrik, "lookup_cache", None)
+        if lookup_cache is not None:
+            lookup_cache.set(rubrik, "vm_snapshot_index", vm_id, index)
+
+        return index
+
+    def _index(self, rubrik, vm_id):
+        index = self._indexes.get(vm_id)
+        lookup_cache = getattr(rubrik, "lookup_cache", None)
+        if index is None and lookup_cache is not None:
+            index = lookup_cache.get(rubrik, "vm_snapshot_index", vm_id)
+            if index is not None:
+                self._indexes[vm_id] = index
+
+        return index
+
+
+class NodeRouter(object):
+    """Spreads the API calls of a connection across the nodes of a Rubrik cluster. Each call goes to a healthy node picked at
+    random, weighted by the inverse of the smoothed latency of its previous calls and the number of calls it is already
+    serving, so every fork favors the fastest nodes without sending all of its calls to the same one. A node that fails with
+    a connection error or a 5xx response is skipped for a cool down period that doubles with every consecutive failure.
+    """
+
+    LATENCY_SMOOTHING = 0.3
+    MAX_COOL_DOWN = 60
+
+    def __init__(self, nodes):
+        self.nodes = list(nodes)
+        self.random = random.Random()
+        self._lock = threading.Lock()
+        self._nodes = dict((node, {"requests": 0, "errors": 0, "latency": 0.0, "smoothed_latency": None, "in_flight": 0, "failures": 0,
+                                   "down_until": 0}) for node in self.nodes)
+
+    def select(self, exclude=()):
+        """Return the node of the next API call."""
+
+        with self._lock:
+            now = time.time()
+            candidates = [node for node in self.nodes if node not in exclude] or self.nodes
+            healthy = [node for node in candidates if self._nodes[node]["down_until"] <= now]
+            if not healthy:
+                # Every node is cooling down, try the one that failed the longest time ago
+                healthy = [min(candidates, key=lambda node: self._nodes[node]["down_until"])]
+
+            latencies = [self._nodes[node]["smoothed_latency"] for node in healthy if self._nodes[node]["smoothed_latency"]]
+            # Nodes without a measured latency yet get the best measured one so that they are tried early
+            default_latency = min(latencies) if latencies else 1.0
+            weights = [1.0 / ((self._nodes[node]["smoothed_latency"] or default_latency) * (1 + self._nodes[node]["in_flight"]))
+                       for node in healthy]
+
+            pick = self.random.uniform(0, sum(weights))
+            for node, weight in zip(healthy, weights):
+                pick -= weight
+                if pick <= 0:
+                    break
+
+            self._nodes[node]["in_flight"] += 1
+            return node
+
+    def pin(self, node):
+        """Return the node when it is one of the routed nodes, so that an API call that must go to that node is recorded."""
+
+        with self._lock:
+            if node not in self._nodes:
+                return None
+
+            self._nodes[node]["in_flight"] += 1
+            return node
+
+    def record(self, node, latency, failed):
+        """Record the outcome of an API call returned by select() or pin()."""
+
+        if node is None:
+            return
+
+        with self._lock:
+            stats = self._nodes[node]
+            stats["in_flight"] -= 1
+            stats["requests"] += 1
+            stats["latency"] += latency
+
+            if failed:
+                stats["errors"] += 1
+                stats["failures"] += 1
+                stats["down_until"] = time.time() + min(2 ** (stats["failures"] - 1), self.MAX_COOL_DOWN)
+                return
+
+            stats["failures"] = 0
+            if stats["smoothed_latency"] is None:
+                stats["smoothed_latency"] = latency
+            else:
+                stats["smoothed_latency"] += self.LATENCY_SMOOTHING * (latency - stats["smoothed_latency"])
+
+    def stats(self):
+        """Return the number of API calls, errors and the average latency in seconds of each node."""
+
+        with self._lock:
+            return dict((node, {
+                "requests": stats["requests"],
+                "errors": stats["errors"],
+                "average_latency": round(stats["latency"] / stats["requests"], 3) if stats["requests"] else None,
+            }) for node, stats in iteritems(self._nodes))
+
+
+def discover_nodes(rubrik, timeout=15):
+    """Return the address of every healthy node of the Rubrik cluster."""
+
+    nodes = rubrik.get("internal", "/cluster/me/node", timeout=timeout)
+    return [node["ipAddress"] for node in nodes.get("data", []) if node.get("ipAddress") and node.get("status", "OK").upper() == "OK"]
+
+
+class CheckModeChange(Exception):
+    """Raised by a connection in check mode in place of the first API call that would change the Rubrik cluster. Every
+    read of the task is sent, so the SDK makes its usual idempotent check, and the state last read from the endpoint of
+    the change is kept to report the would-be change as a diff.
+    """
+
+    WRITE_CALLS = ("POST", "PATCH", "PUT", "DELETE")
+
+    def __init__(self, call_type, api_version, api_endpoint, config=None, read=None):
+        self.request = {"method": call_type, "endpoint": "/{0}{1}".format(api_version, api_endpoint), "config": config}
+        self.read = read
+        super(CheckModeChange, self).__init__(
+            "Check mode: {0} {1} was not sent to the Rubrik cluster.".format(call_type, self.request["endpoint"]))
+
+    def diff(self):
+        """Return the Ansible diff of the change, from the state last read from the endpoint to the state the call would
+        leave it in."""
+
+        before_header, before = self.read or (self.request["endpoint"], None)
+        after = None if self.request["method"] == "DELETE" else self.request["config"]
+
+        if isinstance(before, dict) and isinstance(before.get("data"), list):
+            if isinstance(after, list):
+                before = before["data"]
+            else:
+                # A listing only holds the state of the object the call updates or deletes
+                object_id = unquote(self.request["endpoint"].rsplit("/", 1)[-1])
+                matches = [item for item in before["data"] if isinstance(item, dict) and item.get("id") == object_id]
+                before = matches[0] if matches else None
+
+        return {
+            "before_header": before_header,
+            "before": before,
+            "after_header": "{0} {1}".format(self.request["method"], self.request["endpoint"]),
+            "after": _merged(before, after),
+        }
+
+    def results(self, diff=False):
+        """Return the module results of the change, with its diff when the task runs with --diff."""
+
+        results = {"changed": True, "response": self.request}
+        if diff:
+            results["diff"] = self.diff()
+        return results
+
+
+def _merged(before, config):
+    """Return the state after the config of a PATCH-like call is applied to the state before it."""
+
+    if not isinstance(before, dict) or not isinstance(config, dict):
+        return config
+
+    merged = dict(before)
+    for key, value in iteritems(config):
+        merged[key] = _merged(before.get(key), value)
+    return merged
+
+
+class DesiredState(object):
+    """Idempotent configuration of a Rubrik cluster setting or object. The current state is read with a single API call
+    and normalized into the shape of the desired state, the differences between the two are computed locally and the
+    write is only sent when there is a difference.
+
+    Arguments:
+        api_version {str} -- The version of the Rubrik CDM API the current state is read from.
+        api_endpoint {str} -- The endpoint the current state is read from.
+        desired {dict} -- The desired state. Only its keys are compared, the other keys of the current state are not managed.
+
+    Keyword Arguments:
+        normalize {function} -- Called with the API response of the read, returns the current state in the shape of the
+            desired state, or None when the object does not exist. (default: {None})
+        params {dict} -- The query parameters of the read. (default: {None})
+    """
+
+    def __init__(self, api_version, api_endpoint, desired, normalize=None, params=None):
+        self.api_version = api_version
+        self.api_endpoint = api_endpoint
+        self.desired = desired
+        self.normalize = normalize
+        self.params = params
+        self.current = None
+
+    def read(self, rubrik, timeout=15):
+        """Read and normalize the current state. Returns the API response of the read."""
+
+        response = rubrik.get(self.api_version, self.api_endpoint, timeout=timeout, params=self.params)
+        self.current = response if self.normalize is None else self.normalize(response)
+        return response
+
+    def differences(self):
+        """Return the {key: {"before": value, "after": value}} differences between the current and the desired state."""
+
+        return state_differences(self.current, self.desired)
+
+    def apply(self, module, rubrik, write, no_change, timeout=15):
+        """Bring the Rubrik cluster to the desired state.
+
+        Arguments:
+            module {class} -- Ansible module helper class.
+            rubrik {class} -- The rubrik_cdm.Connect object returned by connect().
+            write {function} -- Called with the API response of the read when the cluster differs from the desired state,
+                returns the API response of the change.
+            no_change {str} -- The response of the module when the cluster is already in the desired state.
+
+        Keyword Arguments:
+            timeout {int} -- The number of seconds to wait to establish a connection the Rubrik cluster. (default: {15})
+
+        Returns:
+            dict -- The changed and response results of the module, and its diff when the task runs with --diff. In check
+                mode the response is the differences that would be written.
+        """
+
+        response = self.read(rubrik, timeout)
+        differences = self.differences()
+
+        results = {"changed": bool(differences)}
+        if module._diff:
+            results["diff"] = {"before": self.current, "after": _merged(self.current, self.desired)}
+
+        if not differences:
+            results["response"] = no_change
+        elif module.check_mode:
+            results["response"] = differences
+        else:
+            results["response"] = write(response)
+
+        return results
+
+
+def state_differences(current, desired, key=None):
+    """Return the {key: {"before": value, "after": value}} differences between the current and the desired state. Nested
+    dicts are compared key by key and their keys are joined with a dot, a missing current state has no keys.
+    """
+
+    if isinstance(desired, dict) and (current is None or isinstance(current, dict)):
+        differences = {}
+        for name, value in iteritems(desired):
+            path = name if key is None else "{0}.{1}".format(key, name)
+            differences.update(state_differences((current or {}).get(name), value, path))
+        return differences
+
+    if current == desired:
+        return {}
+    return {key: {"before": current, "after": desired}}
+
+
+def sdk_changed(response):
+    """Return whether a rubrik_cdm.Connect function changed the Rubrik cluster. The SDK functions report that the cluster was
+    already in the requested state with a "No change required" message, whose letter case varies between functions.
+    """
+
+    return not (isinstance(response, string_types) and "no change required" in response.lower())
+
+
+def _report_stats(module, key, stats):
+    """Add the counters returned by stats() to the result of the module under the key."""
+
+    def reporter(method):
+        def report(*args, **kwargs):
+            kwargs.setdefault(key, stats())
+            return method(*args, **kwargs)
+
+        return report
+
+    module.exit_json = reporter(module.exit_json)
+    module.fail_json = reporter(module.fail_json)
+
+
+def _status_code(error):
+    """Return the HTTP status code of a failed API call, None when the Rubrik cluster did not respond."""
+
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        # The SDK raises APICallException while handling the requests HTTPError
+        status_code = getattr(getattr(getattr(error, "__context__", None), "response", None), "status_code", None)
+
+    return status_code
+
+
+def _retry_after(error):
+    """Return the number of seconds in the Retry-After header of a throttled API call, None when it is not provided."""
+
+    headers = getattr(getattr(getattr(error, "__context__", None), "response", None), "headers", None) or {}
+    try:
+        return max(float(headers.get("Retry-After")), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _cluster_failure(error):
+    """Return True when the API call failed because the Rubrik cluster could not be reached or is unavailable."""
+
+    status_code = _status_code(error)
+    return status_code is None or status_code in (502, 503, 504)
+
+
+def _unauthorized(error):
+    """Return True when the API call failed with 401 Unauthorized."""
+
+    return _status_code(error) == 401
+
+
+def _node_failure(error):
+    """Return True when the API call failed because of the node rather than the request."""
+
+    status_code = _status_code(error)
+    return status_code is None or status_code >= 500
+
+
+RubrikConnect = None
+
+
+def rubrik_connect_class():
+    """Return the RubrikConnect class. It subclasses rubrik_cdm.Connect and is therefore only defined, and the SDK imported,
+    the first time a connection is made.
+    """
+
+    global RubrikConnect
+
+    if RubrikConnect is None:
+        RubrikConnect = _define_rubrik_connect()
+
+    return RubrikConnect
+
+
+def _define_rubrik_connect():
+    from ansible.module_utils.connection import ConnectionError
+
+    class RubrikConnect(rubrik_cdm.Connect):
+        """rubrik_cdm.Connect implementation handed out by connect().
+
+        When a persistent rubrikinc.cdm.rubrik httpapi connection is provided every API call is sent through it instead of
+        opening a new HTTPS connection from the module process. When a lookup_cache is set, object_id() lookups are served
+        from the cache. The snapshots of vSphere Live Mounts are resolved through the snapshot_index.
+        """
+
+        def __init__(self, node_ip=None, username=None, password=None, api_token=None, connection=None, connection_factory=None):
+            self._connection = connection
+            self._connection_factory = connection_factory
+            self._connection_credentials = (username, password, api_token)
+            self._node = threading.local()
+            self.lookup_cache = None
+            self.snapshot_index = SnapshotIndex()
+            self.token_cache = None
+            self.node_router = None
+            self.rate_limiter = None
+            self.retry_policy = None
+            self.circuit_breaker = None
+            self.check_mode = False
+            self._reads = {}
+            self._session_token = None
+
+            if connection is None:
+                super(RubrikConnect, self).__init__(node_ip, username, password, api_token)
+                return
+
+            self.node_ip = connection.get_option("host")
+            self.ipv6_addr = ""
+            self.username = None
+            self.password = None
+            self.api_token = None
+            self.logging_level = "debug"
+            self.function_name = ""
+            self.platform = ""
+
+        @property
+        def node_ip(self):
+            # The node selected by the node router for the API call of the current thread
+            return getattr(self._node, "ip", None) or self._node_ip
+
+        @node_ip.setter
+        def node_ip(self, node_ip):
+            self._node_ip = node_ip
+
+        def use_token_cache(self, token_cache, username, password):
+            """Authenticate with a session token of the username and password, shared through the token cache."""
+
+            self.token_cache = token_cache
+            self._credentials = (username, password)
+
+        def _login(self):
+            username, password = self._credentials
+            return rubrik_cdm.Connect(self.node_ip, username, password).post("v1", "/session", {})["token"]
+
+        def _use_session_token(self, expired=None):
+            username, password = self._credentials
+            self._session_token = self.token_cache.token(self.node_ip, username, password, self._login, expired)
+
+            if self._connection is None:
+                self.api_token = self._session_token
+            else:
+                self._connection_credentials = (None, None, self._session_token)
+                self._connection = self._connection_factory(self.node_ip, None, None, self._session_token)
+
+        def _common_api(self, call_type, api_version, api_endpoint, config=None, job_status_url=None, timeout=15,
+                        authentication=True, params=None, **kwargs):
+            kwargs.update(config=config, job_status_url=job_status_url, timeout=timeout, authentication=authentication, params=params)
+
+            if self.check_mode:
+                return self._check_mode_api(call_type, api_version, api_endpoint, **kwargs)
+
+            return self._resilient_api(call_type, api_version, api_endpoint, **kwargs)
+
+        def _check_mode_api(self, call_type, api_version, api_endpoint, **kwargs):
+            """Send the reads of a task in check mode and stop at the first call that would change the Rubrik cluster."""
+
+            path = "/" + api_endpoint.split("?")[0].strip("/")
+            if call_type in CheckModeChange.WRITE_CALLS:
+                # The closest state read from the endpoint or its parent collection, whatever the API version of the read
+                reads = [read for read in self._reads if path == read or path.startswith(read + "/")]
+                read = max(reads, key=len) if reads else None
+                raise CheckModeChange(call_type, api_version, api_endpoint, kwargs["config"],
+                                      None if read is None else self._reads[read])
+
+            response = self._resilient_api(call_type, api_version, api_endpoint, **kwargs)
+            if call_type == "GET":
+                # The SDK edits the responses it compares, keep the state as it was read
+                self._reads[path] = ("GET /{0}{1}".format(api_version, path), copy.deepcopy(response))
+            return response
+
+        def _resilient_api(self, call_type, api_version, api_endpoint, **kwargs):
+            """Send the API call, retried by the retry policy and failing fast while the circuit breaker is open."""
+
+            if self.retry_policy is None and self.circuit_breaker is None:
+                return self._authenticated(call_type, api_version, api_endpoint, **kwargs)
+
+            attempt = 0
+            while True:
+                if self.circuit_breaker is not None:
+                    self.circuit_breaker.check()
+
+                try:
+                    response = self._authenticated(call_type, api_version, api_endpoint, **kwargs)
+                except rubrik_cdm.exceptions.APICallException as error:
+                    if self.circuit_breaker is not None:
+                        self.circuit_breaker.record(_cluster_failure(error))
+                    if self.retry_policy is None or not self.retry_policy.retry(call_type, error, attempt):
+                        raise
+                    attempt += 1
+                    continue
+
+                if self.circuit_breaker is not None:
+                    self.circuit_breaker.record(False)
+                return response
+
+        def _authenticated(self, call_type, api_version, api_endpoint, **kwargs):
+            """Send the API call with the session token of the token cache, refreshed once when the cluster rejects it."""
+
+            if self.token_cache is None or not kwargs["authentication"]:
+                return self._route(call_type, api_version, api_endpoint, **kwargs)
+
+            if self._session_token is None:
+                self._use_session_token()
+
+            try:
+                return self._route(call_type, api_version, api_endpoint, **kwargs)
+            except rubrik_cdm.exceptions.APICallException as error:
+                # The cached session token has expired on the cluster, login again and resend the request once
+                if not _unauthorized(error):
+                    raise
+                self._use_session_token(expired=self._session_token)
+
+            return self._route(call_type, api_version, api_endpoint, **kwargs)
+
+        def _route(self, call_type, api_version, api_endpoint, **kwargs):
+            """Send the API call to the node selected by the node router and record its latency and outcome. Read-only
+            calls are sent to another node when the selected node can not be reached."""
+
+            if self.node_router is None:
+                return self._send_limited(None, call_type, api_version, api_endpoint, **kwargs)
+
+            tried = []
+            while True:
+                if call_type == "JOB_STATUS":
+                    # The job status URL points to the node that accepted the job, keep polling that node
+                    node = self.node_router.pin(urlsplit(kwargs["job_status_url"]).netloc)
+                else:
+                    node = self.node_router.select(exclude=tried)
+
+                start = time.time()
+                try:
+                    response = self._send_limited(None if call_type == "JOB_STATUS" else node, call_type, api_version, api_endpoint,
+                                                  **kwargs)
+                except rubrik_cdm.exceptions.APICallException as error:
+                    node_failure = _node_failure(error)
+                    self.node_router.record(node, time.time() - start, node_failure)
+                    tried.append(node)
+                    if not node_failure or call_type != "GET" or len(tried) >= len(self.node_router.nodes):
+                        raise
+                    continue
+
+                self.node_router.record(node, time.time() - start, False)
+                return response
+
+        def _send_limited(self, node, call_type, api_version, api_endpoint, **kwargs):
+            """Send the API call within the budget of the rate limiter. A call rejected by a throttling cluster holds back the
+            calls of every fork sharing the budget and is sent again."""
+
+            if self.rate_limiter is None:
+                return self._send_api(node, call_type, api_version, api_endpoint, **kwargs)
+
+            if call_type == "JOB_STATUS":
+                endpoint = "GET {0}".format(re.sub(r"^/api", "", urlsplit(kwargs["job_status_url"]).path))
+            else:
+                endpoint = "{0} /{1}{2}".format(call_type, api_version, api_endpoint)
+
+            attempt = 0
+            while True:
+                self.rate_limiter.acquire(endpoint)
+                try:
+                    return self._send_api(node, call_type, api_version, api_endpoint, **kwargs)
+                except rubrik_cdm.exceptions.APICallException as error:
+                    # The throttled call was rejected before the cluster acted on it, so it is safe to send it again
+                    if _status_code(error) not in RateLimiter.THROTTLED or attempt >= self.rate_limiter.retries:
+                        raise
+                    attempt += 1
+                    self.rate_limiter.pause(_retry_after(error) or 2 ** (attempt - 1))
+
+        def _send_api(self, node, call_type, api_version, api_endpoint, config=None, job_status_url=None, timeout=15,
+                      authentication=True, params=None, **kwargs):
+            if self._connection is None:
+                self._node.ip = node
+                try:
+                    return super(RubrikConnect, self)._common_api(
+                        call_type, api_version, api_endpoint, config=config, job_status_url=job_status_url, timeout=timeout,
+                        authentication=authentication, params=params, **kwargs)
+                finally:
+                    self._node.ip = None
+
+            connection = self._connection
+            if node is not None and self._connection_factory is not None:
+                connection = self._connection_factory(node, *self._connection_credentials)
+
+            try:
+                return connection.send_request(
+                    config,
+                    call_type=call_type,
+                    api_version=api_version,
+                    api_endpoint=api_endpoint,
+                    job_status_url=job_status_url,
+                    timeout=timeout,
+                    authentication=authentication,
+                    params=params)
+            except ConnectionError as error:
+                api_error = rubrik_cdm.exceptions.APICallException(to_native(error))
+                api_error.status_code = getattr(error, "code", None)
+                raise api_error
+
+        def object_id(self, object_name, object_type, host_os=None, hostname=None, share_type=None, mssql_host=None,
+                      mssql_instance=None, timeout=15):
+            if self.lookup_cache is None:
+                return self._lookup_object_id(
+                    object_name, object_type, host_os, hostname, share_type, mssql_host, mssql_instance, timeout)
+
+            key = json.dumps([object_name.lower(), host_os, hostname, share_type, mssql_host, mssql_instance])
+
+            object_id = self.lookup_cache.get(self, object_type, key)
+            if object_id is None:
+                object_id = self._lookup_object_id(
+                    object_name, object_type, host_os, hostname, share_type, mssql_host, mssql_instance, timeout)
+                self.lookup_cache.set(self, object_type, key, object_id)
+
+            return object_id
+
+        def _lookup_object_id(self, object_name, object_type, host_os, hostname, share_type, mssql_host, mssql_instance, timeout):
+            """Resolve the object through the lookup planner, or through the SDK for the object types it does not plan."""
+
+            if not LookupPlanner.supports(object_type, host_os=host_os, mssql_host=mssql_host, mssql_instance=mssql_instance):
+                return super(RubrikConnect, self).object_id(
+                    object_name, object_type, host_os, hostname, share_type, mssql_host, mssql_instance, timeout)
+
+            if object_type == "sla" and object_name.upper() in ["FOREVER", "UNPROTECTED"]:
+                return "UNPROTECTED"
+
+            filters = {}
+            if object_type == "fileset_template":
+                filters["operating_system_type"] = host_os
+            elif object_type == "mssql_instance":
+                filters["root_id"] = self.object_id(mssql_host, "physical_host", timeout=timeout)
+            elif object_type == "mssql_db":
+                filters["instance_id"] = self.object_id(mssql_instance, "mssql_instance", mssql_host=mssql_host, timeout=timeout)
+
+            return LookupPlanner().object_id(self, object_name, object_type, filters, timeout)
+
+        def vsphere_live_mount(self, vm_name, date='latest', time='latest', host='current', remove_network_devices=False, power_on=True,
+                               timeout=15, snapshot_match="exact"):
+            snapshot = self.vsphere_snapshot(vm_name, date, time, snapshot_match, timeout)
+
+            return self.vsphere_snapshot_mount(snapshot, host, remove_network_devices, power_on, timeout)
+
+        def vsphere_snapshot(self, vm_name, date='latest', time='latest', snapshot_match="exact", timeout=15):
+            """Return the "id" and "date" of the snapshot of the vSphere VM taken at the date and time, resolved through the
+            snapshot_index, with the "vmId" and "hostId" of the VM.
+            """
+
+            if date != 'latest' and time == 'latest' or date == 'latest' and time != 'latest':
+                raise rubrik_cdm.exceptions.InvalidParameterException(
+                    "The date and time arguments most both be 'latest' or a specific date and time.")
+
+            vm_id = self.object_id(vm_name, 'vmware', timeout=timeout)
+
+            point_in_time = None
+            if date != 'latest':
+                point_in_time = self.snapshot_index.point_in_time(self, date, time, timeout)
+
+            snapshot = self.snapshot_index.snapshot(self, vm_id, point_in_time, snapshot_match, timeout)
+            if snapshot is None:
+                if point_in_time is None:
+                    raise rubrik_cdm.exceptions.InvalidParameterException(
+                        "The vSphere VM '{0}' does not have any snapshots.".format(vm_name))
+                raise rubrik_cdm.exceptions.InvalidParameterException("The vSphere VM '{0}' does not have a snapshot taken {1} {2} at {3}.".format(
+                    vm_name, {"exact": "on", "nearest_before": "on or before", "nearest_after": "on or after"}[snapshot_match], date, time))
+
+            return dict(snapshot, vmId=vm_id)
+
+        def vsphere_snapshot_mount(self, snapshot, host='current', remove_network_devices=False, power_on=True, timeout=15):
+            """Live Mount the snapshot returned by vsphere_snapshot()."""
+
+            config = {
+                "hostId": snapshot["hostId"] if host == 'current' else self.object_id(host, 'vmware_host', timeout=timeout),
+                "removeNetworkDevices": remove_network_devices,
+                "powerOn": power_on,
+            }
+
+            return self.post('v1', '/vmware/vm/snapshot/{0}/mount'.format(snapshot["id"]), config, timeout)
+
+        def connection_stats(self):
+            """Return the request and TLS handshake counters of the persistent connection, or None when they can not be read."""
+
+            if self._connection is None:
+                return None
+
+            # The counters are reported with the result of the module, they must not hide the error of a failed task
+            try:
+                return self._connection.get_connection_stats()
+            except Exception:
+                return None
+
+    return RubrikConnect
+
+
 rubrik_provider_spec = {
     'node_ip': dict(fallback=(env_fallback, ['rubrik_cdm_node_ip'])),
     'username': dict(fallback=(env_fallback, ['rubrik_cdm_username'])),
@@ -99,6 +1926,19 @@ rubrik_manual_spec = {
 
 rubrik_argument_spec = {
     'provider': dict(type='dict', options=rubrik_provider_spec),
+    'lookup_cache_ttl': dict(type='int', default=0, fallback=(env_fallback, ['rubrik_cdm_lookup_cache_ttl'])),
+    'lookup_cache_dir': dict(type='path', fallback=(env_fallback, ['rubrik_cdm_lookup_cache_dir'])),
+    'token_cache_ttl': dict(type='int', default=0, fallback=(env_fallback, ['rubrik_cdm_token_cache_ttl'])),
+    'token_cache_dir': dict(type='path', fallback=(env_fallback, ['rubrik_cdm_token_cache_dir'])),
+    'discover_nodes': dict(type='bool', default=False, fallback=(env_fallback, ['rubrik_cdm_discover_nodes'])),
+    'rate_limit': dict(type='float', default=0, fallback=(env_fallback, ['rubrik_cdm_rate_limit'])),
+    'rate_limit_endpoints': dict(type='dict', fallback=(env_fallback, ['rubrik_cdm_rate_limit_endpoints'])),
+    'rate_limit_dir': dict(type='path', fallback=(env_fallback, ['rubrik_cdm_rate_limit_dir'])),
+    'api_retries': dict(type='int', default=0, fallback=(env_fallback, ['rubrik_cdm_api_retries'])),
+    'api_retry_posts': dict(type='bool', default=False, fallback=(env_fallback, ['rubrik_cdm_api_retry_posts'])),
+    'circuit_breaker_threshold': dict(type='int', default=0, fallback=(env_fallback, ['rubrik_cdm_circuit_breaker_threshold'])),
+    'circuit_breaker_cool_down': dict(type='int', default=30, fallback=(env_fallback, ['rubrik_cdm_circuit_breaker_cool_down'])),
+    'circuit_breaker_dir': dict(type='path', fallback=(env_fallback, ['rubrik_cdm_circuit_breaker_dir'])),
 }
 
 rubrik_argument_spec.update(rubrik_manual_spec)
@@ -78,15 +78,10 @@ idempotent_response:
     sample: No change required. The vCenter '`vcenter_ip`' has already been added to the Rubrik cluster.
 '''
 
-from ansible.module_utils.rubrik_cdm import credentials, load_provider_variables, rubrik_argument_spec
+from ansible.module_utils.rubrik_cdm import HAS_RUBRIK_SDK, CheckModeChange, connect, credentials, invalidate_lookup_cache, \
+    load_provider_variables, rubrik_argument_spec, rubrik_cdm, sdk_changed
 from ansible.module_utils.basic import AnsibleModule
 
-try:
-    import rubrik_cdm
-    HAS_RUBRIK_SDK = True
-except ImportError:
-    HAS_RUBRIK_SDK = False
-
 
 def main():
     """ Main entry point for Ansible module execution.
@@ -106,7 +101,7 @@ def main():
 
     argument_spec.update(rubrik_argument_spec)
 
-    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=False)
+    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
 
     ansible = module.params
 
@@ -125,7 +120,7 @@ def main():
     node_ip, username, password, api_token = credentials(module)
 
     try:
-        rubrik = rubrik_cdm.Connect(node_ip, username, password, api_token)
+        rubrik = connect(module, node_ip, username, password, api_token)
     except Exception as error:
         module.fail_json(msg=str(error))
 
@@ -137,13 +132,16 @@ def main():
             vm_linking,
             ca_certificate,
             timeout)
+    except CheckModeChange as change:
+        module.exit_json(**change.results(module._diff))
     except Exception as error:
         module.fail_json(msg=str(error))
 
-    if "No change required" in api_request:
+    if not sdk_changed(api_request):
         results["changed"] = False
     else:
         results["changed"] = True
+        invalidate_lookup_cache(rubrik, "vcenter", "vmware_host")
 
     results["response"] = api_request
 
@@ -123,15 +123,10 @@ idempotent_response:
     sample: No change requird. The host 'hostname' is already connected to the Rubrik cluster.
 '''
 
-from ansible.module_utils.rubrik_cdm import credentials, load_provider_variables, rubrik_argument_spec
+from ansible.module_utils.rubrik_cdm import HAS_RUBRIK_SDK, CheckModeChange, connect, credentials, load_provider_variables, \
+    rubrik_argument_spec, rubrik_cdm, sdk_changed
 from ansible.module_utils.basic import AnsibleModule
 
-try:
-    import rubrik_cdm
-    HAS_RUBRIK_SDK = True
-except ImportError:
-    HAS_RUBRIK_SDK = False
-
 
 def main():
     """ Main entry point for Ansible module execution.
@@ -167,7 +162,7 @@ def main():
         ]
     ]
 
-    module = AnsibleModule(argument_spec=argument_spec, required_together=required_together, supports_check_mode=False)
+    module = AnsibleModule(argument_spec=argument_spec, required_together=required_together, supports_check_mode=True)
 
     ansible = module.params
 
@@ -179,7 +174,7 @@ def main():
     node_ip, username, password, api_token = credentials(module)
 
     try:
-        rubrik = rubrik_cdm.Connect(node_ip, username, password, api_token)
+        rubrik = connect(module, node_ip, username, password, api_token)
     except Exception as error:
         module.fail_json(msg=str(error))
 
@@ -195,6 +190,8 @@ def main():
                 ansible['operating_system'],
                 ansible['sla_name'],
                 timeout=ansible["timeout"])
+        except CheckModeChange as change:
+            module.exit_json(**change.results(module._diff))
         except Exception as error:
             module.fail_json(msg=str(error))
 
@@ -212,10 +209,12 @@ def main():
                 ansible["follow_network_shares"],
                 ansible["backup_hidden_folders"],
                 ansible["timeout"])
+        except CheckModeChange as change:
+            module.exit_json(**change.results(module._diff))
         except Exception as error:
             module.fail_json(msg=str(error))
 
-    if "No change required" in api_request:
+    if not sdk_changed(api_request):
         results["changed"] = False
     else:
         results["changed"] = True
@@ -23,14 +23,33 @@ options:
     description:
       - The name of the Rubrik object you wish to assign to an SLA Domain.
       - When the I(object_type) is 'volume_group', the I(object_name) can be a list of volumes.
-    required: true
+      - Mutually exclusive with I(objects).
+    required: false
+    type: raw
+  objects:
+    description:
+      - Bulk mode. A list of vSphere VM names to assign to the I(sla_name) SLA Domain, or a mapping of vSphere VM names to the
+        SLA Domain name each VM should be assigned to.
+      - Each SLA Domain is resolved once, every VM is resolved from a single paginated inventory scan and only the VMs that are
+        not already assigned to the requested SLA Domain are assigned, in batches of I(batch_size).
+      - In check mode only the listings are read, the current and requested SLA Domain of each VM that would be assigned are
+        returned as the diff of the task.
+      - Only supported when the I(object_type) is 'vmware'. Mutually exclusive with I(object_name).
+    required: false
     type: raw
   sla_name:
     description:
       - The name of the SLA Domain you wish to assign an object to. To exclude the object from all SLA assignments use do not
         protect as the sla_name. To assign the selected object to the SLA of the next higher level object use clear as the sla_name
-    required: true
+      - Required unless I(objects) is a mapping of vSphere VM names to SLA Domain names.
+    required: false
     type: str
+  batch_size:
+    description:
+      - The maximum number of vSphere VMs sent in a single SLA Domain assignment API call when using I(objects).
+    required: false
+    default: 500
+    type: int
   object_type:
     description:
       - The Rubrik object type you want to assign to the SLA Domain.
@@ -82,10 +101,25 @@ EXAMPLES = '''
     log_backup_frequency_in_seconds: 120
     log_retention_hours: 12
     copy_only: false
+
+- rubrik_assign_sla:
+    objects: "{{ groups['web_servers'] }}"
+    sla_name: "Gold"
+
+- rubrik_assign_sla:
+    objects:
+      web01: "Gold"
+      web02: "Gold"
+      db01: "Silver"
+      scratch01: "do not protect"
 '''
 
-from ansible.module_utils.rubrik_cdm import credentials, load_provider_variables, rubrik_argument_spec
+import re
+
+from ansible.module_utils.rubrik_cdm import HAS_RUBRIK_SDK, CheckModeChange, connect, credentials, iterate_pages, load_provider_variables, \
+    rubrik_argument_spec, rubrik_cdm, sdk_changed
 from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.six import iteritems, string_types
 
 RETURN = '''
 full_response:
@@ -99,13 +133,100 @@ idempotent_response:
     returned: When the module idempotent check is succesful.
     type: str
     sample: No change required. The vSphere VM 'object_name' is already assigned to the 'sla_name' SLA Domain.
+
+objects:
+    description:
+      - The SLA Domain requested for each vSphere VM and whether or not the assignment was changed.
+      - The error message of each vSphere VM or SLA Domain that was not found on the Rubrik cluster, in which case nothing is assigned.
+    returned: When I(objects) is provided.
+    type: dict
+    sample: {"web01": {"sla_name": "Gold", "changed": true}, "web02": {"sla_name": "Gold", "changed": false}}
 '''
 
-try:
-    import rubrik_cdm
-    HAS_RUBRIK_SDK = True
-except ImportError:
-    HAS_RUBRIK_SDK = False
+
+def sla_domain_id(sla_name, sla_domains):
+    """Return the SLA Domain ID for the provided SLA Domain name using the same rules as rubrik_cdm.Connect.assign_sla().
+    """
+
+    if re.findall('\\bdo not protect\\b', sla_name, flags=re.IGNORECASE):
+        return "UNPROTECTED"
+    if re.findall('\\bclear\\b', sla_name, flags=re.IGNORECASE):
+        return "INHERIT"
+    if sla_name.upper() in ["FOREVER", "UNPROTECTED"]:
+        return "UNPROTECTED"
+
+    sla_ids = sla_domains.get(sla_name.lower(), [])
+    if len(sla_ids) == 1:
+        return sla_ids[0]
+
+    return None
+
+
+def bulk_assign_sla(rubrik, desired_sla, batch_size, timeout, check_mode=False):
+    """Assign a mapping of vSphere VM names to SLA Domain names. Each SLA Domain and vSphere VM is resolved from a single
+    paginated listing, the idempotent check is done locally and only the VMs that require a change are assigned. In check
+    mode nothing is assigned, the listings are the only API calls made.
+    Returns:
+        [errors] -- A list of error messages. Nothing is assigned when this list is not empty.
+        [objects] -- The requested SLA Domain and changed status for each vSphere VM, and the error message of each vSphere
+            VM that could not be resolved.
+        [responses] -- The API responses for POST /internal/sla_domain/{sla_id}/assign.
+        [diff] -- The current and requested SLA Domain of each vSphere VM that requires a change.
+    """
+
+    errors = []
+
+    sla_domains = {}
+    sla_names = set(sla_name.lower() for sla_name in desired_sla.values() if sla_domain_id(sla_name, {}) is None)
+    if sla_names:
+        for sla in iterate_pages(rubrik, "v1", "/sla_domain", params={"primary_cluster_id": "local"}, timeout=timeout):
+            sla_domains.setdefault(sla["name"].lower(), []).append(sla["id"])
+            # SLA Domain names are unique on a cluster, stop listing once every requested SLA Domain is found
+            if sla_names.issubset(sla_domains):
+                break
+
+    vms = {}
+    for vm in iterate_pages(rubrik, "v1", "/vmware/vm", params={"primary_cluster_id": "local", "is_relic": "false"}, timeout=timeout):
+        vms.setdefault(vm["name"].lower(), []).append(vm)
+
+    objects = {}
+    assignments = {}
+    diff = {"before": {}, "after": {}}
+    for vm_name, sla_name in sorted(iteritems(desired_sla)):
+        sla_id = sla_domain_id(sla_name, sla_domains)
+        vm = vms.get(vm_name.lower(), [])
+
+        error = None
+        if sla_id is None:
+            error = "The sla object '{0}' was not found on the Rubrik cluster.".format(sla_name)
+        elif len(vm) == 0:
+            error = "The vmware object '{0}' was not found on the Rubrik cluster.".format(vm_name)
+        elif len(vm) > 1:
+            error = "Multiple vmware objects named '{0}' were found on the Rubrik cluster.".format(vm_name)
+
+        if error is not None:
+            errors.append(error)
+            objects[vm_name] = {"sla_name": sla_name, "changed": False, "error": error}
+            continue
+
+        changed = vm[0]["configuredSlaDomainId"] != sla_id
+        if changed:
+            assignments.setdefault(sla_id, []).append(vm[0]["id"])
+            diff["before"][vm_name] = vm[0].get("configuredSlaDomainName", vm[0]["configuredSlaDomainId"])
+            diff["after"][vm_name] = sla_name
+
+        objects[vm_name] = {"sla_name": sla_name, "changed": changed}
+
+    if errors or check_mode:
+        return errors, objects, [], diff
+
+    responses = []
+    for sla_id, vm_ids in sorted(iteritems(assignments)):
+        for index in range(0, len(vm_ids), batch_size):
+            config = {"managedIds": vm_ids[index:index + batch_size]}
+            responses.append(rubrik.post("internal", "/sla_domain/{0}/assign".format(sla_id), config, timeout))
+
+    return errors, objects, responses, diff
 
 
 def main():
@@ -115,8 +236,9 @@ def main():
     results = {}
 
     argument_spec = dict(
-        object_name=dict(required=True, type='raw'),
-        sla_name=dict(required=True, type='str'),
+        object_name=dict(required=False, type='raw'),
+        objects=dict(required=False, type='raw'),
+        sla_name=dict(required=False, type='str'),
         object_type=dict(
             required=False,
             type='str',
@@ -130,29 +252,58 @@ def main():
         log_retention_hours=dict(required=False, type='int'),
         copy_only=dict(required=False, type='bool'),
         windows_host=dict(required=False, type='str'),
+        batch_size=dict(required=False, type='int', default=500),
         timeout=dict(required=False, type='int', default=30),
     )
 
     argument_spec.update(rubrik_argument_spec)
 
-    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=False)
+    required_one_of = [["object_name", "objects"]]
+
+    mutually_exclusive = [["object_name", "objects"]]
+
+    module = AnsibleModule(argument_spec=argument_spec, required_one_of=required_one_of, mutually_exclusive=mutually_exclusive,
+                           supports_check_mode=True)
 
     ansible = module.params
 
     load_provider_variables(module)
 
     object_name = ansible["object_name"]
+    objects = ansible["objects"]
     sla_name = ansible["sla_name"]
     object_type = ansible["object_type"]
     log_backup_frequency_in_seconds = ansible["log_backup_frequency_in_seconds"]
     log_retention_hours = ansible["log_retention_hours"]
     copy_only = ansible["copy_only"]
     windows_host = ansible["windows_host"]
+    batch_size = ansible["batch_size"]
     timeout = ansible["timeout"]
 
     if not HAS_RUBRIK_SDK:
         module.fail_json(msg='The Rubrik Python SDK is required for this module (pip install rubrik_cdm).')
 
+    if objects is not None:
+        if object_type != "vmware":
+            module.fail_json(msg="The 'objects' parameter is only supported when the object_type is 'vmware'.")
+
+        if isinstance(objects, list):
+            if sla_name is None:
+                module.fail_json(msg="When 'objects' is a list, 'sla_name' must also be populated.")
+            desired_sla = dict((vm_name, sla_name) for vm_name in objects)
+        elif isinstance(objects, dict):
+            desired_sla = objects
+        else:
+            module.fail_json(msg="The 'objects' parameter must be a list of vSphere VM names or a mapping of vSphere VM names to SLA Domain names.")
+
+        if not all(isinstance(value, string_types) for value in list(desired_sla.keys()) + list(desired_sla.values())):
+            module.fail_json(msg="The vSphere VM and SLA Domain names provided in 'objects' must be strings.")
+
+        if batch_size < 1:
+            module.fail_json(msg="The 'batch_size' parameter must be greater than 0.")
+    elif sla_name is None:
+        module.fail_json(msg="missing required arguments: sla_name")
+
     if object_type == "mssql_host":
         if log_backup_frequency_in_seconds is None or log_retention_hours is None or log_retention_hours is None:
             module.fail_json(
@@ -166,10 +317,26 @@ def main():
     node_ip, username, password, api_token = credentials(module)
 
     try:
-        rubrik = rubrik_cdm.Connect(node_ip, username, password, api_token)
+        rubrik = connect(module, node_ip, username, password, api_token)
     except Exception as error:
         module.fail_json(msg=str(error))
 
+    if objects is not None:
+        try:
+            errors, results["objects"], results["response"], diff = bulk_assign_sla(rubrik, desired_sla, batch_size, timeout,
+                                                                                    module.check_mode)
+        except Exception as error:
+            module.fail_json(msg=str(error))
+
+        if errors:
+            module.fail_json(msg=" ".join(errors), objects=results["objects"])
+
+        results["changed"] = any(vm["changed"] for vm in results["objects"].values())
+        if module._diff:
+            results["diff"] = diff
+
+        module.exit_json(**results)
+
     try:
         api_request = rubrik.assign_sla(
             object_name,
@@ -180,10 +347,12 @@ def main():
             copy_only,
             windows_host,
             timeout)
+    except CheckModeChange as change:
+        module.exit_json(**change.results(module._diff))
     except Exception as error:
         module.fail_json(msg=str(error))
 
-    if "No change required" in api_request:
+    if not sdk_changed(api_request):
         results["changed"] = False
     else:
         results["changed"] = True
@@ -112,15 +112,9 @@ response:
     type: dict
 '''
 
-from ansible.module_utils.rubrik_cdm import credentials, load_provider_variables, rubrik_argument_spec
+from ansible.module_utils.rubrik_cdm import HAS_RUBRIK_SDK, credentials, load_provider_variables, rubrik_argument_spec, rubrik_cdm
 from ansible.module_utils.basic import AnsibleModule
 
-try:
-    import rubrik_cdm
-    HAS_RUBRIK_SDK = True
-except ImportError:
-    HAS_RUBRIK_SDK = False
-
 
 def main():
     """ Main entry point for Ansible module execution.
@@ -37,15 +37,9 @@ version:
     sample: 4.1.3-2510
 '''
 
-from ansible.module_utils.rubrik_cdm import credentials, load_provider_variables, rubrik_argument_spec
+from ansible.module_utils.rubrik_cdm import HAS_RUBRIK_SDK, connect, credentials, load_provider_variables, rubrik_argument_spec, rubrik_cdm
 from ansible.module_utils.basic import AnsibleModule
 
-try:
-    import rubrik_cdm
-    HAS_RUBRIK_SDK = True
-except ImportError:
-    HAS_RUBRIK_SDK = False
-
 
 def main():
     """ Main entry point for Ansible module execution.
@@ -70,7 +64,7 @@ def main():
     node_ip, username, password, api_token = credentials(module)
 
     try:
-        rubrik = rubrik_cdm.Connect(node_ip, username, password, api_token)
+        rubrik = connect(module, node_ip, username, password, api_token)
     except Exception as error:
         module.fail_json(msg=str(error))
 
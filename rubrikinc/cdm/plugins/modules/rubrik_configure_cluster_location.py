@@ -53,22 +53,15 @@ idempotent_response:
     sample: No change required. The Rubrik cluster is already configured with I(location) as its location.
 '''
 
-from ansible.module_utils.rubrik_cdm import credentials, load_provider_variables, rubrik_argument_spec
+from ansible.module_utils.rubrik_cdm import HAS_RUBRIK_SDK, DesiredState, connect, credentials, load_provider_variables, \
+    rubrik_argument_spec, rubrik_cdm
 from ansible.module_utils.basic import AnsibleModule
 
-try:
-    import rubrik_cdm
-    HAS_RUBRIK_SDK = True
-except ImportError:
-    HAS_RUBRIK_SDK = False
-
 
 def main():
     """ Main entry point for Ansible module execution.
     """
 
-    results = {}
-
     argument_spec = dict(
         location=dict(required=True, type='str'),
         timeout=dict(required=False, type='int', default=15),
@@ -77,7 +70,7 @@ def main():
 
     argument_spec.update(rubrik_argument_spec)
 
-    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=False)
+    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
 
     ansible = module.params
 
@@ -89,22 +82,22 @@ def main():
     node_ip, username, password, api_token = credentials(module)
 
     try:
-        rubrik = rubrik_cdm.Connect(node_ip, username, password, api_token)
+        rubrik = connect(module, node_ip, username, password, api_token)
     except Exception as error:
         module.fail_json(msg=str(error))
 
+    state = DesiredState("v1", "/cluster/me", {"geolocation": {"address": ansible["location"]}})
+
+    def configure_cluster_location(current):
+        return rubrik.patch("v1", "/cluster/me", state.desired, ansible["timeout"])
+
     try:
-        api_request = rubrik.configure_cluster_location(ansible["location"], ansible["timeout"])
+        results = state.apply(module, rubrik, configure_cluster_location,
+                              "No change required. The Rubrik cluster is already configured with '{0}' as its location.".format(
+                                  ansible["location"]), ansible["timeout"])
     except Exception as error:
         module.fail_json(msg=str(error))
 
-    if "No change required" in api_request:
-        results["changed"] = False
-    else:
-        results["changed"] = True
-
-    results["response"] = api_request
-
     module.exit_json(**results)
 
 
@@ -53,22 +53,22 @@ idempotent_response:
     sample: No change required. The NTP server(s) I(ntp_server) has already been added to the Rubrik cluster.
 '''
 
-from ansible.module_utils.rubrik_cdm import credentials, load_provider_variables, rubrik_argument_spec
+from ansible.module_utils.rubrik_cdm import HAS_RUBRIK_SDK, DesiredState, connect, credentials, load_provider_variables, \
+    rubrik_argument_spec, rubrik_cdm
 from ansible.module_utils.basic import AnsibleModule
 
-try:
-    import rubrik_cdm
-    HAS_RUBRIK_SDK = True
-except ImportError:
-    HAS_RUBRIK_SDK = False
+
+def ntp_servers(response):
+    """Return the NTP servers configured on the Rubrik cluster. CDM 5.0 and later list each server as an object.
+    """
+
+    return {"servers": sorted(ntp["server"] if isinstance(ntp, dict) else ntp for ntp in response["data"])}
 
 
 def main():
     """ Main entry point for Ansible module execution.
     """
 
-    results = {}
-
     argument_spec = dict(
         ntp_servers=dict(required=True, type='list'),
         timeout=dict(required=False, type='int', default=15),
@@ -77,7 +77,7 @@ def main():
 
     argument_spec.update(rubrik_argument_spec)
 
-    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=False)
+    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
 
     ansible = module.params
 
@@ -89,22 +89,25 @@ def main():
     node_ip, username, password, api_token = credentials(module)
 
     try:
-        rubrik = rubrik_cdm.Connect(node_ip, username, password, api_token)
+        rubrik = connect(module, node_ip, username, password, api_token)
     except Exception as error:
         module.fail_json(msg=str(error))
 
+    state = DesiredState("internal", "/cluster/me/ntp_server", {"servers": sorted(ansible["ntp_servers"])}, normalize=ntp_servers)
+
+    def configure_ntp(current):
+        config = ansible["ntp_servers"]
+        if rubrik.minimum_installed_cdm_version("5.0", ansible["timeout"]):
+            config = [{"server": ntp_server} for ntp_server in ansible["ntp_servers"]]
+        return rubrik.post("internal", "/cluster/me/ntp_server", config, ansible["timeout"])
+
     try:
-        api_request = rubrik.configure_ntp(ansible["ntp_servers"], ansible["timeout"])
+        results = state.apply(module, rubrik, configure_ntp,
+                              "No change required. The NTP server(s) {0} has already been added to the Rubrik cluster.".format(
+                                  ansible["ntp_servers"]), ansible["timeout"])
     except Exception as error:
         module.fail_json(msg=str(error))
 
-    if "No change required" in api_request:
-        results["changed"] = False
-    else:
-        results["changed"] = True
-
-    results["response"] = api_request
-
     module.exit_json(**results)
 
 
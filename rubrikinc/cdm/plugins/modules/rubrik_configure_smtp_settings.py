@@ -87,22 +87,15 @@ idempotent_response:
     sample: No change required. The Rubrik cluster is already configured with I(timezone) as it's timezone.
 '''
 
-from ansible.module_utils.rubrik_cdm import credentials, load_provider_variables, rubrik_argument_spec
+from ansible.module_utils.rubrik_cdm import HAS_RUBRIK_SDK, DesiredState, connect, credentials, load_provider_variables, \
+    rubrik_argument_spec, rubrik_cdm
 from ansible.module_utils.basic import AnsibleModule
 
-try:
-    import rubrik_cdm
-    HAS_RUBRIK_SDK = True
-except ImportError:
-    HAS_RUBRIK_SDK = False
-
 
 def main():
     """ Main entry point for Ansible module execution.
     """
 
-    results = {}
-
     argument_spec = dict(
         hostname=dict(required=True, type='str'),
         port=dict(required=True, type='int'),
@@ -116,7 +109,7 @@ def main():
 
     argument_spec.update(rubrik_argument_spec)
 
-    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=False)
+    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
 
     ansible = module.params
 
@@ -136,23 +129,31 @@ def main():
     node_ip, username, password, api_token = credentials(module)
 
     try:
-        rubrik = rubrik_cdm.Connect(node_ip, username, password, api_token)
+        rubrik = connect(module, node_ip, username, password, api_token)
     except Exception as error:
         module.fail_json(msg=str(error))
 
+    config = {
+        "smtpHostname": hostname,
+        "smtpPort": port,
+        "smtpSecurity": encryption,
+        "smtpUsername": smtp_username,
+        "fromEmailId": from_email,
+    }
+
+    state = DesiredState("internal", "/smtp_instance", config, normalize=lambda response: (response["data"] or [None])[0])
+
+    def configure_smtp_settings(current):
+        if current["total"] == 0:
+            return rubrik.post("internal", "/smtp_instance", dict(config, smtpPassword=smtp_password), timeout)
+        return rubrik.patch("internal", "/smtp_instance/{0}".format(current["data"][0]["id"]), config, timeout)
+
     try:
-        api_request = rubrik.configure_smtp_settings(
-            hostname, port, from_email, smtp_username, smtp_password, encryption, timeout)
+        results = state.apply(module, rubrik, configure_smtp_settings,
+                              "No change required. The Rubrik cluster is already configured with the provided SMTP settings.", timeout)
     except Exception as error:
         module.fail_json(msg=str(error))
 
-    if "No change required" in api_request:
-        results["changed"] = False
-    else:
-        results["changed"] = True
-
-    results["response"] = api_request
-
     module.exit_json(**results)
 
 
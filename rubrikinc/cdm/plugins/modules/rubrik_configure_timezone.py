@@ -87,22 +87,15 @@ idempotent_response:
     sample: No change required. The Rubrik cluster is already configured with I(timezone) as it's timezone.
 '''
 
-from ansible.module_utils.rubrik_cdm import credentials, load_provider_variables, rubrik_argument_spec
+from ansible.module_utils.rubrik_cdm import HAS_RUBRIK_SDK, DesiredState, connect, credentials, load_provider_variables, \
+    rubrik_argument_spec, rubrik_cdm
 from ansible.module_utils.basic import AnsibleModule
 
-try:
-    import rubrik_cdm
-    HAS_RUBRIK_SDK = True
-except ImportError:
-    HAS_RUBRIK_SDK = False
-
 
 def main():
     """ Main entry point for Ansible module execution.
     """
 
-    results = {}
-
     argument_spec = dict(
         timezone=dict(required=True, type='str', choices=[
             'America/Anchorage',
@@ -143,7 +136,7 @@ def main():
 
     argument_spec.update(rubrik_argument_spec)
 
-    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=False)
+    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
 
     ansible = module.params
 
@@ -155,22 +148,22 @@ def main():
     node_ip, username, password, api_token = credentials(module)
 
     try:
-        rubrik = rubrik_cdm.Connect(node_ip, username, password, api_token)
+        rubrik = connect(module, node_ip, username, password, api_token)
     except Exception as error:
         module.fail_json(msg=str(error))
 
+    state = DesiredState("v1", "/cluster/me", {"timezone": {"timezone": ansible["timezone"]}})
+
+    def configure_timezone(current):
+        return rubrik.patch("v1", "/cluster/me", state.desired, ansible["timeout"])
+
     try:
-        api_request = rubrik.configure_timezone(ansible["timezone"], ansible["timeout"])
+        results = state.apply(module, rubrik, configure_timezone,
+                              "No change required. The Rubrik cluster is already configured with '{0}' as its timezone.".format(
+                                  ansible["timezone"]), ansible["timeout"])
     except Exception as error:
         module.fail_json(msg=str(error))
 
-    if "No change required" in api_request:
-        results["changed"] = False
-    else:
-        results["changed"] = True
-
-    results["response"] = api_request
-
     module.exit_json(**results)
 
 
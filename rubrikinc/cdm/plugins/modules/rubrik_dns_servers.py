@@ -54,22 +54,15 @@ idempotent_response:
     sample: No change required. The Rubrik cluster is already configured with the provided DNS servers.
 '''
 
-from ansible.module_utils.rubrik_cdm import credentials, load_provider_variables, rubrik_argument_spec
+from ansible.module_utils.rubrik_cdm import HAS_RUBRIK_SDK, DesiredState, connect, credentials, load_provider_variables, \
+    rubrik_argument_spec, rubrik_cdm
 from ansible.module_utils.basic import AnsibleModule
 
-try:
-    import rubrik_cdm
-    HAS_RUBRIK_SDK = True
-except ImportError:
-    HAS_RUBRIK_SDK = False
-
 
 def main():
     """ Main entry point for Ansible module execution.
     """
 
-    results = {}
-
     argument_spec = dict(
         server_ip=dict(required=True, type='list'),
         timeout=dict(required=False, type='int', default=15),
@@ -78,7 +71,7 @@ def main():
 
     argument_spec.update(rubrik_argument_spec)
 
-    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=False)
+    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
 
     ansible = module.params
 
@@ -90,22 +83,23 @@ def main():
     node_ip, username, password, api_token = credentials(module)
 
     try:
-        rubrik = rubrik_cdm.Connect(node_ip, username, password, api_token)
+        rubrik = connect(module, node_ip, username, password, api_token)
     except Exception as error:
         module.fail_json(msg=str(error))
 
+    state = DesiredState("internal", "/cluster/me/dns_nameserver", {"servers": sorted(ansible["server_ip"])},
+                         normalize=lambda servers: {"servers": sorted(servers)})
+
+    def configure_dns_servers(current):
+        return rubrik.post("internal", "/cluster/me/dns_nameserver", ansible["server_ip"], ansible["timeout"])
+
     try:
-        api_request = rubrik.configure_dns_servers(ansible["server_ip"], ansible["timeout"])
+        results = state.apply(module, rubrik, configure_dns_servers,
+                              "No change required. The Rubrik cluster is already configured with the provided DNS servers.",
+                              ansible["timeout"])
     except Exception as error:
         module.fail_json(msg=str(error))
 
-    if "No change required" in api_request:
-        results["changed"] = False
-    else:
-        results["changed"] = True
-
-    results["response"] = api_request
-
     module.exit_json(**results)
 
 
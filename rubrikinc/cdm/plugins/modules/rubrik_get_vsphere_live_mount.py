@@ -16,14 +16,24 @@ module: rubrik_get_vsphere_live_mount
 short_description: Get existing Live Mounts for a vSphere VM.
 description:
     - Get existing Live Mounts for a vSphere VM.
+    - When I(vm_name) is not provided, every Live Mount of the Rubrik cluster is read in one paginated pass and indexed by source
+      VM, mounted VM name, ESXi host and age.
 version_added: '2.8'
 author: Rubrik Build Team (@drew-russell) <build@rubrik.com>
 options:
   vm_name:
     description:
       - The name of the mounted vSphere VM.
-    required: True
+      - When omitted, the Live Mounts of every vSphere VM are returned.
+    required: False
     type: str
+  older_than:
+    description:
+      - Only return the Live Mounts created more than this number of hours ago, to find forgotten Live Mounts.
+      - Live Mounts whose creation time is not reported by the cluster are not returned.
+      - Mutually exclusive with I(vm_name).
+    required: False
+    type: int
   timeout:
     description:
       - The number of seconds to wait to establish a connection the Rubrik cluster before returning a timeout error.
@@ -41,6 +51,13 @@ EXAMPLES = '''
 - rubrik_get_vsphere_live_mount:
     vm_name: 'ansible-tower'
 
+- rubrik_get_vsphere_live_mount:
+    older_than: 72
+  register: forgotten
+
+- rubrik_vsphere_live_unmount:
+    mounted_vm_names: "{{ forgotten.index.by_mounted_vm_name.keys() | list }}"
+
 '''
 
 RETURN = '''
@@ -48,16 +65,79 @@ version:
     description: The full response of `GET /v1/vmware/vm/snapshot/mount?vm_id={vm_id}`.
     returned: success
     type: dict
+
+live_mounts:
+    description:
+      - Every Live Mount of the cluster, keyed by Live Mount ID, with the name of its source VM (vmName), the name of the mounted VM
+        (mountedVmName), the name of its ESXi host (hostName) and the number of seconds since it was created (age).
+    returned: When I(vm_name) is not provided.
+    type: dict
+
+index:
+    description:
+      - The Live Mount IDs by source VM name, by ESXi host name and oldest first, and the Live Mount ID of each mounted VM name.
+    returned: When I(vm_name) is not provided.
+    type: dict
+    sample:
+        {
+            "by_vm_name": {"ansible-tower": ["11111111-2222-3333-4444-555555555555"]},
+            "by_mounted_vm_name": {"ansible-tower 01-15 13:30 0": "11111111-2222-3333-4444-555555555555"},
+            "by_host": {"esxi01.example.com": ["11111111-2222-3333-4444-555555555555"]},
+            "by_age": ["11111111-2222-3333-4444-555555555555"]
+        }
 '''
 
-from ansible.module_utils.rubrik_cdm import credentials, load_provider_variables, rubrik_argument_spec
+from datetime import datetime
+
+from ansible.module_utils.rubrik_cdm import HAS_RUBRIK_SDK, connect, credentials, load_provider_variables, rubrik_argument_spec, rubrik_cdm, \
+    vsphere_live_mounts
 from ansible.module_utils.basic import AnsibleModule
 
-try:
-    import rubrik_cdm
-    HAS_RUBRIK_SDK = True
-except ImportError:
-    HAS_RUBRIK_SDK = False
+
+def mount_age(mount, now):
+    """Return the number of seconds since the Live Mount was created, or None when the cluster does not report it."""
+
+    try:
+        mounted = datetime.strptime(mount["mountTimestamp"], "%Y-%m-%dT%H:%M:%S.%fZ")
+    except (KeyError, TypeError, ValueError):
+        return None
+
+    return int((now - mounted).total_seconds())
+
+
+def live_mount_index(mounts, older_than=None, now=None):
+    """Index the Live Mounts by source VM, mounted VM name, ESXi host and age.
+
+    Arguments:
+        mounts {list} -- The Live Mounts returned by vsphere_live_mounts().
+    Keyword Arguments:
+        older_than {int} -- Only index the Live Mounts created more than this number of hours ago. (default: {None})
+        now {datetime} -- The current UTC time. (default: {None})
+    Returns:
+        [dict] -- The indexed Live Mounts, keyed by ID.
+        [dict] -- The Live Mount IDs by_vm_name, by_mounted_vm_name, by_host and by_age.
+    """
+
+    now = now or datetime.utcnow()
+
+    live_mounts = {}
+    index = {"by_vm_name": {}, "by_mounted_vm_name": {}, "by_host": {}}
+
+    for mount in mounts:
+        age = mount_age(mount, now)
+        if older_than is not None and (age is None or age < older_than * 3600):
+            continue
+
+        live_mounts[mount["id"]] = dict(mount, age=age)
+        index["by_vm_name"].setdefault(mount["vmName"] or mount.get("vmId"), []).append(mount["id"])
+        index["by_host"].setdefault(mount["hostName"] or mount.get("hostId"), []).append(mount["id"])
+        if mount["mountedVmName"] is not None:
+            index["by_mounted_vm_name"][mount["mountedVmName"]] = mount["id"]
+
+    # Oldest first, the Live Mounts of unknown age last
+    index["by_age"] = sorted(live_mounts, key=lambda mount_id: (live_mounts[mount_id]["age"] is None, -(live_mounts[mount_id]["age"] or 0)))
+
+    return live_mounts, index
 
 
 def main():
@@ -67,14 +147,17 @@ def main():
     results = {}
 
     argument_spec = dict(
-        vm_name=dict(required=True, type='str'),
+        vm_name=dict(required=False, type='str'),
+        older_than=dict(required=False, type='int'),
         timeout=dict(required=False, type='int', default=15),
 
     )
 
     argument_spec.update(rubrik_argument_spec)
 
-    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=False)
+    mutually_exclusive = [["vm_name", "older_than"]]
+
+    module = AnsibleModule(argument_spec=argument_spec, mutually_exclusive=mutually_exclusive, supports_check_mode=False)
 
     ansible = module.params
 
@@ -86,10 +169,20 @@ def main():
     node_ip, username, password, api_token = credentials(module)
 
     try:
-        rubrik = rubrik_cdm.Connect(node_ip, username, password, api_token)
+        rubrik = connect(module, node_ip, username, password, api_token)
     except Exception as error:
         module.fail_json(msg=str(error))
 
+    if ansible["vm_name"] is None:
+        try:
+            mounts = vsphere_live_mounts(rubrik, host_names=True, timeout=ansible["timeout"])
+        except Exception as error:
+            module.fail_json(msg=str(error))
+
+        results["live_mounts"], results["index"] = live_mount_index(mounts, ansible["older_than"])
+
+        module.exit_json(**results)
+
     try:
         api_request = rubrik.get_vsphere_live_mount(
             ansible["vm_name"],
@@ -18,21 +18,63 @@ description:
     - Certain Rubrik operations may not instantaneously complete. In those cases we have the ability to monitor the status of
       the job through a job status link provided in the actions API response body. In those cases the Ansible Module will return a "job_status_link"
       which can then be registered and used as a variable in the rubrik_job_status module. The rubrik_job_status will check on the status of the
-      job every 20 seconds until the job has successfully completed for failed.
+      job until the job has successfully completed for failed.
+    - The first check happens I(poll_interval) seconds after the job status is first read. While the job reports progress, the
+      time left until it completes is estimated from its progress rate and the job is checked again half way to the estimated
+      completion time. Jobs that do not report progress are checked with an exponentially increasing delay. Every delay is capped
+      at I(max_poll_interval) seconds and randomized by up to 20% so that parallel tasks do not poll the cluster in lockstep.
 version_added: '2.8'
 author: Rubrik Build Team (@drew-russell) <build@rubrik.com>
 options:
   url:
     description:
       - The job status URL provided by a previous API call.
-    required: True
+      - Mutually exclusive with I(urls).
+    required: False
     type: str
+  urls:
+    description:
+      - A list of job status URLs provided by previous API calls, for example the I(job_status_urls) returned by the
+        rubrik_on_demand_snapshot module.
+      - Every pending job is polled concurrently once per round, until every job has finished or the I(deadline) has passed.
+        The delay before the next round is the shortest delay required by any pending job.
+      - A job whose status can not be read is checked again until its status could not be read 3 times in a row or the
+        I(deadline) has passed, and is then reported in I(unknown_jobs).
+      - Mutually exclusive with I(url).
+    required: False
+    type: list
+    elements: str
   wait_for_completion:
     description:
       - Flag that determines if the method should wait for the job to complete before exiting.
     required: False
     type: bool
     default: True
+  deadline:
+    description:
+      - The maximum number of seconds to wait for the jobs to finish. The module fails with the jobs that are still in
+        progress when the deadline passes. 0 waits until every job has finished.
+    required: False
+    type: int
+    default: 0
+  poll_interval:
+    description:
+      - The minimum number of seconds to wait between two job status checks.
+    required: False
+    type: int
+    default: 5
+  max_poll_interval:
+    description:
+      - The maximum number of seconds to wait between two job status checks.
+    required: False
+    type: int
+    default: 60
+  max_concurrency:
+    description:
+      - The maximum number of job status API calls in flight at the same time when using I(urls).
+    required: False
+    type: int
+    default: 10
   timeout:
     description:
       - The number of seconds to wait to establish a connection the Rubrik cluster before returning a timeout error.
@@ -47,7 +89,15 @@ requirements: [rubrik_cdm]
 
 EXAMPLES = '''
 - rubrik_job_status:
-    url: "https://192.168.1.100/api/v1/vmware/vm/request/CREATE_VMWARE_SNAPSHOT_fbcb1d87-9872-4227-a68c-5982f48-vm-289386_e837-a04c-4327-915b-7698d2c5ecf48:::0"
+    url: "https://192.168.1.100/api/v1/vmware/vm/request/CREATE_VMWARE_SNAPSHOT_fbcb1d87-9872-4227-a68c-5982f48:::0"
+
+- rubrik_on_demand_snapshot:
+    objects: "{{ groups['pre_patch'] }}"
+  register: snapshots
+
+- rubrik_job_status:
+    urls: "{{ snapshots.job_status_urls }}"
+    deadline: 7200
 '''
 
 RETURN = '''
@@ -56,16 +106,59 @@ response:
     returned: on success
     type: dict
     sample: differs depending on the object_type being monitored.
+jobs:
+    description: The last job status API response of each job status URL.
+    returned: When I(urls) is provided.
+    type: dict
+    sample:
+        {
+            "https://192.168.1.100/api/v1/vmware/vm/request/CREATE_VMWARE_SNAPSHOT_fbcb1d87-9872-4227-a68c-5982f48:::0": {
+                "id": "CREATE_VMWARE_SNAPSHOT_fbcb1d87-9872-4227-a68c-5982f48-vm-289386_e837-a04c-4327-915b-7698d2c5ecf48:::0",
+                "status": "SUCCEEDED",
+                "startTime": "2019-04-17T21:31:17.785Z",
+                "endTime": "2019-04-17T21:31:39.056Z",
+                "nodeId": "cluster:::RVM189S019012"
+            }
+        }
+succeeded_jobs:
+    description: The job status URLs of the jobs that succeeded.
+    returned: When I(urls) is provided.
+    type: list
+canceled_jobs:
+    description: The job status URLs of the jobs that were canceled. A canceled job does not fail the task, the same as with I(url).
+    returned: When I(urls) is provided.
+    type: list
+failed_jobs:
+    description: The job status URLs of the jobs that failed.
+    returned: When I(urls) is provided.
+    type: list
+unknown_jobs:
+    description: The job status URLs of the jobs whose status could not be read. Their entry in I(jobs) has the UNKNOWN status and the error.
+    returned: When I(urls) is provided.
+    type: list
+pending_jobs:
+    description: The job status URLs of the jobs that were still in progress when the module returned.
+    returned: When I(urls) is provided.
+    type: list
+polls:
+    description: The number of job status API calls made.
+    returned: on success
+    type: int
+    sample: 12
+wait_time:
+    description: The total number of seconds spent waiting between job status checks.
+    returned: on success
+    type: float
+    sample: 184.52
 '''
 
-from ansible.module_utils.rubrik_cdm import credentials, load_provider_variables, rubrik_argument_spec
+from ansible.module_utils.rubrik_cdm import HAS_RUBRIK_SDK, JobPoller, connect, credentials, load_provider_variables, rubrik_argument_spec, \
+    rubrik_cdm
 from ansible.module_utils.basic import AnsibleModule
 
-try:
-    import rubrik_cdm
-    HAS_RUBRIK_SDK = True
-except ImportError:
-    HAS_RUBRIK_SDK = False
+
+# The final job statuses that do not fail the task, the same as rubrik_cdm.Connect.job_status()
+JOB_SUCCESSFUL_STATUS = ["SUCCEEDED", "CANCELED"]
 
 
 def main():
@@ -75,8 +168,13 @@ def main():
     results = {}
 
     argument_spec = dict(
-        url=dict(required=True),
+        url=dict(required=False, type='str'),
+        urls=dict(required=False, type='list', elements='str'),
         wait_for_completion=dict(required=False, type='bool', default=True),
+        deadline=dict(required=False, type='int', default=0),
+        poll_interval=dict(required=False, type='int', default=5),
+        max_poll_interval=dict(required=False, type='int', default=60),
+        max_concurrency=dict(required=False, type='int', default=10),
         timeout=dict(required=False, type='int', default=15)
     )
 
@@ -84,7 +182,12 @@ def main():
     argument_spec.update(rubrik_argument_spec)
     # End Parameters
 
-    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=False)
+    required_one_of = [["url", "urls"]]
+
+    mutually_exclusive = [["url", "urls"]]
+
+    module = AnsibleModule(argument_spec=argument_spec, required_one_of=required_one_of, mutually_exclusive=mutually_exclusive,
+                           supports_check_mode=False)
 
     ansible = module.params
 
@@ -96,18 +199,54 @@ def main():
     node_ip, username, password, api_token = credentials(module)
 
     try:
-        rubrik = rubrik_cdm.Connect(node_ip, username, password, api_token)
+        rubrik = connect(module, node_ip, username, password, api_token)
     except Exception as error:
         module.fail_json(msg=str(error))
 
+    results["changed"] = False
+
+    # A negative deadline stops after the first polling round and returns the current status of every job
+    deadline = ansible["deadline"] if ansible["wait_for_completion"] else -1
+
+    poller = JobPoller(deadline=deadline, poll_interval=ansible["poll_interval"], max_poll_interval=ansible["max_poll_interval"],
+                       max_concurrency=ansible["max_concurrency"])
+
     try:
-        api_request = rubrik.job_status(ansible["url"], ansible["wait_for_completion"], ansible["timeout"])
+        jobs, pending = poller.wait(rubrik, ansible["urls"] or [ansible["url"]], timeout=ansible["timeout"])
     except Exception as error:
         module.fail_json(msg=str(error))
 
-    results["changed"] = False
+    results.update(poller.stats())
+
+    if ansible["url"] is not None:
+        results["response"] = jobs[ansible["url"]]
+
+        if results["response"].get("status") == "UNKNOWN":
+            module.fail_json(msg="The job status could not be read: {0}".format(results["response"]["error"]["message"]), **results)
+
+        if ansible["wait_for_completion"] and not pending and results["response"].get("status") not in JOB_SUCCESSFUL_STATUS:
+            module.fail_json(msg=str(results["response"]), **results)
+
+        if pending and ansible["wait_for_completion"]:
+            module.fail_json(msg="The job did not finish before the deadline.", **results)
+
+        module.exit_json(**results)
+
+    results["jobs"] = jobs
+    results["succeeded_jobs"] = [url for url in jobs if jobs[url].get("status") == "SUCCEEDED"]
+    results["unknown_jobs"] = [url for url in jobs if jobs[url].get("status") == "UNKNOWN"]
+    results["pending_jobs"] = [url for url in pending if url not in results["unknown_jobs"]]
+    results["canceled_jobs"] = [url for url in jobs if jobs[url].get("status") == "CANCELED"]
+    results["failed_jobs"] = [url for url in jobs if jobs[url].get("status") not in JOB_SUCCESSFUL_STATUS + ["UNKNOWN"] and url not in pending]
+
+    if results["failed_jobs"]:
+        module.fail_json(msg="{0} of the {1} jobs did not succeed.".format(len(results["failed_jobs"]), len(jobs)), **results)
+
+    if results["unknown_jobs"]:
+        module.fail_json(msg="The status of {0} of the {1} jobs could not be read.".format(len(results["unknown_jobs"]), len(jobs)), **results)
 
-    results["response"] = api_request
+    if pending and ansible["wait_for_completion"]:
+        module.fail_json(msg="{0} of the {1} jobs did not finish before the deadline.".format(len(pending), len(jobs)), **results)
 
     module.exit_json(**results)
 
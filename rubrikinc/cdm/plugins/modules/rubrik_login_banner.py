@@ -53,22 +53,15 @@ idempotent_response:
     sample: No change required. The Rubrik cluster is already configured with I(banner_text) as it's banner.
 '''
 
-from ansible.module_utils.rubrik_cdm import credentials, load_provider_variables, rubrik_argument_spec
+from ansible.module_utils.rubrik_cdm import HAS_RUBRIK_SDK, DesiredState, connect, credentials, load_provider_variables, \
+    rubrik_argument_spec, rubrik_cdm
 from ansible.module_utils.basic import AnsibleModule
 
-try:
-    import rubrik_cdm
-    HAS_RUBRIK_SDK = True
-except ImportError:
-    HAS_RUBRIK_SDK = False
-
 
 def main():
     """ Main entry point for Ansible module execution.
     """
 
-    results = {}
-
     argument_spec = dict(
         banner_text=dict(required=True, type='str'),
         timeout=dict(required=False, type='int', default=15),
@@ -76,7 +69,7 @@ def main():
 
     argument_spec.update(rubrik_argument_spec)
 
-    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=False)
+    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
 
     ansible = module.params
 
@@ -88,22 +81,22 @@ def main():
     node_ip, username, password, api_token = credentials(module)
 
     try:
-        rubrik = rubrik_cdm.Connect(node_ip, username, password, api_token)
+        rubrik = connect(module, node_ip, username, password, api_token)
     except Exception as error:
         module.fail_json(msg=str(error))
 
+    state = DesiredState("internal", "/cluster/me/login_banner", {"loginBanner": ansible["banner_text"]})
+
+    def configure_login_banner(current):
+        return rubrik.put("internal", "/cluster/me/login_banner", state.desired, ansible["timeout"])
+
     try:
-        api_request = rubrik.configure_login_banner(ansible["banner_text"], ansible["timeout"])
+        results = state.apply(module, rubrik, configure_login_banner,
+                              "No change required. The Rubrik cluster is already configured with the login banner text '{0}'.".format(
+                                  ansible["banner_text"]), ansible["timeout"])
     except Exception as error:
         module.fail_json(msg=str(error))
 
-    if "No change required" in api_request:
-        results["changed"] = False
-    else:
-        results["changed"] = True
-
-    results["response"] = api_request
-
     module.exit_json(**results)
 
 
@@ -121,22 +121,27 @@ idempotent_response:
     sample: No change required. The Rubrik cluster already has a NAS Fileset named 'name' configured with the provided variables.
 '''
 
-from ansible.module_utils.rubrik_cdm import credentials, load_provider_variables, rubrik_argument_spec
+from ansible.module_utils.rubrik_cdm import HAS_RUBRIK_SDK, DesiredState, connect, credentials, invalidate_lookup_cache, \
+    load_provider_variables, rubrik_argument_spec, rubrik_cdm
 from ansible.module_utils.basic import AnsibleModule
 
-try:
-    import rubrik_cdm
-    HAS_RUBRIK_SDK = True
-except ImportError:
-    HAS_RUBRIK_SDK = False
+
+def fileset_template(response, name):
+    """Return the Fileset template named name from the listing of the Rubrik cluster, with its paths sorted.
+    """
+
+    for template in response["data"]:
+        if template["name"] == name:
+            return dict(template, includes=sorted(template["includes"]), excludes=sorted(template["excludes"]),
+                        exceptions=sorted(template["exceptions"]))
+
+    return None
 
 
 def main():
     """ Main entry point for Ansible module execution.
     """
 
-    results = {}
-
     argument_spec = dict(
         fileset_name=dict(required=True, aliases=['name']),
         share_type=dict(required=True, choices=['NFS', 'SMB']),
@@ -150,7 +155,7 @@ def main():
 
     argument_spec.update(rubrik_argument_spec)
 
-    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=False)
+    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
 
     ansible = module.params
 
@@ -162,7 +167,7 @@ def main():
     node_ip, username, password, api_token = credentials(module)
 
     try:
-        rubrik = rubrik_cdm.Connect(node_ip, username, password, api_token)
+        rubrik = connect(module, node_ip, username, password, api_token)
     except Exception as error:
         module.fail_json(msg=str(error))
 
@@ -174,25 +179,30 @@ def main():
     follow_network_shares = ansible["follow_network_shares"]
     timeout = ansible["timeout"]
 
-    try:
-        api_request = rubrik.create_nas_fileset(
-            fileset_name,
-            share_type,
-            include,
-            exclude,
-            exclude_exception,
-            follow_network_shares,
-            timeout)
+    config = {
+        "name": fileset_name,
+        "includes": sorted(include),
+        "excludes": sorted(exclude),
+        "exceptions": sorted(exclude_exception),
+        "allowBackupHiddenFoldersInNetworkMounts": follow_network_shares,
+        "shareType": share_type,
+    }
+
+    state = DesiredState("v1", "/fileset_template", config, normalize=lambda response: fileset_template(response, fileset_name),
+                         params={"primary_cluster_id": "local", "operating_system_type": "NONE", "name": fileset_name})
+
+    def create_nas_fileset(current):
+        return rubrik.post("internal", "/fileset_template/bulk", [config], timeout=timeout)
 
+    try:
+        results = state.apply(module, rubrik, create_nas_fileset,
+                              "No change required. The Rubrik cluster already has a NAS Fileset named '{0}' configured with the provided variables.".format(
+                                  fileset_name), timeout)
     except Exception as error:
         module.fail_json(msg=str(error))
 
-    if "No change required" in api_request:
-        results["changed"] = False
-    else:
-        results["changed"] = True
-
-    results["response"] = api_request
+    if results["changed"] and not module.check_mode:
+        invalidate_lookup_cache(rubrik, "fileset_template")
 
     module.exit_json(**results)
 
@@ -22,9 +22,29 @@ options:
   object_name:
     description:
       - The name of the Rubrik object to take a on-demand snapshot of.
-    required: True
+      - Mutually exclusive with I(objects).
+    required: False
     type: str
 
+  objects:
+    description:
+      - Bulk mode. A list of Rubrik objects to take an on-demand snapshot of. Each item is either the name of the object or a dict
+        with an I(object_name) key and any of the I(object_type), I(sla_name), I(fileset), I(host_os), I(sql_host) and
+        I(sql_instance) keys, which override the module level values for that object.
+      - Every snapshot is started concurrently, up to I(max_concurrency) at a time, and the module returns without waiting for the
+        snapshots to complete. The returned I(job_status_urls) can be passed to the I(urls) option of the rubrik_job_status module.
+      - Mutually exclusive with I(object_name).
+    required: False
+    type: list
+    elements: raw
+
+  max_concurrency:
+    description:
+      - The maximum number of on-demand snapshot API calls in flight at the same time when using I(objects).
+    required: False
+    type: int
+    default: 10
+
   object_type:
     description:
       - The Rubrik object type you want to backup.
@@ -91,6 +111,19 @@ EXAMPLES = '''
         object_type: "physical_host"
         fileset: "Python SDK"
         host_os: "Linux"
+
+- rubrik_on_demand_snapshot:
+    objects:
+      - 'ansible-node01'
+      - 'ansible-node02'
+      - object_name: "ansible-demo"
+        object_type: "physical_host"
+        fileset: "Python SDK"
+        host_os: "Linux"
+  register: snapshots
+
+- rubrik_job_status:
+    urls: "{{ snapshots.job_status_urls }}"
 '''
 
 RETURN = '''
@@ -145,16 +178,84 @@ job_status_url:
     returned: on success
     type: str
     sample: https://192.168.8.19/api/v1/fileset/request/CREATE_FILESET_SNAPSHOT_a2f6161c-33a4-3123-efaw-de7d1bef284e_dc0983bf-1c47-45ce-9ce0-b8df3c93b5fa:::0
+
+snapshots:
+    description:
+      - The snapshot of each item of I(objects), in the same order. Each snapshot has the I(object_name) and I(object_type) of the
+        object, its I(fileset) or I(sql_host) and I(sql_instance) when they identify the object, and either the on-demand snapshot
+        API I(response) and I(job_status_url) or the I(error) message when the snapshot could not be started.
+    returned: When I(objects) is provided.
+    type: list
+    sample:
+        [
+            {
+                "object_name": "ansible-node01",
+                "object_type": "vmware",
+                "response": {
+                    "id": "CREATE_VMWARE_SNAPSHOT_fbcb1d87-9872-4227-a68c-5982f48-vm-289386_e837-a04c-4327-915b-7698d2c5ecf48:::0",
+                    "status": "QUEUED"
+                },
+                "job_status_url": "https://192.168.8.19/api/v1/vmware/vm/request/CREATE_VMWARE_SNAPSHOT_fbcb1d87-9872-4227-a68c-5982f48:::0"
+            }
+        ]
+
+job_status_urls:
+    description: The job status url of every snapshot that was started, which can be passed into the I(urls) option of the rubrik_job_status module.
+    returned: When I(objects) is provided.
+    type: list
 '''
 
-from ansible.module_utils.rubrik_cdm import credentials, load_provider_variables, rubrik_argument_spec
+from ansible.module_utils.rubrik_cdm import HAS_RUBRIK_SDK, connect, credentials, load_provider_variables, rubrik_argument_spec, \
+    rubrik_cdm, run_concurrently
 from ansible.module_utils.basic import AnsibleModule
 
-try:
-    import rubrik_cdm
-    HAS_RUBRIK_SDK = True
-except ImportError:
-    HAS_RUBRIK_SDK = False
+
+SNAPSHOT_OPTIONS = ["object_name", "object_type", "sla_name", "fileset", "host_os", "sql_host", "sql_instance"]
+
+# The options that tell apart objects of the same type and name
+IDENTITY_OPTIONS = {
+    "physical_host": ["fileset"],
+    "mssql_db": ["sql_host", "sql_instance"],
+}
+
+
+def snapshot_requests(ansible):
+    """Build the on_demand_snapshot() arguments of every item in the "objects" module argument.
+
+    Returns:
+        [list] -- The validation errors.
+        [list] -- The on_demand_snapshot() arguments of each object.
+    """
+
+    errors = []
+    requests = []
+
+    for item in ansible["objects"]:
+        if not isinstance(item, dict):
+            item = {"object_name": item}
+
+        invalid_options = [option for option in item if option not in SNAPSHOT_OPTIONS]
+        if invalid_options:
+            errors.append("Unsupported 'objects' option(s): {0}.".format(", ".join(sorted(invalid_options))))
+            continue
+
+        if not item.get("object_name"):
+            errors.append("Each item in 'objects' must provide an object_name.")
+            continue
+
+        request = dict((option, ansible[option]) for option in SNAPSHOT_OPTIONS)
+        request.update(item)
+        for option in ["fileset", "host_os"]:
+            if request[option] == "None":
+                request[option] = None
+
+        if request["object_type"] == "mssql_db" and (request["sql_host"] == "None" or request["sql_instance"] == "None"):
+            errors.append("The sql_host and sql_instance must be provided for the '{0}' mssql_db.".format(request["object_name"]))
+            continue
+
+        requests.append(request)
+
+    return errors, requests
 
 
 def main():
@@ -162,7 +263,9 @@ def main():
     """
 
     argument_spec = dict(
-        object_name=dict(required=True, type='str'),
+        object_name=dict(required=False, type='str'),
+        objects=dict(required=False, type='list', elements='raw'),
+        max_concurrency=dict(required=False, type='int', default=10),
         object_type=dict(required=False, type='str', default="vmware", choices=["vmware", "physical_host", "ahv", "mssql_db"]),
         sla_name=dict(required=False, type='str', default='current'),
         fileset=dict(required=False, type='str', default='None'),
@@ -176,9 +279,14 @@ def main():
         ["object_type", "mssql_db", ["sql_host", "sql_instance"]],
     ]
 
+    required_one_of = [["object_name", "objects"]]
+
+    mutually_exclusive = [["object_name", "objects"]]
+
     argument_spec.update(rubrik_argument_spec)
 
-    module = AnsibleModule(argument_spec=argument_spec, required_if=required_if, supports_check_mode=False)
+    module = AnsibleModule(argument_spec=argument_spec, required_if=required_if, required_one_of=required_one_of,
+                           mutually_exclusive=mutually_exclusive, supports_check_mode=False)
 
     results = {}
 
@@ -192,10 +300,46 @@ def main():
     node_ip, username, password, api_token = credentials(module)
 
     try:
-        rubrik = rubrik_cdm.Connect(node_ip, username, password, api_token)
+        rubrik = connect(module, node_ip, username, password, api_token)
     except Exception as error:
         module.fail_json(msg=str(error))
 
+    if ansible["objects"] is not None:
+        errors, requests = snapshot_requests(ansible)
+        if errors:
+            module.fail_json(msg=" ".join(errors))
+
+        def on_demand_snapshot(request):
+            return rubrik.on_demand_snapshot(
+                request["object_name"], request["object_type"], request["sla_name"], request["fileset"], request["host_os"],
+                request["sql_host"], request["sql_instance"], sql_db=request["object_name"], timeout=ansible["timeout"])
+
+        snapshots = run_concurrently(on_demand_snapshot, requests, ansible["max_concurrency"])
+
+        # Objects of different types, filesets or SQL instances can share a name, so the snapshots follow the order of the objects
+        results["snapshots"] = []
+        results["job_status_urls"] = []
+        for request, (snapshot, error) in zip(requests, snapshots):
+            result = dict((option, request[option]) for option in ["object_name", "object_type"] + IDENTITY_OPTIONS.get(request["object_type"], []))
+            results["snapshots"].append(result)
+
+            if error is not None:
+                result["error"] = str(error)
+                errors.append("{0}: {1}".format(request["object_name"], str(error)))
+                continue
+
+            api_request, job_status_url = snapshot
+            result.update({"response": api_request, "job_status_url": job_status_url})
+            results["job_status_urls"].append(job_status_url)
+
+        results["changed"] = len(results["job_status_urls"]) > 0
+
+        if errors:
+            module.fail_json(msg="Unable to start the on-demand snapshot of {0} of the {1} objects. {2}".format(
+                len(errors), len(requests), " ".join(errors)), **results)
+
+        module.exit_json(**results)
+
     if ansible["fileset"] == "None":
         ansible["fileset"] = None
 
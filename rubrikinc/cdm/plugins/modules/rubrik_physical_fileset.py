@@ -129,22 +129,27 @@ idempotent_response:
     sample: No change required. The Rubrik cluster already has a NAS Fileset named 'name' configured with the provided variables.
 '''
 
-from ansible.module_utils.rubrik_cdm import credentials, load_provider_variables, rubrik_argument_spec
+from ansible.module_utils.rubrik_cdm import HAS_RUBRIK_SDK, DesiredState, connect, credentials, invalidate_lookup_cache, \
+    load_provider_variables, rubrik_argument_spec, rubrik_cdm
 from ansible.module_utils.basic import AnsibleModule
 
-try:
-    import rubrik_cdm
-    HAS_RUBRIK_SDK = True
-except ImportError:
-    HAS_RUBRIK_SDK = False
+
+def fileset_template(response, name):
+    """Return the Fileset template named name from the listing of the Rubrik cluster, with its paths sorted.
+    """
+
+    for template in response["data"]:
+        if template["name"] == name:
+            return dict(template, includes=sorted(template["includes"]), excludes=sorted(template["excludes"]),
+                        exceptions=sorted(template["exceptions"]))
+
+    return None
 
 
 def main():
     """ Main entry point for Ansible module execution.
     """
 
-    results = {}
-
     argument_spec = dict(
         fileset_name=dict(required=True, aliases=['name']),
         operating_system=dict(required=True, choices=['Linux', 'Windows']),
@@ -158,7 +163,7 @@ def main():
 
     argument_spec.update(rubrik_argument_spec)
 
-    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=False)
+    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
 
     ansible = module.params
 
@@ -170,7 +175,7 @@ def main():
     node_ip, username, password, api_token = credentials(module)
 
     try:
-        rubrik = rubrik_cdm.Connect(node_ip, username, password, api_token)
+        rubrik = connect(module, node_ip, username, password, api_token)
     except Exception as error:
         module.fail_json(msg=str(error))
 
@@ -183,26 +188,31 @@ def main():
     backup_hidden_folders = ansible["backup_hidden_folders"]
     timeout = ansible["timeout"]
 
-    try:
-        api_request = rubrik.create_physical_fileset(
-            fileset_name,
-            operating_system,
-            include,
-            exclude,
-            exclude_exception,
-            follow_network_shares,
-            backup_hidden_folders,
-            timeout)
+    config = {
+        "name": fileset_name,
+        "includes": sorted(include),
+        "excludes": sorted(exclude),
+        "exceptions": sorted(exclude_exception),
+        "allowBackupHiddenFoldersInNetworkMounts": backup_hidden_folders,
+        "allowBackupNetworkMounts": follow_network_shares,
+        "operatingSystemType": operating_system,
+    }
+
+    state = DesiredState("v1", "/fileset_template", config, normalize=lambda response: fileset_template(response, fileset_name),
+                         params={"primary_cluster_id": "local", "operating_system_type": operating_system, "name": fileset_name})
+
+    def create_physical_fileset(current):
+        return rubrik.post("internal", "/fileset_template/bulk", [config], timeout=timeout)
 
+    try:
+        results = state.apply(module, rubrik, create_physical_fileset,
+                              "No change required. The Rubrik cluster already has a {0} Fileset named '{1}' configured with the provided variables.".format(
+                                  operating_system, fileset_name), timeout)
     except Exception as error:
         module.fail_json(msg=str(error))
 
-    if "No change required" in api_request:
-        results["changed"] = False
-    else:
-        results["changed"] = True
-
-    results["response"] = api_request
+    if results["changed"] and not module.check_mode:
+        invalidate_lookup_cache(rubrik, "fileset_template")
 
     module.exit_json(**results)
 
@@ -22,7 +22,9 @@ options:
   hostname:
     description:
       - The hostname or IP Address of the physical host you want to add or delete from the Rubrik cluster.
-      - When C(action=add) this may also be a list of hostnames.
+      - This may also be a list of hostnames. The hosts already connected to the Rubrik cluster are found with a single host
+        listing, the remaining hosts are then added or deleted concurrently, up to I(max_concurrency) at a time, and the status
+        of each host is returned in I(hosts). A host that fails does not stop the other hosts from being processed.
     required: True
     type: raw
     aliases: ["ip_address"]
@@ -38,7 +40,12 @@ options:
     required: False
     type: int
     default: 120
-
+  max_concurrency:
+    description:
+      - The maximum number of hosts added or deleted at the same time when I(hostname) is a list.
+    required: False
+    type: int
+    default: 10
 
 extends_documentation_fragment: rubrikinc.cdm.credentials
 requirements: [rubrik_cdm]
@@ -52,6 +59,11 @@ EXAMPLES = '''
 - rubrik_physical_host:
     hostname: 'ubuntu-physical-demo'
     action: 'delete'
+
+- rubrik_physical_host:
+    hostname: "{{ groups['linux_servers'] }}"
+    action: 'add'
+    max_concurrency: 20
 '''
 
 RETURN = '''
@@ -88,16 +100,81 @@ idempotent_response_action_delete:
     returned: When the module idempotent check is succesful and action is delete.
     type: str
     sample: No change required. The host 'hostname' is not connected to the Rubrik cluster.
+
+hosts:
+    description:
+      - The status of each host when I(hostname) is a list. The status is one of added, deleted, unchanged or failed.
+      - The API response is returned for the added and deleted hosts and the error message for the failed hosts.
+    returned: When I(hostname) is a list.
+    type: dict
+    sample:
+        {
+            "ubuntu-physical-demo": {"status": "added", "response": {"id": "Host:::2a6b5f1c", "hostname": "ubuntu-physical-demo"}},
+            "centos-physical-demo": {"status": "unchanged"},
+            "offline-physical-demo": {"status": "failed", "msg": "Unable to connect to the Rubrik Backup Service."}
+        }
+
+summary:
+    description: The number of hosts in each status and the number of seconds spent processing the hosts when I(hostname) is a list.
+    returned: When I(hostname) is a list.
+    type: dict
+    sample: {"added": 1, "deleted": 0, "unchanged": 1, "failed": 1, "elapsed": 12.84}
 '''
 
-from ansible.module_utils.rubrik_cdm import credentials, load_provider_variables, rubrik_argument_spec
+import time
+
+from ansible.module_utils.rubrik_cdm import HAS_RUBRIK_SDK, CheckModeChange, connect, credentials, invalidate_lookup_cache, \
+    iterate_pages, load_provider_variables, rubrik_argument_spec, rubrik_cdm, run_concurrently, sdk_changed
 from ansible.module_utils.basic import AnsibleModule
 
-try:
-    import rubrik_cdm
-    HAS_RUBRIK_SDK = True
-except ImportError:
-    HAS_RUBRIK_SDK = False
+
+def bulk_physical_host(rubrik, hostnames, action, max_concurrency, timeout, check_mode=False):
+    """Add or delete multiple physical hosts concurrently. In check mode the hosts are only compared with the current hosts.
+    The current hosts are read in a single paginated pass and matched on their name or hostname, ignoring case, the same way
+    as rubrik_cdm.Connect.object_id().
+
+    Returns:
+        dict -- The status of each host.
+    """
+
+    current_hosts = {}
+    for host in iterate_pages(rubrik, "v1", "/host", params={"primary_cluster_id": "local"}, timeout=timeout):
+        for field in ["name", "hostname"]:
+            if host.get(field):
+                current_hosts.setdefault(host[field].lower(), host["id"])
+
+    hosts = {}
+    pending = []
+    requested = set()
+    for hostname in hostnames:
+        if hostname.lower() in requested:
+            continue
+        requested.add(hostname.lower())
+        if (hostname.lower() in current_hosts) == (action == "add"):
+            hosts[hostname] = {"status": "unchanged"}
+        else:
+            pending.append(hostname)
+
+    def add_physical_host(hostname):
+        return rubrik.post("v1", "/host", {"hostname": hostname, "hasAgent": True}, timeout)
+
+    def delete_physical_host(hostname):
+        return rubrik.delete("v1", "/host/{0}".format(current_hosts[hostname.lower()]), timeout=timeout)
+
+    if check_mode:
+        responses = [(None, None)] * len(pending)
+    elif action == "add":
+        responses = run_concurrently(add_physical_host, pending, max_concurrency)
+    else:
+        responses = run_concurrently(delete_physical_host, pending, max_concurrency)
+
+    for hostname, (response, error) in zip(pending, responses):
+        if error is not None:
+            hosts[hostname] = {"status": "failed", "msg": str(error)}
+        else:
+            hosts[hostname] = {"status": "added" if action == "add" else "deleted", "response": response}
+
+    return hosts
 
 
 def main():
@@ -110,12 +187,12 @@ def main():
         hostname=dict(required=True, aliases=['ip_address'], type="raw"),
         action=dict(required=True, choices=['add', 'delete']),
         timeout=dict(required=False, type='int', default=120),
-
+        max_concurrency=dict(required=False, type='int', default=10),
     )
 
     argument_spec.update(rubrik_argument_spec)
 
-    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=False)
+    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
 
     ansible = module.params
 
@@ -127,30 +204,61 @@ def main():
     node_ip, username, password, api_token = credentials(module)
 
     try:
-        rubrik = rubrik_cdm.Connect(node_ip, username, password, api_token)
+        rubrik = connect(module, node_ip, username, password, api_token)
     except Exception as error:
         module.fail_json(msg=str(error))
 
+    if isinstance(ansible["hostname"], list):
+        start = time.time()
+
+        try:
+            results["hosts"] = bulk_physical_host(rubrik, ansible["hostname"], ansible["action"], ansible["max_concurrency"], ansible["timeout"],
+                                                  module.check_mode)
+        except Exception as error:
+            module.fail_json(msg=str(error))
+
+        results["summary"] = dict((status, 0) for status in ["added", "deleted", "unchanged", "failed"])
+        for host in results["hosts"].values():
+            results["summary"][host["status"]] += 1
+        results["summary"]["elapsed"] = round(time.time() - start, 3)
+
+        results["changed"] = results["summary"]["added"] + results["summary"]["deleted"] > 0
+        if module._diff:
+            # The hosts that stay connected, already added or failed to delete, are listed in both states
+            connected = ["unchanged"] if ansible["action"] == "add" else ["failed"]
+            results["diff"] = {
+                "before": {"hosts": sorted(name for name, host in results["hosts"].items() if host["status"] in connected + ["deleted"])},
+                "after": {"hosts": sorted(name for name, host in results["hosts"].items() if host["status"] in connected + ["added"])},
+            }
+        if results["changed"] and not module.check_mode:
+            invalidate_lookup_cache(rubrik, "physical_host", "mssql_instance", "mssql_db", "share")
+
+        failed = sorted(hostname for hostname, host in results["hosts"].items() if host["status"] == "failed")
+        if failed:
+            module.fail_json(msg="Unable to {0} the following physical host(s): {1}".format(ansible["action"], ", ".join(failed)), **results)
+
+        module.exit_json(**results)
+
     if ansible["action"] == "add":
         try:
             api_request = rubrik.add_physical_host(ansible["hostname"], ansible["timeout"])
+        except CheckModeChange as change:
+            module.exit_json(**change.results(module._diff))
         except Exception as error:
             module.fail_json(msg=str(error))
     elif ansible["action"] == "delete":
-
-        # module.fail_json(msg=str(ansible["hostname"]))
-
-        if isinstance(ansible["hostname"], list) is True:
-            module.fail_json(msg="A list of hostnames is not supported when action is delete.")
         try:
             api_request = rubrik.delete_physical_host(ansible["hostname"], ansible["timeout"])
+        except CheckModeChange as change:
+            module.exit_json(**change.results(module._diff))
         except Exception as error:
             module.fail_json(msg=str(error))
 
-    if "No change required" in api_request or "No Change Required" in api_request:
+    if not sdk_changed(api_request):
         results["changed"] = False
     else:
         results["changed"] = True
+        invalidate_lookup_cache(rubrik, "physical_host", "mssql_instance", "mssql_db", "share")
 
     results["response"] = api_request
 
@@ -22,18 +22,62 @@ options:
   db_name:
     description:
       - The name of the database to Live Mount.
-    required: True
+      - Mutually exclusive with I(databases).
+    required: False
     type: str
+  databases:
+    description:
+      - Multi-database mode. A list of databases of I(sql_instance) to Live Mount. Each item is either the name of the database or
+        a dict with a I(db_name) key and any of the I(mount_name), I(date) and I(time) keys, which override the module level
+        values for that database.
+      - The host and instance are resolved once, the databases of the instance are read in a single listing and the recovery
+        point of every database is validated in one concurrent pass before any Live Mount is started. The Live Mounts are then
+        started concurrently, keeping up to I(max_concurrency) of them in progress, and the module waits for every Live Mount to
+        finish and returns the status and mount time of each database.
+      - Mutually exclusive with I(db_name).
+    required: False
+    type: list
+    elements: raw
+  mount_suffix:
+    description:
+      - The suffix appended to the name of each database in I(databases) that does not provide its own I(mount_name).
+    required: False
+    type: str
+    default: _LiveMount
+  max_concurrency:
+    description:
+      - The maximum number of Live Mounts in progress, and of recovery point API calls in flight, at the same time when using
+        I(databases).
+    required: False
+    type: int
+    default: 10
+  deadline:
+    description:
+      - The maximum number of seconds to wait for the Live Mounts of I(databases) to finish. 0 waits until every Live Mount has
+        finished.
+    required: False
+    type: int
+    default: 0
+  poll_interval:
+    description:
+      - The minimum number of seconds to wait between two rounds of Live Mount job status calls when using I(databases).
+    required: False
+    type: int
+    default: 5
   date:
     description:
       - The recovery_point date you wish to Live Mount formated as Month-Day-Year (ex. 1-15-2014).
-    required: True
+      - If latest is specified, the last snapshot taken will be used.
+    required: False
     type: str
+    default: latest
   time:
     description:
       - The recovery_point time you wish to Live Mount formated as Hour:Minute AM/PM (ex. 1:30 AM).
-    required: True
+      - If latest is specified, the last snapshot taken will be used.
+    required: False
     type: str
+    default: latest
   sql_instance:
     description:
       - The SQL instance name with the database you wish to Live Mount.
@@ -47,7 +91,8 @@ options:
   mount_name:
     description:
       - The name given to the Live Mounted database i.e. AdventureWorks_Clone.
-    required: True
+      - Required with I(db_name).
+    required: False
     type: str
   timeout:
     description:
@@ -70,6 +115,21 @@ EXAMPLES = '''
     sql_instance: 'MSSQLSERVER'
     sql_host: 'sql.rubrikdemo.com'
     mount_name: 'AdventureWorksClone'
+
+- rubrik_sql_live_mount:
+    databases:
+      - 'AdventureWorks2016'
+      - 'WideWorldImporters'
+      - db_name: 'ReportServer'
+        mount_name: 'ReportServer_Test'
+        date: '08-25-2018'
+        time: '11:00 PM'
+    date: '08-26-2018'
+    time: '12:11 AM'
+    sql_instance: 'MSSQLSERVER'
+    sql_host: 'sql.rubrikdemo.com'
+    mount_suffix: '_Test'
+    max_concurrency: 20
 '''
 
 
@@ -78,16 +138,183 @@ full_response:
     description: The full response of `POST /v1/mssql/db/{id}/mount`.
     returned: success
     type: dict
+
+mounts:
+    description:
+      - The Live Mount of each database with its mount name, UTC recovery point, job status URL, the final job status and the
+        number of seconds the Live Mount took, or the error message when it could not be started.
+      - No Live Mount is started when a database or one of the recovery points can not be resolved. Databases whose Live Mount
+        was not started before the deadline passed have the status C(NOT_STARTED).
+    returned: When I(databases) is provided.
+    type: dict
+    sample:
+        {
+            "AdventureWorks2016": {
+                "mount_name": "AdventureWorks2016_Test",
+                "recovery_point": "2018-08-26T05:11",
+                "job_status_url": "https://192.168.8.19/api/v1/mssql/request/MSSQL_DB_MOUNT_d1b8e2a4-3c1f-4b5e-8a6f-2e4c1d0b9a7e:::0",
+                "status": "SUCCEEDED",
+                "seconds": 42.7
+            }
+        }
+
+job_status_urls:
+    description: The job status url of every Live Mount that was started.
+    returned: When I(databases) is provided.
+    type: list
+
+polls:
+    description: The number of job status API calls made when using I(databases).
+    returned: When I(databases) is provided.
+    type: int
+
+wait_time:
+    description: The total number of seconds spent waiting between two rounds of job status calls when using I(databases).
+    returned: When I(databases) is provided.
+    type: float
 '''
 
-from ansible.module_utils.rubrik_cdm import credentials, load_provider_variables, rubrik_argument_spec
+import calendar
+from datetime import datetime
+
+from ansible.module_utils.rubrik_cdm import HAS_RUBRIK_SDK, JobPoller, connect, credentials, iterate_pages, load_provider_variables, \
+    rubrik_argument_spec, rubrik_cdm, run_concurrently
 from ansible.module_utils.basic import AnsibleModule
 
-try:
-    import rubrik_cdm
-    HAS_RUBRIK_SDK = True
-except ImportError:
-    HAS_RUBRIK_SDK = False
+
+MOUNT_OPTIONS = ["db_name", "mount_name", "date", "time"]
+
+
+def mount_requests(ansible):
+    """Build the Live Mount arguments of every item in the "databases" module argument.
+
+    Returns:
+        [list] -- The validation errors.
+        [list] -- The Live Mount arguments of each database.
+    """
+
+    errors = []
+    requests = []
+
+    for item in ansible["databases"]:
+        if not isinstance(item, dict):
+            item = {"db_name": item}
+
+        invalid_options = [option for option in item if option not in MOUNT_OPTIONS]
+        if invalid_options:
+            errors.append("Unsupported 'databases' option(s): {0}.".format(", ".join(sorted(invalid_options))))
+            continue
+
+        if not item.get("db_name"):
+            errors.append("Each item in 'databases' must provide a db_name.")
+            continue
+
+        if item["db_name"] in [request["db_name"] for request in requests]:
+            errors.append("The database '{0}' is listed more than once in 'databases'.".format(item["db_name"]))
+            continue
+
+        request = {"db_name": item["db_name"], "mount_name": item["db_name"] + ansible["mount_suffix"], "date": ansible["date"],
+                   "time": ansible["time"]}
+        request.update(item)
+
+        if (request["date"] == "latest") != (request["time"] == "latest"):
+            errors.append("The date and time of the database '{0}' must both be 'latest' or a specific date and time.".format(
+                request["db_name"]))
+            continue
+
+        if request["mount_name"] in [other["mount_name"] for other in requests]:
+            errors.append("The mount_name '{0}' of the database '{1}' is used by more than one database.".format(
+                request["mount_name"], request["db_name"]))
+            continue
+
+        requests.append(request)
+
+    return errors, requests
+
+
+def recovery_points(rubrik, requests, sql_instance, sql_host, max_concurrency, timeout):
+    """Resolve the database ID and UTC recovery point of every request. The host and instance are resolved once, the databases
+    of the instance are read in a single listing and the recoverable ranges, or the snapshots when the latest recovery point is
+    requested, of all the databases are read concurrently.
+
+    Returns:
+        [list] -- The errors.
+        [list] -- The "id", "recovery_point" and "timestamp_ms" of the recovery point of each request.
+    """
+
+    instance_id = rubrik.object_id(sql_instance, "mssql_instance", mssql_host=sql_host, timeout=timeout)
+
+    db_ids = {}
+    for db in iterate_pages(rubrik, "v1", "/mssql/db", params={"primary_cluster_id": "local", "is_relic": "false", "instance_id": instance_id},
+                            timeout=timeout):
+        db_ids.setdefault(db["name"].lower(), db["id"])
+
+    # The cluster timezone is read once for every distinct date and time
+    points_in_time = {}
+    for request in requests:
+        if request["date"] != "latest" and (request["date"], request["time"]) not in points_in_time:
+            points_in_time[(request["date"], request["time"])] = rubrik.snapshot_index.point_in_time(
+                rubrik, request["date"], request["time"], timeout)
+
+    def recovery_point(request):
+        db_id = db_ids.get(request["db_name"].lower())
+        if db_id is None:
+            raise rubrik_cdm.exceptions.InvalidParameterException(
+                "The database {0} does not exist, please provide a valid database".format(request["db_name"]))
+
+        if request["date"] == "latest":
+            snapshots = rubrik.get("v1", "/mssql/db/{0}/snapshot".format(db_id), timeout=timeout)["data"]
+            if not snapshots:
+                raise rubrik_cdm.exceptions.InvalidParameterException(
+                    "The database {0} does not have any existing snapshots.".format(request["db_name"]))
+            latest = max(snapshot["date"] for snapshot in snapshots)[:19]
+            timestamp = datetime.strptime(latest, "%Y-%m-%dT%H:%M:%S")
+            return {"id": db_id, "recovery_point": latest[:16], "timestamp_ms": calendar.timegm(timestamp.timetuple()) * 1000}
+
+        point_in_time = points_in_time[(request["date"], request["time"])]
+        recoverable_ranges = rubrik.get("v1", "/mssql/db/{0}/recoverable_range".format(db_id), timeout=timeout)["data"]
+        if not any(recoverable_range["beginTime"][:16] <= point_in_time <= recoverable_range["endTime"][:16]
+                   for recoverable_range in recoverable_ranges):
+            raise rubrik_cdm.exceptions.InvalidParameterException(
+                "The database '{0}' does not have a recovery_point taken on {1} at {2}.".format(request["db_name"], request["date"], request["time"]))
+
+        timestamp = datetime.strptime(point_in_time, "%Y-%m-%dT%H:%M")
+        return {"id": db_id, "recovery_point": point_in_time, "timestamp_ms": calendar.timegm(timestamp.timetuple()) * 1000}
+
+    errors = []
+    points = []
+    for request, (point, error) in zip(requests, run_concurrently(recovery_point, requests, max_concurrency)):
+        if error is not None:
+            errors.append(str(error))
+        points.append(point)
+
+    return errors, points
+
+
+def bulk_sql_live_mount(rubrik, requests, points, poller, max_concurrency, timeout):
+    """Live Mount every database from its recovery point and wait for the Live Mounts to finish.
+
+    Returns:
+        [dict] -- The Live Mount of each database.
+    """
+
+    def live_mount(index):
+        config = {
+            "recoveryPoint": {"timestampMs": points[index]["timestamp_ms"]},
+            "mountedDatabaseName": requests[index]["mount_name"],
+        }
+        api_request = rubrik.post("v1", "/mssql/db/{0}/mount".format(points[index]["id"]), config, timeout=timeout)
+
+        return api_request["links"][0]["href"]
+
+    mounts = {}
+    jobs = poller.run(rubrik, live_mount, list(range(len(requests))), max_concurrency, timeout)
+
+    for request, point, job in zip(requests, points, jobs):
+        mount = mounts[request["db_name"]] = {"mount_name": request["mount_name"], "recovery_point": point["recovery_point"]}
+        mount.update(JobPoller.job_result(job))
+
+    return mounts
 
 
 def main():
@@ -97,19 +324,31 @@ def main():
     results = {}
 
     argument_spec = dict(
-        db_name=dict(required=True, type='str'),
-        date=dict(required=True, type='str'),
-        time=dict(required=True, type='str'),
+        db_name=dict(required=False, type='str'),
+        databases=dict(required=False, type='list', elements='raw'),
+        mount_suffix=dict(required=False, type='str', default="_LiveMount"),
+        max_concurrency=dict(required=False, type='int', default=10),
+        deadline=dict(required=False, type='int', default=0),
+        poll_interval=dict(required=False, type='int', default=5),
+        date=dict(required=False, type='str', default="latest"),
+        time=dict(required=False, type='str', default="latest"),
         sql_instance=dict(required=True, type='str'),
         sql_host=dict(required=True, type='str'),
-        mount_name=dict(required=True, type='str'),
+        mount_name=dict(required=False, type='str'),
         timeout=dict(required=False, type='int', default=30),
 
     )
 
     argument_spec.update(rubrik_argument_spec)
 
-    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=False)
+    required_one_of = [["db_name", "databases"]]
+
+    mutually_exclusive = [["db_name", "databases"], ["mount_name", "databases"]]
+
+    required_together = [["db_name", "mount_name"]]
+
+    module = AnsibleModule(argument_spec=argument_spec, required_one_of=required_one_of, mutually_exclusive=mutually_exclusive,
+                           required_together=required_together, supports_check_mode=False)
 
     ansible = module.params
 
@@ -121,18 +360,49 @@ def main():
     node_ip, username, password, api_token = credentials(module)
 
     try:
-        rubrik = rubrik_cdm.Connect(node_ip, username, password, api_token)
+        rubrik = connect(module, node_ip, username, password, api_token)
     except Exception as error:
         module.fail_json(msg=str(error))
 
+    if ansible["databases"] is not None:
+        errors, requests = mount_requests(ansible)
+        if errors:
+            module.fail_json(msg=" ".join(errors))
+
+        try:
+            errors, points = recovery_points(rubrik, requests, ansible["sql_instance"], ansible["sql_host"], ansible["max_concurrency"],
+                                             ansible["timeout"])
+        except Exception as error:
+            module.fail_json(msg=str(error))
+        if errors:
+            module.fail_json(msg=" ".join(errors))
+
+        poller = JobPoller(deadline=ansible["deadline"], poll_interval=ansible["poll_interval"], max_concurrency=ansible["max_concurrency"])
+
+        try:
+            results["mounts"] = bulk_sql_live_mount(rubrik, requests, points, poller, ansible["max_concurrency"], ansible["timeout"])
+        except Exception as error:
+            module.fail_json(msg=str(error))
+
+        results.update(poller.stats())
+        results["job_status_urls"] = [mount["job_status_url"] for mount in results["mounts"].values() if "job_status_url" in mount]
+        results["changed"] = len(results["job_status_urls"]) > 0
+
+        unsuccessful = sorted(db_name for db_name, mount in results["mounts"].items() if mount["status"] != "SUCCEEDED")
+        if unsuccessful:
+            module.fail_json(msg="{0} of the {1} database Live Mounts did not succeed: {2}.".format(
+                len(unsuccessful), len(requests), ", ".join(unsuccessful)), **results)
+
+        module.exit_json(**results)
+
     try:
         api_request = rubrik.sql_live_mount(
             ansible["db_name"],
-            ansible["date"],
-            ansible["time"],
             ansible["sql_instance"],
             ansible["sql_host"],
             ansible["mount_name"],
+            ansible["date"],
+            ansible["time"],
             ansible["timeout"])
     except Exception as error:
         module.fail_json(msg=str(error))
@@ -22,8 +22,46 @@ options:
   vm_name:
     description:
       - The name of the vSphere VM to Live Mount.
-    required: True
+      - Mutually exclusive with I(vms).
+    required: False
     type: str
+  vms:
+    description:
+      - Bulk mode. A list of vSphere VMs to Live Mount. Each item is either the name of the VM or a dict with a I(vm_name) key and
+        any of the I(date), I(time), I(snapshot_match), I(host), I(remove_network_devices), I(power_on) and I(group) keys, which
+        override the module level values for that VM.
+      - The VMs are mounted in the ascending order of their I(group). The Live Mounts of a group are started concurrently, keeping
+        up to I(max_concurrency) of them in progress, and the next group is only started once every Live Mount of the group has
+        succeeded, so the VMs of a group are powered on after the VMs they depend on.
+      - The module waits for every Live Mount to finish and returns the status and mount time of each VM.
+      - Mutually exclusive with I(vm_name).
+    required: False
+    type: list
+    elements: raw
+  group:
+    description:
+      - The dependency group of the VMs in I(vms) that do not set their own.
+    required: False
+    type: int
+    default: 0
+  max_concurrency:
+    description:
+      - The maximum number of Live Mounts in progress at the same time when using I(vms).
+    required: False
+    type: int
+    default: 10
+  deadline:
+    description:
+      - The maximum number of seconds to wait for the Live Mounts of I(vms) to finish. 0 waits until every Live Mount has finished.
+    required: False
+    type: int
+    default: 0
+  poll_interval:
+    description:
+      - The minimum number of seconds to wait between two rounds of Live Mount job status calls when using I(vms).
+    required: False
+    type: int
+    default: 5
   date:
     description:
       - The date of the snapshot you wish to Live Mount formated as Month-Day-Year (ex. 1-15-2014).
@@ -38,6 +76,17 @@ options:
     required: False
     type: str
     default: latest
+  snapshot_match:
+    description:
+      - How the date and time are matched against the snapshots of the VM.
+      - C(exact) uses the snapshot taken during that minute, C(nearest_before) the closest snapshot taken at or before it and
+        C(nearest_after) the closest snapshot taken at or after it.
+      - The snapshots of the VM are indexed by date and only re-read from the cluster when the requested point in time is newer
+        than the newest indexed snapshot. When the lookup cache is enabled the index is shared with the other tasks.
+    required: False
+    type: str
+    default: exact
+    choices: [exact, nearest_before, nearest_after]
   host:
     description:
       - The hostname or IP address of the ESXi host to Live Mount the VM on. By default, the current host will be used.
@@ -79,6 +128,26 @@ EXAMPLES = '''
     date: '1-15-2019'
     time: '1:30 PM'
 
+- rubrik_vsphere_live_mount:
+    vm_name: 'ansible-tower'
+    date: '1-15-2019'
+    time: '1:30 PM'
+    snapshot_match: nearest_before
+
+- rubrik_vsphere_live_mount:
+    vms:
+      - vm_name: 'dc01'
+        group: 1
+      - vm_name: 'sql01'
+        group: 2
+      - 'web01'
+      - 'web02'
+    group: 3
+    date: '1-15-2019'
+    time: '1:30 PM'
+    snapshot_match: nearest_before
+    max_concurrency: 20
+
 '''
 
 RETURN = '''
@@ -86,16 +155,147 @@ full_response:
     description: The full API response for POST /v1/vmware/vm/snapshot/{snapshot_id}/mount.
     returned: success
     type: dict
+
+snapshot:
+    description: The ID and UTC date of the Live Mounted snapshot.
+    returned: success
+    type: dict
+    sample: {"id": "b4a3cfd1-4b1c-4f3a-9b5e-0b3e0b3c1a2d", "date": "2019-01-15T19:30:12.000Z"}
+
+mounts:
+    description:
+      - The Live Mount of each VM with its group, snapshot, job status URL, the final job status and the number of seconds the Live
+        Mount took, or the error message when it could not be started.
+      - VMs whose group was not started because a previous group failed, or the deadline passed, have the status C(NOT_STARTED).
+    returned: When I(vms) is provided.
+    type: dict
+    sample:
+        {
+            "dc01": {
+                "group": 1,
+                "snapshot": {"id": "b4a3cfd1-4b1c-4f3a-9b5e-0b3e0b3c1a2d", "date": "2019-01-15T19:30:12.000Z"},
+                "job_status_url": "https://192.168.8.19/api/v1/vmware/vm/request/MOUNT_SNAPSHOT_d1b8e2a4-3c1f-4b5e-8a6f-2e4c1d0b9a7e:::0",
+                "status": "SUCCEEDED",
+                "seconds": 84.2
+            }
+        }
+
+job_status_urls:
+    description: The job status url of every Live Mount that was started.
+    returned: When I(vms) is provided.
+    type: list
+
+polls:
+    description: The number of job status API calls made when using I(vms).
+    returned: When I(vms) is provided.
+    type: int
+
+wait_time:
+    description: The total number of seconds spent waiting between two rounds of job status calls when using I(vms).
+    returned: When I(vms) is provided.
+    type: float
 '''
 
-from ansible.module_utils.rubrik_cdm import credentials, load_provider_variables, rubrik_argument_spec
+import time
+
+from ansible.module_utils.rubrik_cdm import HAS_RUBRIK_SDK, JobPoller, connect, credentials, load_provider_variables, rubrik_argument_spec, \
+    rubrik_cdm
 from ansible.module_utils.basic import AnsibleModule
 
-try:
-    import rubrik_cdm
-    HAS_RUBRIK_SDK = True
-except ImportError:
-    HAS_RUBRIK_SDK = False
+
+MOUNT_OPTIONS = ["vm_name", "date", "time", "snapshot_match", "host", "remove_network_devices", "power_on", "group"]
+
+
+def mount_requests(ansible):
+    """Build the Live Mount arguments of every item in the "vms" module argument.
+
+    Returns:
+        [list] -- The validation errors.
+        [list] -- The Live Mount arguments of each VM.
+    """
+
+    errors = []
+    requests = []
+
+    for item in ansible["vms"]:
+        if not isinstance(item, dict):
+            item = {"vm_name": item}
+
+        invalid_options = [option for option in item if option not in MOUNT_OPTIONS]
+        if invalid_options:
+            errors.append("Unsupported 'vms' option(s): {0}.".format(", ".join(sorted(invalid_options))))
+            continue
+
+        if not item.get("vm_name"):
+            errors.append("Each item in 'vms' must provide a vm_name.")
+            continue
+
+        if item["vm_name"] in [request["vm_name"] for request in requests]:
+            errors.append("The vSphere VM '{0}' is listed more than once in 'vms'.".format(item["vm_name"]))
+            continue
+
+        request = dict((option, ansible[option]) for option in MOUNT_OPTIONS)
+        request.update(item)
+
+        if request["snapshot_match"] not in ["exact", "nearest_before", "nearest_after"]:
+            errors.append("The snapshot_match of the '{0}' vSphere VM must be one of exact, nearest_before or nearest_after.".format(
+                request["vm_name"]))
+            continue
+
+        if not isinstance(request["group"], int) or isinstance(request["group"], bool):
+            errors.append("The group of the '{0}' vSphere VM must be an integer.".format(request["vm_name"]))
+            continue
+
+        requests.append(request)
+
+    return errors, requests
+
+
+def bulk_live_mount(rubrik, requests, poller, max_concurrency, timeout):
+    """Live Mount the VMs group by group and wait for the Live Mounts to finish. The deadline of the poller bounds the wait for
+    every group together.
+
+    Returns:
+        [dict] -- The Live Mount of each VM.
+    """
+
+    mounts = {}
+    failed = False
+
+    def live_mount(request):
+        snapshot = rubrik.vsphere_snapshot(request["vm_name"], request["date"], request["time"], request["snapshot_match"], timeout)
+        mounts[request["vm_name"]]["snapshot"] = {"id": snapshot["id"], "date": snapshot["date"]}
+
+        api_request = rubrik.vsphere_snapshot_mount(snapshot, request["host"], request["remove_network_devices"], request["power_on"], timeout)
+
+        return api_request["links"][0]["href"]
+
+    deadline = poller.deadline
+    start = time.time()
+
+    for group in sorted(set(request["group"] for request in requests)):
+        group_requests = [request for request in requests if request["group"] == group]
+
+        # Every group shares the deadline of the Live Mounts
+        if deadline > 0:
+            poller.deadline = deadline - (time.time() - start)
+            failed = failed or poller.deadline <= 0
+
+        if failed:
+            for request in group_requests:
+                mounts[request["vm_name"]] = {"group": group, "status": "NOT_STARTED"}
+            continue
+
+        for request in group_requests:
+            mounts[request["vm_name"]] = {"group": group}
+
+        for request, job in zip(group_requests, poller.run(rubrik, live_mount, group_requests, max_concurrency, timeout)):
+            mount = mounts[request["vm_name"]]
+            mount.update(JobPoller.job_result(job))
+
+            failed = failed or mount["status"] != "SUCCEEDED"
+
+    return mounts
 
 
 def main():
@@ -105,9 +305,15 @@ def main():
     results = {}
 
     argument_spec = dict(
-        vm_name=dict(required=True, type='str'),
+        vm_name=dict(required=False, type='str'),
+        vms=dict(required=False, type='list', elements='raw'),
+        group=dict(required=False, type='int', default=0),
+        max_concurrency=dict(required=False, type='int', default=10),
+        deadline=dict(required=False, type='int', default=0),
+        poll_interval=dict(required=False, type='int', default=5),
         date=dict(required=False, type='str', default="latest"),
         time=dict(required=False, type='str', default="latest"),
+        snapshot_match=dict(required=False, type='str', default="exact", choices=["exact", "nearest_before", "nearest_after"]),
         host=dict(required=False, type='str', default="current"),
         remove_network_devices=dict(required=False, type='bool', default=False),
         power_on=dict(required=False, type='bool', default=True),
@@ -117,7 +323,12 @@ def main():
 
     argument_spec.update(rubrik_argument_spec)
 
-    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=False)
+    required_one_of = [["vm_name", "vms"]]
+
+    mutually_exclusive = [["vm_name", "vms"]]
+
+    module = AnsibleModule(argument_spec=argument_spec, required_one_of=required_one_of, mutually_exclusive=mutually_exclusive,
+                           supports_check_mode=False)
 
     ansible = module.params
 
@@ -129,15 +340,37 @@ def main():
     node_ip, username, password, api_token = credentials(module)
 
     try:
-        rubrik = rubrik_cdm.Connect(node_ip, username, password, api_token)
+        rubrik = connect(module, node_ip, username, password, api_token)
     except Exception as error:
         module.fail_json(msg=str(error))
 
+    if ansible["vms"] is not None:
+        errors, requests = mount_requests(ansible)
+        if errors:
+            module.fail_json(msg=" ".join(errors))
+
+        poller = JobPoller(deadline=ansible["deadline"], poll_interval=ansible["poll_interval"], max_concurrency=ansible["max_concurrency"])
+
+        try:
+            results["mounts"] = bulk_live_mount(rubrik, requests, poller, ansible["max_concurrency"], ansible["timeout"])
+        except Exception as error:
+            module.fail_json(msg=str(error))
+
+        results.update(poller.stats())
+        results["job_status_urls"] = [mount["job_status_url"] for mount in results["mounts"].values() if "job_status_url" in mount]
+        results["changed"] = len(results["job_status_urls"]) > 0
+
+        unsuccessful = sorted(vm_name for vm_name, mount in results["mounts"].items() if mount["status"] != "SUCCEEDED")
+        if unsuccessful:
+            module.fail_json(msg="{0} of the {1} vSphere VM Live Mounts did not succeed: {2}.".format(
+                len(unsuccessful), len(requests), ", ".join(unsuccessful)), **results)
+
+        module.exit_json(**results)
+
     try:
-        api_request = rubrik.vsphere_live_mount(
-            ansible["vm_name"],
-            ansible["date"],
-            ansible["time"],
+        snapshot = rubrik.vsphere_snapshot(ansible["vm_name"], ansible["date"], ansible["time"], ansible["snapshot_match"], ansible["timeout"])
+        api_request = rubrik.vsphere_snapshot_mount(
+            snapshot,
             ansible["host"],
             ansible["remove_network_devices"],
             ansible["power_on"],
@@ -145,6 +378,7 @@ def main():
     except Exception as error:
         module.fail_json(msg=str(error))
 
+    results["snapshot"] = {"id": snapshot["id"], "date": snapshot["date"]}
     results["response"] = api_request
 
     module.exit_json(**results)
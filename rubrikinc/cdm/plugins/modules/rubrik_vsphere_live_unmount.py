@@ -22,14 +22,55 @@ options:
   mounted_vm_name:
     description:
       - The name of the Live Mounted vSphere VM to be unmounted.
-    required: True
+      - Mutually exclusive with I(mounted_vm_names) and I(vm_names).
+    required: False
     type: str
+  mounted_vm_names:
+    description:
+      - Bulk mode. Unmount every Live Mounted vSphere VM whose name matches one of these shell-style patterns (ex. C(dr-test-*)).
+        The match is case insensitive.
+      - Every Live Mount of the cluster is read in one paginated listing and the unmounts are started concurrently, keeping up to
+        I(max_concurrency) of them in progress. The module waits for every unmount to finish.
+    required: False
+    type: list
+    elements: str
+  vm_names:
+    description:
+      - Bulk mode. Unmount every Live Mount of these source vSphere VMs. Can be combined with I(mounted_vm_names).
+    required: False
+    type: list
+    elements: str
   force:
     description:
       - Force unmount to remove metadata when the datastore of the Live Mount virtual machine was moved off of the Rubrik cluster.
     required: False
     type: bool
     default: False
+  force_on_failure:
+    description:
+      - In bulk mode, retry the unmounts that failed with I(force) once every other unmount has finished.
+      - Only the unmounts that the cluster reported as failed are retried, not the unmounts whose job status could not be read.
+    required: False
+    type: bool
+    default: True
+  max_concurrency:
+    description:
+      - The maximum number of unmounts in progress at the same time in bulk mode.
+    required: False
+    type: int
+    default: 10
+  deadline:
+    description:
+      - The maximum number of seconds to wait for the unmounts to finish in bulk mode. 0 waits until every unmount has finished.
+    required: False
+    type: int
+    default: 0
+  poll_interval:
+    description:
+      - The minimum number of seconds to wait between two rounds of unmount job status calls in bulk mode.
+    required: False
+    type: int
+    default: 5
   timeout:
     description:
       - The number of seconds to wait to establish a connection the Rubrik cluster before returning a timeout error.
@@ -50,6 +91,14 @@ EXAMPLES = '''
     mounted_vm_name: 'ansible-tower'
     force: True
 
+- rubrik_vsphere_live_unmount:
+    mounted_vm_names:
+      - 'dc01 *'
+      - 'web*'
+    vm_names:
+      - 'sql01'
+    max_concurrency: 20
+
 '''
 
 RETURN = '''
@@ -57,16 +106,90 @@ full_response:
     description: The full response of `DELETE /vmware/vm/snapshot/mount/{id}?force={bool}`.
     returned: success
     type: dict
+
+unmounts:
+    description:
+      - The unmount of each matching Live Mount, keyed by the name of the mounted VM, or by the Live Mount ID while the VM is not
+        in the inventory yet. Each unmount has the Live Mount ID, the source VM name, the final job status, whether it was
+        forced, the job status URL and the number of seconds it took, or the error message when it could not be started.
+    returned: When I(mounted_vm_names) or I(vm_names) is provided.
+    type: dict
+    sample:
+        {
+            "dc01 01-15 13:30 0": {
+                "mount_id": "11111111-2222-3333-4444-555555555555",
+                "vm_name": "dc01",
+                "status": "SUCCEEDED",
+                "forced": false,
+                "job_status_url": "https://192.168.8.19/api/v1/vmware/vm/request/UNMOUNT_SNAPSHOT_d1b8e2a4-3c1f-4b5e-8a6f-2e4c1d0b9a7e:::0",
+                "seconds": 21.4
+            }
+        }
 '''
 
-from ansible.module_utils.rubrik_cdm import credentials, load_provider_variables, rubrik_argument_spec
+import fnmatch
+import time
+
+from ansible.module_utils.rubrik_cdm import HAS_RUBRIK_SDK, JobPoller, connect, credentials, invalidate_lookup_cache, \
+    load_provider_variables, rubrik_argument_spec, rubrik_cdm, vsphere_live_mounts
 from ansible.module_utils.basic import AnsibleModule
 
-try:
-    import rubrik_cdm
-    HAS_RUBRIK_SDK = True
-except ImportError:
-    HAS_RUBRIK_SDK = False
+
+def matching_live_mounts(mounts, mounted_vm_names, vm_names):
+    """Return the Live Mounts whose mounted VM name matches one of the mounted_vm_names patterns, or whose source VM is one of
+    the vm_names.
+    """
+
+    patterns = [pattern.lower() for pattern in mounted_vm_names or []]
+    vm_names = [vm_name.lower() for vm_name in vm_names or []]
+
+    return [mount for mount in mounts
+            if (mount["vmName"] or "").lower() in vm_names
+            or mount["mountedVmName"] is not None and any(fnmatch.fnmatchcase(mount["mountedVmName"].lower(), pattern) for pattern in patterns)]
+
+
+def bulk_live_unmount(rubrik, mounts, poller, force, force_on_failure, max_concurrency, timeout):
+    """Unmount the Live Mounts concurrently and wait for the unmounts to finish. When force_on_failure is set, the unmounts
+    that the cluster reported as FAILED are retried with force before the deadline of the poller.
+
+    Returns:
+        [dict] -- The unmount of each Live Mount.
+    """
+
+    start = time.time()
+    unmounts = {}
+    for mount in mounts:
+        unmounts[mount["id"]] = {"mount_id": mount["id"], "vm_name": mount["vmName"]}
+
+    def run(mounts, force):
+        def live_unmount(mount):
+            api_request = rubrik.delete("v1", "/vmware/vm/snapshot/mount/{0}?force={1}".format(mount["id"], force), timeout)
+            return api_request["links"][0]["href"]
+
+        for mount, job in zip(mounts, poller.run(rubrik, live_unmount, mounts, max_concurrency, timeout)):
+            unmount = unmounts[mount["id"]]
+            unmount["forced"] = force
+
+            # A forced unmount that was started replaces the error of the first pass
+            result = JobPoller.job_result(job)
+            if "job_status_url" in result:
+                unmount.pop("error", None)
+            unmount.update(result)
+
+    run(mounts, force)
+
+    if force_on_failure and not force:
+        # A job whose status could not be read is UNKNOWN and may still be running, so it is not forced
+        failed = [mount for mount in mounts if unmounts[mount["id"]]["status"] == "FAILED"]
+
+        # The forced unmounts share the deadline of the first pass
+        remaining = poller.deadline - (time.time() - start)
+        if failed and (not poller.deadline or remaining > 0):
+            if poller.deadline:
+                poller.deadline = remaining
+            run(failed, True)
+
+    return dict((mount["mountedVmName"] or mount["id"], unmounts[mount["id"]]) for mount in mounts)
 
 
 def main():
@@ -76,15 +199,26 @@ def main():
     results = {}
 
     argument_spec = dict(
-        mounted_vm_name=dict(required=True, type='str'),
+        mounted_vm_name=dict(required=False, type='str'),
+        mounted_vm_names=dict(required=False, type='list', elements='str'),
+        vm_names=dict(required=False, type='list', elements='str'),
         force=dict(required=False, type='bool', default=False),
+        force_on_failure=dict(required=False, type='bool', default=True),
+        max_concurrency=dict(required=False, type='int', default=10),
+        deadline=dict(required=False, type='int', default=0),
+        poll_interval=dict(required=False, type='int', default=5),
         timeout=dict(required=False, type='int', default=30),
 
     )
 
     argument_spec.update(rubrik_argument_spec)
 
-    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=False)
+    required_one_of = [["mounted_vm_name", "mounted_vm_names", "vm_names"]]
+
+    mutually_exclusive = [["mounted_vm_name", "mounted_vm_names"], ["mounted_vm_name", "vm_names"]]
+
+    module = AnsibleModule(argument_spec=argument_spec, required_one_of=required_one_of, mutually_exclusive=mutually_exclusive,
+                           supports_check_mode=False)
 
     ansible = module.params
 
@@ -96,10 +230,33 @@ def main():
     node_ip, username, password, api_token = credentials(module)
 
     try:
-        rubrik = rubrik_cdm.Connect(node_ip, username, password, api_token)
+        rubrik = connect(module, node_ip, username, password, api_token)
     except Exception as error:
         module.fail_json(msg=str(error))
 
+    if ansible["mounted_vm_names"] is not None or ansible["vm_names"] is not None:
+        poller = JobPoller(deadline=ansible["deadline"], poll_interval=ansible["poll_interval"], max_concurrency=ansible["max_concurrency"])
+
+        try:
+            mounts = matching_live_mounts(vsphere_live_mounts(rubrik, timeout=ansible["timeout"]), ansible["mounted_vm_names"], ansible["vm_names"])
+            results["unmounts"] = bulk_live_unmount(rubrik, mounts, poller, ansible["force"], ansible["force_on_failure"],
+                                                    ansible["max_concurrency"], ansible["timeout"])
+        except Exception as error:
+            module.fail_json(msg=str(error))
+
+        results.update(poller.stats())
+        results["changed"] = any("job_status_url" in unmount for unmount in results["unmounts"].values())
+
+        if results["changed"]:
+            invalidate_lookup_cache(rubrik, "vmware")
+
+        unsuccessful = sorted(name for name, unmount in results["unmounts"].items() if unmount["status"] != "SUCCEEDED")
+        if unsuccessful:
+            module.fail_json(msg="{0} of the {1} vSphere Live Mounts were not unmounted: {2}.".format(
+                len(unsuccessful), len(mounts), ", ".join(unsuccessful)), **results)
+
+        module.exit_json(**results)
+
     try:
         api_request = rubrik.vsphere_live_unmount(
             ansible["mounted_vm_name"],
@@ -108,6 +265,8 @@ def main():
     except Exception as error:
         module.fail_json(msg=str(error))
 
+    invalidate_lookup_cache(rubrik, "vmware")
+
     results["response"] = api_request
 
     module.exit_json(**results)
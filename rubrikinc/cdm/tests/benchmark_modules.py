@@ -0,0 +1,347 @@
+#!/usr/bin/env python
+# (c) 2018 Rubrik, Inc
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""Measure the per-task overhead of every rubrikinc.cdm module against the local mock CDM API.
+
+Each module main() runs in a fresh interpreter, the same way Ansible forks a module per host, against a MockCdmServer with
+the requested latency. For every module the harness reports the wall clock of the whole process, the time spent importing
+the module and the Rubrik SDK, parsing the module arguments, constructing the SDK Connect object, resolving object names to
+IDs and waiting on API calls, the number of HTTP requests and bytes transferred and the peak RSS of the process.
+
+The collection must be importable as ansible_collections.rubrikinc.cdm, exactly like the unit tests:
+
+    PYTHONPATH=/path/to/collections python tests/benchmark_modules.py --latency 0.02 --repeat 5 --output benchmark.json
+
+The JSON report is meant to be kept between releases, --compare prints the change of every metric against an older report.
+"""
+from __future__ import absolute_import, division, print_function
+
+import argparse
+import io
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+BENCHMARK_MARKER = "RUBRIK_BENCHMARK_RESULT:"
+
+MODULE_PACKAGE = "ansible_collections.rubrikinc.cdm.plugins.modules"
+
+# The module arguments used for each module against a MockCdmServer with its default objects. The scenarios run in order and
+# some depend on the objects created by the previous ones, the fileset template and the SQL live mount.
+SCENARIOS = [
+    ("rubrik_cluster_version", {}),
+    ("rubrik_add_vcenter", {"vcenter_ip": "vcenter-bench.mock.local", "vcenter_username": "administrator", "vcenter_password": "secret"}),
+    ("rubrik_assign_sla", {"object_name": "vm-000001", "sla_name": "Silver"}),
+    ("rubrik_aws_s3_cloudout", {"aws_bucket_name": "rubrik-bench", "aws_region": "us-east-1", "aws_access_key": "key",
+                                "aws_secret_key": "secret", "kms_master_key_id": "kms", "archive_name": "AWS:S3:bench"}),
+    ("rubrik_configure_cluster_location", {"location": "San Francisco, CA, USA"}),
+    ("rubrik_configure_ntp", {"ntp_servers": ["0.pool.ntp.org", "1.pool.ntp.org"]}),
+    ("rubrik_configure_smtp_settings", {"hostname": "smtp.mock.local", "port": 25, "from_email": "rubrik@mock.local",
+                                        "smtp_username": "rubrik", "smtp_password": "secret"}),
+    ("rubrik_configure_timezone", {"timezone": "America/Denver"}),
+    ("rubrik_create_sla", {"name": "Bench", "hourly_frequency": 1, "hourly_retention": 24}),
+    ("rubrik_dns_servers", {"server_ip": ["192.168.100.5", "192.168.100.6"]}),
+    ("rubrik_end_user_authorization", {"object_name": "vm-000002", "end_user": "admin"}),
+    ("rubrik_get_sql_live_mount", {"db_name": "db-000000", "sql_instance": "MSSQLSERVER", "sql_host": "host-00001.mock.local"}),
+    ("rubrik_get_vsphere_live_mount", {"vm_name": "vm-000003"}),
+    ("rubrik_get_vsphere_live_mount_names", {"vm_name": "vm-000003"}),
+    ("rubrik_login_banner", {"banner_text": "Rubrik benchmark cluster"}),
+    ("rubrik_managed_volume", {"managed_volume_name": "mv-00000", "action": "begin"}),
+    ("rubrik_nas_fileset", {"fileset_name": "Bench NFS", "share_type": "NFS", "include": ["*"]}),
+    ("rubrik_on_demand_snapshot", {"object_name": "vm-000004"}),
+    ("rubrik_physical_fileset", {"fileset_name": "Bench Linux", "operating_system": "Linux", "include": ["/etc"]}),
+    ("rubrik_assign_physical_host_fileset", {"hostname": "host-00000.mock.local", "fileset_name": "Bench Linux", "operating_system": "Linux",
+                                             "include": ["/etc"], "sla_name": "Gold"}),
+    ("rubrik_physical_host", {"hostname": "bench.mock.local", "action": "add"}),
+    ("rubrik_sql_live_mount", {"db_name": "db-000000", "date": "12-31-2019", "time": "12:00 AM", "sql_instance": "MSSQLSERVER",
+                               "sql_host": "host-00001.mock.local", "mount_name": "db-000000-bench"}),
+    ("rubrik_sql_live_unmount", {"mounted_db_name": "db-000000-bench", "sql_instance": "MSSQLSERVER", "sql_host": "host-00001.mock.local"}),
+    ("rubrik_vsphere_live_mount", {"vm_name": "vm-000005"}),
+    ("rubrik_vsphere_live_unmount", {"mounted_vm_name": "vm-000005 2020-01-01T12:00:00.000Z 0"}),
+    ("rubrik_job_status", {"url": "https://{node_ip}/api/v1/vmware/vm/request/UNKNOWN_JOB:::0", "wait_for_completion": False}),
+]
+
+# The phases timed inside the module process, as (name, class path, method name). The phases can nest, the Connect object
+# is built and names are resolved with API calls, so the api phase includes the API calls of the other phases.
+PHASES = [
+    ("argument_parsing", "ansible.module_utils.basic.AnsibleModule", "__init__"),
+    ("connect", "rubrik_cdm.rubrik_cdm.Connect", "__init__"),
+    ("name_resolution", "rubrik_cdm.rubrik_cdm.Connect", "object_id"),
+    ("api", "rubrik_cdm.rubrik_cdm.Connect", "_common_api"),
+]
+
+
+def sdk_import_time(importtime_output):
+    """Return the cumulative seconds spent importing the rubrik_cdm package from the output of python -X importtime, zero
+    when the module did not import the SDK."""
+
+    seconds = 0.0
+    subtree_indent = None
+    # Imports are printed after the imports they trigger, walk backwards to see each outermost SDK import before its children
+    for line in reversed(importtime_output.splitlines()):
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)$", line)
+        if match is None:
+            continue
+        indent = len(match.group(2))
+        if subtree_indent is not None and indent <= subtree_indent:
+            subtree_indent = None
+        if subtree_indent is None and (match.group(3) == "rubrik_cdm" or match.group(3).startswith("rubrik_cdm.")):
+            seconds += int(match.group(1)) / 1000000.0
+            subtree_indent = indent
+    return seconds
+
+
+class PhaseTimers(object):
+    """Meta path finder that installs the phase timers on a class as soon as the module defining it is imported, so that
+    timing a phase never imports a module, the lazily imported Rubrik SDK in particular, earlier than the module does."""
+
+    def __init__(self, durations):
+        self.durations = durations
+        self.pending = {}
+
+    def install(self):
+        for phase, class_path, method in PHASES:
+            module_name, class_name = class_path.rsplit(".", 1)
+            if module_name in sys.modules:
+                self.patch(sys.modules[module_name], class_name, method, phase)
+            else:
+                self.pending.setdefault(module_name, []).append((class_name, method, phase))
+        sys.meta_path.insert(0, self)
+
+    def patch(self, module, class_name, method, phase):
+        cls = getattr(module, class_name)
+        setattr(cls, method, timed(self.durations, phase, getattr(cls, method)))
+
+    def find_spec(self, fullname, path, target=None):
+        if fullname not in self.pending:
+            return None
+
+        for finder in sys.meta_path:
+            if finder is not self and hasattr(finder, "find_spec"):
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+        else:
+            return None
+
+        exec_module = spec.loader.exec_module
+        patches = self.pending.pop(fullname)
+
+        def exec_and_patch(module):
+            exec_module(module)
+            for class_name, method, phase in patches:
+                self.patch(module, class_name, method, phase)
+
+        spec.loader.exec_module = exec_and_patch
+        return spec
+
+
+def timed(durations, name, function):
+    def wrapper(*args, **kwargs):
+        start = time.time()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            durations[name] += time.time() - start
+    return wrapper
+
+
+def run_module(module_name, module_args):
+    """Run the module main() in this process and print the measurements. Used in the child process of run_scenario()."""
+
+    import importlib
+    import resource
+
+    durations = dict((phase, 0.0) for phase, _, _ in PHASES)
+    start = time.time()
+
+    module = importlib.import_module("{0}.{1}".format(MODULE_PACKAGE, module_name))
+    durations["module_import"] = time.time() - start
+
+    from ansible.module_utils import basic
+    from ansible.module_utils._text import to_bytes
+    basic._ANSIBLE_ARGS = to_bytes(json.dumps({"ANSIBLE_MODULE_ARGS": module_args}))
+
+    PhaseTimers(durations).install()
+
+    stdout = sys.stdout
+    sys.stdout = io.StringIO()
+    main_start = time.time()
+    try:
+        module.main()
+    except SystemExit:
+        pass
+    finally:
+        output, sys.stdout = sys.stdout.getvalue(), stdout
+    durations["main"] = time.time() - main_start
+
+    try:
+        result = json.loads(output)
+    except ValueError:
+        result = {"failed": True, "msg": output.strip()}
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform != "darwin":
+        peak_rss *= 1024
+
+    measurements = {
+        "durations": dict((phase, round(seconds, 6)) for phase, seconds in durations.items()),
+        "peak_rss": peak_rss,
+        "changed": result.get("changed", False),
+        "failed": result.get("failed", False),
+        "msg": result.get("msg"),
+    }
+    print(BENCHMARK_MARKER + json.dumps(measurements))
+
+
+def run_scenario(server, module_name, module_args, python=sys.executable):
+    """Run the module in a fresh interpreter and return its measurements and the HTTP statistics of the mock server."""
+
+    module_args = json.loads(json.dumps(module_args).replace("{node_ip}", server.node_ip))
+    module_args.update({"node_ip": server.node_ip, "api_token": "benchmark"})
+
+    server.reset_stats()
+    start = time.time()
+    process = subprocess.Popen(
+        [python, "-X", "importtime", os.path.abspath(__file__), "--child", module_name, json.dumps(module_args)],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    stdout, stderr = process.communicate()
+    wall_clock = time.time() - start
+    http = server.stats()
+
+    for line in stdout.splitlines():
+        if line.startswith(BENCHMARK_MARKER):
+            measurements = json.loads(line[len(BENCHMARK_MARKER):])
+            break
+    else:
+        raise RuntimeError("The {0} benchmark did not report any measurement:\n{1}".format(module_name, stderr[-2000:]))
+
+    measurements["durations"]["sdk_import"] = sdk_import_time(stderr)
+    measurements["wall_clock"] = round(wall_clock, 6)
+    measurements["http_requests"] = http["requests"]
+    measurements["http_errors"] = http["errors"]
+    measurements["bytes_sent"] = http["bytes_received"]
+    measurements["bytes_received"] = http["bytes_sent"]
+    measurements["endpoints"] = http["endpoints"]
+    return measurements
+
+
+def median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+    return values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2.0
+
+
+def summarize(runs):
+    """Reduce the measurements of repeated runs of a module to the median of each metric. The changed, failed and msg
+    results are the ones of the last run."""
+
+    summary = dict(runs[-1])
+    for key in ["wall_clock", "http_requests", "http_errors", "bytes_sent", "bytes_received", "peak_rss"]:
+        summary[key] = median([run[key] for run in runs])
+    summary["durations"] = dict((phase, round(median([run["durations"][phase] for run in runs]), 6)) for phase in runs[-1]["durations"])
+    summary["runs"] = len(runs)
+    return summary
+
+
+def benchmark(modules=None, repeat=3, latency=0.0, server_options=None):
+    """Benchmark the modules against a new MockCdmServer.
+
+    Keyword Arguments:
+        modules {list} -- The names of the modules to benchmark, all the modules when None. (default: {None})
+        repeat {int} -- The number of passes over the modules, the report holds the median of the runs. (default: {3})
+        latency {float} -- The number of seconds the mock server adds to every response. (default: {0})
+        server_options {dict} -- Extra MockCdmServer keyword arguments. (default: {None})
+
+    Returns:
+        dict -- The JSON report.
+    """
+
+    try:
+        from mock_cdm_server import MockCdmServer
+    except ImportError:
+        from ansible_collections.rubrikinc.cdm.tests.mock_cdm_server import MockCdmServer
+
+    report = {
+        "python": sys.version.split()[0],
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "latency": latency,
+        "repeat": repeat,
+        "modules": {},
+    }
+
+    scenarios = [(module_name, module_args) for module_name, module_args in SCENARIOS if not modules or module_name in modules]
+    runs = dict((module_name, []) for module_name, _ in scenarios)
+
+    with MockCdmServer(latency=latency, **(server_options or {})) as server:
+        for _ in range(repeat):
+            for module_name, module_args in scenarios:
+                runs[module_name].append(run_scenario(server, module_name, module_args))
+
+    for module_name, module_runs in runs.items():
+        report["modules"][module_name] = summarize(module_runs)
+
+    return report
+
+
+def compare(report, baseline):
+    """Return the relative change of the wall clock, HTTP requests, bytes and peak RSS of each module against the baseline."""
+
+    changes = {}
+    for module_name, current in report["modules"].items():
+        previous = baseline.get("modules", {}).get(module_name)
+        if previous is None:
+            continue
+        changes[module_name] = {}
+        for key in ["wall_clock", "http_requests", "bytes_sent", "bytes_received", "peak_rss"]:
+            changes[module_name][key] = round((current[key] - previous[key]) / float(previous[key]), 4) if previous[key] else None
+    return changes
+
+
+def format_table(report):
+    columns = "{0:<38} {1:>8} {2:>8} {3:>8} {4:>8} {5:>8} {6:>6} {7:>10} {8:>8}  {9}"
+    lines = [columns.format("module", "wall(s)", "sdk(s)", "args(s)", "conn(s)", "api(s)", "reqs", "bytes", "rss(MB)", "result")]
+    for module_name, summary in sorted(report["modules"].items()):
+        durations = summary["durations"]
+        result = "failed: {0}".format(summary["msg"])[:60] if summary["failed"] else ("changed" if summary["changed"] else "ok")
+        lines.append(columns.format(
+            module_name, "{0:.3f}".format(summary["wall_clock"]), "{0:.3f}".format(durations["sdk_import"]),
+            "{0:.3f}".format(durations["argument_parsing"]), "{0:.3f}".format(durations["connect"]), "{0:.3f}".format(durations["api"]),
+            summary["http_requests"], summary["bytes_sent"] + summary["bytes_received"], "{0:.1f}".format(summary["peak_rss"] / 1048576.0),
+            result))
+    return "\n".join(lines)
+
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == "--child":
+        run_module(sys.argv[2], json.loads(sys.argv[3]))
+        return
+
+    parser = argparse.ArgumentParser(description="Benchmark the rubrikinc.cdm modules against the local mock CDM API.")
+    parser.add_argument("modules", nargs="*", help="The modules to benchmark, all the modules by default.")
+    parser.add_argument("--repeat", type=int, default=3, help="The number of runs of each module.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds the mock server adds to every response.")
+    parser.add_argument("--vms", type=int, default=100, help="The number of vSphere VMs on the mock cluster.")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout.")
+    parser.add_argument("--compare", help="A previous JSON report to compare the results with.")
+    arguments = parser.parse_args()
+
+    report = benchmark(arguments.modules, arguments.repeat, arguments.latency, {"vms": arguments.vms})
+
+    if arguments.compare:
+        with open(arguments.compare) as baseline:
+            report["comparison"] = compare(report, json.load(baseline))
+
+    sys.stderr.write(format_table(report) + "\n")
+    if arguments.output:
+        with open(arguments.output, "w") as output:
+            json.dump(report, output, indent=2, sort_keys=True)
+    else:
+        print(json.dumps(report, indent=2, sort_keys=True))
+
+
+if __name__ == "__main__":
+    main()
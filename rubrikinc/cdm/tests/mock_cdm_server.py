@@ -0,0 +1,955 @@
+#!/usr/bin/env python
+# (c) 2018 Rubrik, Inc
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""Stateful stand-in for the Rubrik CDM REST API used for offline integration and load testing.
+
+The server implements the endpoints used by the rubrikinc.cdm modules (cluster, session, sla_domain, vmware/vm, host,
+fileset_template, fileset, mssql, managed_volume, live mounts and job status) over HTTPS, with paginated listings,
+asynchronous jobs, configurable object counts, latency and error injection.
+
+Use it from a test:
+
+    with MockCdmServer(vms=10000, latency=0.005) as server:
+        rubrik = rubrik_cdm.Connect(server.node_ip, api_token="token")
+        rubrik.get("v1", "/vmware/vm", params={"limit": 500})
+        server.stats()
+
+or run it standalone and point the modules at it with rubrik_cdm_node_ip=127.0.0.1:8443:
+
+    python tests/mock_cdm_server.py --port 8443 --vms 10000 --latency 0.01 --error-rate 0.01
+"""
+from __future__ import absolute_import, division, print_function
+
+import argparse
+import base64
+import json
+import os
+import random
+import re
+import shutil
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import parse_qsl, urlsplit
+
+SNAPSHOT_BASE_DATE = datetime(2020, 1, 1, 12, 0, 0)
+
+UNPROTECTED_SLA_DOMAIN_IDS = ["UNPROTECTED", "INHERIT"]
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    # http.server.ThreadingHTTPServer only exists from Python 3.7 on.
+    daemon_threads = True
+
+
+class MockCdmError(Exception):
+
+    def __init__(self, status, message, error_type="user_error", headers=None):
+        super(MockCdmError, self).__init__(message)
+        self.status = status
+        self.body = {"errorType": error_type, "message": message, "cause": None}
+        self.headers = headers or {}
+
+
+def camel_case(key):
+    words = key.split("_")
+    return words[0] + "".join(word.title() for word in words[1:])
+
+
+def snapshot_date(index):
+    return (SNAPSHOT_BASE_DATE - timedelta(days=index)).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+class MockCdmState(object):
+    """In-memory Rubrik cluster. Every mutation made through the API is kept for the life of the server."""
+
+    def __init__(self, vms=100, hosts=20, mssql_dbs=50, managed_volumes=10, sla_domains=5, snapshots_per_object=3,
+                 job_duration=0.0):
+        self.lock = threading.RLock()
+        self.job_duration = job_duration
+
+        self.cluster = {
+            "id": "89fc3dc8-5b8f-4a21-a1c6-4c2f7d7a5c8d",
+            "name": "mock-cluster",
+            "version": "5.0.1-1280",
+            "apiVersion": "1",
+            "timezone": {"timezone": "America/Chicago"},
+            "geolocation": {"address": ""},
+            "acceptedEulaVersion": "1.1",
+            "latestEulaVersion": "1.1",
+        }
+        self.settings = {
+            "dns_nameserver": [],
+            "dns_search_domain": [],
+            "ntp_server": {"hasMore": False, "data": [], "total": 0},
+            "login_banner": {"loginBanner": ""},
+        }
+        self.nodes = []
+        self.tokens = {}
+        self.expired_tokens = set()
+        self.jobs = {}
+        self.collections = dict((name, {}) for name in [
+            "sla_domain", "vmware_vm", "vmware_vcenter", "vmware_host", "vm_snapshot", "vm_mount", "host", "fileset_template",
+            "fileset", "fileset_snapshot", "mssql_instance", "mssql_db", "mssql_snapshot", "mssql_mount", "managed_volume",
+            "user", "end_user_authorization", "smtp_instance", "archive"])
+
+        self._populate(vms, hosts, mssql_dbs, managed_volumes, sla_domains, snapshots_per_object)
+
+    def _populate(self, vms, hosts, mssql_dbs, managed_volumes, sla_domains, snapshots_per_object):
+        sla_names = ["Gold", "Silver", "Bronze"] + ["SLA-{0:03d}".format(index) for index in range(max(sla_domains - 3, 0))]
+        for index, name in enumerate(sla_names[:sla_domains]):
+            self.add("sla_domain", {"id": "sla-{0:04d}".format(index), "name": name, "frequencies": [], "numVms": 0})
+        sla_ids = sorted(self.collections["sla_domain"])
+
+        def sla(index):
+            if not sla_ids or index % 4 == 3:
+                return "UNPROTECTED", "Unprotected"
+            sla_id = sla_ids[index % len(sla_ids)]
+            return sla_id, self.collections["sla_domain"][sla_id]["name"]
+
+        self.add("vmware_vcenter", {"id": "vCenter:::vcenter-0001", "name": "vcenter.mock.local", "hostname": "vcenter.mock.local"})
+        self.add("vmware_host", {"id": "VmwareHost:::esxi-0001", "name": "esxi-0001.mock.local"})
+
+        for index in range(vms):
+            sla_id, sla_name = sla(index)
+            vm_id = "VirtualMachine:::vm-{0:06d}".format(index)
+            self.add("vmware_vm", {
+                "id": vm_id,
+                "name": "vm-{0:06d}".format(index),
+                "moid": "vm-{0}".format(index),
+                "ipAddress": "10.{0}.{1}.{2}".format(index // 65536 % 256, index // 256 % 256, index % 256),
+                "primaryClusterId": self.cluster["id"],
+                "isRelic": False,
+                "configuredSlaDomainId": sla_id,
+                "configuredSlaDomainName": sla_name,
+                "effectiveSlaDomainId": sla_id,
+                "effectiveSlaDomainName": sla_name,
+                "slaAssignment": "Direct",
+                "vcenterId": "vCenter:::vcenter-0001",
+                "hostId": "VmwareHost:::esxi-0001",
+                "hostName": "esxi-0001.mock.local",
+                "clusterName": "Compute",
+                "powerStatus": "poweredOn",
+            })
+            for snapshot in range(snapshots_per_object):
+                self.add("vm_snapshot", {"id": "{0}-snapshot-{1}".format(vm_id, snapshot), "vmId": vm_id, "date": snapshot_date(snapshot)})
+
+        for index in range(hosts):
+            os_type = "Windows" if index % 2 else "Linux"
+            hostname = "host-{0:05d}.mock.local".format(index)
+            self.add("host", {
+                "id": "Host:::host-{0:05d}".format(index),
+                "name": hostname,
+                "hostname": hostname,
+                "primaryClusterId": self.cluster["id"],
+                "operatingSystem": os_type,
+                "operatingSystemType": os_type,
+                "status": "Connected",
+            })
+
+        windows_hosts = [host for host in self.collections["host"].values() if host["operatingSystemType"] == "Windows"]
+        for host in windows_hosts:
+            self.add("mssql_instance", {
+                "id": "MssqlInstance:::{0}".format(host["id"].split(":::")[1]),
+                "name": "MSSQLSERVER",
+                "rootProperties": {"rootType": "Host", "rootId": host["id"], "rootName": host["hostname"]},
+                "primaryClusterId": self.cluster["id"],
+                "configuredSlaDomainId": "INHERIT",
+                "logBackupFrequencyInSeconds": 3600,
+                "logRetentionHours": 24,
+                "copyOnly": False,
+            })
+
+        instances = sorted(self.collections["mssql_instance"].values(), key=lambda instance: instance["id"])
+        for index in range(mssql_dbs if instances else 0):
+            instance = instances[index % len(instances)]
+            sla_id, sla_name = sla(index)
+            db_id = "MssqlDatabase:::db-{0:06d}".format(index)
+            self.add("mssql_db", {
+                "id": db_id,
+                "name": "db-{0:06d}".format(index),
+                "instanceId": instance["id"],
+                "instanceName": instance["name"],
+                "rootProperties": dict(instance["rootProperties"]),
+                "primaryClusterId": self.cluster["id"],
+                "isRelic": False,
+                "isLiveMount": False,
+                "effectiveSlaDomainId": sla_id,
+                "effectiveSlaDomainName": sla_name,
+                "configuredSlaDomainId": sla_id,
+                "configuredSlaDomainName": sla_name,
+            })
+            for snapshot in range(snapshots_per_object):
+                self.add("mssql_snapshot", {"id": "{0}-snapshot-{1}".format(db_id, snapshot), "databaseId": db_id, "date": snapshot_date(snapshot)})
+
+        for index in range(managed_volumes):
+            sla_id, sla_name = sla(index)
+            self.add("managed_volume", {
+                "id": "ManagedVolume:::mv-{0:05d}".format(index),
+                "name": "mv-{0:05d}".format(index),
+                "primaryClusterId": self.cluster["id"],
+                "isRelic": False,
+                "isWritable": False,
+                "effectiveSlaDomainId": sla_id,
+                "effectiveSlaDomainName": sla_name,
+                "configuredSlaDomainId": sla_id,
+                "configuredSlaDomainName": sla_name,
+            })
+
+        self.add("user", {"id": "User:::admin", "username": "admin"})
+
+    def add(self, collection, rubrik_object):
+        with self.lock:
+            if "id" not in rubrik_object:
+                rubrik_object["id"] = "{0}:::{1}".format(collection, uuid.uuid4())
+            self.collections[collection][rubrik_object["id"]] = rubrik_object
+            return rubrik_object
+
+    def find(self, collection, object_id):
+        with self.lock:
+            try:
+                return self.collections[collection][object_id]
+            except KeyError:
+                raise MockCdmError(404, "The {0} '{1}' was not found.".format(collection, object_id))
+
+    def remove(self, collection, object_id):
+        with self.lock:
+            self.find(collection, object_id)
+            return self.collections[collection].pop(object_id)
+
+    def listing(self, collection, query, filters=None):
+        """Return a paginated listing of the collection. Query parameters that are not pagination or sort parameters
+        filter the objects by the camelCase field of the same name, "name" filters are case insensitive substring matches.
+        """
+
+        filters = filters or {}
+        with self.lock:
+            objects = sorted(self.collections[collection].values(), key=lambda rubrik_object: rubrik_object["id"])
+
+        for key, value in query.items():
+            if key in ["limit", "offset", "sort_by", "sort_order", "primary_cluster_id", "force"]:
+                continue
+            field = filters.get(key, camel_case(key))
+            if key in ["name", "username"]:
+                objects = [rubrik_object for rubrik_object in objects if value.lower() in str(rubrik_object.get(field, "")).lower()]
+            else:
+                objects = [rubrik_object for rubrik_object in objects if str(self._field(rubrik_object, field)).lower() == value.lower()]
+
+        total = len(objects)
+        offset = int(query.get("offset", 0))
+        if "limit" in query:
+            limit = int(query["limit"])
+            page = objects[offset:offset + limit]
+            has_more = offset + limit < total
+        else:
+            page = objects[offset:]
+            has_more = False
+
+        return {"hasMore": has_more, "data": page, "total": total}
+
+    def _field(self, rubrik_object, field):
+        for key in field.split("."):
+            if not isinstance(rubrik_object, dict):
+                return None
+            rubrik_object = rubrik_object.get(key)
+        return rubrik_object
+
+    def create_job(self, host, job_type, api_path, on_success=None):
+        job_id = "{0}_{1}:::0".format(job_type, uuid.uuid4())
+        with self.lock:
+            self.jobs[job_id] = {"id": job_id, "started": time.time(), "on_success": on_success, "done": False}
+        job = self.job_status(job_id)
+        job["links"] = [{"href": "https://{0}/api/v1/{1}/request/{2}".format(host, api_path, job_id), "rel": "self"}]
+        return job
+
+    def job_status(self, job_id):
+        with self.lock:
+            try:
+                job = self.jobs[job_id]
+            except KeyError:
+                raise MockCdmError(404, "The job '{0}' was not found.".format(job_id))
+
+            elapsed = time.time() - job["started"]
+            start_time = datetime.utcfromtimestamp(job["started"]).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+            status = {"id": job_id, "startTime": start_time, "nodeId": "cluster:::mock-node-1"}
+
+            if self.job_duration and elapsed < self.job_duration:
+                status["status"] = "QUEUED" if elapsed < self.job_duration * 0.1 else "RUNNING"
+                status["progress"] = round(100.0 * elapsed / self.job_duration, 1)
+                return status
+
+            if not job["done"]:
+                job["done"] = True
+                if job["on_success"] is not None:
+                    # A job whose side effect can not be applied ends as FAILED with the error of the cluster
+                    try:
+                        job["on_success"]()
+                    except MockCdmError as error:
+                        job["error"] = error.body["message"]
+
+            if "error" in job:
+                status["status"] = "FAILED"
+                status["error"] = {"message": job["error"]}
+            else:
+                status["status"] = "SUCCEEDED"
+            status["progress"] = 100
+            status["endTime"] = datetime.utcfromtimestamp(job["started"] + self.job_duration).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+            return status
+
+
+class MockCdmApi(object):
+    """Maps (method, version, endpoint) onto MockCdmState operations."""
+
+    def __init__(self, state):
+        self.state = state
+        self.routes = []
+
+        self.route("POST", "v1", r"/session", self.create_session)
+        self.route("DELETE", "v1", r"/session/me", self.delete_session)
+        self.route("GET", "v1", r"/cluster/me", lambda request: self.state.cluster)
+        self.route("PATCH", "v1", r"/cluster/me", self.update_cluster)
+        self.route("GET", "v1", r"/cluster/me/version", lambda request: {"version": self.state.cluster["version"]})
+        self.route("GET", "internal", r"/smtp_instance", lambda request: self.state.listing("smtp_instance", request["query"]))
+        self.route("POST", "internal", r"/smtp_instance", lambda request: self.state.add("smtp_instance", dict(request["body"])))
+        self.route("PATCH", "internal", r"/smtp_instance/(?P<id>[^/]+)", lambda request: self.update("smtp_instance", request))
+        self.route("GET", "internal", r"/archive/object_store", lambda request: self.state.listing("archive", request["query"]))
+        self.route("POST", "internal", r"/archive/object_store", self.create_archive)
+        self.route("GET", "internal", r"/cluster/me/node", self.list_nodes)
+        self.route("GET", "internal", r"/cluster/me/(?P<setting>[a-z_]+)", self.get_setting)
+        self.route(["POST", "PUT", "PATCH"], "internal", r"/cluster/me/(?P<setting>[a-z_]+)", self.update_setting)
+        self.route("GET", "(v1|internal)", r"/(?P<path>.+)/request/(?P<job_id>[^/]+)", self.get_job_status)
+
+        self.route("GET", "(v1|v2)", r"/sla_domain", lambda request: self.state.listing("sla_domain", request["query"]))
+        self.route("GET", "(v1|v2)", r"/sla_domain/(?P<id>[^/]+)", lambda request: self.state.find("sla_domain", request["id"]))
+        self.route("POST", "(v1|v2)", r"/sla_domain", self.create_sla_domain)
+        self.route("POST", "internal", r"/sla_domain/(?P<id>[^/]+)/assign", self.assign_sla_domain)
+
+        self.route("GET", "v1", r"/vmware/vm", lambda request: self.state.listing("vmware_vm", request["query"]))
+        self.route("GET", "v1", r"/vmware/vm/snapshot/mount", self.list_vm_mounts)
+        self.route("GET", "v1", r"/vmware/vm/snapshot/mount/(?P<id>[^/]+)", lambda request: self.state.find("vm_mount", request["id"]))
+        self.route("DELETE", "v1", r"/vmware/vm/snapshot/mount/(?P<id>[^/]+)", self.delete_vm_mount)
+        self.route("POST", "v1", r"/vmware/vm/snapshot/(?P<id>[^/]+)/mount", self.create_vm_mount)
+        self.route("GET", "v1", r"/vmware/vm/(?P<id>[^/]+)", self.get_vm)
+        self.route("PATCH", "v1", r"/vmware/vm/(?P<id>[^/]+)", lambda request: self.update("vmware_vm", request))
+        self.route("POST", "v1", r"/vmware/vm/(?P<id>[^/]+)/snapshot", self.create_vm_snapshot)
+        self.route("GET", "v1", r"/vmware/vcenter", lambda request: self.state.listing("vmware_vcenter", request["query"]))
+        self.route("POST", "v1", r"/vmware/vcenter", self.create_vcenter)
+        self.route("GET", "v1", r"/vmware/host", lambda request: self.state.listing("vmware_host", request["query"]))
+
+        self.route("GET", "v1", r"/host", lambda request: self.state.listing("host", request["query"]))
+        self.route("GET", "v1", r"/host/(?P<id>[^/]+)", lambda request: self.state.find("host", request["id"]))
+        self.route("POST", "v1", r"/host", lambda request: self.create_host(request["body"]))
+        self.route("POST", "internal", r"/host/bulk", self.create_hosts)
+        self.route("DELETE", "v1", r"/host/(?P<id>[^/]+)", lambda request: self.delete("host", request))
+
+        self.route("GET", "v1", r"/fileset_template", lambda request: self.state.listing("fileset_template", request["query"]))
+        self.route("POST", "internal", r"/fileset_template/bulk", lambda request: self.create_bulk("fileset_template", request))
+        self.route("GET", "v1", r"/fileset", lambda request: self.state.listing("fileset", request["query"]))
+        self.route("GET", "v1", r"/fileset/(?P<id>[^/]+)", lambda request: self.state.find("fileset", request["id"]))
+        self.route("POST", "v1", r"/fileset", lambda request: self.state.add("fileset", dict(request["body"], isRelic=False)))
+        self.route("POST", "internal", r"/fileset/bulk", lambda request: self.create_bulk("fileset", request))
+        self.route("PATCH", "v1", r"/fileset/(?P<id>[^/]+)", lambda request: self.update("fileset", request))
+        self.route("POST", "v1", r"/fileset/(?P<id>[^/]+)/snapshot", self.create_fileset_snapshot)
+
+        self.route("GET", "v1", r"/mssql/instance", lambda request: self.state.listing(
+            "mssql_instance", request["query"], {"root_id": "rootProperties.rootId"}))
+        self.route("GET", "v1", r"/mssql/instance/(?P<id>[^/]+)", lambda request: self.state.find("mssql_instance", request["id"]))
+        self.route("PATCH", "v1", r"/mssql/instance/(?P<id>[^/]+)", lambda request: self.update("mssql_instance", request))
+        self.route("GET", "v1", r"/mssql/db", lambda request: self.state.listing("mssql_db", request["query"]))
+        self.route("GET", "v1", r"/mssql/db/mount", lambda request: self.state.listing("mssql_mount", request["query"]))
+        self.route("DELETE", "v1", r"/mssql/db/mount/(?P<id>[^/]+)", self.delete_mssql_mount)
+        self.route("GET", "v1", r"/mssql/db/(?P<id>[^/]+)", lambda request: self.state.find("mssql_db", request["id"]))
+        self.route("POST", "v1", r"/mssql/db/(?P<id>[^/]+)/snapshot", self.create_mssql_snapshot)
+        self.route("GET", "v1", r"/mssql/db/(?P<id>[^/]+)/snapshot", self.list_mssql_snapshots)
+        self.route("GET", "v1", r"/mssql/db/(?P<id>[^/]+)/recoverable_range", self.mssql_recoverable_range)
+        self.route("POST", "v1", r"/mssql/db/(?P<id>[^/]+)/mount", self.create_mssql_mount)
+
+        self.route("GET", "internal", r"/managed_volume", lambda request: self.state.listing("managed_volume", request["query"]))
+        self.route("GET", "internal", r"/managed_volume/(?P<id>[^/]+)", lambda request: self.state.find("managed_volume", request["id"]))
+        self.route("POST", "internal", r"/managed_volume/(?P<id>[^/]+)/begin_snapshot", lambda request: self.managed_volume_snapshot(request, True))
+        self.route("POST", "internal", r"/managed_volume/(?P<id>[^/]+)/end_snapshot", lambda request: self.managed_volume_snapshot(request, False))
+
+        self.route("GET", "internal", r"/user", lambda request: [
+            user for user in self.state.listing("user", request["query"])["data"]])
+        self.route("GET", "internal", r"/authorization/role/end_user", self.list_end_user_authorizations)
+        self.route("POST", "internal", r"/authorization/role/end_user", self.create_end_user_authorization)
+
+    def route(self, methods, api_version, endpoint, handler):
+        if not isinstance(methods, list):
+            methods = [methods]
+        pattern = re.compile(r"^/api/(?:{0})(?:{1})$".format(api_version, endpoint))
+        self.routes.append((methods, pattern, handler))
+
+    def dispatch(self, request):
+        for methods, pattern, handler in self.routes:
+            match = pattern.match(request["path"])
+            if match is not None and request["method"] in methods:
+                request.update(match.groupdict())
+                return handler(request)
+
+        raise MockCdmError(404, "Route not found: {0} {1}".format(request["method"], request["path"]))
+
+    # Session and cluster settings
+
+    def create_session(self, request):
+        token = uuid.uuid4().hex
+        with self.state.lock:
+            self.state.tokens[token] = request["username"] or "api_token"
+        return {"id": uuid.uuid4().hex, "token": token, "userId": "User:::admin", "organizationId": "Organization:::global"}
+
+    def delete_session(self, request):
+        with self.state.lock:
+            self.state.tokens.pop(request["token"], None)
+        return None
+
+    def list_nodes(self, request):
+        nodes = [{"id": "node-{0:02d}".format(index), "brikId": "brik-00", "status": "OK", "ipAddress": node_ip}
+                 for index, node_ip in enumerate(self.state.nodes)]
+        return {"hasMore": False, "data": nodes, "total": len(nodes)}
+
+    def update_cluster(self, request):
+        with self.state.lock:
+            self.state.cluster.update(request["body"] or {})
+            return self.state.cluster
+
+    def get_setting(self, request):
+        with self.state.lock:
+            if request["setting"] not in self.state.settings:
+                raise MockCdmError(404, "Route not found: GET {0}".format(request["path"]))
+            return self.state.settings[request["setting"]]
+
+    def update_setting(self, request):
+        body = request["body"]
+        if request["setting"] == "ntp_server":
+            body = {"hasMore": False, "data": body, "total": len(body)}
+        with self.state.lock:
+            self.state.settings[request["setting"]] = body
+        return None if request["method"] == "POST" else request["body"]
+
+    def get_job_status(self, request):
+        return self.state.job_status(request["job_id"])
+
+    # Generic collection helpers
+
+    def update(self, collection, request):
+        with self.state.lock:
+            rubrik_object = self.state.find(collection, request["id"])
+            rubrik_object.update(request["body"] or {})
+            return rubrik_object
+
+    def delete(self, collection, request):
+        self.state.remove(collection, request["id"])
+        return None
+
+    def create_bulk(self, collection, request):
+        created = [self.state.add(collection, dict(rubrik_object, isRelic=False)) for rubrik_object in request["body"]]
+        return {"hasMore": False, "data": created, "total": len(created)}
+
+    def create_archive(self, request):
+        definition = dict((key, value) for key, value in request["body"].items() if key not in ["secretKey", "kmsMasterKeyId", "pemFileContent"])
+        return self.state.add("archive", {"definition": definition, "status": "Active"})
+
+    # SLA Domains
+
+    def create_sla_domain(self, request):
+        body = dict(request["body"])
+        body.setdefault("frequencies", [])
+        body["numVms"] = 0
+        return self.state.add("sla_domain", body)
+
+    def assign_sla_domain(self, request):
+        sla_id = request["id"]
+        if sla_id in UNPROTECTED_SLA_DOMAIN_IDS:
+            sla_name = "Unprotected" if sla_id == "UNPROTECTED" else "Inherit"
+        else:
+            sla_name = self.state.find("sla_domain", sla_id)["name"]
+
+        with self.state.lock:
+            for managed_id in request["body"].get("managedIds", []):
+                for collection in ["vmware_vm", "mssql_db", "managed_volume", "fileset"]:
+                    rubrik_object = self.state.collections[collection].get(managed_id)
+                    if rubrik_object is not None:
+                        rubrik_object.update({
+                            "configuredSlaDomainId": sla_id,
+                            "configuredSlaDomainName": sla_name,
+                            "effectiveSlaDomainId": sla_id,
+                            "effectiveSlaDomainName": sla_name,
+                        })
+                        break
+                else:
+                    raise MockCdmError(400, "The managed object '{0}' was not found.".format(managed_id))
+        return None
+
+    # vSphere
+
+    def get_vm(self, request):
+        vm = dict(self.state.find("vmware_vm", request["id"]))
+        vm["snapshots"] = sorted(
+            [snapshot for snapshot in self.state.listing("vm_snapshot", {"vm_id": vm["id"]})["data"]],
+            key=lambda snapshot: snapshot["date"])
+        vm["snapshotCount"] = len(vm["snapshots"])
+        return vm
+
+    def create_vm_snapshot(self, request):
+        vm = self.state.find("vmware_vm", request["id"])
+
+        def complete():
+            self.state.add("vm_snapshot", {"vmId": vm["id"], "date": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.000Z")})
+
+        return self.state.create_job(request["host"], "CREATE_VMWARE_SNAPSHOT", "vmware/vm", complete)
+
+    def list_vm_mounts(self, request):
+        return self.state.listing("vm_mount", request["query"])
+
+    def create_vm_mount(self, request):
+        snapshot = self.state.find("vm_snapshot", request["id"])
+        vm = self.state.find("vmware_vm", snapshot["vmId"])
+        body = request["body"] or {}
+
+        def complete():
+            host_id = body.get("hostId", vm["hostId"])
+            if host_id not in self.state.collections["vmware_host"]:
+                raise MockCdmError(404, "The ESXi host '{0}' of the Live Mount was not found.".format(host_id))
+
+            mounts = [mount for mount in self.state.collections["vm_mount"].values() if mount["snapshotId"] == snapshot["id"]]
+            mounted_vm = self.state.add("vmware_vm", dict(
+                vm, id="VirtualMachine:::{0}".format(uuid.uuid4()),
+                name=body.get("vmName") or "{0} {1} {2}".format(vm["name"], snapshot["date"], len(mounts)),
+                moid="vm-{0}".format(uuid.uuid4().hex[:8]), isRelic=False))
+            self.state.add("vm_mount", {
+                "snapshotId": snapshot["id"],
+                "snapshotDate": snapshot["date"],
+                "vmId": vm["id"],
+                "mountedVmId": mounted_vm["id"],
+                "hostId": host_id,
+                "mountTimestamp": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+                "isReady": True,
+                "powerStatus": "poweredOn" if body.get("powerOn", True) else "poweredOff",
+            })
+
+        return self.state.create_job(request["host"], "MOUNT_SNAPSHOT", "vmware/vm", complete)
+
+    def delete_vm_mount(self, request):
+        mount = self.state.find("vm_mount", request["id"])
+        if mount.get("datastoreRemoved") and request["query"].get("force", "").lower() != "true":
+            raise MockCdmError(400, "The datastore of the Live Mount '{0}' was removed. Use force to unmount it.".format(mount["id"]))
+
+        def complete():
+            self.state.collections["vm_mount"].pop(mount["id"], None)
+            self.state.collections["vmware_vm"].pop(mount["mountedVmId"], None)
+
+        return self.state.create_job(request["host"], "UNMOUNT_SNAPSHOT", "vmware/vm", complete)
+
+    def create_vcenter(self, request):
+        body = request["body"]
+        vcenter = {"id": "vCenter:::{0}".format(uuid.uuid4()), "name": body["hostname"], "hostname": body["hostname"]}
+        return self.state.create_job(request["host"], "REFRESH_METADATA", "vmware/vcenter", lambda: self.state.add("vmware_vcenter", vcenter))
+
+    # Physical hosts and filesets
+
+    def create_host(self, body):
+        with self.state.lock:
+            for host in self.state.collections["host"].values():
+                if host["hostname"] == body["hostname"]:
+                    raise MockCdmError(400, "The host '{0}' is already added.".format(body["hostname"]))
+            return self.state.add("host", {
+                "id": "Host:::{0}".format(uuid.uuid4()),
+                "name": body["hostname"],
+                "hostname": body["hostname"],
+                "primaryClusterId": self.state.cluster["id"],
+                "operatingSystem": "Linux",
+                "operatingSystemType": "Linux",
+                "status": "Connected",
+            })
+
+    def create_hosts(self, request):
+        created = [self.create_host(body) for body in request["body"]]
+        return {"hasMore": False, "data": created, "total": len(created)}
+
+    def create_fileset_snapshot(self, request):
+        fileset = self.state.find("fileset", request["id"])
+
+        def complete():
+            self.state.add("fileset_snapshot", {"filesetId": fileset["id"], "date": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.000Z")})
+
+        return self.state.create_job(request["host"], "CREATE_FILESET_SNAPSHOT", "fileset", complete)
+
+    # MSSQL
+
+    def create_mssql_snapshot(self, request):
+        db = self.state.find("mssql_db", request["id"])
+
+        def complete():
+            self.state.add("mssql_snapshot", {"databaseId": db["id"], "date": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.000Z")})
+
+        return self.state.create_job(request["host"], "MSSQL_DB_BACKUP", "mssql", complete)
+
+    def list_mssql_snapshots(self, request):
+        self.state.find("mssql_db", request["id"])
+        return self.state.listing("mssql_snapshot", {"database_id": request["id"]})
+
+    def mssql_recoverable_range(self, request):
+        snapshots = self.list_mssql_snapshots(request)["data"]
+        dates = sorted(snapshot["date"] for snapshot in snapshots)
+        data = [{"beginTime": dates[0], "endTime": dates[-1], "status": "Available"}] if dates else []
+        return {"hasMore": False, "data": data, "total": len(data)}
+
+    def create_mssql_mount(self, request):
+        db = self.state.find("mssql_db", request["id"])
+        body = request["body"] or {}
+
+        def complete():
+            mount_names = [mount["mountedDatabaseName"] for mount in self.state.collections["mssql_mount"].values()]
+            if body.get("mountedDatabaseName") in mount_names:
+                raise MockCdmError(409, "A database named '{0}' is already mounted.".format(body["mountedDatabaseName"]))
+
+            self.state.add("mssql_mount", {
+                "sourceDatabaseId": db["id"],
+                "sourceDatabaseName": db["name"],
+                "mountedDatabaseId": "MssqlDatabase:::{0}".format(uuid.uuid4()),
+                "mountedDatabaseName": body.get("mountedDatabaseName"),
+                "targetInstanceId": body.get("targetInstanceId"),
+                "isReady": True,
+            })
+
+        return self.state.create_job(request["host"], "MSSQL_DB_MOUNT", "mssql", complete)
+
+    def delete_mssql_mount(self, request):
+        mount = self.state.find("mssql_mount", request["id"])
+        return self.state.create_job(
+            request["host"], "MSSQL_DB_UNMOUNT", "mssql", lambda: self.state.collections["mssql_mount"].pop(mount["id"], None))
+
+    # Managed volumes
+
+    def managed_volume_snapshot(self, request, begin):
+        with self.state.lock:
+            managed_volume = self.state.find("managed_volume", request["id"])
+            managed_volume["isWritable"] = begin
+        if begin:
+            return {"snapshotId": "{0}-snapshot-{1}".format(managed_volume["id"], uuid.uuid4().hex[:8]), "ownerId": "owner"}
+        return {"id": "{0}-snapshot".format(managed_volume["id"]), "date": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.000Z")}
+
+    # End user authorization
+
+    def list_end_user_authorizations(self, request):
+        principal = request["query"].get("principals")
+        with self.state.lock:
+            data = [authorization for authorization in self.state.collections["end_user_authorization"].values()
+                    if principal is None or authorization["principal"] == principal]
+        if principal is not None and not data:
+            data = [{"principal": principal, "privileges": {"restore": [], "destructiveRestore": [], "onDemandSnapshot": []}}]
+        return {"hasMore": False, "data": data, "total": len(data)}
+
+    def create_end_user_authorization(self, request):
+        body = request["body"]
+        with self.state.lock:
+            for principal in body["principals"]:
+                authorization = self.state.collections["end_user_authorization"].get(principal)
+                if authorization is None:
+                    authorization = self.state.add("end_user_authorization", {
+                        "id": principal, "principal": principal, "privileges": {"restore": [], "destructiveRestore": [], "onDemandSnapshot": []}})
+                for privilege, object_ids in body["privileges"].items():
+                    authorization["privileges"].setdefault(privilege, []).extend(object_ids)
+        return {"hasMore": False, "data": [], "total": 0}
+
+
+class MockCdmServer(object):
+    """HTTPS server that serves MockCdmApi on a local port, with request statistics.
+
+    Keyword Arguments:
+        host {str} -- The address to listen on. (default: {127.0.0.1})
+        port {int} -- The port to listen on, 0 selects a free port. (default: {0})
+        latency {float} -- The number of seconds added to every response. (default: {0})
+        error_rate {float} -- The fraction of requests answered with error_status. (default: {0})
+        error_status {int} -- The HTTP status code of the injected errors. (default: {503})
+        error_endpoints {list} -- Regular expressions of the request paths that always fail with error_status. (default: {None})
+        seed {int} -- The seed of the error injection random number generator. (default: {None})
+        rate_limit {int} -- The number of requests accepted per second, the others are answered with 429 Too Many Requests and
+            a Retry-After header. (default: {0})
+        state {MockCdmState} -- The state of the cluster, shared by the servers of every node of a multi-node cluster.
+            (default: {None})
+        Any other keyword argument is passed to MockCdmState (vms, hosts, mssql_dbs, managed_volumes, sla_domains,
+        snapshots_per_object, job_duration).
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, error_rate=0.0, error_status=503, error_endpoints=None, seed=None,
+                 rate_limit=0, state=None, **state_options):
+        self.state = state if state is not None else MockCdmState(**state_options)
+        self.api = MockCdmApi(self.state)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.error_endpoints = [re.compile(pattern) for pattern in (error_endpoints or [])]
+        self.random = random.Random(seed)
+        self.rate_limit = rate_limit
+        self._accepted = []
+
+        self._stats_lock = threading.Lock()
+        self.reset_stats()
+
+        self._cert_dir = tempfile.mkdtemp(prefix="mock_cdm_")
+        certfile, keyfile = generate_certificate(self._cert_dir)
+
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        context = ssl.SSLContext(getattr(ssl, "PROTOCOL_TLS_SERVER", ssl.PROTOCOL_SSLv23))
+        context.load_cert_chain(certfile, keyfile)
+        self.httpd.socket = context.wrap_socket(self.httpd.socket, server_side=True)
+        self._thread = None
+
+        with self.state.lock:
+            self.state.nodes.append(self.node_ip)
+
+    @property
+    def node_ip(self):
+        return "{0}:{1}".format(*self.httpd.server_address[:2])
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, kwargs={"poll_interval": 0.05})
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        with self.state.lock:
+            if self.node_ip in self.state.nodes:
+                self.state.nodes.remove(self.node_ip)
+
+        if self._thread is not None:
+            self.httpd.shutdown()
+            self._thread = None
+        self.httpd.server_close()
+        shutil.rmtree(self._cert_dir, ignore_errors=True)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def expire_sessions(self):
+        """Expire every session token issued so far, the API calls that use them fail with 401 Unauthorized."""
+
+        with self.state.lock:
+            self.state.expired_tokens.update(self.state.tokens)
+            self.state.tokens.clear()
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._stats = {"requests": 0, "errors": 0, "bytes_received": 0, "bytes_sent": 0, "connections": 0, "endpoints": {}}
+
+    def stats(self):
+        """Return the number of requests, injected or API errors, bytes received and sent, TLS connections accepted and the
+        number of requests of each "METHOD /path" since the last reset."""
+
+        with self._stats_lock:
+            stats = dict(self._stats)
+            stats["endpoints"] = dict(self._stats["endpoints"])
+            return stats
+
+    def _record(self, method, path, status, received, sent):
+        with self._stats_lock:
+            self._stats["requests"] += 1
+            self._stats["bytes_received"] += received
+            self._stats["bytes_sent"] += sent
+            if status >= 400:
+                self._stats["errors"] += 1
+            endpoint = "{0} {1}".format(method, re.sub(r":::[^/?]+", ":::{id}", path))
+            self._stats["endpoints"][endpoint] = self._stats["endpoints"].get(endpoint, 0) + 1
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                BaseHTTPRequestHandler.setup(self)
+                with server._stats_lock:
+                    server._stats["connections"] += 1
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                self._handle("GET")
+
+            def do_POST(self):
+                self._handle("POST")
+
+            def do_PUT(self):
+                self._handle("PUT")
+
+            def do_PATCH(self):
+                self._handle("PATCH")
+
+            def do_DELETE(self):
+                self._handle("DELETE")
+
+            def _handle(self, method):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw_body = self.rfile.read(length) if length else b""
+                url = urlsplit(self.path)
+
+                if server.latency:
+                    time.sleep(server.latency)
+
+                headers = {}
+                try:
+                    status, body = self._respond(method, url, raw_body)
+                except MockCdmError as error:
+                    status, body, headers = error.status, error.body, error.headers
+
+                payload = b"" if body is None else json.dumps(body).encode("utf-8")
+                # Record the request before the client can see the response so the statistics never lag behind the client
+                server._record(method, url.path, status, len(self.requestline) + length, len(payload))
+
+                self.send_response(status)
+                for header, value in headers.items():
+                    self.send_header(header, value)
+                if payload:
+                    self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _respond(self, method, url, raw_body):
+                if server.rate_limit:
+                    with server._stats_lock:
+                        now = time.time()
+                        server._accepted = [accepted for accepted in server._accepted if accepted > now - 1]
+                        if len(server._accepted) >= server.rate_limit:
+                            raise MockCdmError(429, "Too many requests.", "server_error", {"Retry-After": "1"})
+                        server._accepted.append(now)
+
+                if any(pattern.search(url.path) for pattern in server.error_endpoints) or \
+                        (server.error_rate and server.random.random() < server.error_rate):
+                    raise MockCdmError(server.error_status, "Injected error.", "server_error")
+
+                username, token = self._credentials()
+                if username is None and token is None:
+                    raise MockCdmError(401, "Missing authentication credentials.")
+                if token in server.state.expired_tokens:
+                    raise MockCdmError(401, "The session token has expired.")
+
+                try:
+                    body = json.loads(raw_body.decode("utf-8")) if raw_body else None
+                except ValueError:
+                    raise MockCdmError(400, "The request body is not valid JSON.")
+
+                request = {
+                    "method": method,
+                    "path": url.path,
+                    "query": dict(parse_qsl(url.query)),
+                    "body": body,
+                    "host": self.headers.get("Host") or server.node_ip,
+                    "username": username,
+                    "token": token,
+                }
+
+                response = server.api.dispatch(request)
+                if response is None:
+                    return 204, None
+                if method == "POST" and isinstance(response, dict) and "links" in response:
+                    return 202, response
+                return 200, response
+
+            def _credentials(self):
+                authorization = self.headers.get("Authorization") or ""
+                if authorization.startswith("Bearer "):
+                    return None, authorization[len("Bearer "):]
+                if authorization.startswith("Basic "):
+                    try:
+                        return base64.b64decode(authorization[len("Basic "):]).decode("utf-8").split(":", 1)[0], None
+                    except (ValueError, UnicodeDecodeError):
+                        return None, None
+                return None, None
+
+        return Handler
+
+
+def generate_certificate(directory):
+    """Create a self-signed certificate for 127.0.0.1 and localhost with the cryptography library or the openssl CLI.
+
+    Returns:
+        [str] -- The path of the certificate.
+        [str] -- The path of the private key.
+    """
+
+    certfile = os.path.join(directory, "cert.pem")
+    keyfile = os.path.join(directory, "key.pem")
+
+    try:
+        from cryptography import x509
+        from cryptography.hazmat.backends import default_backend
+        from cryptography.hazmat.primitives import hashes, serialization
+        from cryptography.hazmat.primitives.asymmetric import rsa
+        from cryptography.x509.oid import NameOID
+        import ipaddress
+    except ImportError:
+        subprocess.check_call(
+            ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1", "-subj", "/CN=localhost",
+             "-keyout", keyfile, "-out", certfile], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return certfile, keyfile
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048, backend=default_backend())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, u"localhost")])
+    now = datetime.utcnow()
+    certificate = x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key()) \
+        .serial_number(x509.random_serial_number()).not_valid_before(now - timedelta(days=1)).not_valid_after(now + timedelta(days=1)) \
+        .add_extension(x509.SubjectAlternativeName([x509.DNSName(u"localhost"), x509.IPAddress(ipaddress.ip_address(u"127.0.0.1"))]),
+                       critical=False) \
+        .sign(key, hashes.SHA256(), default_backend())
+
+    with open(keyfile, "wb") as key_file:
+        key_file.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.TraditionalOpenSSL, serialization.NoEncryption()))
+    with open(certfile, "wb") as cert_file:
+        cert_file.write(certificate.public_bytes(serialization.Encoding.PEM))
+
+    return certfile, keyfile
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local mock of the Rubrik CDM REST API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8443)
+    parser.add_argument("--vms", type=int, default=100)
+    parser.add_argument("--hosts", type=int, default=20)
+    parser.add_argument("--mssql-dbs", type=int, default=50)
+    parser.add_argument("--managed-volumes", type=int, default=10)
+    parser.add_argument("--sla-domains", type=int, default=5)
+    parser.add_argument("--snapshots-per-object", type=int, default=3)
+    parser.add_argument("--job-duration", type=float, default=0.0, help="Seconds before an asynchronous job succeeds.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with --error-status.")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--error-endpoint", action="append", dest="error_endpoints", help="Regular expression of request paths that always fail.")
+    parser.add_argument("--rate-limit", type=int, default=0, help="Requests accepted per second, the others are answered with 429.")
+    parser.add_argument("--seed", type=int)
+    arguments = parser.parse_args()
+
+    server = MockCdmServer(
+        host=arguments.host, port=arguments.port, latency=arguments.latency, error_rate=arguments.error_rate,
+        error_status=arguments.error_status, error_endpoints=arguments.error_endpoints, seed=arguments.seed,
+        rate_limit=arguments.rate_limit, vms=arguments.vms, hosts=arguments.hosts, mssql_dbs=arguments.mssql_dbs,
+        managed_volumes=arguments.managed_volumes,
+        sla_domains=arguments.sla_domains, snapshots_per_object=arguments.snapshots_per_object, job_duration=arguments.job_duration)
+
+    print("Mock Rubrik CDM API listening on https://{0} (export rubrik_cdm_node_ip={0} rubrik_cdm_token=mock)".format(server.node_ip))
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        shutil.rmtree(server._cert_dir, ignore_errors=True)
+        print(json.dumps(server.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import os
+from ansible.utils.collection_loader._collection_finder import _AnsibleCollectionFinder
+
+# Load the collection through the Ansible collection loader, as ansible-test units does, so that plugins of the collection
+# can be looked up by their fully qualified name
+_AnsibleCollectionFinder(paths=[os.path.abspath(os.path.join(os.path.dirname(__file__), *[os.pardir] * 5))])._install()
@@ -0,0 +1,229 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from unittest.mock import Mock, patch
+from ansible.module_utils import basic
+import ansible_collections.rubrikinc.cdm.plugins.action.rubrik as rubrik_action
+import ansible_collections.rubrikinc.cdm.plugins.module_utils.rubrik_cdm as rubrik_module_utils
+from ansible_collections.rubrikinc.cdm.tests.mock_cdm_server import MockCdmServer
+import ansible_collections.rubrikinc.cdm.plugins.modules.rubrik_cluster_version as rubrik_cluster_version
+
+
+def action_module(module_name="rubrik_cluster_version", transport="local", async_val=0, **args):
+    task = Mock(action=module_name, collections=["rubrikinc.cdm"], args=args, async_val=async_val, _uuid="task-uuid")
+    connection = Mock(transport=transport, socket_path=None)
+    shared_loader_obj = Mock()
+    shared_loader_obj.module_loader.find_plugin_with_context.return_value = Mock(
+        resolved=True, resolved_fqcn="rubrikinc.cdm.{0}".format(module_name))
+
+    action = rubrik_action.ActionModule(task, connection, Mock(check_mode=False), Mock(), Mock(), shared_loader_obj)
+    action._update_module_args = Mock()
+    action._compute_environment_string = Mock()
+    return action
+
+
+def assign_calls(stats):
+    return sum(count for endpoint, count in stats["endpoints"].items() if endpoint.startswith("POST /api/internal/sla_domain/"))
+
+
+def run_hosts(module_name, hosts_args, **task_vars):
+    """Run the task of every host in its own thread, the way the worker process of each host would, and return the result of
+    each host."""
+
+    task_vars.setdefault("ansible_play_batch", ["host-{0}".format(index) for index in range(len(hosts_args))])
+    results = [None] * len(hosts_args)
+
+    def run(index):
+        action = action_module(module_name, **hosts_args[index])
+        results[index] = action._execute_module_in_batch(module_name, rubrik_action.BATCHES[module_name], task_vars)
+        if results[index] is None:
+            results[index] = action._execute_module_in_process(module_name, task_vars)
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(len(hosts_args))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return results
+
+
+class TestRubrikAction(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = MockCdmServer(vms=10, hosts=2, mssql_dbs=2, managed_volumes=1, seed=1).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.server.reset_stats()
+        rubrik_action._connections.clear()
+
+        local_tmp = patch.object(rubrik_action.C, "DEFAULT_LOCAL_TMP", tempfile.mkdtemp())
+        local_tmp.start()
+        self.addCleanup(local_tmp.stop)
+
+    def credentials(self, **kwargs):
+        kwargs.update({"node_ip": self.server.node_ip, "api_token": "mock-token"})
+        return kwargs
+
+    def test_runs_in_process(self):
+        action = action_module()
+
+        self.assertEqual(action._module_name(), "rubrik_cluster_version")
+        self.assertTrue(action._runs_in_process("rubrik_cluster_version", {}))
+        self.assertFalse(action._runs_in_process("rubrik_cluster_version", {"rubrik_cdm_in_process": "false"}))
+        self.assertFalse(action._runs_in_process(None, {}))
+
+    def test_delegated_or_async_tasks_run_as_usual(self):
+        self.assertFalse(action_module(transport="ssh")._runs_in_process("rubrik_cluster_version", {}))
+        self.assertFalse(action_module(async_val=60)._runs_in_process("rubrik_cluster_version", {}))
+
+    def test_module_of_another_collection(self):
+        action = action_module()
+        action._shared_loader_obj.module_loader.find_plugin_with_context.return_value = Mock(
+            resolved=True, resolved_fqcn="ansible.builtin.command")
+
+        self.assertIsNone(action._module_name())
+
+    def test_execute_module_in_process(self):
+        action = action_module(node_ip=self.server.node_ip, api_token="mock-token")
+
+        for _ in range(3):
+            result = action._execute_module_in_process("rubrik_cluster_version", {})
+            self.assertEqual(result["version"], "5.0.1-1280")
+            self.assertFalse(result.get("failed", False))
+
+        # Every run reuses the keep-alive session of the worker process
+        self.assertEqual(self.server.stats()["endpoints"], {"GET /api/v1/cluster/me/version": 3})
+        self.assertEqual(self.server.stats()["connections"], 1)
+        self.assertIsNone(basic._ANSIBLE_ARGS)
+        self.assertIsNone(rubrik_module_utils.connection_factory)
+
+    def test_execute_module_in_process_failure(self):
+        action = action_module("rubrik_assign_sla", node_ip=self.server.node_ip, api_token="mock-token",
+                               object_name="missing-vm", sla_name="Gold")
+
+        result = action._execute_module_in_process("rubrik_assign_sla", {})
+
+        self.assertTrue(result["failed"])
+        self.assertIn("missing-vm", result["msg"])
+
+    def test_module_exception_is_reported(self):
+        action = action_module(node_ip=self.server.node_ip, api_token="mock-token")
+
+        with patch.object(rubrik_cluster_version, "credentials", side_effect=RuntimeError("boom")):
+            result = action._execute_module_in_process("rubrik_cluster_version", {})
+
+        self.assertTrue(result["failed"])
+        self.assertIn("boom", result["module_stderr"])
+
+    def test_assign_sla_tasks_are_coalesced(self):
+        hosts_args = [self.credentials(object_name="vm-00000{0}".format(index), sla_name="Silver") for index in range(4)]
+
+        results = run_hosts("rubrik_assign_sla", hosts_args)
+
+        self.assertTrue(any(result["changed"] for result in results))
+        self.assertEqual([result["coalesced"] for result in results], [4] * 4)
+        self.assertEqual(assign_calls(self.server.stats()), 1)
+        self.assertEqual(self.server.stats()["endpoints"]["GET /api/v1/vmware/vm"], 1)
+
+        self.server.reset_stats()
+        results = run_hosts("rubrik_assign_sla", hosts_args)
+
+        self.assertEqual([result["changed"] for result in results], [False] * 4)
+        self.assertEqual(results[0]["response"], "No change required. The vSphere VM 'vm-000000' is already assigned to the 'Silver' SLA Domain.")
+        self.assertEqual(assign_calls(self.server.stats()), 0)
+
+    def test_assign_sla_batch_with_missing_vm(self):
+        hosts_args = [self.credentials(object_name=object_name, sla_name="Bronze") for object_name in ["vm-000006", "missing-vm", "vm-000007"]]
+
+        results = run_hosts("rubrik_assign_sla", hosts_args)
+
+        self.assertEqual(results[1]["msg"], "The vmware object 'missing-vm' was not found on the Rubrik cluster.")
+        self.assertTrue(results[1]["failed"])
+        self.assertNotIn("failed", results[0])
+        self.assertNotIn("failed", results[2])
+        self.assertLessEqual(assign_calls(self.server.stats()), 1)
+
+    def test_on_demand_snapshot_tasks_are_coalesced(self):
+        hosts_args = [self.credentials(object_name="vm-00000{0}".format(index)) for index in range(3)]
+
+        results = run_hosts("rubrik_on_demand_snapshot", hosts_args)
+
+        self.assertEqual([result["changed"] for result in results], [True] * 3)
+        self.assertEqual(len(set(result["job_status_url"] for result in results)), 3)
+        self.assertEqual([result["coalesced"] for result in results], [3] * 3)
+
+    def test_tasks_that_can_not_be_coalesced(self):
+        action = action_module("rubrik_assign_sla", **self.credentials(object_name="vm-000001", sla_name="Gold"))
+
+        self.assertIsNone(action._execute_module_in_batch("rubrik_assign_sla", rubrik_action.AssignSlaBatch, {"ansible_play_batch": ["host-0"]}))
+        self.assertIsNone(action._execute_module_in_batch("rubrik_assign_sla", rubrik_action.AssignSlaBatch, {
+            "ansible_play_batch": ["host-0", "host-1"], "rubrik_cdm_batch_window": 0}))
+        self.assertIsNone(rubrik_action.AssignSlaBatch.request({"object_name": "sql-host", "sla_name": "Gold", "object_type": "mssql_host"}))
+        self.assertIsNone(rubrik_action.OnDemandSnapshotBatch.request({"objects": ["vm-000001"]}))
+
+    def test_task_batch_conflicting_request(self):
+        path = tempfile.mkdtemp()
+        leader = rubrik_action.TaskBatch(path, 1, 2)
+        follower = rubrik_action.TaskBatch(path, 1, 2)
+
+        self.assertTrue(leader.join("vm-000001", "Gold"))
+        self.assertFalse(follower.join("vm-000001", "Silver"))
+        self.assertTrue(follower.join("vm-000002", "Silver"))
+
+        self.assertTrue(leader.leader)
+        self.assertFalse(follower.leader)
+        self.assertEqual(leader.close(), [("vm-000001", "Gold"), ("vm-000002", "Silver")])
+
+        leader.set_results([{"changed": True}, {"changed": False}])
+        self.assertEqual(follower.wait_result(), {"changed": False})
+
+    def test_task_batch_duplicate_requests(self):
+        path = tempfile.mkdtemp()
+        leader = rubrik_action.TaskBatch(path, 1, 3)
+        followers = [rubrik_action.TaskBatch(path, 1, 3) for _ in range(2)]
+
+        self.assertTrue(leader.join("vm-000001", "Gold"))
+        for follower in followers:
+            self.assertTrue(follower.join("vm-000002", "Silver"))
+        self.assertEqual(leader.close(), [("vm-000001", "Gold"), ("vm-000002", "Silver")])
+
+        # Both hosts that asked for the same object get the result of the request
+        leader.set_results([{"changed": True}, {"changed": False}])
+        self.assertEqual([follower.wait_result() for follower in followers], [{"changed": False}] * 2)
+
+    def test_task_batch_waits_for_its_own_leader(self):
+        path = tempfile.mkdtemp()
+        leader = rubrik_action.TaskBatch(path, 0, 2)
+        follower = rubrik_action.TaskBatch(path, 0, 2)
+
+        self.assertTrue(leader.join("vm-000001", "Gold"))
+        self.assertTrue(follower.join("vm-000002", "Silver"))
+        leader.close()
+
+        # The next batch is started by a worker that has already exited
+        exited = subprocess.Popen([sys.executable, "-c", "pass"])
+        exited.wait()
+        rubrik_action.TaskBatch(path, 0, 2).join("vm-000003", "Bronze")
+        with open(os.path.join(path, "state.json")) as state_file:
+            state = json.load(state_file)
+        state["leader"] = exited.pid
+        with open(os.path.join(path, "state.json"), "w") as state_file:
+            json.dump(state, state_file)
+
+        timer = threading.Timer(0.5, leader.set_results, [[{"changed": True}, {"changed": False}]])
+        timer.start()
+        self.addCleanup(timer.join)
+        self.assertEqual(follower.wait_result(), {"changed": False})
@@ -2,6 +2,8 @@ from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 
 import json
+import shutil
+import tempfile
 import unittest
 from unittest.mock import Mock, patch
 from ansible.module_utils import basic
@@ -1402,6 +1404,159 @@ class TestRubrikAssignSla(unittest.TestCase):
         self.assertEqual(result.exception.args[0]['changed'], True)
         self.assertEqual(result.exception.args[0]['response'], mock_post_internal_sla_domain_id_assign())
 
+    @patch.object(rubrik_assign_sla.rubrik_cdm.rubrik_cdm.Connect, 'post', autospec=True, spec_set=True)
+    @patch.object(rubrik_assign_sla.rubrik_cdm.rubrik_cdm.Connect, 'get', autospec=True, spec_set=True)
+    def test_module_bulk_assign_sla(self, mock_get, mock_post):
+
+        def mock_get_v1_sla_domain():
+            return {
+                "hasMore": False,
+                "data": [
+                    {"id": "gold_sla_id", "name": "Gold"},
+                    {"id": "silver_sla_id", "name": "Silver"}
+                ],
+                "total": 2
+            }
+
+        def mock_get_v1_vmware_vm():
+            return {
+                "hasMore": False,
+                "data": [
+                    {"id": "vm_1_id", "name": "vm-1", "configuredSlaDomainId": "gold_sla_id"},
+                    {"id": "vm_2_id", "name": "vm-2", "configuredSlaDomainId": "silver_sla_id"},
+                    {"id": "vm_3_id", "name": "vm-3", "configuredSlaDomainId": "INHERIT"},
+                    {"id": "vm_4_id", "name": "vm-4", "configuredSlaDomainId": "INHERIT"}
+                ],
+                "total": 4
+            }
+
+        set_module_args({
+            'objects': {'vm-1': 'Gold', 'vm-2': 'Gold', 'vm-3': 'Gold', 'vm-4': 'do not protect'},
+            'node_ip': '1.1.1.1',
+            'api_token': 'vkys219gn2jziReqdPJH0asGM3PKEQHP'
+        })
+
+        mock_get.side_effect = [mock_get_v1_sla_domain(), mock_get_v1_vmware_vm()]
+
+        mock_post.return_value = {"status_code": 204}
+
+        with self.assertRaises(AnsibleExitJson) as result:
+            rubrik_assign_sla.main()
+
+        self.assertEqual(result.exception.args[0]['changed'], True)
+        self.assertEqual(result.exception.args[0]['objects'], {
+            'vm-1': {'sla_name': 'Gold', 'changed': False},
+            'vm-2': {'sla_name': 'Gold', 'changed': True},
+            'vm-3': {'sla_name': 'Gold', 'changed': True},
+            'vm-4': {'sla_name': 'do not protect', 'changed': True}})
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertEqual(mock_post.call_args_list[0][0][1:4],
+                         ('internal', '/sla_domain/UNPROTECTED/assign', {'managedIds': ['vm_4_id']}))
+        self.assertEqual(mock_post.call_args_list[1][0][1:4],
+                         ('internal', '/sla_domain/gold_sla_id/assign', {'managedIds': ['vm_2_id', 'vm_3_id']}))
+
+    @patch.object(rubrik_assign_sla.rubrik_cdm.rubrik_cdm.Connect, 'post', autospec=True, spec_set=True)
+    @patch.object(rubrik_assign_sla.rubrik_cdm.rubrik_cdm.Connect, 'get', autospec=True, spec_set=True)
+    def test_module_bulk_assign_sla_idempotence(self, mock_get, mock_post):
+
+        def mock_get_v1_vmware_vm():
+            return {
+                "hasMore": False,
+                "data": [
+                    {"id": "vm_1_id", "name": "vm-1", "configuredSlaDomainId": "UNPROTECTED"},
+                    {"id": "vm_2_id", "name": "vm-2", "configuredSlaDomainId": "UNPROTECTED"}
+                ],
+                "total": 2
+            }
+
+        set_module_args({
+            'objects': ['vm-1', 'vm-2'],
+            'sla_name': 'do not protect',
+            'node_ip': '1.1.1.1',
+            'api_token': 'vkys219gn2jziReqdPJH0asGM3PKEQHP'
+        })
+
+        mock_get.return_value = mock_get_v1_vmware_vm()
+
+        with self.assertRaises(AnsibleExitJson) as result:
+            rubrik_assign_sla.main()
+
+        self.assertEqual(result.exception.args[0]['changed'], False)
+        self.assertEqual(result.exception.args[0]['response'], [])
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(mock_post.call_count, 0)
+
+    @patch.object(rubrik_assign_sla.rubrik_cdm.rubrik_cdm.Connect, 'post', autospec=True, spec_set=True)
+    @patch.object(rubrik_assign_sla.rubrik_cdm.rubrik_cdm.Connect, 'get', autospec=True, spec_set=True)
+    def test_module_fail_bulk_assign_sla_with_invalid_vm(self, mock_get, mock_post):
+
+        set_module_args({
+            'objects': ['vm-1', 'invalid-vm'],
+            'sla_name': 'do not protect',
+            'node_ip': '1.1.1.1',
+            'api_token': 'vkys219gn2jziReqdPJH0asGM3PKEQHP'
+        })
+
+        mock_get.return_value = {
+            "hasMore": False,
+            "data": [{"id": "vm_1_id", "name": "vm-1", "configuredSlaDomainId": "INHERIT"}],
+            "total": 1
+        }
+
+        with self.assertRaises(AnsibleFailJson) as result:
+            rubrik_assign_sla.main()
+
+        self.assertEqual(result.exception.args[0]['msg'], "The vmware object 'invalid-vm' was not found on the Rubrik cluster.")
+        self.assertEqual(mock_post.call_count, 0)
+
+    @patch.object(rubrik_assign_sla.rubrik_cdm.rubrik_cdm.Connect, 'post', autospec=True, spec_set=True)
+    @patch.object(rubrik_assign_sla.rubrik_cdm.rubrik_cdm.Connect, 'get', autospec=True, spec_set=True)
+    def test_module_assign_sla_lookup_cache(self, mock_get, mock_post):
+
+        responses = {
+            '/cluster/me': {"id": "cluster_id", "name": "cluster"},
+            '/sla_domain?limit=100&name=Gold&offset=0&primary_cluster_id=local': {
+                "hasMore": False, "data": [{"id": "gold_sla_id", "name": "Gold"}], "total": 1},
+            '/vmware/vm?is_relic=false&limit=100&name=test-vm&offset=0&primary_cluster_id=local': {
+                "hasMore": False, "data": [{"id": "vm_id", "name": "test-vm"}], "total": 1},
+            '/vmware/vm/vm_id': {"id": "vm_id", "name": "test-vm", "configuredSlaDomainId": "INHERIT"},
+        }
+
+        def mock_get_api(self, api_version, api_endpoint, timeout=15, authentication=True, params=None):
+            if params:
+                api_endpoint += "?" + "&".join("{0}={1}".format(key, value) for key, value in sorted(params.items()))
+            return responses[api_endpoint]
+
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+
+        set_module_args({
+            'object_name': 'test-vm',
+            'sla_name': 'Gold',
+            'lookup_cache_ttl': 300,
+            'lookup_cache_dir': cache_dir,
+            'node_ip': '1.1.1.1',
+            'api_token': 'vkys219gn2jziReqdPJH0asGM3PKEQHP'
+        })
+
+        mock_get.side_effect = mock_get_api
+        mock_post.return_value = {"status_code": 204}
+
+        with self.assertRaises(AnsibleExitJson):
+            rubrik_assign_sla.main()
+
+        self.assertEqual(mock_get.call_count, 4)
+
+        mock_get.reset_mock()
+
+        with self.assertRaises(AnsibleExitJson) as result:
+            rubrik_assign_sla.main()
+
+        self.assertEqual(result.exception.args[0]['changed'], True)
+        self.assertEqual([call[0][2] for call in mock_get.call_args_list], ['/vmware/vm/vm_id'])
+        self.assertEqual(mock_post.call_args[0][1:4], ('internal', '/sla_domain/gold_sla_id/assign', {'managedIds': ['vm_id']}))
+
 
 if __name__ == '__main__':
     unittest.main()
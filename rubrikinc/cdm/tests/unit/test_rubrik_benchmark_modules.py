@@ -0,0 +1,69 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import unittest
+from ansible_collections.rubrikinc.cdm.tests import benchmark_modules
+from ansible_collections.rubrikinc.cdm.tests.mock_cdm_server import MockCdmServer
+
+
+class TestRubrikBenchmarkModules(unittest.TestCase):
+
+    def test_sdk_import_time(self):
+        importtime_output = "\n".join([
+            "import time: self [us] | cumulative | imported package",
+            "import time:       120 |        120 |     rubrik_cdm.exceptions",
+            "import time:      2500 |      31250 |   rubrik_cdm",
+            "import time:        80 |      40000 | ansible_collections.rubrikinc.cdm.plugins.modules.rubrik_cluster_version",
+        ])
+
+        self.assertEqual(benchmark_modules.sdk_import_time(importtime_output), 0.03125)
+
+        # The SDK package imports its rubrik_cdm.rubrik_cdm submodule, which is then reported as the outermost import
+        importtime_output = "\n".join([
+            "import time:       288 |        288 |     rubrik_cdm.exceptions",
+            "import time:       648 |       1019 |   rubrik_cdm.api",
+            "import time:       754 |      41063 | rubrik_cdm.rubrik_cdm",
+            "import time:       900 |       1200 |   requests.compat",
+            "import time:       500 |       2000 | logging.handlers",
+        ])
+
+        self.assertEqual(benchmark_modules.sdk_import_time(importtime_output), 0.041063)
+        self.assertEqual(benchmark_modules.sdk_import_time(""), 0.0)
+
+    def test_summarize_and_compare(self):
+        runs = [
+            {"wall_clock": 0.5, "http_requests": 3, "http_errors": 0, "bytes_sent": 100, "bytes_received": 900, "peak_rss": 100,
+             "durations": {"api": 0.2}, "changed": True, "failed": False, "msg": None},
+            {"wall_clock": 0.3, "http_requests": 2, "http_errors": 0, "bytes_sent": 80, "bytes_received": 700, "peak_rss": 100,
+             "durations": {"api": 0.1}, "changed": False, "failed": False, "msg": None},
+            {"wall_clock": 0.4, "http_requests": 2, "http_errors": 0, "bytes_sent": 80, "bytes_received": 700, "peak_rss": 100,
+             "durations": {"api": 0.15}, "changed": False, "failed": False, "msg": None},
+        ]
+
+        summary = benchmark_modules.summarize(runs)
+
+        self.assertEqual(summary["wall_clock"], 0.4)
+        self.assertEqual(summary["http_requests"], 2)
+        self.assertEqual(summary["durations"], {"api": 0.15})
+        self.assertEqual(summary["runs"], 3)
+        self.assertEqual(summary["changed"], False)
+
+        baseline = {"modules": {"rubrik_assign_sla": dict(summary, wall_clock=0.5, http_requests=4)}}
+        changes = benchmark_modules.compare({"modules": {"rubrik_assign_sla": summary}}, baseline)
+
+        self.assertEqual(changes["rubrik_assign_sla"]["wall_clock"], -0.2)
+        self.assertEqual(changes["rubrik_assign_sla"]["http_requests"], -0.5)
+        self.assertEqual(changes["rubrik_assign_sla"]["peak_rss"], 0.0)
+
+    def test_run_scenario(self):
+        with MockCdmServer(vms=10, hosts=2, mssql_dbs=2, managed_volumes=1) as server:
+            measurements = benchmark_modules.run_scenario(server, "rubrik_cluster_version", {})
+
+        self.assertEqual(measurements["failed"], False)
+        self.assertEqual(measurements["http_requests"], 1)
+        self.assertEqual(measurements["endpoints"], {"GET /api/v1/cluster/me/version": 1})
+        self.assertGreater(measurements["bytes_received"], 0)
+        self.assertGreater(measurements["peak_rss"], 0)
+        self.assertGreater(measurements["wall_clock"], measurements["durations"]["main"])
+        self.assertGreater(measurements["durations"]["sdk_import"], 0)
+        self.assertGreaterEqual(measurements["durations"]["api"], measurements["durations"]["name_resolution"])
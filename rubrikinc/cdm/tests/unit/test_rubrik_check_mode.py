@@ -0,0 +1,147 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+import unittest
+from unittest.mock import patch
+from ansible.module_utils import basic
+from ansible.module_utils._text import to_bytes
+from ansible_collections.rubrikinc.cdm.tests.mock_cdm_server import MockCdmServer
+import ansible_collections.rubrikinc.cdm.plugins.modules.rubrik_assign_sla as rubrik_assign_sla
+import ansible_collections.rubrikinc.cdm.plugins.modules.rubrik_configure_smtp_settings as rubrik_configure_smtp_settings
+import ansible_collections.rubrikinc.cdm.plugins.modules.rubrik_configure_timezone as rubrik_configure_timezone
+import ansible_collections.rubrikinc.cdm.plugins.modules.rubrik_create_sla as rubrik_create_sla
+import ansible_collections.rubrikinc.cdm.plugins.modules.rubrik_dns_servers as rubrik_dns_servers
+import ansible_collections.rubrikinc.cdm.plugins.modules.rubrik_physical_host as rubrik_physical_host
+
+
+def set_module_args(args):
+    """prepare arguments so that they will be picked up during module creation"""
+    args = json.dumps({'ANSIBLE_MODULE_ARGS': args})
+    basic._ANSIBLE_ARGS = to_bytes(args)
+
+
+class AnsibleExitJson(Exception):
+    """Exception class to be raised by module.exit_json and caught by the test case"""
+    pass
+
+
+class AnsibleFailJson(Exception):
+    """Exception class to be raised by module.fail_json and caught by the test case"""
+    pass
+
+
+def exit_json(*args, **kwargs):
+    """function to patch over exit_json; package return data into an exception"""
+    if 'changed' not in kwargs:
+        kwargs['changed'] = False
+    raise AnsibleExitJson(kwargs)
+
+
+def fail_json(*args, **kwargs):
+    """function to patch over fail_json; package return data into an exception"""
+    kwargs['failed'] = True
+    raise AnsibleFailJson(kwargs)
+
+
+class TestRubrikCheckMode(unittest.TestCase):
+
+    def setUp(self):
+        self.mock_module_helper = patch.multiple(basic.AnsibleModule,
+                                                 exit_json=exit_json,
+                                                 fail_json=fail_json)
+        self.mock_module_helper.start()
+        self.addCleanup(self.mock_module_helper.stop)
+
+        self.server = MockCdmServer(vms=1200, hosts=4, mssql_dbs=4, managed_volumes=2, seed=1).start()
+        self.addCleanup(self.server.stop)
+
+    def module_args(self, check_mode=True, **kwargs):
+        kwargs.update({'node_ip': self.server.node_ip, 'api_token': 'mock-token', '_ansible_check_mode': check_mode,
+                       '_ansible_diff': True})
+        set_module_args(kwargs)
+
+    def run_module(self, module):
+        with self.assertRaises(AnsibleExitJson) as result:
+            module.main()
+        return result.exception.args[0]
+
+    def writes(self):
+        return dict((endpoint, count) for endpoint, count in self.server.stats()['endpoints'].items() if not endpoint.startswith('GET '))
+
+    def test_dns_servers(self):
+        self.module_args(server_ip=['10.0.0.1', '10.0.0.2'])
+
+        result = self.run_module(rubrik_dns_servers)
+
+        self.assertEqual(result['changed'], True)
+        self.assertEqual(result['diff'], {'before': {'servers': []}, 'after': {'servers': ['10.0.0.1', '10.0.0.2']}})
+        self.assertEqual(self.writes(), {})
+
+        # The check did not configure the DNS servers
+        self.module_args(check_mode=False, server_ip=['10.0.0.1', '10.0.0.2'])
+        self.assertEqual(self.run_module(rubrik_dns_servers)['changed'], True)
+
+        self.module_args(server_ip=['10.0.0.1', '10.0.0.2'])
+        self.assertEqual(self.run_module(rubrik_dns_servers)['changed'], False)
+
+    def test_patch_is_reported_against_the_current_state(self):
+        self.module_args(timezone='Europe/London')
+
+        result = self.run_module(rubrik_configure_timezone)
+
+        self.assertEqual(result['response'], {'timezone.timezone': {'before': 'America/Chicago', 'after': 'Europe/London'}})
+        self.assertEqual(result['diff']['before']['timezone'], {'timezone': 'America/Chicago'})
+        self.assertEqual(result['diff']['after']['timezone'], {'timezone': 'Europe/London'})
+        self.assertEqual(result['diff']['after']['name'], 'mock-cluster')
+        self.assertEqual(self.writes(), {})
+
+    def test_object_is_picked_out_of_the_listing(self):
+        smtp = {'hostname': 'smtp.example.com', 'port': 25, 'from_email': 'rubrik@example.com', 'smtp_username': 'rubrik',
+                'smtp_password': 'secret'}
+        self.module_args(check_mode=False, **smtp)
+        self.run_module(rubrik_configure_smtp_settings)
+        self.server.reset_stats()
+
+        self.module_args(**dict(smtp, port=587, encryption='STARTTLS'))
+        result = self.run_module(rubrik_configure_smtp_settings)
+
+        self.assertEqual(result['diff']['before']['smtpPort'], 25)
+        self.assertEqual(result['diff']['after']['smtpPort'], 587)
+        self.assertEqual(result['diff']['after']['smtpSecurity'], 'STARTTLS')
+        self.assertEqual(self.writes(), {})
+
+    def test_new_object(self):
+        self.module_args(name='Platinum', daily_frequency=1, daily_retention=30)
+
+        result = self.run_module(rubrik_create_sla)
+
+        self.assertEqual(result['changed'], True)
+        self.assertEqual(result['diff']['before'], None)
+        self.assertEqual(result['diff']['after']['name'], 'Platinum')
+        self.assertEqual(self.writes(), {})
+
+    def test_bulk_assign_sla_only_reads(self):
+        objects = dict(('vm-{0:06d}'.format(index), 'Gold') for index in range(0, 1200, 3))
+        self.module_args(objects=objects)
+
+        result = self.run_module(rubrik_assign_sla)
+
+        changed = sorted(vm_name for vm_name, vm in result['objects'].items() if vm['changed'])
+        self.assertEqual(result['changed'], True)
+        self.assertEqual(sorted(result['diff']['after']), changed)
+        self.assertTrue(all(sla_name != 'Gold' for sla_name in result['diff']['before'].values()))
+        self.assertEqual(result['response'], [])
+        self.assertEqual(self.writes(), {})
+        # The VM inventory is read in pages and the SLA Domain listing stops at the requested SLA Domain
+        self.assertEqual(self.server.stats()['endpoints'], {'GET /api/v1/sla_domain': 1, 'GET /api/v1/vmware/vm': 3})
+
+    def test_bulk_physical_host(self):
+        self.module_args(hostname=['host-00000.mock.local', 'new-host.mock.local'], action='add')
+
+        result = self.run_module(rubrik_physical_host)
+
+        self.assertEqual(result['summary']['added'], 1)
+        self.assertEqual(result['diff'], {'before': {'hosts': ['host-00000.mock.local']},
+                                          'after': {'hosts': ['host-00000.mock.local', 'new-host.mock.local']}})
+        self.assertEqual(self.writes(), {})
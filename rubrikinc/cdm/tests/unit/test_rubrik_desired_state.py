@@ -0,0 +1,122 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+import unittest
+from unittest.mock import patch
+from ansible.module_utils import basic
+from ansible.module_utils._text import to_bytes
+from ansible_collections.rubrikinc.cdm.plugins.module_utils.rubrik_cdm import sdk_changed, state_differences
+from ansible_collections.rubrikinc.cdm.tests.mock_cdm_server import MockCdmServer
+import ansible_collections.rubrikinc.cdm.plugins.modules.rubrik_configure_ntp as rubrik_configure_ntp
+import ansible_collections.rubrikinc.cdm.plugins.modules.rubrik_configure_smtp_settings as rubrik_configure_smtp_settings
+import ansible_collections.rubrikinc.cdm.plugins.modules.rubrik_physical_fileset as rubrik_physical_fileset
+
+
+def set_module_args(args):
+    """prepare arguments so that they will be picked up during module creation"""
+    args = json.dumps({'ANSIBLE_MODULE_ARGS': args})
+    basic._ANSIBLE_ARGS = to_bytes(args)
+
+
+class AnsibleExitJson(Exception):
+    """Exception class to be raised by module.exit_json and caught by the test case"""
+    pass
+
+
+class AnsibleFailJson(Exception):
+    """Exception class to be raised by module.fail_json and caught by the test case"""
+    pass
+
+
+def exit_json(*args, **kwargs):
+    """function to patch over exit_json; package return data into an exception"""
+    if 'changed' not in kwargs:
+        kwargs['changed'] = False
+    raise AnsibleExitJson(kwargs)
+
+
+def fail_json(*args, **kwargs):
+    """function to patch over fail_json; package return data into an exception"""
+    kwargs['failed'] = True
+    raise AnsibleFailJson(kwargs)
+
+
+class TestRubrikStateDifferences(unittest.TestCase):
+
+    def test_only_the_desired_keys_are_compared(self):
+        current = {'id': 'smtp-1', 'smtpPort': 25, 'smtpSecurity': 'NONE', 'timezone': {'timezone': 'UTC', 'zone': 'Z'}}
+        desired = {'smtpPort': 587, 'smtpSecurity': 'NONE', 'timezone': {'timezone': 'Europe/London'}}
+
+        self.assertEqual(state_differences(current, desired), {
+            'smtpPort': {'before': 25, 'after': 587},
+            'timezone.timezone': {'before': 'UTC', 'after': 'Europe/London'}})
+        self.assertEqual(state_differences(current, {'smtpSecurity': 'NONE'}), {})
+
+    def test_missing_object(self):
+        self.assertEqual(state_differences(None, {'name': 'fileset', 'includes': []}), {
+            'name': {'before': None, 'after': 'fileset'},
+            'includes': {'before': None, 'after': []}})
+
+    def test_sdk_changed(self):
+        self.assertFalse(sdk_changed("No change required. The host 'host-1' is already connected to the Rubrik cluster."))
+        self.assertFalse(sdk_changed("No Change Required. All Hosts have already been added or supplied list was empty."))
+        self.assertTrue(sdk_changed({'status_code': 204}))
+
+
+class TestRubrikDesiredState(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = MockCdmServer(vms=10, hosts=2, mssql_dbs=2, managed_volumes=1, seed=1).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.mock_module_helper = patch.multiple(basic.AnsibleModule,
+                                                 exit_json=exit_json,
+                                                 fail_json=fail_json)
+        self.mock_module_helper.start()
+        self.addCleanup(self.mock_module_helper.stop)
+
+        self.server.reset_stats()
+
+    def run_module(self, module, **kwargs):
+        kwargs.update({'node_ip': self.server.node_ip, 'api_token': 'mock-token'})
+        set_module_args(kwargs)
+
+        with self.assertRaises(AnsibleExitJson) as result:
+            module.main()
+        return result.exception.args[0]
+
+    def test_converged_setting_is_a_single_read(self):
+        self.assertEqual(self.run_module(rubrik_configure_ntp, ntp_servers=['ntp-2', 'ntp-1'])['changed'], True)
+        self.server.reset_stats()
+
+        result = self.run_module(rubrik_configure_ntp, ntp_servers=['ntp-1', 'ntp-2'])
+
+        self.assertEqual(result['changed'], False)
+        self.assertEqual(self.server.stats()['endpoints'], {'GET /api/internal/cluster/me/ntp_server': 1})
+
+    def test_only_differing_settings_are_written(self):
+        smtp = {'hostname': 'smtp.example.com', 'port': 25, 'from_email': 'rubrik@example.com', 'smtp_username': 'rubrik',
+                'smtp_password': 'secret'}
+        self.run_module(rubrik_configure_smtp_settings, **smtp)
+        self.server.reset_stats()
+
+        self.assertEqual(self.run_module(rubrik_configure_smtp_settings, **smtp)['changed'], False)
+        diff = self.run_module(rubrik_configure_smtp_settings, _ansible_diff=True, **dict(smtp, port=587))['diff']
+        self.assertEqual((diff['before']['smtpPort'], diff['after']['smtpPort']), (25, 587))
+        self.assertEqual(diff['after']['smtpHostname'], 'smtp.example.com')
+        endpoints = self.server.stats()['endpoints']
+        self.assertEqual(endpoints.pop('GET /api/internal/smtp_instance'), 2)
+        self.assertEqual([endpoint.split('/')[:-1] for endpoint in endpoints], [['PATCH ', 'api', 'internal', 'smtp_instance']])
+
+    def test_fileset_template_paths_are_compared_in_any_order(self):
+        fileset = {'fileset_name': 'home', 'operating_system': 'Linux', 'include': ['/home', '/etc'], 'exclude': ['*.tmp']}
+
+        self.assertEqual(self.run_module(rubrik_physical_fileset, **fileset)['changed'], True)
+        self.assertEqual(self.run_module(rubrik_physical_fileset, **dict(fileset, include=['/etc', '/home']))['changed'], False)
+        self.assertEqual(self.run_module(rubrik_physical_fileset, **dict(fileset, exclude=[]))['changed'], True)
@@ -6,6 +6,7 @@ import unittest
 from unittest.mock import Mock, patch
 from ansible.module_utils import basic
 from ansible.module_utils._text import to_bytes
+from ansible_collections.rubrikinc.cdm.plugins.module_utils.rubrik_cdm import rubrik_connect_class
 import ansible_collections.rubrikinc.cdm.plugins.modules.rubrik_end_user_authorization as rubrik_end_user_authorization
 
 
@@ -69,8 +70,7 @@ class TestRubrikEndUserAuthorization(unittest.TestCase):
         self.assertEqual(result.exception.args[0]['msg'],
                          'value of object_type must be one of: vmware, got: invalid_object_type')
 
-    @patch.object(rubrik_end_user_authorization.rubrik_cdm.rubrik_cdm.Connect,
-                  'object_id', autospec=True, spec_set=True)
+    @patch.object(rubrik_connect_class(), 'object_id', autospec=True, spec_set=True)
     @patch.object(rubrik_end_user_authorization.rubrik_cdm.rubrik_cdm.Connect, 'get', autospec=True, spec_set=True)
     def test_module_fail_with_invalid_user(self, mock_get, mock_object_id):
 
@@ -100,8 +100,7 @@ class TestRubrikEndUserAuthorization(unittest.TestCase):
             result.exception.args[0]['msg'],
             'The Rubrik cluster does not contain a End User account named "testuser".')
 
-    @patch.object(rubrik_end_user_authorization.rubrik_cdm.rubrik_cdm.Connect,
-                  'object_id', autospec=True, spec_set=True)
+    @patch.object(rubrik_connect_class(), 'object_id', autospec=True, spec_set=True)
     @patch.object(rubrik_end_user_authorization.rubrik_cdm.rubrik_cdm.Connect, 'get', autospec=True, spec_set=True)
     def test_module_idempotence(self, mock_get, mock_object_id):
 
@@ -177,8 +176,7 @@ class TestRubrikEndUserAuthorization(unittest.TestCase):
             result.exception.args[0]['response'],
             'No change required. The End User "testuser" is already authorized to interact with the "server_1" VM.')
 
-    @patch.object(rubrik_end_user_authorization.rubrik_cdm.rubrik_cdm.Connect,
-                  'object_id', autospec=True, spec_set=True)
+    @patch.object(rubrik_connect_class(), 'object_id', autospec=True, spec_set=True)
     @patch.object(rubrik_end_user_authorization.rubrik_cdm.rubrik_cdm.Connect, 'post', autospec=True, spec_set=True)
     @patch.object(rubrik_end_user_authorization.rubrik_cdm.rubrik_cdm.Connect, 'get', autospec=True, spec_set=True)
     def test_module_configure_user_authorization(self, mock_get, mock_post, mock_object_id):
@@ -0,0 +1,94 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+import unittest
+from unittest.mock import patch
+from ansible.module_utils import basic
+from ansible.module_utils._text import to_bytes
+from ansible_collections.rubrikinc.cdm.tests.mock_cdm_server import MockCdmServer
+import ansible_collections.rubrikinc.cdm.plugins.modules.rubrik_get_vsphere_live_mount as rubrik_get_vsphere_live_mount
+import ansible_collections.rubrikinc.cdm.plugins.modules.rubrik_vsphere_live_mount as rubrik_vsphere_live_mount
+
+
+def set_module_args(args):
+    """prepare arguments so that they will be picked up during module creation"""
+    args = json.dumps({'ANSIBLE_MODULE_ARGS': args})
+    basic._ANSIBLE_ARGS = to_bytes(args)
+
+
+class AnsibleExitJson(Exception):
+    """Exception class to be raised by module.exit_json and caught by the test case"""
+    pass
+
+
+class AnsibleFailJson(Exception):
+    """Exception class to be raised by module.fail_json and caught by the test case"""
+    pass
+
+
+def exit_json(*args, **kwargs):
+    """function to patch over exit_json; package return data into an exception"""
+    if 'changed' not in kwargs:
+        kwargs['changed'] = False
+    raise AnsibleExitJson(kwargs)
+
+
+def fail_json(*args, **kwargs):
+    """function to patch over fail_json; package return data into an exception"""
+    kwargs['failed'] = True
+    raise AnsibleFailJson(kwargs)
+
+
+class TestRubrikGetVsphereLiveMount(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = MockCdmServer(vms=10, hosts=1, mssql_dbs=1, managed_volumes=1, seed=1).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.mock_module_helper = patch.multiple(basic.AnsibleModule, exit_json=exit_json, fail_json=fail_json)
+        self.mock_module_helper.start()
+        self.addCleanup(self.mock_module_helper.stop)
+
+        if not self.server.state.collections['vm_mount']:
+            self.run_module(rubrik_vsphere_live_mount, vms=['vm-000001', 'vm-000002', 'vm-000003'])
+
+            # The Live Mount of vm-000002 was forgotten five days ago
+            mount = self.server.state.listing('vm_mount', {'vm_id': 'VirtualMachine:::vm-000002'})['data'][0]
+            self.server.state.collections['vm_mount'][mount['id']]['mountTimestamp'] = '2020-01-10T08:00:00.000Z'
+
+        self.server.reset_stats()
+
+    def run_module(self, module, **kwargs):
+        kwargs.update({'node_ip': self.server.node_ip, 'api_token': 'mock-token'})
+        set_module_args(kwargs)
+
+        with self.assertRaises(AnsibleExitJson) as result:
+            module.main()
+        return result.exception.args[0]
+
+    def test_every_live_mount_is_indexed_in_one_pass(self):
+        result = self.run_module(rubrik_get_vsphere_live_mount)
+
+        live_mounts = result['live_mounts']
+        index = result['index']
+        self.assertEqual(sorted(index['by_vm_name']), ['vm-000001', 'vm-000002', 'vm-000003'])
+        self.assertEqual(sorted(sum(index['by_vm_name'].values(), [])), sorted(live_mounts))
+        self.assertEqual(list(index['by_host']), ['esxi-0001.mock.local'])
+        self.assertEqual(sorted(live_mounts[mount_id]['vmName'] for mount_id in index['by_mounted_vm_name'].values()),
+                         ['vm-000001', 'vm-000002', 'vm-000003'])
+        self.assertEqual(live_mounts[index['by_age'][0]]['vmName'], 'vm-000002')
+        self.assertEqual(self.server.stats()['endpoints'], {'GET /api/v1/vmware/vm/snapshot/mount': 1, 'GET /api/v1/vmware/vm': 1,
+                                                            'GET /api/v1/vmware/host': 1})
+
+    def test_older_than(self):
+        result = self.run_module(rubrik_get_vsphere_live_mount, older_than=72)
+
+        self.assertEqual([mount['vmName'] for mount in result['live_mounts'].values()], ['vm-000002'])
+        self.assertGreater(list(result['live_mounts'].values())[0]['age'], 72 * 3600)
+        self.assertEqual(list(result['index']['by_vm_name']), ['vm-000002'])
@@ -0,0 +1,79 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import unittest
+from unittest.mock import Mock, patch
+from ansible.module_utils.connection import ConnectionError
+import ansible_collections.rubrikinc.cdm.plugins.httpapi.rubrik as rubrik_httpapi
+
+
+def mock_response(status_code, body):
+    response = Mock()
+    response.status_code = status_code
+    response.json.return_value = body
+    response.text = str(body)
+    return response
+
+
+class TestRubrikHttpApi(unittest.TestCase):
+
+    def setUp(self):
+        self.connection = Mock()
+        self.connection.get_option.side_effect = {
+            'host': '1.1.1.1',
+            'remote_user': 'admin',
+            'password': 'password',
+            'validate_certs': False,
+        }.get
+
+        self.httpapi = rubrik_httpapi.HttpApi(self.connection)
+
+        self.mock_get_option = patch.object(rubrik_httpapi.HttpApi, 'get_option', return_value=None)
+        self.mock_get_option.start()
+        self.addCleanup(self.mock_get_option.stop)
+
+    @patch.object(rubrik_httpapi.requests.Session, 'request', autospec=True, spec_set=True)
+    def test_send_request_reuses_session_token(self, mock_request):
+        mock_request.side_effect = [
+            mock_response(200, {'token': 'session_token'}),
+            mock_response(200, {'version': '5.0.1-1280'}),
+            mock_response(200, {'version': '5.0.1-1280'}),
+        ]
+
+        for _ in range(2):
+            result = self.httpapi.send_request(None, call_type='GET', api_version='v1', api_endpoint='/cluster/me/version')
+
+        self.assertEqual(result, {'version': '5.0.1-1280'})
+        self.assertEqual(mock_request.call_count, 3)
+        self.assertEqual(mock_request.call_args[1]['headers'], {'Authorization': 'Bearer session_token'})
+
+        stats = self.httpapi.get_connection_stats()
+        self.assertEqual(stats['requests'], 3)
+        self.assertEqual(stats['logins'], 1)
+
+    @patch.object(rubrik_httpapi.requests.Session, 'request', autospec=True, spec_set=True)
+    def test_send_request_login_again_on_expired_token(self, mock_request):
+        mock_request.side_effect = [
+            mock_response(200, {'token': 'session_token'}),
+            mock_response(401, {'errorType': 'user_error', 'message': 'Token expired'}),
+            mock_response(200, {'token': 'new_session_token'}),
+            mock_response(204, None),
+        ]
+
+        result = self.httpapi.send_request({'name': 'Gold'}, call_type='POST', api_version='v1', api_endpoint='/sla_domain')
+
+        self.assertEqual(result, {'status_code': 204})
+        self.assertEqual(mock_request.call_args[1]['headers'], {'Authorization': 'Bearer new_session_token'})
+        self.assertEqual(self.httpapi.get_connection_stats()['logins'], 2)
+
+    @patch.object(rubrik_httpapi.requests.Session, 'request', autospec=True, spec_set=True)
+    def test_send_request_raises_api_error_message(self, mock_request):
+        mock_request.side_effect = [
+            mock_response(200, {'token': 'session_token'}),
+            mock_response(404, {'errorType': 'user_error', 'message': 'Not Found'}),
+        ]
+
+        with self.assertRaises(ConnectionError) as error:
+            self.httpapi.send_request(None, call_type='GET', api_version='v1', api_endpoint='/vmware/vm/invalid')
+
+        self.assertEqual(str(error.exception), 'Not Found')
@@ -0,0 +1,112 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+import os
+import re
+import subprocess
+import sys
+import unittest
+import ansible_collections.rubrikinc.cdm.plugins.module_utils.rubrik_cdm as rubrik_module_utils
+
+COLLECTION = "ansible_collections.rubrikinc.cdm"
+
+MODULES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "plugins", "modules")
+
+MODULES = sorted(name[:-3] for name in os.listdir(MODULES_DIR) if name.startswith("rubrik_") and name.endswith(".py"))
+
+# Import time budgets as a fraction of the import time of ansible.module_utils.basic, measured in the same interpreter,
+# which every Ansible module imports anyway. Importing requests alone takes about twice as long as ansible.module_utils.basic,
+# so the budgets catch an eager import of a heavy dependency without depending on the speed of the runner.
+MODULE_UTILS_IMPORT_BUDGET = 1.5
+MODULE_IMPORT_BUDGET = 0.5
+
+# The packages that must only be imported once a module talks to the Rubrik cluster
+DEFERRED_IMPORTS = ["rubrik_cdm", "requests", "urllib3", "multiprocessing", "ansible.module_utils.connection", "cryptography"]
+
+
+def run_python(code, *options):
+    """Run the code in a new interpreter started with the options and return its stdout and stderr."""
+
+    process = subprocess.Popen([sys.executable] + list(options) + ["-c", code], stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                               universal_newlines=True)
+    stdout, stderr = process.communicate()
+    if process.returncode != 0:
+        raise AssertionError(stderr)
+
+    return stdout, stderr
+
+
+def import_times(stderr):
+    """Return the cumulative import time in seconds of every module imported at the top level from python -X importtime."""
+
+    times = {}
+    for line in stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \| (\S+)$", line)
+        if match:
+            times[match.group(2)] = int(match.group(1)) / 1000000.0
+
+    return times
+
+
+def deferred_imports_loaded(modules):
+    return sorted(name for name in modules for deferred in DEFERRED_IMPORTS if name == deferred or name.startswith(deferred + "."))
+
+
+IMPORT_CODE = "\n".join([
+    "import json, sys",
+    "import ansible.module_utils.basic",
+    "import {0}.plugins.module_utils.rubrik_cdm".format(COLLECTION),
+] + ["import {0}.plugins.modules.{1}".format(COLLECTION, module) for module in MODULES] + [
+    "print(json.dumps(sorted(sys.modules)))",
+])
+
+
+class TestRubrikImportTime(unittest.TestCase):
+
+    def test_module_import_defers_heavy_dependencies(self):
+        stdout, stderr = run_python(IMPORT_CODE)
+
+        # Importing module_utils and every module, as Ansible does before main() runs, must not load the SDK or its HTTP stack
+        self.assertEqual(deferred_imports_loaded(json.loads(stdout)), [])
+
+    @unittest.skipIf(sys.version_info < (3, 7), "python -X importtime requires Python 3.7")
+    def test_module_import_time_budget(self):
+        times = import_times(run_python(IMPORT_CODE, "-X", "importtime")[1])
+        basic = times["ansible.module_utils.basic"]
+
+        module_utils = "{0}.plugins.module_utils.rubrik_cdm".format(COLLECTION)
+        self.assertLess(times[module_utils], basic * MODULE_UTILS_IMPORT_BUDGET)
+        for module in MODULES:
+            self.assertLess(times["{0}.plugins.modules.{1}".format(COLLECTION, module)], basic * MODULE_IMPORT_BUDGET, module)
+
+    def test_argument_validation_failure_does_not_import_sdk(self):
+        code = "\n".join([
+            "import json, sys",
+            "from ansible.module_utils import basic",
+            "from ansible.module_utils._text import to_bytes",
+            "import {0}.plugins.modules.rubrik_assign_sla as module".format(COLLECTION),
+            "basic._ANSIBLE_ARGS = to_bytes(json.dumps({'ANSIBLE_MODULE_ARGS': {'node_ip': '1.1.1.1', 'api_token': 'token'}}))",
+            "try:",
+            "    module.main()",
+            "except SystemExit:",
+            "    pass",
+            "sys.stderr.write(json.dumps(sorted(sys.modules)))",
+        ])
+
+        process = subprocess.Popen([sys.executable, "-c", code], stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+        stdout, stderr = process.communicate()
+
+        self.assertTrue(json.loads(stdout)["failed"])
+        self.assertEqual(deferred_imports_loaded(json.loads(stderr)), [])
+
+    def test_lazy_import_loads_once(self):
+        imported = []
+        lazy_json = rubrik_module_utils.LazyImport("json", on_import=imported.append)
+
+        self.assertEqual(imported, [])
+        self.assertEqual(lazy_json.dumps([1]), "[1]")
+        self.assertEqual(lazy_json.loads("[1]"), [1])
+        self.assertEqual(len(imported), 1)
+        self.assertTrue(rubrik_module_utils.is_importable("json"))
+        self.assertFalse(rubrik_module_utils.is_importable("rubrik_cdm_missing"))
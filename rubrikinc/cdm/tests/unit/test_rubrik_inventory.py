@@ -0,0 +1,140 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import unittest
+from unittest.mock import patch
+from ansible.inventory.data import InventoryData
+from ansible.parsing.dataloader import DataLoader
+import ansible_collections.rubrikinc.cdm.plugins.inventory.rubrik as rubrik_inventory
+
+
+def mock_get_endpoint(self, api_version, api_endpoint, timeout=15, params=None):
+    if api_endpoint == "/cluster/me":
+        return {"id": "cluster_id", "name": "prod-cluster"}
+
+    listings = {
+        "/vmware/vm": [
+            {"id": "VirtualMachine:::1", "name": "web01", "ipAddress": "10.0.0.1", "primaryClusterId": "cluster_id",
+             "effectiveSlaDomainId": "sla_gold", "effectiveSlaDomainName": "Gold"},
+            {"id": "VirtualMachine:::2", "name": "web02", "ipAddress": "", "primaryClusterId": "replica_cluster_id",
+             "effectiveSlaDomainId": "UNPROTECTED", "effectiveSlaDomainName": "Unprotected"},
+        ],
+        "/host": [
+            {"id": "Host:::1", "name": "sql01", "hostname": "sql01.example.com", "operatingSystemType": "Windows",
+             "status": "Connected", "primaryClusterId": "cluster_id"},
+        ],
+        "/mssql/db": [
+            {"id": "MssqlDatabase:::1", "name": "orders", "instanceName": "MSSQLSERVER", "rootProperties": {"rootName": "sql01"},
+             "primaryClusterId": "cluster_id", "effectiveSlaDomainId": "sla_silver", "effectiveSlaDomainName": "Silver"},
+        ],
+        "/managed_volume": [],
+    }
+
+    data = listings[api_endpoint][params["offset"]:params["offset"] + params["limit"]]
+    return {"hasMore": params["offset"] + params["limit"] < len(listings[api_endpoint]), "data": data}
+
+
+class TestRubrikInventory(unittest.TestCase):
+
+    def setUp(self):
+        self.options = {
+            'node_ip': '1.1.1.1',
+            'username': None,
+            'password': None,
+            'api_token': 'vkys219gn2jziReqdPJH0asGM3PKEQHP',
+            'object_types': ['vmware', 'physical_host', 'mssql_db', 'managed_volume'],
+            'page_size': 1,
+            'max_concurrency': 4,
+            'timeout': 30,
+            'strict': False,
+            'compose': {},
+            'groups': {},
+            'keyed_groups': [],
+            'cache': True,
+        }
+
+        self.inventory = rubrik_inventory.InventoryModule()
+        self.inventory._cache = {}
+
+        self.mock_get_option = patch.object(rubrik_inventory.InventoryModule, 'get_option', side_effect=self.options.get)
+        self.mock_get_option.start()
+        self.addCleanup(self.mock_get_option.stop)
+
+        self.mock_read_config_data = patch.object(rubrik_inventory.InventoryModule, '_read_config_data')
+        self.mock_read_config_data.start()
+        self.addCleanup(self.mock_read_config_data.stop)
+
+    def test_verify_file(self):
+        with patch('os.path.exists', return_value=True), patch('os.access', return_value=True):
+            self.assertTrue(self.inventory.verify_file('/tmp/prod.rubrik.yml'))
+            self.assertFalse(self.inventory.verify_file('/tmp/prod.aws_ec2.yml'))
+
+    @patch.object(rubrik_inventory.rubrik_cdm.Connect, 'get', autospec=True, spec_set=True)
+    def test_parse_groups_objects(self, mock_get):
+        mock_get.side_effect = mock_get_endpoint
+
+        inventory = InventoryData()
+        self.inventory.parse(inventory, DataLoader(), '/tmp/prod.rubrik.yml', cache=False)
+
+        self.assertEqual(sorted(inventory.hosts), ['sql01', 'sql01/MSSQLSERVER/orders', 'web01', 'web02'])
+
+        groups = dict((name, sorted(host.name for host in group.get_hosts())) for name, group in inventory.groups.items())
+        self.assertEqual(groups['rubrik_vmware'], ['web01', 'web02'])
+        self.assertEqual(groups['rubrik_physical_host'], ['sql01'])
+        self.assertEqual(groups['rubrik_mssql_db'], ['sql01/MSSQLSERVER/orders'])
+        self.assertEqual(groups['rubrik_managed_volume'], [])
+        self.assertEqual(groups['rubrik_sla_gold'], ['web01'])
+        self.assertEqual(groups['rubrik_sla_silver'], ['sql01/MSSQLSERVER/orders'])
+        self.assertEqual(groups['rubrik_protected'], ['sql01/MSSQLSERVER/orders', 'web01'])
+        self.assertEqual(groups['rubrik_unprotected'], ['web02'])
+        self.assertEqual(groups['rubrik_cluster_prod_cluster'], ['sql01', 'sql01/MSSQLSERVER/orders', 'web01'])
+        self.assertEqual(groups['rubrik_cluster_replica_cluster_id'], ['web02'])
+
+        self.assertEqual(inventory.get_host('web01').vars['ansible_host'], '10.0.0.1')
+        self.assertNotIn('ansible_host', inventory.get_host('web02').vars)
+        self.assertEqual(inventory.get_host('sql01').vars['ansible_host'], 'sql01.example.com')
+        self.assertEqual(inventory.get_host('sql01/MSSQLSERVER/orders').vars['rubrik_sql_instance'], 'MSSQLSERVER')
+
+    @patch.object(rubrik_inventory.display, 'warning')
+    @patch.object(rubrik_inventory.rubrik_cdm.Connect, 'get', autospec=True, spec_set=True)
+    def test_parse_objects_with_the_same_name(self, mock_get, mock_warning):
+
+        def mock_get_duplicates(self, api_version, api_endpoint, timeout=15, params=None):
+            if api_endpoint == "/vmware/vm":
+                return {"hasMore": False, "data": [
+                    {"id": "VirtualMachine:::1", "name": "web01", "ipAddress": "10.0.0.1"},
+                    {"id": "VirtualMachine:::2", "name": "web01", "ipAddress": "10.0.1.1"}]}
+            if api_endpoint == "/host":
+                return {"hasMore": False, "data": [{"id": "Host:::1", "hostname": "sql01.example.com"},
+                                                   {"id": "Host:::2", "name": "web01", "hostname": "web01.example.com"}]}
+            return mock_get_endpoint(self, api_version, api_endpoint, timeout, params)
+
+        mock_get.side_effect = mock_get_duplicates
+        self.options['object_types'] = ['vmware', 'physical_host']
+
+        inventory = InventoryData()
+        self.inventory.parse(inventory, DataLoader(), '/tmp/prod.rubrik.yml', cache=False)
+
+        self.assertEqual(sorted(inventory.hosts), ['sql01.example.com', 'web01', 'web01_Host:::2', 'web01_VirtualMachine:::2'])
+        self.assertEqual(inventory.get_host('web01').vars['ansible_host'], '10.0.0.1')
+        self.assertEqual(inventory.get_host('web01_VirtualMachine:::2').vars['ansible_host'], '10.0.1.1')
+        self.assertEqual(inventory.get_host('web01_Host:::2').vars['ansible_host'], 'web01.example.com')
+
+        # The physical host with the name of a VM keeps its own group
+        groups = dict((name, sorted(host.name for host in group.get_hosts())) for name, group in inventory.groups.items())
+        self.assertEqual(groups['rubrik_vmware'], ['web01', 'web01_VirtualMachine:::2'])
+        self.assertEqual(groups['rubrik_physical_host'], ['sql01.example.com', 'web01_Host:::2'])
+        self.assertEqual(mock_warning.call_count, 2)
+
+    @patch.object(rubrik_inventory.rubrik_cdm.Connect, 'get', autospec=True, spec_set=True)
+    def test_parse_uses_inventory_cache(self, mock_get):
+        mock_get.side_effect = mock_get_endpoint
+
+        self.inventory.parse(InventoryData(), DataLoader(), '/tmp/prod.rubrik.yml', cache=False)
+        api_calls = mock_get.call_count
+
+        inventory = InventoryData()
+        self.inventory.parse(inventory, DataLoader(), '/tmp/prod.rubrik.yml', cache=True)
+
+        self.assertEqual(mock_get.call_count, api_calls)
+        self.assertEqual(sorted(inventory.hosts), ['sql01', 'sql01/MSSQLSERVER/orders', 'web01', 'web02'])
@@ -8,6 +8,7 @@ from ansible.module_utils import basic
 from ansible.module_utils._text import to_bytes
 from rubrik_cdm.exceptions import RubrikException, APICallException
 import ansible_collections.rubrikinc.cdm.plugins.modules.rubrik_job_status as rubrik_job_status
+import ansible_collections.rubrikinc.cdm.plugins.module_utils.rubrik_cdm as rubrik_cdm_utils
 
 
 def set_module_args(args):
@@ -107,3 +108,180 @@ class TestRubrikJobStatus(unittest.TestCase):
 
         self.assertEqual(result.exception.args[0]['changed'], False)
         self.assertEqual(result.exception.args[0]['response'], mock_job_status())
+
+    @patch.object(rubrik_job_status.rubrik_cdm.rubrik_cdm.Connect, '_common_api', autospec=True, spec_set=True)
+    def test_module_get_multiple_job_status(self, mock_common_api):
+
+        url = "https://1.1.1.1/api/v1/vmware/vm/request/"
+        statuses = {
+            url + "job_1": ["RUNNING", "SUCCEEDED"],
+            url + "job_2": ["QUEUED", "RUNNING", "SUCCEEDED"],
+            url + "job_3": ["FAILED"],
+        }
+
+        def mock_job_status(self, call_type, api_version, api_endpoint, config=None, job_status_url=None, timeout=15, **kwargs):
+            return {"id": job_status_url, "status": statuses[job_status_url].pop(0)}
+
+        set_module_args({
+            'urls': sorted(statuses),
+            'poll_interval': 0,
+            'node_ip': '1.1.1.1',
+            'api_token': 'vkys219gn2jziReqdPJH0asGM3PKEQHP'
+        })
+
+        mock_common_api.side_effect = mock_job_status
+
+        with self.assertRaises(AnsibleFailJson) as result:
+            rubrik_job_status.main()
+
+        self.assertEqual(result.exception.args[0]['msg'], "1 of the 3 jobs did not succeed.")
+        self.assertEqual(result.exception.args[0]['succeeded_jobs'], [url + "job_1", url + "job_2"])
+        self.assertEqual(result.exception.args[0]['failed_jobs'], [url + "job_3"])
+        self.assertEqual(result.exception.args[0]['pending_jobs'], [])
+        self.assertEqual(mock_common_api.call_count, 6)
+
+    @patch.object(rubrik_job_status.rubrik_cdm.rubrik_cdm.Connect, '_common_api', autospec=True, spec_set=True)
+    def test_module_keeps_polling_after_a_status_error(self, mock_common_api):
+
+        url = "https://1.1.1.1/api/v1/vmware/vm/request/"
+        statuses = {
+            url + "job_1": [None, "SUCCEEDED"],
+            url + "job_2": [None, None, None],
+        }
+
+        def mock_job_status(self, call_type, api_version, api_endpoint, config=None, job_status_url=None, timeout=15, **kwargs):
+            status = statuses[job_status_url].pop(0)
+            if status is None:
+                raise Exception("The request timed out.")
+            return {"id": job_status_url, "status": status}
+
+        set_module_args({
+            'urls': sorted(statuses),
+            'poll_interval': 0,
+            'node_ip': '1.1.1.1',
+            'api_token': 'vkys219gn2jziReqdPJH0asGM3PKEQHP'
+        })
+
+        mock_common_api.side_effect = mock_job_status
+
+        with self.assertRaises(AnsibleFailJson) as result:
+            rubrik_job_status.main()
+
+        self.assertEqual(result.exception.args[0]['msg'], "The status of 1 of the 2 jobs could not be read.")
+        self.assertEqual(result.exception.args[0]['succeeded_jobs'], [url + "job_1"])
+        self.assertEqual(result.exception.args[0]['unknown_jobs'], [url + "job_2"])
+        self.assertEqual(result.exception.args[0]['failed_jobs'], [])
+        self.assertEqual(result.exception.args[0]['pending_jobs'], [])
+        self.assertEqual(result.exception.args[0]['jobs'][url + "job_2"], {"status": "UNKNOWN", "error": {"message": "The request timed out."}})
+        self.assertEqual(mock_common_api.call_count, 5)
+
+    @patch.object(rubrik_cdm_utils.time, 'sleep', autospec=True, spec_set=True)
+    @patch.object(rubrik_job_status.rubrik_cdm.rubrik_cdm.Connect, '_common_api', autospec=True, spec_set=True)
+    def test_module_fail_when_the_url_status_can_not_be_read(self, mock_common_api, mock_sleep):
+
+        url = "https://1.1.1.1/api/v1/vmware/vm/request/job_1"
+        mock_common_api.side_effect = Exception("The request timed out.")
+
+        for wait_for_completion, polls in [(False, 1), (True, 3)]:
+            set_module_args({
+                'url': url,
+                'wait_for_completion': wait_for_completion,
+                'node_ip': '1.1.1.1',
+                'api_token': 'vkys219gn2jziReqdPJH0asGM3PKEQHP'
+            })
+
+            with self.assertRaises(AnsibleFailJson) as result:
+                rubrik_job_status.main()
+
+            self.assertEqual(result.exception.args[0]['msg'], "The job status could not be read: The request timed out.")
+            self.assertEqual(result.exception.args[0]['response']['status'], "UNKNOWN")
+            self.assertEqual(result.exception.args[0]['polls'], polls)
+
+    @patch.object(rubrik_job_status.rubrik_cdm.rubrik_cdm.Connect, '_common_api', autospec=True, spec_set=True)
+    def test_module_canceled_job_does_not_fail_with_url_or_urls(self, mock_common_api):
+
+        url = "https://1.1.1.1/api/v1/vmware/vm/request/"
+        mock_common_api.return_value = {"status": "CANCELED"}
+
+        set_module_args({'url': url + "job_1", 'node_ip': '1.1.1.1', 'api_token': 'vkys219gn2jziReqdPJH0asGM3PKEQHP'})
+        with self.assertRaises(AnsibleExitJson) as result:
+            rubrik_job_status.main()
+        self.assertEqual(result.exception.args[0]['response'], {"status": "CANCELED"})
+
+        set_module_args({'urls': [url + "job_1", url + "job_2"], 'node_ip': '1.1.1.1', 'api_token': 'vkys219gn2jziReqdPJH0asGM3PKEQHP'})
+        with self.assertRaises(AnsibleExitJson) as result:
+            rubrik_job_status.main()
+        self.assertEqual(result.exception.args[0]['canceled_jobs'], [url + "job_1", url + "job_2"])
+        self.assertEqual(result.exception.args[0]['failed_jobs'], [])
+
+    @patch.object(rubrik_job_status.rubrik_cdm.rubrik_cdm.Connect, '_common_api', autospec=True, spec_set=True)
+    def test_module_get_multiple_job_status_without_waiting(self, mock_common_api):
+
+        url = "https://1.1.1.1/api/v1/vmware/vm/request/"
+
+        set_module_args({
+            'urls': [url + "job_1", url + "job_2"],
+            'wait_for_completion': False,
+            'node_ip': '1.1.1.1',
+            'api_token': 'vkys219gn2jziReqdPJH0asGM3PKEQHP'
+        })
+
+        mock_common_api.return_value = {"status": "RUNNING", "progress": 50}
+
+        with self.assertRaises(AnsibleExitJson) as result:
+            rubrik_job_status.main()
+
+        self.assertEqual(result.exception.args[0]['changed'], False)
+        self.assertEqual(result.exception.args[0]['pending_jobs'], [url + "job_1", url + "job_2"])
+        self.assertEqual(mock_common_api.call_count, 2)
+
+    @patch.object(rubrik_cdm_utils.time, 'sleep', autospec=True, spec_set=True)
+    @patch.object(rubrik_job_status.rubrik_cdm.rubrik_cdm.Connect, '_common_api', autospec=True, spec_set=True)
+    def test_module_job_status_backoff(self, mock_common_api, mock_sleep):
+
+        url = "https://1.1.1.1/api/v1/vmware/vm/request/job_1"
+
+        set_module_args({
+            'url': url,
+            'poll_interval': 1,
+            'max_poll_interval': 4,
+            'node_ip': '1.1.1.1',
+            'api_token': 'vkys219gn2jziReqdPJH0asGM3PKEQHP'
+        })
+
+        mock_common_api.side_effect = [{"status": "QUEUED"}] * 4 + [{"status": "SUCCEEDED"}]
+
+        with self.assertRaises(AnsibleExitJson) as result:
+            rubrik_job_status.main()
+
+        self.assertEqual(result.exception.args[0]['response'], {"status": "SUCCEEDED"})
+        self.assertEqual(result.exception.args[0]['polls'], 5)
+
+        delays = [call[0][0] for call in mock_sleep.call_args_list]
+        for delay, interval in zip(delays, [1, 2, 4, 4]):
+            self.assertTrue(interval * 0.8 <= delay <= interval * 1.2)
+        self.assertAlmostEqual(result.exception.args[0]['wait_time'], sum(delays), places=2)
+
+    @patch.object(rubrik_cdm_utils.time, 'sleep', autospec=True, spec_set=True)
+    @patch.object(rubrik_job_status.rubrik_cdm.rubrik_cdm.Connect, '_common_api', autospec=True, spec_set=True)
+    def test_module_job_status_deadline(self, mock_common_api, mock_sleep):
+
+        url = "https://1.1.1.1/api/v1/vmware/vm/request/job_1"
+
+        set_module_args({
+            'url': url,
+            'deadline': 10,
+            'poll_interval': 5,
+            'node_ip': '1.1.1.1',
+            'api_token': 'vkys219gn2jziReqdPJH0asGM3PKEQHP'
+        })
+
+        mock_common_api.return_value = {"status": "RUNNING", "progress": 10}
+
+        with patch.object(rubrik_cdm_utils.time, 'time', side_effect=[0, 0, 6, 6, 12]):
+            with self.assertRaises(AnsibleFailJson) as result:
+                rubrik_job_status.main()
+
+        self.assertEqual(result.exception.args[0]['msg'], "The job did not finish before the deadline.")
+        self.assertEqual(result.exception.args[0]['polls'], 2)
+        self.assertEqual(mock_sleep.call_count, 1)
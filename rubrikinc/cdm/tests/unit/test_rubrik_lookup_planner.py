@@ -0,0 +1,74 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import unittest
+from ansible_collections.rubrikinc.cdm.plugins.module_utils.rubrik_cdm import LookupPlanner, rubrik_cdm, rubrik_connect_class
+from ansible_collections.rubrikinc.cdm.tests.mock_cdm_server import MockCdmServer
+
+
+class TestRubrikLookupPlanner(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = MockCdmServer(vms=1200, hosts=4, mssql_dbs=4, managed_volumes=2, seed=1).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.server.reset_stats()
+        self.rubrik = rubrik_connect_class()(self.server.node_ip, api_token='mock-token')
+
+    def test_vmware_lookup_is_a_single_filtered_request(self):
+        self.assertEqual(self.rubrik.object_id('vm-000999', 'vmware'), 'VirtualMachine:::vm-000999')
+
+        # The name filter is pushed down, a single page of matches is returned instead of 1200 VMs
+        self.assertEqual(self.server.stats()['endpoints'], {'GET /api/v1/vmware/vm': 1})
+        self.assertLess(self.server.stats()['bytes_sent'], 2000)
+
+    def test_physical_host_lookup_skips_the_version_check(self):
+        self.assertEqual(self.rubrik.object_id('host-00001.mock.local', 'physical_host'), 'Host:::host-00001')
+
+        self.assertEqual(self.server.stats()['endpoints'], {'GET /api/v1/host': 1})
+
+    def test_mssql_db_lookup(self):
+        object_id = self.rubrik.object_id('db-000000', 'mssql_db', mssql_host='host-00001.mock.local', mssql_instance='MSSQLSERVER')
+
+        self.assertEqual(object_id, 'MssqlDatabase:::db-000000')
+        self.assertEqual(self.server.stats()['endpoints'], {'GET /api/v1/host': 1, 'GET /api/v1/mssql/instance': 1, 'GET /api/v1/mssql/db': 1})
+
+    def test_names_are_matched_exactly(self):
+        with self.assertRaises(rubrik_cdm.exceptions.InvalidParameterException) as error:
+            self.rubrik.object_id('vm-00099', 'vmware')
+
+        self.assertEqual(str(error.exception), "The vmware object 'vm-00099' was not found on the Rubrik cluster.")
+        self.assertEqual(self.rubrik.object_id('GOLD', 'sla'), 'sla-0000')
+        self.assertEqual(self.rubrik.object_id('Forever', 'sla'), 'UNPROTECTED')
+
+    def test_unplanned_lookups_are_left_to_the_sdk(self):
+        self.assertFalse(LookupPlanner.supports('oracle_db'))
+        self.assertFalse(LookupPlanner.supports('fileset_template', host_os=None))
+        self.assertTrue(LookupPlanner.supports('fileset_template', host_os='Linux'))
+
+        with self.assertRaises(rubrik_cdm.exceptions.InvalidParameterException):
+            self.rubrik.object_id('template', 'fileset_template')
+
+    def test_fall_back_to_full_scan(self):
+        class Rubrik(object):
+            requests = []
+
+            def get(self, api_version, api_endpoint, timeout=15, params=None):
+                self.requests.append(params)
+                if 'name' in params:
+                    error = rubrik_cdm.exceptions.APICallException('Unknown query parameter name.')
+                    error.status_code = 400
+                    raise error
+                return {'hasMore': False, 'data': [{'id': 'id-1', 'name': 'vm-1'}, {'id': 'id-2', 'name': 'vm-2'}], 'total': 2}
+
+        rubrik = Rubrik()
+
+        self.assertEqual(LookupPlanner().object_id(rubrik, 'VM-2', 'vmware'), 'id-2')
+        self.assertEqual(rubrik.requests, [
+            {'primary_cluster_id': 'local', 'is_relic': 'false', 'name': 'VM-2', 'limit': 100, 'offset': 0},
+            {'primary_cluster_id': 'local', 'is_relic': 'false', 'limit': 100, 'offset': 0}])
@@ -0,0 +1,153 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+import unittest
+from unittest.mock import patch
+from ansible.module_utils import basic
+from ansible.module_utils._text import to_bytes
+from ansible_collections.rubrikinc.cdm.plugins.module_utils.rubrik_cdm import JobPoller, paginate
+from ansible_collections.rubrikinc.cdm.tests.mock_cdm_server import MockCdmServer
+import ansible_collections.rubrikinc.cdm.plugins.modules.rubrik_assign_sla as rubrik_assign_sla
+import ansible_collections.rubrikinc.cdm.plugins.modules.rubrik_cluster_version as rubrik_cluster_version
+
+
+def set_module_args(args):
+    """prepare arguments so that they will be picked up during module creation"""
+    args = json.dumps({'ANSIBLE_MODULE_ARGS': args})
+    basic._ANSIBLE_ARGS = to_bytes(args)
+
+
+class AnsibleExitJson(Exception):
+    """Exception class to be raised by module.exit_json and caught by the test case"""
+    pass
+
+
+class AnsibleFailJson(Exception):
+    """Exception class to be raised by module.fail_json and caught by the test case"""
+    pass
+
+
+def exit_json(*args, **kwargs):
+    """function to patch over exit_json; package return data into an exception"""
+    if 'changed' not in kwargs:
+        kwargs['changed'] = False
+    raise AnsibleExitJson(kwargs)
+
+
+def fail_json(*args, **kwargs):
+    """function to patch over fail_json; package return data into an exception"""
+    kwargs['failed'] = True
+    raise AnsibleFailJson(kwargs)
+
+
+class TestRubrikMockCdmServer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = MockCdmServer(vms=1200, hosts=4, mssql_dbs=4, managed_volumes=2, job_duration=0.2, seed=1).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.mock_module_helper = patch.multiple(basic.AnsibleModule,
+                                                 exit_json=exit_json,
+                                                 fail_json=fail_json)
+        self.mock_module_helper.start()
+        self.addCleanup(self.mock_module_helper.stop)
+
+        self.server.error_rate = 0
+        self.server.reset_stats()
+
+    def module_args(self, **kwargs):
+        kwargs.update({'node_ip': self.server.node_ip, 'api_token': 'mock-token'})
+        set_module_args(kwargs)
+
+    def test_module_cluster_version(self):
+        self.module_args()
+
+        with self.assertRaises(AnsibleExitJson) as result:
+            rubrik_cluster_version.main()
+
+        self.assertEqual(result.exception.args[0]['version'], '5.0.1-1280')
+        self.assertEqual(self.server.stats()['endpoints'], {'GET /api/v1/cluster/me/version': 1})
+
+    def test_paginate_large_listing(self):
+        rubrik = rubrik_cluster_version.rubrik_cdm.Connect(self.server.node_ip, api_token='mock-token')
+
+        vms = paginate(rubrik, 'v1', '/vmware/vm', params={'is_relic': 'false'}, limit=500)
+
+        self.assertEqual(len(vms), 1200)
+        self.assertEqual(len(set(vm['id'] for vm in vms)), 1200)
+        self.assertEqual(self.server.stats()['requests'], 3)
+
+    def test_module_assign_sla_is_stateful(self):
+        self.module_args(object_name='vm-000003', sla_name='Gold')
+
+        with self.assertRaises(AnsibleExitJson) as result:
+            rubrik_assign_sla.main()
+
+        self.assertEqual(result.exception.args[0]['changed'], True)
+
+        with self.assertRaises(AnsibleExitJson) as result:
+            rubrik_assign_sla.main()
+
+        self.assertEqual(result.exception.args[0]['changed'], False)
+
+    def test_job_status_progresses(self):
+        rubrik = rubrik_cluster_version.rubrik_cdm.Connect(self.server.node_ip, api_token='mock-token')
+        vm_id = rubrik.object_id('vm-000001', 'vmware')
+        snapshots = len(rubrik.get('v1', '/vmware/vm/{0}'.format(vm_id))['snapshots'])
+
+        job = rubrik.post('v1', '/vmware/vm/{0}/snapshot'.format(vm_id), {'slaId': 'INHERIT'})
+        self.assertEqual(job['status'], 'QUEUED')
+
+        jobs, pending = JobPoller(poll_interval=0.05, max_poll_interval=0.1).wait(rubrik, [job['links'][0]['href']])
+
+        self.assertEqual(pending, [])
+        self.assertEqual(list(jobs.values())[0]['status'], 'SUCCEEDED')
+        self.assertEqual(len(rubrik.get('v1', '/vmware/vm/{0}'.format(vm_id))['snapshots']), snapshots + 1)
+
+    def test_job_poller_keeps_jobs_in_flight(self):
+        rubrik = rubrik_cluster_version.rubrik_cdm.Connect(self.server.node_ip, api_token='mock-token')
+        vm_ids = dict(('vm-{0:06d}'.format(index), rubrik.object_id('vm-{0:06d}'.format(index), 'vmware')) for index in range(6))
+
+        started = []
+        finished = set()
+        in_flight = []
+        job_status = rubrik.job_status
+
+        def tracked_job_status(url, wait_for_completion=True, timeout=15):
+            response = job_status(url, wait_for_completion=wait_for_completion, timeout=timeout)
+            if response['status'] == 'SUCCEEDED':
+                finished.add(url)
+            return response
+
+        def start(vm_name):
+            if vm_name == 'missing-vm':
+                raise ValueError("The vmware object 'missing-vm' was not found on the Rubrik cluster.")
+            in_flight.append(len(started) - len(finished))
+            job = rubrik.post('v1', '/vmware/vm/{0}/snapshot'.format(vm_ids[vm_name]), {'slaId': 'INHERIT'})
+            started.append(job['links'][0]['href'])
+            return job['links'][0]['href']
+
+        rubrik.job_status = tracked_job_status
+        jobs = JobPoller(poll_interval=0.05, max_poll_interval=0.1).run(rubrik, start, sorted(vm_ids) + ['missing-vm'], max_in_flight=2)
+
+        self.assertEqual([job['response']['status'] for job in jobs[:6]], ['SUCCEEDED'] * 6)
+        self.assertTrue(all('seconds' in job for job in jobs[:6]))
+        self.assertEqual(jobs[6], {'error': "The vmware object 'missing-vm' was not found on the Rubrik cluster."})
+        # A new job is only started once one of the two jobs in progress has finished
+        self.assertLessEqual(max(in_flight), 1)
+
+    def test_error_injection(self):
+        self.server.error_rate = 1
+        self.module_args(api_retries=0)
+
+        with self.assertRaises(AnsibleFailJson) as result:
+            rubrik_cluster_version.main()
+
+        self.assertIn('Injected error', result.exception.args[0]['msg'])
+        self.assertEqual(self.server.stats()['errors'], 1)
@@ -0,0 +1,159 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+import unittest
+from unittest.mock import patch
+from ansible.module_utils import basic
+from ansible.module_utils._text import to_bytes
+from ansible_collections.rubrikinc.cdm.plugins.module_utils.rubrik_cdm import NodeRouter, rubrik_connect_class
+from ansible_collections.rubrikinc.cdm.tests.mock_cdm_server import MockCdmServer
+import ansible_collections.rubrikinc.cdm.plugins.modules.rubrik_assign_sla as rubrik_assign_sla
+import ansible_collections.rubrikinc.cdm.plugins.modules.rubrik_cluster_version as rubrik_cluster_version
+
+
+def set_module_args(args):
+    """prepare arguments so that they will be picked up during module creation"""
+    args = json.dumps({'ANSIBLE_MODULE_ARGS': args})
+    basic._ANSIBLE_ARGS = to_bytes(args)
+
+
+class AnsibleExitJson(Exception):
+    """Exception class to be raised by module.exit_json and caught by the test case"""
+    pass
+
+
+class AnsibleFailJson(Exception):
+    """Exception class to be raised by module.fail_json and caught by the test case"""
+    pass
+
+
+def exit_json(*args, **kwargs):
+    """function to patch over exit_json; package return data into an exception"""
+    if 'changed' not in kwargs:
+        kwargs['changed'] = False
+    raise AnsibleExitJson(kwargs)
+
+
+def fail_json(*args, **kwargs):
+    """function to patch over fail_json; package return data into an exception"""
+    kwargs['failed'] = True
+    raise AnsibleFailJson(kwargs)
+
+
+class TestRubrikNodeRouter(unittest.TestCase):
+
+    def test_select_spreads_calls_across_nodes(self):
+        router = NodeRouter(['node-1', 'node-2', 'node-3'])
+        router.random.seed(1)
+
+        for _ in range(300):
+            router.record(router.select(), 0.1, False)
+
+        requests = [stats['requests'] for stats in router.stats().values()]
+        self.assertEqual(sum(requests), 300)
+        self.assertTrue(all(count > 50 for count in requests), requests)
+
+    def test_select_favors_faster_nodes(self):
+        router = NodeRouter(['fast', 'slow'])
+        router.random.seed(1)
+
+        for _ in range(300):
+            node = router.select()
+            router.record(node, 0.01 if node == 'fast' else 0.1, False)
+
+        stats = router.stats()
+        self.assertGreater(stats['fast']['requests'], 4 * stats['slow']['requests'])
+        self.assertEqual(stats['fast']['average_latency'], 0.01)
+
+    def test_failed_node_cools_down(self):
+        router = NodeRouter(['node-1', 'node-2'])
+
+        router.pin('node-1')
+        router.record('node-1', 0.1, True)
+
+        self.assertEqual(set(router.select() for _ in range(20)), {'node-2'})
+        self.assertEqual(router.select(exclude=['node-2']), 'node-1')
+        self.assertEqual(router.stats()['node-1'], {'requests': 1, 'errors': 1, 'average_latency': 0.1})
+        self.assertIsNone(router.pin('unknown-node'))
+
+
+class TestRubrikMultiNodeCluster(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.nodes = [MockCdmServer(vms=20, hosts=2, mssql_dbs=2, managed_volumes=1, job_duration=0.1, seed=1).start()]
+        cls.nodes += [MockCdmServer(state=cls.nodes[0].state).start() for _ in range(2)]
+        cls.node_ips = [node.node_ip for node in cls.nodes]
+
+    @classmethod
+    def tearDownClass(cls):
+        for node in cls.nodes:
+            node.stop()
+
+    def setUp(self):
+        self.mock_module_helper = patch.multiple(basic.AnsibleModule,
+                                                 exit_json=exit_json,
+                                                 fail_json=fail_json)
+        self.mock_module_helper.start()
+        self.addCleanup(self.mock_module_helper.stop)
+
+        for node in self.nodes:
+            node.reset_stats()
+
+    def test_module_calls_are_spread_across_nodes(self):
+        set_module_args({
+            'objects': ['vm-0000{0:02d}'.format(index) for index in range(10)],
+            'sla_name': 'Bronze',
+            'batch_size': 2,
+            'node_ip': ','.join(self.node_ips),
+            'api_token': 'mock-token',
+        })
+
+        with self.assertRaises(AnsibleExitJson) as result:
+            rubrik_assign_sla.main()
+
+        node_stats = result.exception.args[0]['node_stats']
+        self.assertEqual(sorted(node_stats), sorted(self.node_ips))
+        for node in self.nodes:
+            self.assertEqual(node_stats[node.node_ip]['requests'], node.stats()['requests'])
+            self.assertEqual(node_stats[node.node_ip]['errors'], 0)
+
+    def test_discover_nodes(self):
+        set_module_args({'node_ip': self.node_ips[0], 'api_token': 'mock-token', 'discover_nodes': True})
+
+        with self.assertRaises(AnsibleExitJson) as result:
+            rubrik_cluster_version.main()
+
+        self.assertEqual(sorted(result.exception.args[0]['node_stats']), sorted(self.node_ips))
+
+    def test_unreachable_node_is_skipped(self):
+        unreachable = MockCdmServer(state=self.nodes[0].state)
+        unreachable.stop()
+
+        for _ in range(5):
+            set_module_args({'node_ip': '{0},{1}'.format(unreachable.node_ip, self.node_ips[0]), 'api_token': 'mock-token'})
+
+            with self.assertRaises(AnsibleExitJson) as result:
+                rubrik_cluster_version.main()
+
+            self.assertEqual(result.exception.args[0]['version'], '5.0.1-1280')
+            self.assertEqual(result.exception.args[0]['node_stats'][unreachable.node_ip]['requests'],
+                             result.exception.args[0]['node_stats'][unreachable.node_ip]['errors'])
+
+    def test_job_status_is_pinned_to_the_accepting_node(self):
+        rubrik = rubrik_connect_class()(self.node_ips[0], api_token='mock-token')
+        rubrik.node_router = NodeRouter(self.node_ips)
+
+        vm_id = rubrik.object_id('vm-000001', 'vmware')
+        job_status_url = rubrik.post('v1', '/vmware/vm/{0}/snapshot'.format(vm_id), {'slaId': 'INHERIT'})['links'][0]['href']
+
+        for _ in range(3):
+            rubrik.job_status(job_status_url, wait_for_completion=False)
+
+        polls = dict((node.node_ip, sum(count for endpoint, count in node.stats()['endpoints'].items()
+                                        if endpoint.startswith('GET /api/v1/vmware/vm/request/'))) for node in self.nodes)
+        accepting_node = [node_ip for node_ip in self.node_ips if node_ip in job_status_url][0]
+        self.assertEqual(polls[accepting_node], 3)
+        self.assertEqual(sum(polls.values()), 3)
+        self.assertGreaterEqual(rubrik.node_router.stats()[accepting_node]['requests'], 3)
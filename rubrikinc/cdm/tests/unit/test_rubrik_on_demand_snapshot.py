@@ -850,5 +850,101 @@ class TestRubrikOnDemandSnapshot(unittest.TestCase):
         self.assertEqual(result.exception.args[0]['job_status_url'], 'href_string')
 
 
+    @patch.object(rubrik_on_demand_snapshot.rubrik_cdm.rubrik_cdm.Connect, 'post', autospec=True, spec_set=True)
+    @patch.object(rubrik_on_demand_snapshot.rubrik_cdm.rubrik_cdm.Connect, 'get', autospec=True, spec_set=True)
+    def test_module_bulk_vmware_current_sla(self, mock_get, mock_post):
+        set_module_args({
+            'objects': ['test-vm-1', 'test-vm-2', {'object_name': 'test-vm-3', 'sla_name': 'Gold'}],
+            'node_ip': '1.1.1.1',
+            'api_token': 'vkys219gn2jziReqdPJH0asGM3PKEQHP'
+        })
+
+        def mock_get_endpoint(self, api_version, api_endpoint, timeout=15, params=None):
+            if api_endpoint == '/vmware/vm':
+                vm_name = params['name']
+                return {"hasMore": False, "data": [{"id": "vm-" + vm_name, "name": vm_name}], "total": 1}
+            if api_endpoint == '/sla_domain':
+                return {"hasMore": False, "data": [{"id": "sla-gold", "name": "Gold"}], "total": 1}
+            return {"effectiveSlaDomainId": "sla-current"}
+
+        def mock_post_endpoint(self, api_version, api_endpoint, config, timeout=15, authentication=True):
+            vm_id = api_endpoint.split('/')[3]
+            return {"status": "QUEUED", "links": [{"href": "https://1.1.1.1/api/v1/vmware/vm/request/" + vm_id, "rel": "self"}]}
+
+        mock_get.side_effect = mock_get_endpoint
+        mock_post.side_effect = mock_post_endpoint
+
+        with self.assertRaises(AnsibleExitJson) as result:
+            rubrik_on_demand_snapshot.main()
+
+        self.assertEqual(result.exception.args[0]['changed'], True)
+        self.assertEqual(result.exception.args[0]['job_status_urls'], [
+            'https://1.1.1.1/api/v1/vmware/vm/request/vm-test-vm-1',
+            'https://1.1.1.1/api/v1/vmware/vm/request/vm-test-vm-2',
+            'https://1.1.1.1/api/v1/vmware/vm/request/vm-test-vm-3'])
+
+        sla_ids = dict((call[0][2], call[0][3]['slaId']) for call in mock_post.call_args_list)
+        self.assertEqual(sla_ids, {
+            '/vmware/vm/vm-test-vm-1/snapshot': 'sla-current',
+            '/vmware/vm/vm-test-vm-2/snapshot': 'sla-current',
+            '/vmware/vm/vm-test-vm-3/snapshot': 'sla-gold'})
+
+    @patch.object(rubrik_on_demand_snapshot.rubrik_cdm.rubrik_cdm.Connect, 'post', autospec=True, spec_set=True)
+    @patch.object(rubrik_on_demand_snapshot.rubrik_cdm.rubrik_cdm.Connect, 'get', autospec=True, spec_set=True)
+    def test_module_bulk_partial_failure(self, mock_get, mock_post):
+        set_module_args({
+            'objects': ['test-vm', 'missing-vm'],
+            'node_ip': '1.1.1.1',
+            'api_token': 'vkys219gn2jziReqdPJH0asGM3PKEQHP'
+        })
+
+        def mock_get_endpoint(self, api_version, api_endpoint, timeout=15, params=None):
+            if api_endpoint == '/vmware/vm':
+                if params['name'] == 'missing-vm':
+                    return {"hasMore": False, "data": [], "total": 0}
+                return mock_get_v1_vmware_vm()
+            return mock_get_v1_vmware_vm_id()
+
+        mock_get.side_effect = mock_get_endpoint
+        mock_post.return_value = mock_post_v1_vmware_vm_id_snapshot()
+
+        with self.assertRaises(AnsibleFailJson) as result:
+            rubrik_on_demand_snapshot.main()
+
+        self.assertEqual(result.exception.args[0]['changed'], True)
+        self.assertEqual(result.exception.args[0]['job_status_urls'], ['href_string'])
+        self.assertEqual(result.exception.args[0]['snapshots'][1], {'object_name': 'missing-vm', 'object_type': 'vmware',
+                                                                    'error': "The vmware object 'missing-vm' was not found on the Rubrik cluster."})
+
+    @patch.object(rubrik_on_demand_snapshot.rubrik_cdm.rubrik_cdm.Connect, 'post', autospec=True, spec_set=True)
+    @patch.object(rubrik_on_demand_snapshot.rubrik_cdm.rubrik_cdm.Connect, 'get', autospec=True, spec_set=True)
+    def test_module_bulk_objects_with_the_same_name(self, mock_get, mock_post):
+        set_module_args({
+            'objects': ['test-vm', {'object_name': 'test-vm', 'object_type': 'ahv'}],
+            'node_ip': '1.1.1.1',
+            'api_token': 'vkys219gn2jziReqdPJH0asGM3PKEQHP'
+        })
+
+        def mock_get_endpoint(self, api_version, api_endpoint, timeout=15, params=None):
+            if api_endpoint in ['/vmware/vm', '/nutanix/vm']:
+                vm_id = api_endpoint.split('/')[1] + '-vm'
+                return {"hasMore": False, "data": [{"id": vm_id, "name": 'test-vm'}], "total": 1}
+            return {"effectiveSlaDomainId": "sla-current"}
+
+        def mock_post_endpoint(self, api_version, api_endpoint, config, timeout=15, authentication=True):
+            vm_id = api_endpoint.split('/')[3]
+            return {"status": "QUEUED", "links": [{"href": "https://1.1.1.1/api/v1/request/" + vm_id, "rel": "self"}]}
+
+        mock_get.side_effect = mock_get_endpoint
+        mock_post.side_effect = mock_post_endpoint
+
+        with self.assertRaises(AnsibleExitJson) as result:
+            rubrik_on_demand_snapshot.main()
+
+        self.assertEqual([(snapshot['object_name'], snapshot['object_type'], snapshot['job_status_url'])
+                          for snapshot in result.exception.args[0]['snapshots']], [
+            ('test-vm', 'vmware', 'https://1.1.1.1/api/v1/request/vmware-vm'),
+            ('test-vm', 'ahv', 'https://1.1.1.1/api/v1/request/nutanix-vm')])
+
 if __name__ == '__main__':
     unittest.main()
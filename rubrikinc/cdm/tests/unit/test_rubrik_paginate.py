@@ -0,0 +1,53 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import time
+import unittest
+from ansible_collections.rubrikinc.cdm.plugins.module_utils.rubrik_cdm import iterate_pages, paginate, rubrik_connect_class
+from ansible_collections.rubrikinc.cdm.tests.mock_cdm_server import MockCdmServer
+
+
+class TestRubrikPaginate(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = MockCdmServer(vms=1200, hosts=2, mssql_dbs=2, managed_volumes=1, seed=1).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.server.latency = 0
+        self.server.reset_stats()
+        self.rubrik = rubrik_connect_class()(self.server.node_ip, api_token='mock-token')
+
+    def test_every_object_is_yielded_in_order(self):
+        vms = list(iterate_pages(self.rubrik, 'v1', '/vmware/vm', params={'is_relic': 'false'}, limit=500))
+
+        self.assertEqual(vms, paginate(self.rubrik, 'v1', '/vmware/vm', params={'is_relic': 'false'}, limit=500))
+        self.assertEqual(len(vms), 1200)
+        self.assertEqual(len(set(vm['id'] for vm in vms)), 1200)
+        self.assertEqual(self.server.stats()['requests'], 6)
+
+    def test_lookup_stops_at_the_first_match(self):
+        for vm in iterate_pages(self.rubrik, 'v1', '/vmware/vm', limit=100):
+            if vm['name'] == 'vm-000042':
+                break
+
+        # The first page holds the match, only the second page was requested in advance
+        self.assertEqual(vm['name'], 'vm-000042')
+        self.assertLessEqual(self.server.stats()['requests'], 2)
+
+    def test_next_page_is_prefetched(self):
+        self.server.latency = 0.2
+
+        def walk(prefetch):
+            start = time.time()
+            for index, vm in enumerate(iterate_pages(self.rubrik, 'v1', '/vmware/vm', limit=400, prefetch=prefetch)):
+                if index % 400 == 0:
+                    # The caller spends as long on each page as the cluster takes to return it
+                    time.sleep(0.2)
+            return time.time() - start
+
+        self.assertGreater(walk(False) - walk(True), 0.3)
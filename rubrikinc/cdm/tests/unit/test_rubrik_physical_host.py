@@ -50,19 +50,103 @@ class TestRubrikPhysicalHost(unittest.TestCase):
             set_module_args({})
             rubrik_physical_host.main()
 
-    def test_module_fail_with_incorrect_hostname_list_when_action_is_delete(self):
+    @patch.object(rubrik_physical_host.rubrik_cdm.rubrik_cdm.Connect, 'delete', autospec=True, spec_set=True)
+    @patch.object(rubrik_physical_host.rubrik_cdm.rubrik_cdm.Connect, 'get', autospec=True, spec_set=True)
+    def test_module_delete_hostname_list(self, mock_get, mock_delete):
         set_module_args({
             'node_ip': '1.1.1.1',
             'api_token': 'vkys219gn2jziReqdPJH0asGM3PKEQHP',
             'action': 'delete',
-            'hostname': ['hostname1', 'hostname2'],
+            'hostname': ['hostname1', 'hostname2', 'hostname3'],
+        })
+
+        mock_get.return_value = {
+            "hasMore": False,
+            "data": [
+                {"id": "Host:::1", "hostname": "hostname1"},
+                {"id": "Host:::2", "hostname": "hostname2"},
+            ],
+            "total": 2
+        }
+
+        mock_delete.return_value = {"status_code": 204}
+
+        with self.assertRaises(AnsibleExitJson) as result:
+            rubrik_physical_host.main()
+
+        self.assertEqual(result.exception.args[0]['changed'], True)
+        self.assertEqual(result.exception.args[0]['hosts'], {
+            'hostname1': {'status': 'deleted', 'response': {'status_code': 204}},
+            'hostname2': {'status': 'deleted', 'response': {'status_code': 204}},
+            'hostname3': {'status': 'unchanged'},
+        })
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(sorted(call[0][2] for call in mock_delete.call_args_list), ['/host/Host:::1', '/host/Host:::2'])
+
+    @patch.object(rubrik_physical_host.rubrik_cdm.rubrik_cdm.Connect, 'post', autospec=True, spec_set=True)
+    @patch.object(rubrik_physical_host.rubrik_cdm.rubrik_cdm.Connect, 'get', autospec=True, spec_set=True)
+    def test_module_add_hostname_list_reads_every_page(self, mock_get, mock_post):
+        set_module_args({
+            'node_ip': '1.1.1.1',
+            'api_token': 'vkys219gn2jziReqdPJH0asGM3PKEQHP',
+            'action': 'add',
+            'hostname': ['hostname1', 'HOSTNAME2', 'hostname3'],
+        })
+
+        pages = {
+            0: {"hasMore": True, "data": [{"id": "Host:::1", "hostname": "hostname1"}], "total": 2},
+            1: {"hasMore": False, "data": [{"id": "Host:::2", "name": "hostname2"}], "total": 2},
+        }
+
+        def mock_get_v1_host(self, api_version, api_endpoint, timeout=15, authentication=True, params=None):
+            return pages[params["offset"]]
+
+        mock_get.side_effect = mock_get_v1_host
+        mock_post.return_value = {"id": "Host:::3", "hostname": "hostname3"}
+
+        with self.assertRaises(AnsibleExitJson) as result:
+            rubrik_physical_host.main()
+
+        self.assertEqual(result.exception.args[0]['hosts'], {
+            'hostname1': {'status': 'unchanged'},
+            'HOSTNAME2': {'status': 'unchanged'},
+            'hostname3': {'status': 'added', 'response': {'id': 'Host:::3', 'hostname': 'hostname3'}},
+        })
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(mock_post.call_count, 1)
+
+    @patch.object(rubrik_physical_host.rubrik_cdm.rubrik_cdm.Connect, 'post', autospec=True, spec_set=True)
+    @patch.object(rubrik_physical_host.rubrik_cdm.rubrik_cdm.Connect, 'get', autospec=True, spec_set=True)
+    def test_module_add_hostname_list_partial_failure(self, mock_get, mock_post):
+        set_module_args({
+            'node_ip': '1.1.1.1',
+            'api_token': 'vkys219gn2jziReqdPJH0asGM3PKEQHP',
+            'action': 'add',
+            'hostname': ['hostname1', 'hostname2', 'hostname3'],
         })
 
+        mock_get.return_value = {"hasMore": False, "data": [{"id": "Host:::1", "hostname": "hostname1"}], "total": 1}
+
+        def mock_post_v1_host(self, api_version, api_endpoint, config, timeout=15, authentication=True):
+            if config["hostname"] == "hostname3":
+                raise rubrik_physical_host.rubrik_cdm.exceptions.APICallException("Unable to connect to the Rubrik Backup Service.")
+            return {"id": "Host:::2", "hostname": config["hostname"]}
+
+        mock_post.side_effect = mock_post_v1_host
+
         with self.assertRaises(AnsibleFailJson) as result:
             rubrik_physical_host.main()
 
-        self.assertEqual(result.exception.args[0]['failed'], True)
-        self.assertEqual(result.exception.args[0]['msg'], "A list of hostnames is not supported when action is delete.")
+        self.assertEqual(result.exception.args[0]['msg'], "Unable to add the following physical host(s): hostname3")
+        self.assertEqual(result.exception.args[0]['changed'], True)
+        self.assertEqual(result.exception.args[0]['hosts'], {
+            'hostname1': {'status': 'unchanged'},
+            'hostname2': {'status': 'added', 'response': {'id': 'Host:::2', 'hostname': 'hostname2'}},
+            'hostname3': {'status': 'failed', 'msg': 'Unable to connect to the Rubrik Backup Service.'},
+        })
+        self.assertEqual(
+            dict((key, value) for key, value in result.exception.args[0]['summary'].items() if key != 'elapsed'),
+            {'added': 1, 'deleted': 0, 'unchanged': 1, 'failed': 1})
 
     @patch.object(rubrik_physical_host.rubrik_cdm.rubrik_cdm.Connect, 'post', autospec=True, spec_set=True)
     @patch.object(rubrik_physical_host.rubrik_cdm.rubrik_cdm.Connect, 'get', autospec=True, spec_set=True)
@@ -259,8 +343,7 @@ class TestRubrikPhysicalHost(unittest.TestCase):
             rubrik_physical_host.main()
 
         self.assertEqual(result.exception.args[0]['changed'], False)
-        self.assertEqual(result.exception.args[0]['response'],
-                         "No change required. All Hosts have already been added or supplied list was empty.")
+        self.assertEqual(result.exception.args[0]['hosts'], {'hostname1': {'status': 'unchanged'}, 'hostname2': {'status': 'unchanged'}})
 
     @patch.object(rubrik_physical_host.rubrik_cdm.rubrik_cdm.Connect, 'delete', autospec=True, spec_set=True)
     @patch.object(rubrik_physical_host.rubrik_cdm.rubrik_cdm.Connect, 'get', autospec=True, spec_set=True)
@@ -0,0 +1,144 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from ansible.module_utils import basic
+from ansible.module_utils._text import to_bytes
+from ansible_collections.rubrikinc.cdm.plugins.module_utils.rubrik_cdm import RateLimiter, rubrik_connect_class
+from ansible_collections.rubrikinc.cdm.tests.mock_cdm_server import MockCdmServer
+import ansible_collections.rubrikinc.cdm.plugins.modules.rubrik_cluster_version as rubrik_cluster_version
+
+
+def set_module_args(args):
+    """prepare arguments so that they will be picked up during module creation"""
+    args = json.dumps({'ANSIBLE_MODULE_ARGS': args})
+    basic._ANSIBLE_ARGS = to_bytes(args)
+
+
+class AnsibleExitJson(Exception):
+    """Exception class to be raised by module.exit_json and caught by the test case"""
+    pass
+
+
+class AnsibleFailJson(Exception):
+    """Exception class to be raised by module.fail_json and caught by the test case"""
+    pass
+
+
+def exit_json(*args, **kwargs):
+    """function to patch over exit_json; package return data into an exception"""
+    if 'changed' not in kwargs:
+        kwargs['changed'] = False
+    raise AnsibleExitJson(kwargs)
+
+
+def fail_json(*args, **kwargs):
+    """function to patch over fail_json; package return data into an exception"""
+    kwargs['failed'] = True
+    raise AnsibleFailJson(kwargs)
+
+
+def run_forks(forks, function):
+    """Call the function once in each thread, the way every fork would, and return the number of seconds it took."""
+
+    start = time.time()
+    threads = [threading.Thread(target=function, args=(fork,)) for fork in range(forks)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.time() - start
+
+
+class TestRubrikRateLimiter(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+
+    def test_rate_is_shared_by_every_fork(self):
+        def fork(index):
+            # Every fork has its own limiter, sharing the budget of the cluster through the rate limit file
+            limiter = RateLimiter(self.cache_dir, "cluster", 20)
+            for _ in range(5):
+                limiter.acquire("GET /v1/cluster/me")
+
+        # The first second of calls is served at once, the next 20 calls take another second
+        self.assertGreaterEqual(run_forks(8, fork), 0.9)
+
+    def test_endpoint_budget(self):
+        limiter = RateLimiter(self.cache_dir, "cluster", 0, {"POST /v1/vmware/vm/*/snapshot": 5})
+
+        start = time.time()
+        for _ in range(20):
+            limiter.acquire("GET /v1/vmware/vm")
+        self.assertLess(time.time() - start, 0.5)
+
+        for _ in range(10):
+            limiter.acquire("POST /v1/vmware/vm/VirtualMachine:::1/snapshot")
+        self.assertGreaterEqual(limiter.stats()["waited"], 0.9)
+
+    def test_pause_holds_back_every_fork(self):
+        RateLimiter(self.cache_dir, "cluster", 0).pause(0.5)
+
+        start = time.time()
+        RateLimiter(self.cache_dir, "cluster", 100).acquire("GET /v1/cluster/me")
+        self.assertGreaterEqual(time.time() - start, 0.4)
+
+
+class TestRubrikRateLimit(unittest.TestCase):
+
+    def setUp(self):
+        self.server = MockCdmServer(vms=10, hosts=2, mssql_dbs=2, managed_volumes=1, rate_limit=10, seed=1).start()
+        self.addCleanup(self.server.stop)
+
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+
+        self.mock_module_helper = patch.multiple(basic.AnsibleModule,
+                                                 exit_json=exit_json,
+                                                 fail_json=fail_json)
+        self.mock_module_helper.start()
+        self.addCleanup(self.mock_module_helper.stop)
+
+    def cluster_version(self, rate, calls):
+        def fork(index):
+            rubrik = rubrik_connect_class()(self.server.node_ip, api_token='mock-token')
+            rubrik.rate_limiter = RateLimiter(self.cache_dir, self.server.node_ip, rate)
+            for _ in range(calls):
+                self.assertEqual(rubrik.cluster_version(), '5.0.1-1280')
+
+        return fork
+
+    def test_calls_within_the_rate_are_not_throttled(self):
+        # The server accepts 10 calls in any second, the burst and the refill of the limiter add up to 10
+        run_forks(5, self.cluster_version(5, 2))
+
+        self.assertEqual(self.server.stats()['requests'], 10)
+        self.assertEqual(self.server.stats()['errors'], 0)
+
+    def test_throttled_calls_are_sent_again(self):
+        run_forks(5, self.cluster_version(100, 3))
+
+        self.assertGreater(self.server.stats()['errors'], 0)
+        self.assertEqual(self.server.stats()['requests'] - self.server.stats()['errors'], 15)
+
+    def test_rate_limit_stats_are_returned(self):
+        set_module_args({
+            'node_ip': self.server.node_ip,
+            'api_token': 'mock-token',
+            'rate_limit': 5,
+            'rate_limit_dir': self.cache_dir,
+        })
+
+        with self.assertRaises(AnsibleExitJson) as result:
+            rubrik_cluster_version.main()
+
+        self.assertEqual(result.exception.args[0]['version'], '5.0.1-1280')
+        self.assertEqual(result.exception.args[0]['rate_limit_stats'], {'throttled': 0, 'waited': 0.0})
@@ -0,0 +1,204 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+from ansible.module_utils import basic
+from ansible.module_utils._text import to_bytes
+from ansible_collections.rubrikinc.cdm.plugins.module_utils.rubrik_cdm import CircuitBreaker, RetryPolicy, rubrik_cdm, rubrik_connect_class
+from ansible_collections.rubrikinc.cdm.tests.mock_cdm_server import MockCdmServer
+import ansible_collections.rubrikinc.cdm.plugins.modules.rubrik_cluster_version as rubrik_cluster_version
+
+
+def set_module_args(args):
+    """prepare arguments so that they will be picked up during module creation"""
+    args = json.dumps({'ANSIBLE_MODULE_ARGS': args})
+    basic._ANSIBLE_ARGS = to_bytes(args)
+
+
+class AnsibleExitJson(Exception):
+    """Exception class to be raised by module.exit_json and caught by the test case"""
+    pass
+
+
+class AnsibleFailJson(Exception):
+    """Exception class to be raised by module.fail_json and caught by the test case"""
+    pass
+
+
+def exit_json(*args, **kwargs):
+    """function to patch over exit_json; package return data into an exception"""
+    if 'changed' not in kwargs:
+        kwargs['changed'] = False
+    raise AnsibleExitJson(kwargs)
+
+
+def fail_json(*args, **kwargs):
+    """function to patch over fail_json; package return data into an exception"""
+    kwargs['failed'] = True
+    raise AnsibleFailJson(kwargs)
+
+
+def api_error(status_code=None):
+    error = rubrik_cdm.exceptions.APICallException("error")
+    error.status_code = status_code
+    return error
+
+
+class TestRubrikRetryPolicy(unittest.TestCase):
+
+    def test_idempotent_calls_are_retried(self):
+        policy = RetryPolicy(2, backoff=0)
+
+        self.assertTrue(policy.retry('GET', api_error(), 0))
+        self.assertTrue(policy.retry('PUT', api_error(503), 1))
+        self.assertTrue(policy.retry('JOB_STATUS', api_error(502), 0))
+        self.assertFalse(policy.retry('GET', api_error(), 2))
+
+    def test_post_calls_are_retried_when_requested(self):
+        self.assertFalse(RetryPolicy(2, backoff=0).retry('POST', api_error(), 0))
+        self.assertFalse(RetryPolicy(2, backoff=0).retry('DELETE', api_error(503), 0))
+        self.assertTrue(RetryPolicy(2, retry_posts=True, backoff=0).retry('POST', api_error(), 0))
+
+    def test_request_errors_are_not_retried(self):
+        policy = RetryPolicy(2, backoff=0)
+
+        self.assertFalse(policy.retry('GET', api_error(404), 0))
+        self.assertFalse(policy.retry('PUT', api_error(400), 0))
+
+    def test_backoff_is_capped_and_randomized(self):
+        policy = RetryPolicy(10, backoff=1, max_backoff=4)
+
+        with patch.object(time, 'sleep') as sleep:
+            for attempt in range(10):
+                policy.retry('GET', api_error(), attempt)
+
+        delays = [call[0][0] for call in sleep.call_args_list]
+        self.assertTrue(all(0 <= delay <= 4 for delay in delays), delays)
+        self.assertGreater(len(set(delays)), 1)
+
+
+class TestRubrikCircuitBreaker(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+
+    def test_breaker_opens_for_every_fork(self):
+        breaker = CircuitBreaker(self.cache_dir, 'cluster', 2, 0.2)
+        other_fork = CircuitBreaker(self.cache_dir, 'cluster', 2, 0.2)
+
+        breaker.record(True)
+        other_fork.check()
+        other_fork.record(True)
+
+        with self.assertRaises(rubrik_cdm.exceptions.APICallException) as error:
+            breaker.check()
+        self.assertIn('unavailable after 2 consecutive failed API calls', str(error.exception))
+
+        # After the cool down one call probes the cluster while the other calls keep failing fast
+        time.sleep(0.25)
+        other_fork.check()
+        with self.assertRaises(rubrik_cdm.exceptions.APICallException):
+            breaker.check()
+
+        other_fork.record(False)
+        breaker.check()
+        self.assertEqual([name for name in os.listdir(self.cache_dir) if name.endswith('.json')], [])
+
+    def test_success_resets_the_failures(self):
+        breaker = CircuitBreaker(self.cache_dir, 'cluster', 2, 30)
+
+        breaker.record(True)
+        breaker.record(False)
+        breaker.record(True)
+
+        breaker.check()
+
+
+class TestRubrikResilientApiCalls(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = MockCdmServer(vms=10, hosts=2, mssql_dbs=2, managed_volumes=1, seed=1).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.mock_module_helper = patch.multiple(basic.AnsibleModule,
+                                                 exit_json=exit_json,
+                                                 fail_json=fail_json)
+        self.mock_module_helper.start()
+        self.addCleanup(self.mock_module_helper.stop)
+
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+
+        self.server.error_rate = 0
+        self.server.error_endpoints = []
+        self.server.reset_stats()
+
+    def rubrik(self, **kwargs):
+        rubrik = rubrik_connect_class()(self.server.node_ip, api_token='mock-token')
+        rubrik.retry_policy = RetryPolicy(backoff=0.01, **kwargs)
+        return rubrik
+
+    def test_transient_errors_are_retried(self):
+        self.server.error_rate = 0.5
+        rubrik = self.rubrik(retries=10)
+
+        for _ in range(5):
+            self.assertEqual(rubrik.cluster_version(), '5.0.1-1280')
+
+        self.assertGreater(self.server.stats()['errors'], 0)
+
+    def test_post_is_not_retried_by_default(self):
+        self.server.error_endpoints = [re.compile(r'/snapshot$')]
+        rubrik = self.rubrik(retries=2)
+        vm_id = rubrik.object_id('vm-000001', 'vmware')
+
+        with self.assertRaises(rubrik_cdm.exceptions.APICallException):
+            rubrik.post('v1', '/vmware/vm/{0}/snapshot'.format(vm_id), {'slaId': 'INHERIT'})
+        self.assertEqual(self.server.stats()['errors'], 1)
+
+        rubrik = self.rubrik(retries=2, retry_posts=True)
+        with self.assertRaises(rubrik_cdm.exceptions.APICallException):
+            rubrik.post('v1', '/vmware/vm/{0}/snapshot'.format(vm_id), {'slaId': 'INHERIT'})
+        self.assertEqual(self.server.stats()['errors'], 4)
+
+    def test_module_does_not_retry_by_default(self):
+        self.server.error_rate = 1
+        set_module_args({'node_ip': self.server.node_ip, 'api_token': 'mock-token'})
+
+        with self.assertRaises(AnsibleFailJson):
+            rubrik_cluster_version.main()
+        self.assertEqual(self.server.stats()['requests'], 1)
+
+    def test_module_fails_fast_while_the_cluster_is_down(self):
+        unreachable = MockCdmServer(state=self.server.state)
+        unreachable.stop()
+
+        set_module_args({
+            'node_ip': unreachable.node_ip,
+            'api_token': 'mock-token',
+            'api_retries': 0,
+            'circuit_breaker_threshold': 1,
+            'circuit_breaker_dir': self.cache_dir,
+        })
+
+        with self.assertRaises(AnsibleFailJson) as result:
+            rubrik_cluster_version.main()
+        self.assertIn('Unable to establish a connection', result.exception.args[0]['msg'])
+
+        with self.assertRaises(AnsibleFailJson) as result:
+            rubrik_cluster_version.main()
+        self.assertIn('is unavailable after 1 consecutive failed API calls', result.exception.args[0]['msg'])
+
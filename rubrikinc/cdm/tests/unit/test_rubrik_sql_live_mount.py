@@ -0,0 +1,135 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+import unittest
+from unittest.mock import patch
+from ansible.module_utils import basic
+from ansible.module_utils._text import to_bytes
+from ansible_collections.rubrikinc.cdm.tests.mock_cdm_server import MockCdmServer
+import ansible_collections.rubrikinc.cdm.plugins.modules.rubrik_sql_live_mount as rubrik_sql_live_mount
+
+
+def set_module_args(args):
+    """prepare arguments so that they will be picked up during module creation"""
+    args = json.dumps({'ANSIBLE_MODULE_ARGS': args})
+    basic._ANSIBLE_ARGS = to_bytes(args)
+
+
+class AnsibleExitJson(Exception):
+    """Exception class to be raised by module.exit_json and caught by the test case"""
+    pass
+
+
+class AnsibleFailJson(Exception):
+    """Exception class to be raised by module.fail_json and caught by the test case"""
+    pass
+
+
+def exit_json(*args, **kwargs):
+    """function to patch over exit_json; package return data into an exception"""
+    if 'changed' not in kwargs:
+        kwargs['changed'] = False
+    raise AnsibleExitJson(kwargs)
+
+
+def fail_json(*args, **kwargs):
+    """function to patch over fail_json; package return data into an exception"""
+    kwargs['failed'] = True
+    raise AnsibleFailJson(kwargs)
+
+
+
+class TestRubrikSqlLiveMount(unittest.TestCase):
+
+    def setUp(self):
+        self.mock_module_helper = patch.multiple(basic.AnsibleModule, exit_json=exit_json, fail_json=fail_json)
+        self.mock_module_helper.start()
+        self.addCleanup(self.mock_module_helper.stop)
+
+        self.server = MockCdmServer(vms=1, hosts=2, mssql_dbs=6, managed_volumes=1, seed=1).start()
+        self.addCleanup(self.server.stop)
+
+    def module_args(self, **kwargs):
+        kwargs.update({'node_ip': self.server.node_ip, 'api_token': 'mock-token', 'sql_instance': 'MSSQLSERVER',
+                       'sql_host': 'host-00001.mock.local'})
+        set_module_args(kwargs)
+
+    def mounted_db_names(self):
+        return sorted(mount['mountedDatabaseName'] for mount in self.server.state.listing('mssql_mount', {})['data'])
+
+    def writes(self):
+        return dict((endpoint, count) for endpoint, count in self.server.stats()['endpoints'].items() if not endpoint.startswith('GET '))
+
+    def test_multi_database_live_mount(self):
+        self.module_args(databases=['db-000000', 'db-000002', {'db_name': 'db-000004', 'mount_name': 'reporting', 'date': 'latest',
+                                                               'time': 'latest'}],
+                         date='12-31-2019', time='12:00 AM', mount_suffix='_test', max_concurrency=2, poll_interval=1)
+
+        with self.assertRaises(AnsibleExitJson) as result:
+            rubrik_sql_live_mount.main()
+
+        result = result.exception.args[0]
+        self.assertEqual(result['changed'], True)
+        self.assertEqual(len(result['job_status_urls']), 3)
+        self.assertEqual(dict((db_name, (mount['mount_name'], mount['recovery_point'], mount['status']))
+                              for db_name, mount in result['mounts'].items()), {
+            'db-000000': ('db-000000_test', '2019-12-31T06:00', 'SUCCEEDED'),
+            'db-000002': ('db-000002_test', '2019-12-31T06:00', 'SUCCEEDED'),
+            'db-000004': ('reporting', '2020-01-01T12:00', 'SUCCEEDED')})
+        self.assertEqual(self.mounted_db_names(), ['db-000000_test', 'db-000002_test', 'reporting'])
+
+        # The host, instance, databases and cluster timezone are each read once
+        endpoints = self.server.stats()['endpoints']
+        for endpoint in ['GET /api/v1/host', 'GET /api/v1/mssql/instance', 'GET /api/v1/mssql/db', 'GET /api/v1/cluster/me']:
+            self.assertEqual(endpoints[endpoint], 1)
+        self.assertEqual(self.writes(), {'POST /api/v1/mssql/db/MssqlDatabase:::{id}/mount': 3})
+
+    def test_no_live_mount_is_started_when_a_recovery_point_is_invalid(self):
+        self.module_args(databases=['db-000000', 'db-000001', {'db_name': 'db-000002', 'date': '1-15-2019', 'time': '1:30 PM'}, 'missing'],
+                         date='12-31-2019', time='12:00 AM')
+
+        with self.assertRaises(AnsibleFailJson) as result:
+            rubrik_sql_live_mount.main()
+
+        self.assertEqual(result.exception.args[0]['msg'],
+                         "The database 'db-000002' does not have a recovery_point taken on 1-15-2019 at 1:30 PM. "
+                         "The database missing does not exist, please provide a valid database")
+        self.assertEqual(self.writes(), {})
+        self.assertEqual(self.mounted_db_names(), [])
+
+    def test_mount_names_must_be_unique(self):
+        self.module_args(databases=['db-000000', {'db_name': 'db-000001', 'mount_name': 'db-000000_LiveMount'}])
+
+        with self.assertRaises(AnsibleFailJson) as result:
+            rubrik_sql_live_mount.main()
+
+        self.assertEqual(result.exception.args[0]['msg'],
+                         "The mount_name 'db-000000_LiveMount' of the database 'db-000001' is used by more than one database.")
+        self.assertEqual(self.server.stats()['requests'], 0)
+
+    def test_failed_mount_job_is_reported(self):
+        self.module_args(db_name='db-000000', mount_name='reporting')
+        with self.assertRaises(AnsibleExitJson):
+            rubrik_sql_live_mount.main()
+
+        self.module_args(databases=[{'db_name': 'db-000001', 'mount_name': 'reporting'}, 'db-000002'])
+        with self.assertRaises(AnsibleFailJson) as result:
+            rubrik_sql_live_mount.main()
+
+        # The job was started and failed on the cluster
+        mount = result.exception.args[0]['mounts']['db-000001']
+        self.assertEqual(mount['status'], 'FAILED')
+        self.assertEqual(mount['error'], "A database named 'reporting' is already mounted.")
+        self.assertIn('seconds', mount)
+        self.assertEqual(result.exception.args[0]['mounts']['db-000002']['status'], 'SUCCEEDED')
+
+    def test_single_database_live_mount(self):
+        self.module_args(db_name='db-000000', date='12-31-2019', time='12:00 AM', mount_name='db-000000-clone')
+
+        with self.assertRaises(AnsibleExitJson) as result:
+            rubrik_sql_live_mount.main()
+
+        self.assertIn('links', result.exception.args[0]['response'])
+        self.assertEqual(self.mounted_db_names(), ['db-000000-clone'])
+        self.assertEqual(self.writes(), {'POST /api/v1/mssql/db/MssqlDatabase:::{id}/mount': 1})
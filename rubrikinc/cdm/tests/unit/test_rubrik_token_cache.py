@@ -0,0 +1,143 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+from unittest.mock import patch
+from ansible.module_utils import basic
+from ansible.module_utils._text import to_bytes
+import ansible_collections.rubrikinc.cdm.plugins.action.rubrik as rubrik_action
+import ansible_collections.rubrikinc.cdm.plugins.module_utils.rubrik_cdm as rubrik_module_utils
+from ansible_collections.rubrikinc.cdm.tests.mock_cdm_server import MockCdmServer
+import ansible_collections.rubrikinc.cdm.plugins.modules.rubrik_cluster_version as rubrik_cluster_version
+
+
+def set_module_args(args):
+    """prepare arguments so that they will be picked up during module creation"""
+    args = json.dumps({'ANSIBLE_MODULE_ARGS': args})
+    basic._ANSIBLE_ARGS = to_bytes(args)
+
+
+class AnsibleExitJson(Exception):
+    """Exception class to be raised by module.exit_json and caught by the test case"""
+    pass
+
+
+class AnsibleFailJson(Exception):
+    """Exception class to be raised by module.fail_json and caught by the test case"""
+    pass
+
+
+def exit_json(*args, **kwargs):
+    """function to patch over exit_json; package return data into an exception"""
+    if 'changed' not in kwargs:
+        kwargs['changed'] = False
+    raise AnsibleExitJson(kwargs)
+
+
+def fail_json(*args, **kwargs):
+    """function to patch over fail_json; package return data into an exception"""
+    kwargs['failed'] = True
+    raise AnsibleFailJson(kwargs)
+
+
+class TestRubrikTokenCache(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = MockCdmServer(vms=10, hosts=2, mssql_dbs=2, managed_volumes=1, seed=1).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.mock_module_helper = patch.multiple(basic.AnsibleModule,
+                                                 exit_json=exit_json,
+                                                 fail_json=fail_json)
+        self.mock_module_helper.start()
+        self.addCleanup(self.mock_module_helper.stop)
+
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+
+        self.server.reset_stats()
+
+    def cluster_version(self, password='password'):
+        set_module_args({
+            'node_ip': self.server.node_ip,
+            'username': 'admin',
+            'password': password,
+            'token_cache_ttl': 600,
+            'token_cache_dir': self.cache_dir,
+        })
+
+        with self.assertRaises(AnsibleExitJson) as result:
+            rubrik_cluster_version.main()
+
+        self.assertEqual(result.exception.args[0]['version'], '5.0.1-1280')
+        return result.exception.args[0]
+
+    def test_session_token_is_reused(self):
+        self.cluster_version()
+        self.cluster_version()
+
+        self.assertEqual(self.server.stats()['endpoints'], {'POST /api/v1/session': 1, 'GET /api/v1/cluster/me/version': 2})
+
+        cache_files = [name for name in os.listdir(self.cache_dir) if name.endswith('.json')]
+        self.assertEqual(len(cache_files), 1)
+
+        cache_file = os.path.join(self.cache_dir, cache_files[0])
+        self.assertEqual(stat.S_IMODE(os.stat(cache_file).st_mode), 0o600)
+        with open(cache_file) as token_file:
+            entry = json.load(token_file)
+        self.assertNotIn(entry['token'], self.server.state.tokens)
+        self.assertIn(rubrik_module_utils.TokenCache(self.cache_dir, 600)._get(cache_file, 'password'), self.server.state.tokens)
+
+    def test_expired_session_token_is_refreshed(self):
+        self.cluster_version()
+        self.server.expire_sessions()
+        self.cluster_version()
+
+        self.assertEqual(self.server.stats()['endpoints'], {'POST /api/v1/session': 2, 'GET /api/v1/cluster/me/version': 3})
+        self.assertEqual(self.server.stats()['errors'], 1)
+
+    def test_password_change_discards_session_token(self):
+        self.cluster_version()
+        self.cluster_version(password='new-password')
+
+        self.assertEqual(self.server.stats()['endpoints']['POST /api/v1/session'], 2)
+
+    def test_group_readable_cache_file_is_ignored(self):
+        self.cluster_version()
+        for name in os.listdir(self.cache_dir):
+            os.chmod(os.path.join(self.cache_dir, name), 0o644)
+        self.cluster_version()
+
+        self.assertEqual(self.server.stats()['endpoints']['POST /api/v1/session'], 2)
+
+    def test_session_token_through_action_plugin_connection(self):
+        rubrik_action._connections.clear()
+        rubrik_module_utils.set_connection_factory(rubrik_action.cluster_connection)
+        self.addCleanup(rubrik_module_utils.set_connection_factory, None)
+
+        self.cluster_version()
+        self.server.expire_sessions()
+        self.cluster_version()
+
+        self.assertEqual(self.server.stats()['endpoints'], {'POST /api/v1/session': 2, 'GET /api/v1/cluster/me/version': 3})
+
+    def test_connection_stats_through_action_plugin_connection(self):
+        rubrik_action._connections.clear()
+        rubrik_module_utils.set_connection_factory(rubrik_action.cluster_connection)
+        self.addCleanup(rubrik_module_utils.set_connection_factory, None)
+
+        self.cluster_version()
+        connection_stats = self.cluster_version()['connection_stats']
+
+        # The second task reuses the pooled session of the first one
+        self.assertEqual(connection_stats, {'requests': 2, 'handshakes': 1, 'handshakes_avoided': 1, 'logins': 0})
@@ -2,10 +2,15 @@ from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 
 import json
+import shutil
+import tempfile
+import time
 import unittest
 from unittest.mock import Mock, patch
 from ansible.module_utils import basic
 from ansible.module_utils._text import to_bytes
+from ansible_collections.rubrikinc.cdm.plugins.module_utils.rubrik_cdm import SnapshotIndex
+from ansible_collections.rubrikinc.cdm.tests.mock_cdm_server import MockCdmServer
 import ansible_collections.rubrikinc.cdm.plugins.modules.rubrik_vsphere_live_mount as rubrik_vsphere_live_mount
 
 
@@ -365,10 +370,9 @@ class TestRubrikVsphereLiveMount(unittest.TestCase):
         self.assertEqual(result.exception.args[0]['response'], mock_post_v1_vmware_vm_snapshot_id_mount())
 
     @patch.object(rubrik_vsphere_live_mount.rubrik_cdm.rubrik_cdm.Connect, 'post', autospec=True, spec_set=True)
-    @patch.object(rubrik_vsphere_live_mount.rubrik_cdm.rubrik_cdm.Connect,
-                  '_date_time_conversion', autospec=True, spec_set=True)
+    @patch.object(SnapshotIndex, 'point_in_time', autospec=True, spec_set=True)
     @patch.object(rubrik_vsphere_live_mount.rubrik_cdm.rubrik_cdm.Connect, 'get', autospec=True, spec_set=True)
-    def test_module_configure_rubrik_vsphere_live_specific_time(self, mock_get, mock__date_time_conversion, mock_post):
+    def test_module_configure_rubrik_vsphere_live_specific_time(self, mock_get, mock_point_in_time, mock_post):
 
         def mock_get_v1_vmware_vm():
             return {
@@ -675,7 +679,7 @@ class TestRubrikVsphereLiveMount(unittest.TestCase):
 
         mock_get.side_effect = [mock_get_v1_vmware_vm(), mock_get_v1_vmware_vm_id()]
 
-        mock__date_time_conversion.return_value = "2014-01-15T09:30"
+        mock_point_in_time.return_value = "2014-01-15T09:30"
 
         mock_post.return_value = mock_post_v1_vmware_vm_snapshot_id_mount()
 
@@ -685,11 +689,10 @@ class TestRubrikVsphereLiveMount(unittest.TestCase):
         self.assertEqual(result.exception.args[0]['response'], mock_post_v1_vmware_vm_snapshot_id_mount())
 
     @patch.object(rubrik_vsphere_live_mount.rubrik_cdm.rubrik_cdm.Connect, 'post', autospec=True, spec_set=True)
-    @patch.object(rubrik_vsphere_live_mount.rubrik_cdm.rubrik_cdm.Connect,
-                  '_date_time_conversion', autospec=True, spec_set=True)
+    @patch.object(SnapshotIndex, 'point_in_time', autospec=True, spec_set=True)
     @patch.object(rubrik_vsphere_live_mount.rubrik_cdm.rubrik_cdm.Connect, 'get', autospec=True, spec_set=True)
     def test_module_configure_rubrik_vsphere_live_mount_specific_host(
-            self, mock_get, mock__date_time_conversion, mock_post):
+            self, mock_get, mock_point_in_time, mock_post):
 
         def mock_get_v1_vmware_vm():
             return {
@@ -1029,7 +1032,7 @@ class TestRubrikVsphereLiveMount(unittest.TestCase):
 
         mock_get.side_effect = [mock_get_v1_vmware_vm(), mock_get_v1_vmware_vm_id(), mock_get_v1_vmware_host()]
 
-        mock__date_time_conversion.return_value = "2014-01-15T09:30"
+        mock_point_in_time.return_value = "2014-01-15T09:30"
 
         mock_post.return_value = mock_post_v1_vmware_vm_snapshot_id_mount()
 
@@ -1037,3 +1040,161 @@ class TestRubrikVsphereLiveMount(unittest.TestCase):
             rubrik_vsphere_live_mount.main()
 
         self.assertEqual(result.exception.args[0]['response'], mock_post_v1_vmware_vm_snapshot_id_mount())
+
+
+class TestRubrikVsphereLiveMountSnapshotIndex(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # Every VM has daily snapshots taken at 12:00 UTC (6:00 AM on the America/Chicago cluster), the newest on 1-1-2020
+        cls.server = MockCdmServer(vms=5, hosts=1, mssql_dbs=1, managed_volumes=1, snapshots_per_object=30, seed=1).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.mock_module_helper = patch.multiple(basic.AnsibleModule, exit_json=exit_json, fail_json=fail_json)
+        self.mock_module_helper.start()
+        self.addCleanup(self.mock_module_helper.stop)
+
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+
+        self.server.reset_stats()
+
+    def live_mount(self, **kwargs):
+        kwargs.update({'vm_name': 'vm-000001', 'node_ip': self.server.node_ip, 'api_token': 'mock-token',
+                       'lookup_cache_ttl': 300, 'lookup_cache_dir': self.cache_dir})
+        set_module_args(kwargs)
+
+        with self.assertRaises(AnsibleExitJson) as result:
+            rubrik_vsphere_live_mount.main()
+        return result.exception.args[0]
+
+    def test_snapshot_match(self):
+        self.assertEqual(self.live_mount(date='12-31-2019', time='6:00 AM')['snapshot']['date'], '2019-12-31T12:00:00.000Z')
+        self.assertEqual(self.live_mount(date='12-31-2019', time='11:00 PM', snapshot_match='nearest_before')['snapshot']['date'],
+                         '2019-12-31T12:00:00.000Z')
+        self.assertEqual(self.live_mount(date='12-31-2019', time='11:00 PM', snapshot_match='nearest_after')['snapshot']['date'],
+                         '2020-01-01T12:00:00.000Z')
+        self.assertEqual(self.live_mount()['snapshot']['date'], '2020-01-01T12:00:00.000Z')
+
+        with self.assertRaises(AnsibleFailJson) as result:
+            self.live_mount(date='12-31-2019', time='11:00 PM')
+        self.assertEqual(result.exception.args[0]['msg'],
+                         "The vSphere VM 'vm-000001' does not have a snapshot taken on 12-31-2019 at 11:00 PM.")
+
+        with self.assertRaises(AnsibleFailJson) as result:
+            self.live_mount(date='1-1-2020', time='7:00 AM', snapshot_match='nearest_after')
+        self.assertEqual(result.exception.args[0]['msg'],
+                         "The vSphere VM 'vm-000001' does not have a snapshot taken on or after 1-1-2020 at 7:00 AM.")
+
+    def test_index_is_reused_for_older_points_in_time(self):
+        self.live_mount(date='12-15-2019', time='6:00 AM')
+        self.server.reset_stats()
+
+        for day in range(10, 19):
+            self.live_mount(date='12-{0}-2019'.format(day), time='6:00 AM')
+
+        # Neither the snapshot list of the VM nor the cluster timezone are read again, only the snapshots are mounted
+        endpoints = self.server.stats()['endpoints']
+        self.assertEqual([endpoint for endpoint in endpoints if not endpoint.endswith('/mount')], [])
+        self.assertEqual(sum(endpoints.values()), 9)
+
+        # A point in time newer than the newest indexed snapshot refreshes the index
+        self.live_mount()
+        self.assertEqual(self.server.stats()['endpoints']['GET /api/v1/vmware/vm/VirtualMachine:::{id}'], 1)
+
+
+class TestRubrikVsphereBulkLiveMount(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = MockCdmServer(vms=10, hosts=1, mssql_dbs=1, managed_volumes=1, seed=1).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.mock_module_helper = patch.multiple(basic.AnsibleModule, exit_json=exit_json, fail_json=fail_json)
+        self.mock_module_helper.start()
+        self.addCleanup(self.mock_module_helper.stop)
+
+        self.server.reset_stats()
+
+    def module_args(self, **kwargs):
+        kwargs.update({'node_ip': self.server.node_ip, 'api_token': 'mock-token'})
+        set_module_args(kwargs)
+
+    def test_vms_are_mounted_by_group(self):
+        self.module_args(vms=[{'vm_name': 'vm-000001', 'group': 1, 'power_on': False}, 'vm-000002', 'vm-000003'], group=2,
+                         max_concurrency=2)
+
+        with self.assertRaises(AnsibleExitJson) as result:
+            rubrik_vsphere_live_mount.main()
+
+        mounts = result.exception.args[0]['mounts']
+        self.assertEqual(result.exception.args[0]['changed'], True)
+        self.assertEqual(len(result.exception.args[0]['job_status_urls']), 3)
+        self.assertEqual(dict((vm_name, (mount['group'], mount['status'])) for vm_name, mount in mounts.items()),
+                         {'vm-000001': (1, 'SUCCEEDED'), 'vm-000002': (2, 'SUCCEEDED'), 'vm-000003': (2, 'SUCCEEDED')})
+        self.assertTrue(all(mount['snapshot']['date'] == '2020-01-01T12:00:00.000Z' and 'seconds' in mount for mount in mounts.values()))
+        self.assertEqual(self.server.stats()['endpoints']['POST /api/v1/vmware/vm/snapshot/VirtualMachine:::{id}/mount'], 3)
+
+    def test_failed_group_stops_the_next_groups(self):
+        self.module_args(vms=[{'vm_name': 'vm-000001', 'group': 1, 'date': '1-15-2014', 'time': '1:30 AM'},
+                              {'vm_name': 'vm-000002', 'group': 1}, {'vm_name': 'vm-000003', 'group': 2}])
+
+        with self.assertRaises(AnsibleFailJson) as result:
+            rubrik_vsphere_live_mount.main()
+
+        mounts = result.exception.args[0]['mounts']
+        self.assertEqual(result.exception.args[0]['msg'], "2 of the 3 vSphere VM Live Mounts did not succeed: vm-000001, vm-000003.")
+        self.assertEqual(mounts['vm-000001']['error'], "The vSphere VM 'vm-000001' does not have a snapshot taken on 1-15-2014 at 1:30 AM.")
+        self.assertEqual(mounts['vm-000002']['status'], 'SUCCEEDED')
+        self.assertEqual(mounts['vm-000003'], {'group': 2, 'status': 'NOT_STARTED'})
+        self.assertEqual(self.server.stats()['endpoints']['POST /api/v1/vmware/vm/snapshot/VirtualMachine:::{id}/mount'], 1)
+
+    def test_failed_mount_job_is_reported(self):
+        host = self.server.state.collections['vmware_host'].pop('VmwareHost:::esxi-0001')
+        self.addCleanup(self.server.state.add, 'vmware_host', host)
+        self.module_args(vms=['vm-000004'])
+
+        with self.assertRaises(AnsibleFailJson) as result:
+            rubrik_vsphere_live_mount.main()
+
+        # The job was started and failed on the cluster
+        mount = result.exception.args[0]['mounts']['vm-000004']
+        self.assertEqual(result.exception.args[0]['msg'], "1 of the 1 vSphere VM Live Mounts did not succeed: vm-000004.")
+        self.assertEqual(mount['status'], 'FAILED')
+        self.assertEqual(mount['error'], "The ESXi host 'VmwareHost:::esxi-0001' of the Live Mount was not found.")
+        self.assertIn('job_status_url', mount)
+        self.assertIn('seconds', mount)
+
+    def test_deadline_bounds_every_group(self):
+        server = MockCdmServer(vms=3, hosts=1, mssql_dbs=1, managed_volumes=1, seed=1, job_duration=1).start()
+        self.addCleanup(server.stop)
+        set_module_args({'node_ip': server.node_ip, 'api_token': 'mock-token', 'deadline': 3, 'poll_interval': 1,
+                         'vms': [{'vm_name': 'vm-000000', 'group': 1}, {'vm_name': 'vm-000001', 'group': 2}, {'vm_name': 'vm-000002', 'group': 3}]})
+
+        start = time.time()
+        with self.assertRaises(AnsibleFailJson) as result:
+            rubrik_vsphere_live_mount.main()
+
+        # Each group takes more than a second, the three groups do not fit in the deadline of 3 seconds
+        mounts = result.exception.args[0]['mounts']
+        self.assertLess(time.time() - start, 4.5)
+        self.assertEqual(mounts['vm-000000']['status'], 'SUCCEEDED')
+        self.assertNotEqual(mounts['vm-000002']['status'], 'SUCCEEDED')
+
+    def test_invalid_vms(self):
+        self.module_args(vms=['vm-000001', 'vm-000001', {'vm_name': 'vm-000002', 'wave': 1}])
+
+        with self.assertRaises(AnsibleFailJson) as result:
+            rubrik_vsphere_live_mount.main()
+
+        self.assertEqual(result.exception.args[0]['msg'],
+                         "The vSphere VM 'vm-000001' is listed more than once in 'vms'. Unsupported 'vms' option(s): wave.")
+
@@ -0,0 +1,124 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+import re
+import unittest
+from unittest.mock import patch
+from ansible.module_utils import basic
+from ansible.module_utils._text import to_bytes
+from ansible_collections.rubrikinc.cdm.tests.mock_cdm_server import MockCdmServer
+import ansible_collections.rubrikinc.cdm.plugins.modules.rubrik_vsphere_live_mount as rubrik_vsphere_live_mount
+import ansible_collections.rubrikinc.cdm.plugins.modules.rubrik_vsphere_live_unmount as rubrik_vsphere_live_unmount
+
+
+def set_module_args(args):
+    """prepare arguments so that they will be picked up during module creation"""
+    args = json.dumps({'ANSIBLE_MODULE_ARGS': args})
+    basic._ANSIBLE_ARGS = to_bytes(args)
+
+
+class AnsibleExitJson(Exception):
+    """Exception class to be raised by module.exit_json and caught by the test case"""
+    pass
+
+
+class AnsibleFailJson(Exception):
+    """Exception class to be raised by module.fail_json and caught by the test case"""
+    pass
+
+
+def exit_json(*args, **kwargs):
+    """function to patch over exit_json; package return data into an exception"""
+    if 'changed' not in kwargs:
+        kwargs['changed'] = False
+    raise AnsibleExitJson(kwargs)
+
+
+def fail_json(*args, **kwargs):
+    """function to patch over fail_json; package return data into an exception"""
+    kwargs['failed'] = True
+    raise AnsibleFailJson(kwargs)
+
+
+class TestRubrikVsphereLiveUnmount(unittest.TestCase):
+
+    def setUp(self):
+        self.mock_module_helper = patch.multiple(basic.AnsibleModule, exit_json=exit_json, fail_json=fail_json)
+        self.mock_module_helper.start()
+        self.addCleanup(self.mock_module_helper.stop)
+
+        self.server = MockCdmServer(vms=10, hosts=1, mssql_dbs=1, managed_volumes=1, seed=1).start()
+        self.addCleanup(self.server.stop)
+
+        self.run_module(rubrik_vsphere_live_mount, vms=['vm-000001', 'vm-000002', 'vm-000003', 'vm-000004'])
+        self.run_module(rubrik_vsphere_live_mount, vms=['vm-000001'])
+        self.server.reset_stats()
+
+    def run_module(self, module, **kwargs):
+        kwargs.update({'node_ip': self.server.node_ip, 'api_token': 'mock-token'})
+        set_module_args(kwargs)
+
+        with self.assertRaises(AnsibleExitJson) as result:
+            module.main()
+        return result.exception.args[0]
+
+    def mounted_vm_names(self):
+        mounts = self.server.state.listing('vm_mount', {})['data']
+        return sorted(self.server.state.find('vmware_vm', mount['mountedVmId'])['name'] for mount in mounts)
+
+    def test_unmount_by_pattern_and_source_vm(self):
+        result = self.run_module(rubrik_vsphere_live_unmount, mounted_vm_names=['VM-000001 *'], vm_names=['vm-000003'], max_concurrency=2)
+
+        self.assertEqual(result['changed'], True)
+        self.assertEqual(sorted((unmount['vm_name'], unmount['status'], unmount['forced']) for unmount in result['unmounts'].values()),
+                         [('vm-000001', 'SUCCEEDED', False), ('vm-000001', 'SUCCEEDED', False), ('vm-000003', 'SUCCEEDED', False)])
+        self.assertEqual([name.split(' ')[0] for name in self.mounted_vm_names()], ['vm-000002', 'vm-000004'])
+
+        # The Live Mounts and the VM inventory are each read in a single page
+        endpoints = self.server.stats()['endpoints']
+        self.assertEqual(endpoints['GET /api/v1/vmware/vm/snapshot/mount'], 1)
+        self.assertEqual(endpoints['GET /api/v1/vmware/vm'], 1)
+        self.assertEqual(endpoints['DELETE /api/v1/vmware/vm/snapshot/mount/vm_mount:::{id}'], 3)
+
+    def test_failed_unmounts_are_forced(self):
+        mount = sorted(self.server.state.listing('vm_mount', {'vm_id': 'VirtualMachine:::vm-000002'})['data'], key=lambda mount: mount['id'])[0]
+        self.server.state.collections['vm_mount'][mount['id']]['datastoreRemoved'] = True
+
+        result = self.run_module(rubrik_vsphere_live_unmount, mounted_vm_names=['vm-00000[2-4] *'])
+
+        forced = [unmount for unmount in result['unmounts'].values() if unmount['forced']]
+        self.assertEqual(len(result['unmounts']), 3)
+        self.assertEqual([(unmount['mount_id'], unmount['status']) for unmount in forced], [(mount['id'], 'SUCCEEDED')])
+        self.assertTrue(all(unmount['status'] == 'SUCCEEDED' for unmount in result['unmounts'].values()))
+        self.assertEqual([name.split(' ')[0] for name in self.mounted_vm_names()], ['vm-000001', 'vm-000001'])
+
+    def test_failed_unmounts_are_reported(self):
+        mount = self.server.state.listing('vm_mount', {'vm_id': 'VirtualMachine:::vm-000004'})['data'][0]
+        self.server.state.collections['vm_mount'][mount['id']]['datastoreRemoved'] = True
+
+        set_module_args({'vm_names': ['vm-000004'], 'force_on_failure': False, 'node_ip': self.server.node_ip, 'api_token': 'mock-token'})
+        with self.assertRaises(AnsibleFailJson) as result:
+            rubrik_vsphere_live_unmount.main()
+
+        unmount = list(result.exception.args[0]['unmounts'].values())[0]
+        self.assertEqual(result.exception.args[0]['msg'].split(':')[0], '1 of the 1 vSphere Live Mounts were not unmounted')
+        self.assertEqual(unmount['status'], 'FAILED')
+        self.assertIn('Use force to unmount it.', unmount['error'])
+
+    def test_unreadable_unmount_jobs_are_not_forced(self):
+        self.server.error_endpoints = [re.compile(r"/request/")]
+
+        set_module_args({'vm_names': ['vm-000004'], 'poll_interval': 0, 'node_ip': self.server.node_ip, 'api_token': 'mock-token'})
+        with self.assertRaises(AnsibleFailJson) as result:
+            rubrik_vsphere_live_unmount.main()
+
+        unmount = list(result.exception.args[0]['unmounts'].values())[0]
+        self.assertEqual((unmount['status'], unmount['forced']), ('UNKNOWN', False))
+        self.assertEqual(self.server.stats()['endpoints']['DELETE /api/v1/vmware/vm/snapshot/mount/vm_mount:::{id}'], 1)
+
+    def test_no_matching_live_mount(self):
+        result = self.run_module(rubrik_vsphere_live_unmount, mounted_vm_names=['missing-*'])
+
+        self.assertEqual(result['changed'], False)
+        self.assertEqual(result['unmounts'], {})